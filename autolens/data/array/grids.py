@@ -1,4 +1,5 @@
 from functools import wraps
+import numba
 import numpy as np
 from autolens import decorator_util
 
@@ -46,7 +47,7 @@ def sub_to_image_grid(func):
         galaxy_util.intensities_of_galaxies_from_grid(grid=grid_stack.sub, galaxies=galaxies)
         """
 
-        result = func(grid, galaxies, *args, *kwargs)
+        result = func(grid, galaxies, *args, **kwargs)
 
         if isinstance(grid, SubGrid):
             return grid.sub_data_to_regular_data(result)
@@ -79,6 +80,12 @@ class GridStack(object):
         positive y-axis is upwards and poitive x-axis to the right. The array is ordered such pixels begin from the \
         top-row of the mask and go rightwards and then downwards.
 
+        The grid_stack can also be stored as views of one contiguous buffer of shape (total_coordinates, 2), ordered \
+        sub, blurring, pix and then regular (see *with_buffer*). A function (e.g. the deflection angles of a plane's \
+        galaxies) can then be evaluated once on all grid_stack (see *apply_function_to_concatenated_grid*) instead of \
+        once per grid, and traced grid-stacks are computed directly in a new buffer (see \
+        *traced_grid_stack_from_deflection_stacks*).
+
         Parameters
         -----------
         regular : RegularGrid
@@ -99,8 +106,14 @@ class GridStack(object):
         else:
             self.pix = pix
 
+        self._buffer = None
+        self._concatenated_grid = None
+        self._regular_in_sub = None
+        self._base_grid_stack = None
+
     @classmethod
-    def grid_stack_from_mask_sub_grid_size_and_psf_shape(cls, mask, sub_grid_size, psf_shape):
+    def grid_stack_from_mask_sub_grid_size_and_psf_shape(cls, mask, sub_grid_size, psf_shape,
+                                                         gauss_legendre_sub_grid=False):
         """Setup a grid-stack of grid_stack from a mask, sub-grid size and psf-shape.
 
         Parameters
@@ -111,9 +124,14 @@ class GridStack(object):
             The size of a sub-pixel's sub-grid (sub_grid_size x sub_grid_size).
         psf_shape : (int, int)
             the shape of the PSF used in the analysis, which defines the mask's blurring-region.
+        gauss_legendre_sub_grid : bool
+            If True, the sub-grid is a *GaussLegendreSubGrid* as opposed to a uniform *SubGrid*.
         """
         regular_grid = RegularGrid.from_mask(mask)
-        sub_grid = SubGrid.from_mask_and_sub_grid_size(mask, sub_grid_size)
+        if gauss_legendre_sub_grid:
+            sub_grid = GaussLegendreSubGrid.from_mask_and_sub_grid_size(mask, sub_grid_size)
+        else:
+            sub_grid = SubGrid.from_mask_and_sub_grid_size(mask, sub_grid_size)
         blurring_grid = RegularGrid.blurring_grid_from_mask_and_psf_shape(mask, psf_shape)
         return GridStack(regular_grid, sub_grid, blurring_grid)
 
@@ -139,7 +157,8 @@ class GridStack(object):
         return GridStack(regular_grid, sub_grid, blurring_grid)
 
     @classmethod
-    def padded_grid_stack_from_mask_sub_grid_size_and_psf_shape(cls, mask, sub_grid_size, psf_shape):
+    def padded_grid_stack_from_mask_sub_grid_size_and_psf_shape(cls, mask, sub_grid_size, psf_shape,
+                                                                gauss_legendre_sub_grid=False):
         """Setup a grid-stack of masked grid_stack from a mask,  sub-grid size and psf-shape.
 
         Parameters
@@ -150,13 +169,15 @@ class GridStack(object):
             The size of a sub-pixels sub-grid (sub_grid_size x sub_grid_size).
         psf_shape : (int, int)
             The shape of the PSF used in the analysis, which defines the mask's blurring-region.
+        gauss_legendre_sub_grid : bool
+            If True, the padded sub-grid is a *PaddedGaussLegendreSubGrid* as opposed to a uniform *PaddedSubGrid*.
         """
         regular_padded_grid = PaddedRegularGrid.padded_grid_from_shape_psf_shape_and_pixel_scale(shape=mask.shape,
                                                                                                  psf_shape=psf_shape,
                                                                                                  pixel_scale=mask.pixel_scale)
-        sub_padded_grid = PaddedSubGrid.padded_grid_from_mask_sub_grid_size_and_psf_shape(mask=mask,
-                                                                                          sub_grid_size=sub_grid_size,
-                                                                                          psf_shape=psf_shape)
+        padded_sub_grid_class = PaddedGaussLegendreSubGrid if gauss_legendre_sub_grid else PaddedSubGrid
+        sub_padded_grid = padded_sub_grid_class.padded_grid_from_mask_sub_grid_size_and_psf_shape(
+            mask=mask, sub_grid_size=sub_grid_size, psf_shape=psf_shape)
         # TODO : The blurring grid is not used when the grid mapper is called, the 0.0 0.0 stops errors inr ayT_racing
         # TODO : implement a more explicit solution
         return GridStack(regular=regular_padded_grid, sub=sub_padded_grid, blurring=np.array([[0.0, 0.0]]))
@@ -190,6 +211,12 @@ class GridStack(object):
         The new grid-stack has the same grid_stack (regular, sub, blurring, etc.) as before, but adds a pix-grid as a \
         new attribute.
 
+        The new grid-stack keeps a reference to this (base) grid-stack, such that a function applied to its \
+        concatenated grid is evaluated on the base grid-stack's concatenated grid and on the pix-grid separately \
+        (see *apply_function_to_concatenated_grid*). A new grid-stack is set up for every pix-grid (e.g. every \
+        sample of an adaptive pixelization), thus the base grid-stack's concatenated grid (and therefore any \
+        deflection angles cached on it, see *plane.DeflectionCache*) is the same for all of them.
+
         Parameters
         -----------
         pix_grid : ndarray
@@ -198,8 +225,30 @@ class GridStack(object):
         regular_to_nearest_pix : ndarray
             A 1D array that maps every regular-grid pixel to its nearest pix-grid pixel.
         """
+        base_grid_stack = self._base_grid_stack if self._base_grid_stack is not None else self
+
         pix = PixGrid(arr=pix_grid, regular_to_nearest_pix=regular_to_nearest_pix)
-        return GridStack(regular=self.regular, sub=self.sub, blurring=self.blurring, pix=pix)
+        grid_stack = GridStack(regular=base_grid_stack.regular, sub=base_grid_stack.sub,
+                               blurring=base_grid_stack.blurring, pix=pix)
+        grid_stack._base_grid_stack = base_grid_stack
+        grid_stack._regular_in_sub = base_grid_stack._regular_in_sub
+
+        return grid_stack
+
+    def grid_stack_with_dtype(self, dtype):
+        """Setup a grid-stack whose grid_stack (regular, sub, blurring, etc.) are copies of this grid-stack's, with \
+        their (y,x) arc-second coordinates stored as the input dtype.
+
+        A grid-stack of dtype float32 halves the memory of its grid_stack (e.g. a sub-grid which is 16x the image \
+        size for a sub_grid_size of 4), and the light and mass profiles, PSF convolution and inversion mapping \
+        matrices computed using it are also float32 (see *lens_data.LensData*).
+
+        Parameters
+        -----------
+        dtype : str or np.dtype
+            The dtype of the new grid-stack's grid_stack (e.g. 'float32').
+        """
+        return self.apply_function(lambda grid: grid.astype(dtype))
 
     def apply_function(self, func):
         """Apply a function to all grid_stack in the grid-stack.
@@ -214,10 +263,214 @@ class GridStack(object):
         else:
             return GridStack(func(self.regular), func(self.sub), self.blurring, self.pix)
 
+    @property
+    def base_grid_stack(self):
+        """The grid-stack a pix-grid was added to in order to set up this grid-stack (see \
+        *grid_stack_with_pix_grid_added*), or *None* if it was not set up by adding a pix-grid."""
+        return self._base_grid_stack
+
+    def traced_grid_stack_from_traced_base_grid_stack_and_pix_deflections(self, traced_base_grid_stack,
+                                                                          pix_deflections):
+        """For a grid-stack set up by adding a pix-grid to a base grid-stack (see *grid_stack_with_pix_grid_added*), \
+        set up its traced grid-stack from the traced base grid-stack (e.g. one retrieved from a cache, see \
+        *plane.DeflectionCache*) and the deflection angles of the pix-grid, such that only the pix-grid is traced.
+
+        The traced grid-stack keeps a reference to the traced base grid-stack, as if the traced pix-grid was added \
+        to it.
+
+        Parameters
+        -----------
+        traced_base_grid_stack : GridStack
+            The traced grid-stack of this grid-stack's base grid-stack.
+        pix_deflections : ndarray
+            The deflection angles of this grid-stack's pix-grid.
+        """
+        traced_pix = grid_view_of_buffer(buffer=np.subtract(np.asarray(self.pix), pix_deflections),
+                                         buffer_slice=slice(None), grid=self.pix)
+
+        traced_grid_stack = GridStack(regular=traced_base_grid_stack.regular, sub=traced_base_grid_stack.sub,
+                                      blurring=traced_base_grid_stack.blurring, pix=traced_pix)
+        traced_grid_stack._base_grid_stack = traced_base_grid_stack
+        traced_grid_stack._regular_in_sub = traced_base_grid_stack._regular_in_sub
+
+        return traced_grid_stack
+
     def map_function(self, func, *arg_lists):
         """Map a function to all grid_stack in a grid-stack"""
         return GridStack(*[func(*args) for args in zip(self, *arg_lists)])
 
+    @property
+    def buffer_slices(self):
+        """The slice of every grid (sub, blurring, pix and regular, in that order) in the grid-stack's buffer."""
+        buffer_slices = {}
+        index = 0
+
+        for name in ('sub', 'blurring', 'pix', 'regular'):
+            grid = getattr(self, name)
+            if grid is not None:
+                buffer_slices[name] = slice(index, index + grid.shape[0])
+                index += grid.shape[0]
+
+        return buffer_slices
+
+    @property
+    def buffer(self):
+        """The contiguous buffer of shape (total_coordinates, 2) storing the (y,x) coordinates of every grid in the \
+        grid-stack, in the order sub, blurring, pix and regular, or *None* if the grid_stack are not views of a \
+        buffer (see *with_buffer*)."""
+        return self._buffer
+
+    def with_buffer(self):
+        """Setup a grid-stack whose grid_stack are views of one contiguous buffer (see *buffer*), of the same classes \
+        and with the same attributes as this grid-stack's grid_stack, such that its concatenated grid (see \
+        *concatenated_grid*) is a view of the buffer rather than a copy of the grid_stack. If this grid-stack's \
+        grid_stack are already views of a buffer, it is returned unchanged.
+        """
+        if self._buffer is not None:
+            return self
+
+        buffer_slices = self.buffer_slices
+        grids = [getattr(self, name) for name in buffer_slices]
+
+        buffer = np.zeros((sum(map(lambda grid: grid.shape[0], grids)), 2), dtype=np.result_type(*grids))
+
+        grid_views = {}
+
+        for name, grid in zip(buffer_slices, grids):
+            buffer[buffer_slices[name]] = grid
+            grid_views[name] = grid_view_of_buffer(buffer=buffer, buffer_slice=buffer_slices[name], grid=grid)
+
+        grid_stack = GridStack(regular=grid_views['regular'], sub=grid_views['sub'],
+                               blurring=grid_views.get('blurring'), pix=grid_views['pix'])
+        grid_stack._buffer = buffer
+        grid_stack._regular_in_sub = self._regular_in_sub
+        grid_stack._base_grid_stack = self._base_grid_stack
+
+        return grid_stack
+
+    @property
+    def regular_in_sub(self):
+        """Whether the regular-grid's coordinates are those of the central sub-pixel of every regular pixel, which \
+        is the case for a sub-grid with an odd sub_grid_size (e.g. 1 or 3). A function of the coordinates evaluated \
+        on the sub-grid is then also known on the regular-grid, so the regular-grid is not included in the \
+        concatenated grid."""
+        if self._regular_in_sub is None:
+            self._regular_in_sub = regular_grid_is_in_sub_grid(regular_grid=self.regular, sub_grid=self.sub)
+        return self._regular_in_sub
+
+    @property
+    def concatenated_grid(self):
+        """The grid_stack, in the order of the buffer (see *buffer*), a function is evaluated on by \
+        *apply_function_to_concatenated_grid*, which is all grid_stack except the regular-grid if it is in the \
+        sub-grid (see *regular_in_sub*).
+
+        If the grid_stack are views of a buffer (see *with_buffer*) this is a view of the buffer, otherwise the \
+        grid_stack are concatenated (once) into a new array, without changing the grid-stack."""
+        if self._concatenated_grid is None:
+
+            buffer_slices = self.buffer_slices
+            names = [name for name in buffer_slices if not (name == 'regular' and self.regular_in_sub)]
+
+            if self._buffer is not None:
+                self._concatenated_grid = self._buffer[:buffer_slices[names[-1]].stop]
+            else:
+                grids = [getattr(self, name) for name in names]
+                self._concatenated_grid = np.concatenate([np.asarray(grid) for grid in grids]).astype(
+                    np.result_type(*grids), copy=False)
+
+        return self._concatenated_grid
+
+    def apply_function_to_concatenated_grid(self, func):
+        """Apply a function to all grid_stack in the grid-stack by calling it once on the concatenated grid (see \
+        *concatenated_grid*), as opposed to once per grid as *apply_function* does.
+
+        The function must compute its result (e.g. deflection angles) coordinate by coordinate, as the returned \
+        grid-stack's arrays are slices of this result. If the regular-grid is in the sub-grid, its result is that \
+        of every regular pixel's central sub-pixel.
+
+        If the grid-stack was set up by adding a pix-grid to a base grid-stack (see *grid_stack_with_pix_grid_added*), \
+        the function is called on the base grid-stack's concatenated grid and on the pix-grid."""
+        if self._base_grid_stack is not None:
+            base_result = self._base_grid_stack.apply_function_to_concatenated_grid(func)
+            pix_result = func(self.pix)
+            pix_result = np.broadcast_to(pix_result, (self.pix.shape[0],) + np.shape(pix_result)[1:])
+            return GridStack(regular=base_result.regular, sub=base_result.sub, blurring=base_result.blurring,
+                             pix=pix_result)
+
+        buffer_slices = self.buffer_slices
+
+        result = func(self.concatenated_grid)
+        result = np.broadcast_to(result, (self.concatenated_grid.shape[0],) + np.shape(result)[1:])
+
+        sub = result[buffer_slices['sub']]
+
+        if self.regular_in_sub:
+            regular = sub[self.sub.sub_grid_length // 2::self.sub.sub_grid_length]
+        else:
+            regular = result[buffer_slices['regular']]
+
+        return GridStack(regular=regular, sub=sub,
+                         blurring=result[buffer_slices['blurring']] if 'blurring' in buffer_slices else None,
+                         pix=result[buffer_slices['pix']])
+
+    def traced_grid_stack_from_deflection_stacks(self, deflection_stacks, scaling_factors=None):
+        """Trace the grid-stack using the deflection-stacks of one or more planes (multiplied by their scaling \
+        factors), where every traced grid is computed in place in one new buffer.
+
+        The traced grid_stack are views of the traced grid-stack's buffer, of the same classes and with the same \
+        attributes as this grid-stack's grid_stack.
+
+        Parameters
+        -----------
+        deflection_stacks : [GridStack]
+            The deflection-stacks subtracted from this grid-stack.
+        scaling_factors : [float] or None
+            The factor every deflection-stack is multiplied by before it is subtracted (e.g. the scaling factors of \
+            multi-plane ray-tracing). If None, the deflection-stacks are subtracted unscaled.
+        """
+        if scaling_factors is None:
+            scaling_factors = [None] * len(deflection_stacks)
+
+        buffer_slices = self.buffer_slices
+
+        buffer = np.zeros((sum(map(lambda buffer_slice: buffer_slice.stop - buffer_slice.start,
+                                   buffer_slices.values())), 2),
+                          dtype=np.result_type(*[getattr(self, name) for name in buffer_slices],
+                                               *[getattr(deflection_stack, name)
+                                                 for deflection_stack in deflection_stacks
+                                                 for name in buffer_slices]))
+
+        scaled_deflections = None
+
+        traced_grids = {}
+
+        for name, buffer_slice in buffer_slices.items():
+
+            grid = getattr(self, name)
+            traced_grid = buffer[buffer_slice]
+            traced_grid[:] = grid
+
+            for deflection_stack, scaling_factor in zip(deflection_stacks, scaling_factors):
+
+                deflections = getattr(deflection_stack, name)
+
+                if scaling_factor is None:
+                    np.subtract(traced_grid, deflections, out=traced_grid)
+                else:
+                    if scaled_deflections is None or scaled_deflections.shape[0] < grid.shape[0]:
+                        scaled_deflections = np.zeros((grid.shape[0], 2), dtype=buffer.dtype)
+                    np.multiply(scaling_factor, deflections, out=scaled_deflections[:grid.shape[0]])
+                    np.subtract(traced_grid, scaled_deflections[:grid.shape[0]], out=traced_grid)
+
+            traced_grids[name] = grid_view_of_buffer(buffer=buffer, buffer_slice=buffer_slice, grid=grid)
+
+        traced_grid_stack = GridStack(regular=traced_grids['regular'], sub=traced_grids['sub'],
+                                      blurring=traced_grids.get('blurring'), pix=traced_grids['pix'])
+        traced_grid_stack._buffer = buffer
+        traced_grid_stack._regular_in_sub = self._regular_in_sub
+
+        return traced_grid_stack
+
     @property
     def sub_pixels(self):
         return self.sub.shape[0]
@@ -226,6 +479,29 @@ class GridStack(object):
         return [self.regular, self.sub, self.blurring, self.pix][item]
 
 
+def grid_view_of_buffer(buffer, buffer_slice, grid):
+    """A view of a slice of a buffer, of the same class and with the same attributes as a grid."""
+    grid_view = buffer[buffer_slice].view(type(grid))
+    if hasattr(grid, '__dict__'):
+        grid_view.__dict__.update(grid.__dict__)
+    return grid_view
+
+
+def regular_grid_is_in_sub_grid(regular_grid, sub_grid):
+    """Whether every coordinate of a regular-grid is that of the central sub-pixel of the corresponding regular \
+    pixel on a sub-grid (to within the numerical precision of the grids)."""
+    if not isinstance(sub_grid, SubGrid) or sub_grid.sub_grid_size % 2 == 0:
+        return False
+
+    if regular_grid.shape[0] == 0 or sub_grid.shape[0] != regular_grid.shape[0] * sub_grid.sub_grid_length:
+        return False
+
+    central_sub_grid = sub_grid[sub_grid.sub_grid_length // 2::sub_grid.sub_grid_length]
+    tolerance = 16.0 * np.finfo(np.result_type(regular_grid, sub_grid)).eps * max(1.0, np.max(np.abs(regular_grid)))
+
+    return bool(np.all(np.abs(np.asarray(regular_grid) - np.asarray(central_sub_grid)) <= tolerance))
+
+
 class RegularGrid(np.ndarray):
 
     def __new__(cls, arr, mask, *args, **kwargs):
@@ -520,6 +796,11 @@ class SubGrid(RegularGrid):
                  sub_grid[6] = [0.25, -0.75]
                  sub_grid[7] = [0.25, -0.5]
                  sub_grid[8] = [0.25, -0.25]
+
+        The sub-pixels of a *SubGrid* are weighted equally, by the *sub_grid_fraction*, when mapping sub-gridded \
+        values to the regular-grid. A sub-grid whose sub-pixels have different weights (e.g. a \
+        *GaussLegendreSubGrid*) stores the weight of every sub-pixel of a pixel as its *sub_grid_weights*, which are \
+        *None* for a *SubGrid*.
         """
         # noinspection PyArgumentList
         super(SubGrid, self).__init__()
@@ -527,6 +808,7 @@ class SubGrid(RegularGrid):
         self.sub_grid_size = sub_grid_size
         self.sub_grid_length = int(sub_grid_size ** 2.0)
         self.sub_grid_fraction = 1.0 / self.sub_grid_length
+        self.sub_grid_weights = None
 
     @property
     def unlensed_grid(self):
@@ -553,9 +835,13 @@ class SubGrid(RegularGrid):
         sub_grid_size : int
             The size (sub_grid_size x sub_grid_size) of each unmasked pixels sub-grid.
         """
-        sub_grid_masked = grid_util.sub_grid_1d_masked_from_mask_pixel_scales_and_sub_grid_size(mask=mask,
-                                                                                                pixel_scales=mask.pixel_scales,
-                                                                                                sub_grid_size=sub_grid_size)
+        if decorator_util.use_parallel_kernels():
+            sub_grid_1d_masked_from_mask = grid_util.sub_grid_1d_masked_from_mask_pixel_scales_and_sub_grid_size_parallel
+        else:
+            sub_grid_1d_masked_from_mask = grid_util.sub_grid_1d_masked_from_mask_pixel_scales_and_sub_grid_size
+
+        sub_grid_masked = sub_grid_1d_masked_from_mask(mask=mask, pixel_scales=mask.pixel_scales,
+                                                       sub_grid_size=sub_grid_size)
         return SubGrid(sub_grid_masked, mask, sub_grid_size)
 
     @classmethod
@@ -587,18 +873,26 @@ class SubGrid(RegularGrid):
             self.sub_grid_size = obj.sub_grid_size
             self.sub_grid_length = obj.sub_grid_length
             self.sub_grid_fraction = obj.sub_grid_fraction
+            self.sub_grid_weights = getattr(obj, 'sub_grid_weights', None)
             self.mask = obj.mask
 
     def sub_data_to_regular_data(self, sub_array):
         """For an input sub-gridded array, map its hyper-values from the sub-gridded values to a 1D regular grid of \
         values by summing each set of each set of sub-pixels values and dividing by the total number of sub-pixels.
 
+        If the sub-pixels are weighted (see *sub_grid_weights*), each set of sub-pixel values is instead summed \
+        with their weights.
+
         Parameters
         -----------
         sub_array : ndarray
             A 1D sub-gridded array of values (e.g. the intensities, surface-densities, potential) which is mapped to
             a 1d regular array.
         """
+        if self.sub_grid_weights is not None:
+            return np.dot(sub_array.reshape(-1, self.sub_grid_length),
+                          self.sub_grid_weights.astype(np.result_type(sub_array.dtype, np.float32)))
+
         return np.multiply(self.sub_grid_fraction, sub_array.reshape(-1, self.sub_grid_length).sum(axis=1))
 
     @property
@@ -614,6 +908,79 @@ class SubGrid(RegularGrid):
         return mapping_util.sub_to_regular_from_mask(self.mask, self.sub_grid_size).astype('int')
 
 
+class GaussLegendreSubGrid(SubGrid):
+
+    # noinspection PyUnusedLocal
+    def __init__(self, array, mask, sub_grid_size=1):
+        """ A sub-grid whose sub-pixels are at the nodes of Gauss-Legendre quadrature within every unmasked pixel, as \
+        opposed to the uniformly spaced sub-pixels of a *SubGrid*. The sub-pixels are indexed in the same order as a \
+        *SubGrid* (from the top-left sub-pixel of every unmasked pixel), and a sub-gridded array is mapped to the \
+        regular-grid by summing each pixel's sub-pixel values multiplied by their quadrature weights (see \
+        *sub_grid_weights*).
+
+        Gauss-Legendre quadrature integrates a smooth function over a pixel more accurately than uniform sub-pixels \
+        of the same number. For example, the mean intensity of a light profile over a pixel computed on a 2x2 \
+        Gauss-Legendre sub-grid is as accurate as that computed on a 4x4 uniform sub-grid for pixels that resolve the \
+        profile, with a quarter of the sub-pixels to ray-trace and evaluate the profile at.
+
+        Parameters
+        -----------
+        array : ndarray
+            The (y,x) arc-second coordinates of every sub-pixel.
+        mask : Mask
+            The mask whose unmasked pixels the sub-grid is of.
+        sub_grid_size : int
+            The size (sub_grid_size x sub_grid_size) of each unmasked pixels sub-grid.
+        """
+        super(GaussLegendreSubGrid, self).__init__(array, mask, sub_grid_size)
+        _, self.sub_grid_weights = grid_util.gauss_legendre_sub_grid_offsets_and_weights_from_sub_grid_size(
+            sub_grid_size=sub_grid_size)
+
+    @property
+    def unlensed_grid(self):
+        return GaussLegendreSubGrid.from_mask_and_sub_grid_size(mask=self.mask, sub_grid_size=self.sub_grid_size)
+
+    @property
+    def unlensed_unmasked_grid(self):
+        sub_grid = grid_util.gauss_legendre_sub_grid_1d_masked_from_mask_pixel_scales_and_sub_grid_size(
+            mask=np.full(self.mask.shape, False), pixel_scales=self.mask.pixel_scales, sub_grid_size=self.sub_grid_size)
+        return GaussLegendreSubGrid(sub_grid, mask=self.mask, sub_grid_size=self.sub_grid_size)
+
+    @classmethod
+    def from_mask_and_sub_grid_size(cls, mask, sub_grid_size=1):
+        """Setup a Gauss-Legendre sub-grid of the unmasked pixels, using a mask and a specified sub-grid size.
+
+        Parameters
+        -----------
+        mask : Mask
+            The mask whose masked pixels are used to setup the sub-pixel grid_stack.
+        sub_grid_size : int
+            The size (sub_grid_size x sub_grid_size) of each unmasked pixels sub-grid.
+        """
+        sub_grid_masked = grid_util.gauss_legendre_sub_grid_1d_masked_from_mask_pixel_scales_and_sub_grid_size(
+            mask=mask, pixel_scales=mask.pixel_scales, sub_grid_size=sub_grid_size)
+        return GaussLegendreSubGrid(sub_grid_masked, mask, sub_grid_size)
+
+    @classmethod
+    def from_shape_pixel_scale_and_sub_grid_size(cls, shape, pixel_scale, sub_grid_size):
+        """Setup a Gauss-Legendre sub-grid from a 2D array shape and pixel scale, which is equivalent to using a 2D \
+        mask consisting entirely of unmasked pixels.
+
+        Parameters
+        -----------
+        shape : (int, int)
+            The 2D shape of the array, where all pixels are used to generate the grid-stack's grid_stack.
+        pixel_scale : float
+            The size of each pixel in arc seconds.
+        sub_grid_size : int
+            The size (sub_grid_size x sub_grid_size) of each unmasked pixels sub-grid.
+        """
+        mask = msk.Mask.unmasked_for_shape_and_pixel_scale(shape=shape, pixel_scale=pixel_scale)
+        sub_grid = grid_util.gauss_legendre_sub_grid_1d_masked_from_mask_pixel_scales_and_sub_grid_size(
+            mask=mask, pixel_scales=mask.pixel_scales, sub_grid_size=sub_grid_size)
+        return GaussLegendreSubGrid(sub_grid, mask, sub_grid_size)
+
+
 class PixGrid(np.ndarray):
 
     def __new__(cls, arr, regular_to_nearest_pix, *args, **kwargs):
@@ -725,6 +1092,97 @@ class SparseToRegularGrid(scaled_array.RectangularArrayGeometry):
                                                         sparse_to_unmasked_sparse=self.sparse_to_unmasked_sparse)
 
 
+class GridBuckets(object):
+
+    def __init__(self, grid, points_per_cell=16):
+        """A spatial bucketing of a grid of (y,x) coordinates (e.g. a sub-grid traced to the source-plane), which \
+        finds the coordinates inside a circle without computing the distance of every coordinate to its centre.
+
+        The grid's bounding box is divided into square cells, each containing on average *points_per_cell* \
+        coordinates, and the coordinates are sorted by the (row-major) index of the cell they are in. The cells of \
+        each row of cells overlapping a circle are then a contiguous range of the sorted coordinates, found by a \
+        binary search, and only the coordinates in these ranges have their distance to the circle's centre checked.
+
+        Parameters
+        ----------
+        grid : ndarray
+            The (y,x) coordinates of the grid, in an array of shape (total_coordinates, 2).
+        points_per_cell : int
+            The average number of coordinates in each cell.
+        """
+        self.grid = np.asarray(grid)
+
+        self.minimum = np.min(self.grid, axis=0) if self.grid.shape[0] > 0 else np.zeros(2)
+        self.maximum = np.max(self.grid, axis=0) if self.grid.shape[0] > 0 else np.zeros(2)
+
+        extent = np.maximum(self.maximum - self.minimum, np.finfo(np.float64).eps)
+        total_cells = max(1, self.grid.shape[0] // points_per_cell)
+
+        self.cell_size = max(np.sqrt(extent[0] * extent[1] / total_cells), np.max(extent) / total_cells)
+        self.shape = tuple((extent // self.cell_size).astype('int') + 1)
+
+        self._sorted_indexes = None
+        self._sorted_keys = None
+
+    @property
+    def sorted_indexes(self):
+        """The indexes of the grid's coordinates, sorted by the index of the cell they are in. These are computed \
+        on first use, so that a circle containing the whole grid (see *circle_contains_grid*) does not sort it."""
+        if self._sorted_indexes is None:
+            cells = self.cells_from_coordinates(self.grid)
+            keys = cells[:, 0] * self.shape[1] + cells[:, 1]
+            self._sorted_indexes = np.argsort(keys, kind='stable')
+            self._sorted_keys = keys[self._sorted_indexes]
+        return self._sorted_indexes
+
+    @property
+    def sorted_keys(self):
+        """The cell index of every coordinate, in the order of *sorted_indexes*."""
+        if self._sorted_keys is None:
+            _ = self.sorted_indexes
+        return self._sorted_keys
+
+    def cells_from_coordinates(self, coordinates):
+        """The (y,x) indexes of the cells containing (y,x) coordinates, clipped to the cells of the grid."""
+        cells = np.floor((np.asarray(coordinates) - self.minimum) / self.cell_size).astype('int')
+        return np.clip(cells, 0, np.asarray(self.shape) - 1)
+
+    def circle_contains_grid(self, centre, radius):
+        """Whether a circle contains every coordinate of the grid (i.e. the corners of its bounding box)."""
+        corner_y = np.maximum(np.abs(self.minimum[0] - centre[0]), np.abs(self.maximum[0] - centre[0]))
+        corner_x = np.maximum(np.abs(self.minimum[1] - centre[1]), np.abs(self.maximum[1] - centre[1]))
+        return corner_y ** 2 + corner_x ** 2 <= radius ** 2
+
+    def indexes_within_circle(self, centre, radius):
+        """The (ascending) indexes of the grid's coordinates inside a circle.
+
+        Parameters
+        ----------
+        centre : (float, float)
+            The (y,x) arc-second centre of the circle.
+        radius : float
+            The arc-second radius of the circle.
+        """
+        centre = np.asarray(centre, dtype='float64')
+
+        if self.grid.shape[0] == 0 or np.any(centre + radius < self.minimum) or \
+                np.any(centre - radius > self.maximum):
+            return np.zeros(0, dtype='int')
+
+        (cell_y0, cell_x0), (cell_y1, cell_x1) = self.cells_from_coordinates(np.asarray([centre - radius,
+                                                                                         centre + radius]))
+
+        row_keys = np.arange(cell_y0, cell_y1 + 1) * self.shape[1]
+        starts = np.searchsorted(self.sorted_keys, row_keys + cell_x0, side='left')
+        ends = np.searchsorted(self.sorted_keys, row_keys + cell_x1, side='right')
+
+        candidates = np.concatenate([self.sorted_indexes[start:end] for start, end in zip(starts, ends)])
+
+        distances_squared = np.sum(np.square(self.grid[candidates] - centre), axis=1)
+
+        return np.sort(candidates[distances_squared <= radius ** 2])
+
+
 class PaddedRegularGrid(RegularGrid):
 
     def __new__(cls, arr, mask, image_shape, *args, **kwargs):
@@ -865,8 +1323,13 @@ class PaddedSubGrid(SubGrid, PaddedRegularGrid):
 
         padded_shape = (mask.shape[0] + psf_shape[0] - 1, mask.shape[1] + psf_shape[1] - 1)
 
-        padded_sub_grid = grid_util.sub_grid_1d_masked_from_mask_pixel_scales_and_sub_grid_size(
-            mask=np.full(padded_shape, False), pixel_scales=mask.pixel_scales, sub_grid_size=sub_grid_size)
+        if decorator_util.use_parallel_kernels():
+            sub_grid_1d_masked_from_mask = grid_util.sub_grid_1d_masked_from_mask_pixel_scales_and_sub_grid_size_parallel
+        else:
+            sub_grid_1d_masked_from_mask = grid_util.sub_grid_1d_masked_from_mask_pixel_scales_and_sub_grid_size
+
+        padded_sub_grid = sub_grid_1d_masked_from_mask(mask=np.full(padded_shape, False),
+                                                       pixel_scales=mask.pixel_scales, sub_grid_size=sub_grid_size)
 
         padded_mask = msk.Mask.unmasked_for_shape_and_pixel_scale(shape=padded_shape, pixel_scale=mask.pixel_scale)
 
@@ -879,6 +1342,41 @@ class PaddedSubGrid(SubGrid, PaddedRegularGrid):
             self.image_shape = obj.image_shape
 
 
+class PaddedGaussLegendreSubGrid(PaddedSubGrid):
+
+    def __init__(self, arr, mask, image_shape, sub_grid_size=1):
+        """A *PaddedGaussLegendreSubGrid* is the padded equivalent of a *GaussLegendreSubGrid*, whose sub-pixels are \
+        at the nodes of Gauss-Legendre quadrature within every pixel of the padded mask.
+        """
+        super(PaddedGaussLegendreSubGrid, self).__init__(arr, mask, image_shape, sub_grid_size)
+        _, self.sub_grid_weights = grid_util.gauss_legendre_sub_grid_offsets_and_weights_from_sub_grid_size(
+            sub_grid_size=sub_grid_size)
+
+    @classmethod
+    def padded_grid_from_mask_sub_grid_size_and_psf_shape(cls, mask, sub_grid_size, psf_shape):
+        """Setup a *PaddedGaussLegendreSubGrid* for an input mask, sub-grid size and psf-shape.
+
+        Parameters
+        ----------
+        mask : Mask
+            The mask whose masked pixels are used to setup the sub-pixel grid_stack.
+        sub_grid_size : int
+            The size (sub_grid_size x sub_grid_size) of each image-pixels sub-grid.
+        psf_shape : (int, int)
+           The shape of the psf which defines the blurring region and therefore size of padding.
+        """
+
+        padded_shape = (mask.shape[0] + psf_shape[0] - 1, mask.shape[1] + psf_shape[1] - 1)
+
+        padded_sub_grid = grid_util.gauss_legendre_sub_grid_1d_masked_from_mask_pixel_scales_and_sub_grid_size(
+            mask=np.full(padded_shape, False), pixel_scales=mask.pixel_scales, sub_grid_size=sub_grid_size)
+
+        padded_mask = msk.Mask.unmasked_for_shape_and_pixel_scale(shape=padded_shape, pixel_scale=mask.pixel_scale)
+
+        return PaddedGaussLegendreSubGrid(arr=padded_sub_grid, mask=padded_mask, image_shape=mask.shape,
+                                          sub_grid_size=sub_grid_size)
+
+
 class RegularGridBorder(np.ndarray):
 
     def __new__(cls, arr, *args, **kwargs):
@@ -921,10 +1419,16 @@ class RegularGridBorder(np.ndarray):
             The grid-stack, whose grid_stack coordinates are relocated.
         """
         border_grid = grid_stack.regular[self]
-        return GridStack(regular=self.relocated_grid_from_grid_jit(grid=grid_stack.regular, border_grid=border_grid),
-                         sub=self.relocated_grid_from_grid_jit(grid=grid_stack.sub, border_grid=border_grid),
+
+        if decorator_util.use_parallel_kernels():
+            relocated_grid_from_grid = self.relocated_grid_from_grid_parallel_jit
+        else:
+            relocated_grid_from_grid = self.relocated_grid_from_grid_jit
+
+        return GridStack(regular=relocated_grid_from_grid(grid=grid_stack.regular, border_grid=border_grid),
+                         sub=relocated_grid_from_grid(grid=grid_stack.sub, border_grid=border_grid),
                          blurring=None,
-                         pix=self.relocated_grid_from_grid_jit(grid=grid_stack.pix, border_grid=border_grid))
+                         pix=relocated_grid_from_grid(grid=grid_stack.pix, border_grid=border_grid))
 
     @staticmethod
     @decorator_util.jit()
@@ -968,6 +1472,42 @@ class RegularGridBorder(np.ndarray):
 
         return grid
 
+    @staticmethod
+    @decorator_util.parallel_jit()
+    def relocated_grid_from_grid_parallel_jit(grid, border_grid):
+        """The parallel variant of *relocated_grid_from_grid_jit*, where the grid's coordinates are relocated by \
+        many threads."""
+        border_origin = np.zeros(2)
+        border_origin[0] = np.mean(border_grid[: ,0])
+        border_origin[1] = np.mean(border_grid[: ,1])
+        border_grid_radii = np.sqrt(np.add(np.square(np.subtract(border_grid[:, 0], border_origin[0])),
+                                           np.square(np.subtract(border_grid[:, 1], border_origin[1]))))
+        border_min_radii = np.min(border_grid_radii)
+
+        for pixel_index in numba.prange(grid.shape[0]):
+
+            grid_radius = np.sqrt(np.square(grid[pixel_index, 0] - border_origin[0]) +
+                                  np.square(grid[pixel_index, 1] - border_origin[1]))
+
+            if grid_radius > border_min_radii:
+
+                closest_pixel_index = 0
+                closest_distance = np.inf
+
+                for border_index in range(border_grid.shape[0]):
+                    distance = np.square(grid[pixel_index, 0] - border_grid[border_index, 0]) + \
+                               np.square(grid[pixel_index, 1] - border_grid[border_index, 1])
+                    if distance < closest_distance:
+                        closest_pixel_index = border_index
+                        closest_distance = distance
+
+                move_factor = border_grid_radii[closest_pixel_index] / grid_radius
+                if move_factor < 1.0:
+                    grid[pixel_index, 0] = move_factor * (grid[pixel_index, 0] - border_origin[0]) + border_origin[0]
+                    grid[pixel_index, 1] = move_factor * (grid[pixel_index, 1] - border_origin[1]) + border_origin[1]
+
+        return grid
+
     @property
     def total_pixels(self):
         return self.shape[0]
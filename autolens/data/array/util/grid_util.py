@@ -1,4 +1,5 @@
 from autolens import decorator_util
+import numba
 import numpy as np
 
 from autolens.data.array.util import mask_util
@@ -244,6 +245,177 @@ def sub_grid_1d_masked_from_mask_pixel_scales_and_sub_grid_size(mask, pixel_scal
 
     return sub_grid
 
+@decorator_util.parallel_jit()
+def sub_grid_1d_masked_from_mask_pixel_scales_and_sub_grid_size_parallel(mask, pixel_scales, sub_grid_size,
+                                                                         origin=(0.0, 0.0)):
+    """The parallel variant of *sub_grid_1d_masked_from_mask_pixel_scales_and_sub_grid_size*, where the sub-pixels \
+    of every row of the 2D mask array are computed by one thread. The index of each row's first sub-pixel is first \
+    computed from the number of unmasked pixels in the rows before it."""
+
+    sub_grid_length = sub_grid_size ** 2
+
+    row_sub_starts = np.zeros(mask.shape[0] + 1, dtype=np.int64)
+
+    for y in range(mask.shape[0]):
+        row_sub_starts[y + 1] = row_sub_starts[y]
+        for x in range(mask.shape[1]):
+            if not mask[y, x]:
+                row_sub_starts[y + 1] += sub_grid_length
+
+    sub_grid = np.zeros(shape=(row_sub_starts[mask.shape[0]], 2))
+
+    centres_arc_seconds = centres_from_shape_pixel_scales_and_origin(shape=mask.shape, pixel_scales=pixel_scales,
+                                                                origin=origin)
+
+    y_sub_half = pixel_scales[0] / 2
+    y_sub_step = pixel_scales[0] / (sub_grid_size + 1)
+
+    x_sub_half = pixel_scales[1] / 2
+    x_sub_step = pixel_scales[1] / (sub_grid_size + 1)
+
+    for y in numba.prange(mask.shape[0]):
+
+        sub_index = row_sub_starts[y]
+
+        for x in range(mask.shape[1]):
+
+            if not mask[y, x]:
+
+                y_arcsec = (y - centres_arc_seconds[0]) * pixel_scales[0]
+                x_arcsec = (x - centres_arc_seconds[1]) * pixel_scales[1]
+
+                for y1 in range(sub_grid_size):
+                    for x1 in range(sub_grid_size):
+
+                        sub_grid[sub_index, 0] = -(y_arcsec - y_sub_half + (y1 + 1) * y_sub_step)
+                        sub_grid[sub_index, 1] = x_arcsec - x_sub_half + (x1 + 1) * x_sub_step
+                        sub_index += 1
+
+    return sub_grid
+
+def gauss_legendre_sub_grid_offsets_and_weights_from_sub_grid_size(sub_grid_size):
+    """ Compute the Gauss-Legendre quadrature nodes and weights of a (sub_grid_size x sub_grid_size) sub-grid, which \
+    integrate a function over a pixel exactly if it is a polynomial of order up to 2*sub_grid_size-1 in y and x.
+
+    The nodes are returned as offsets from the pixel centre in units of the pixel size (between -0.5 and 0.5), \
+    ascending. The weights are returned for every sub-pixel of a pixel, in the order the sub-pixels are indexed on a \
+    sub-grid (see *gauss_legendre_sub_grid_1d_masked_from_mask_pixel_scales_and_sub_grid_size*), and are normalized \
+    to sum to one, such that the weighted sum of the sub-pixel values is the pixel's mean value.
+
+    Parameters
+     ----------
+    sub_grid_size : int
+        The size of the sub-grid that each pixel of the 2D mask array is divided into.
+
+    Returns
+    --------
+    (ndarray, ndarray)
+        The sub_grid_size node offsets and the sub_grid_size**2 sub-pixel weights.
+
+    Examples
+    --------
+    sub_grid_offsets, sub_grid_weights = gauss_legendre_sub_grid_offsets_and_weights_from_sub_grid_size(
+                                                                                                 sub_grid_size=2)
+    """
+    nodes, weights = np.polynomial.legendre.leggauss(sub_grid_size)
+
+    sub_grid_offsets = 0.5 * nodes
+    sub_grid_weights = np.outer(0.5 * weights, 0.5 * weights).ravel()
+
+    return sub_grid_offsets, sub_grid_weights
+
+@decorator_util.jit()
+def sub_grid_1d_masked_from_mask_pixel_scales_and_sub_grid_offsets(mask, pixel_scales, sub_grid_offsets,
+                                                                   origin=(0.0, 0.0)):
+    """ For a sub-grid whose sub-pixels are at the same offsets from the centre of every pixel in y and x (e.g. the \
+    nodes of Gauss-Legendre quadrature), compute the (y,x) arc second coordinates of every sub-pixel of every \
+    unmasked pixel of a 2D mask array.
+
+    Sub-pixels are indexed as for *sub_grid_1d_masked_from_mask_pixel_scales_and_sub_grid_size*, going from the \
+    top-left sub-pixel of every unmasked pixel. Thus, for ascending offsets, the y coordinates of the sub-pixels of a \
+    pixel descend and their x coordinates ascend.
+
+    Parameters
+     ----------
+    mask : ndarray
+        A 2D array of bools, where *False* values mean unmasked and are therefore included as part of the calculated \
+        sub grid.
+    pixel_scales : (float, float)
+        The (y,x) arc-second to pixel scales of the 2D mask array.
+    sub_grid_offsets : ndarray
+        The ascending offsets of the sub-pixels from the centre of a pixel, in units of the pixel size.
+    origin : (float, flloat)
+        The (y,x) origin of the 2D array, which the sub-grid is shifted around.
+
+    Returns
+    --------
+    ndarray
+        A sub grid of (y,x) arc-second coordinates of every sub-pixel of every unmasked pixel on the 2D mask \
+        array. The sub grid array has dimensions (total_unmasked_pixels*sub_grid_offsets.shape[0]**2, 2).
+    """
+
+    sub_grid_size = sub_grid_offsets.shape[0]
+
+    total_sub_pixels = mask_util.total_sub_pixels_from_mask_and_sub_grid_size(mask, sub_grid_size)
+
+    sub_grid = np.zeros(shape=(total_sub_pixels, 2))
+
+    centres_arc_seconds = centres_from_shape_pixel_scales_and_origin(shape=mask.shape, pixel_scales=pixel_scales,
+                                                                origin=origin)
+
+    sub_index = 0
+
+    for y in range(mask.shape[0]):
+        for x in range(mask.shape[1]):
+
+            if not mask[y, x]:
+
+                y_arcsec = (y - centres_arc_seconds[0]) * pixel_scales[0]
+                x_arcsec = (x - centres_arc_seconds[1]) * pixel_scales[1]
+
+                for y1 in range(sub_grid_size):
+                    for x1 in range(sub_grid_size):
+
+                        sub_grid[sub_index, 0] = -(y_arcsec + sub_grid_offsets[y1] * pixel_scales[0])
+                        sub_grid[sub_index, 1] = x_arcsec + sub_grid_offsets[x1] * pixel_scales[1]
+                        sub_index += 1
+
+    return sub_grid
+
+def gauss_legendre_sub_grid_1d_masked_from_mask_pixel_scales_and_sub_grid_size(mask, pixel_scales, sub_grid_size,
+                                                                               origin=(0.0, 0.0)):
+    """ For a Gauss-Legendre sub-grid, every unmasked pixel of a 2D mask array is divided into a (sub_grid_size x \
+    sub_grid_size) grid of sub-pixels at the nodes of Gauss-Legendre quadrature (see \
+    *gauss_legendre_sub_grid_offsets_and_weights_from_sub_grid_size*), as opposed to the uniform sub-pixels of \
+    *sub_grid_1d_masked_from_mask_pixel_scales_and_sub_grid_size*. This routine computes the (y,x) arc second \
+    coordinates of every sub-pixel, indexed in the same order as a uniform sub-grid.
+
+    Parameters
+     ----------
+    mask : ndarray
+        A 2D array of bools, where *False* values mean unmasked and are therefore included as part of the calculated \
+        sub grid.
+    pixel_scales : (float, float)
+        The (y,x) arc-second to pixel scales of the 2D mask array.
+    sub_grid_size : int
+        The size of the sub-grid that each pixel of the 2D mask array is divided into.
+    origin : (float, flloat)
+        The (y,x) origin of the 2D array, which the sub-grid is shifted around.
+
+    Examples
+    --------
+    mask = np.array([[True, False, True],
+                     [False, False, False]
+                     [True, False, True]])
+    sub_grid_1d = gauss_legendre_sub_grid_1d_masked_from_mask_pixel_scales_and_sub_grid_size(mask=mask,
+                                                              pixel_scales=(0.5, 0.5), sub_grid_size=2)
+    """
+    sub_grid_offsets, _ = gauss_legendre_sub_grid_offsets_and_weights_from_sub_grid_size(sub_grid_size=sub_grid_size)
+
+    return sub_grid_1d_masked_from_mask_pixel_scales_and_sub_grid_offsets(mask=mask, pixel_scales=pixel_scales,
+                                                                          sub_grid_offsets=sub_grid_offsets,
+                                                                          origin=origin)
+
 @decorator_util.jit()
 def grid_arc_seconds_1d_to_grid_pixels_1d(grid_arc_seconds_1d, shape, pixel_scales, origin=(0.0, 0.0)):
     """ Convert a grid of (y,x) arc second coordinates to a grid of (y,x) pixel coordinate values. Pixel coordinates \ 
@@ -1,8 +1,16 @@
 from autolens import decorator_util
+import numba
 import numpy as np
 
 from autolens import exc
 
+
+def frame_psfs_dtype_from_psf(psf):
+    """The dtype of the PSF kernel values stored in a convolver's frames, and therefore of the images and mapping \
+    matrices it convolves. This is float32 for a float32 PSF (see *lens_data.LensData*) and float64 otherwise."""
+    return np.result_type(psf.dtype, np.float32)
+
+
 class Convolver(object):
     """Class to setup the 1D convolution of an regular / mapping matrix.
 
@@ -195,7 +203,8 @@ class Convolver(object):
 
         image_index = 0
         self.image_frame_indexes = np.zeros((self.pixels_in_mask, self.psf_max_size), dtype='int')
-        self.image_frame_psfs = np.zeros((self.pixels_in_mask, self.psf_max_size))
+        self.image_frame_psfs = np.zeros((self.pixels_in_mask, self.psf_max_size),
+                                         dtype=frame_psfs_dtype_from_psf(psf=psf))
         self.image_frame_lengths = np.zeros((self.pixels_in_mask), dtype='int')
         for x in range(self.mask_index_array.shape[0]):
             for y in range(self.mask_index_array.shape[1]):
@@ -272,7 +281,8 @@ class ConvolverImage(Convolver):
 
         image_index = 0
         self.blurring_frame_indexes = np.zeros((self.pixels_in_blurring_mask, self.psf_max_size), dtype='int')
-        self.blurring_frame_psfs = np.zeros((self.pixels_in_blurring_mask, self.psf_max_size))
+        self.blurring_frame_psfs = np.zeros((self.pixels_in_blurring_mask, self.psf_max_size),
+                                            dtype=frame_psfs_dtype_from_psf(psf=psf))
         self.blurring_frame_lengths = np.zeros((self.pixels_in_blurring_mask), dtype='int')
         for x in range(mask.shape[0]):
             for y in range(mask.shape[1]):
@@ -284,9 +294,25 @@ class ConvolverImage(Convolver):
                     self.blurring_frame_lengths[image_index] = image_frame_indexes[image_frame_indexes >= 0].shape[0]
                     image_index += 1
 
+        self._gather_frames = None
+
+    @property
+    def gather_frames(self):
+        """The frames used by the parallel convolution (see *convolve_parallel_jit*), which for every regular pixel \
+        list the pixels (regular and blurring) whose light is blurred into it and the PSF kernel values of each. \
+        They are computed from the image and blurring frames the first time they are used."""
+        if self._gather_frames is None:
+            self._gather_frames = self.gather_frames_from_frames_jit(
+                self.image_frame_indexes, self.image_frame_psfs, self.image_frame_lengths, self.blurring_frame_indexes,
+                self.blurring_frame_psfs, self.blurring_frame_lengths, self.psf_max_size)
+        return self._gather_frames
+
     def convolve_image(self, image_array, blurring_array):
         """For a given 1D regular array and blurring array, convolve the two using this convolver.
 
+        If parallel kernels are used (see *decorator_util.set_parallel_kernels*), the convolution gathers the light \
+        blurred into every regular pixel in parallel, instead of scattering the light of every pixel.
+
         Parameters
         -----------
         image_array : ndarray
@@ -294,6 +320,11 @@ class ConvolverImage(Convolver):
         blurring_array : ndarray
             1D array of the blurring regular values which blur into the regular-array after PSF convolution.
         """
+        if decorator_util.use_parallel_kernels():
+            gather_indexes, gather_psfs, gather_lengths = self.gather_frames
+            return self.convolve_parallel_jit(image_array, blurring_array, gather_indexes, gather_psfs,
+                                              gather_lengths)
+
         return self.convolve_jit(image_array, self.image_frame_indexes, self.image_frame_psfs, self.image_frame_lengths,
                                  blurring_array, self.blurring_frame_indexes, self.blurring_frame_psfs,
                                  self.blurring_frame_lengths)
@@ -303,7 +334,7 @@ class ConvolverImage(Convolver):
     def convolve_jit(image_array, image_frame_indexes, image_frame_kernels, image_frame_lengths,
                      blurring_array, blurring_frame_indexes, blurring_frame_kernels, blurring_frame_lengths):
 
-        new_array = np.zeros(image_array.shape)
+        new_array = np.zeros(image_array.shape, dtype=image_frame_kernels.dtype)
 
         for image_index in range(len(image_array)):
 
@@ -330,4 +361,65 @@ class ConvolverImage(Convolver):
                 kernel = frame_kernels[kernel_index]
                 new_array[vector_index] += value * kernel
 
-        return new_array
\ No newline at end of file
+        return new_array
+
+    @staticmethod
+    @decorator_util.jit()
+    def gather_frames_from_frames_jit(image_frame_indexes, image_frame_psfs, image_frame_lengths,
+                                      blurring_frame_indexes, blurring_frame_psfs, blurring_frame_lengths,
+                                      psf_max_size):
+        """Invert the image and blurring frames, which for every pixel list the regular pixels its light is blurred \
+        into, to the gather frames, which for every regular pixel list the pixels whose light is blurred into it. \
+        Regular pixels are indexed as in the image array and blurring pixels by their index in the blurring array plus \
+        the number of regular pixels.
+
+        A pixel receives light from at most one pixel per PSF kernel value, thus the gather frames are the same size \
+        as the image frames.
+        """
+        pixels = image_frame_indexes.shape[0]
+
+        gather_indexes = np.zeros((pixels, psf_max_size), dtype=np.int64)
+        gather_psfs = np.zeros((pixels, psf_max_size), dtype=image_frame_psfs.dtype)
+        gather_lengths = np.zeros(pixels, dtype=np.int64)
+
+        for image_index in range(pixels):
+            for kernel_index in range(image_frame_lengths[image_index]):
+                vector_index = image_frame_indexes[image_index, kernel_index]
+                gather_indexes[vector_index, gather_lengths[vector_index]] = image_index
+                gather_psfs[vector_index, gather_lengths[vector_index]] = image_frame_psfs[image_index, kernel_index]
+                gather_lengths[vector_index] += 1
+
+        for blurring_index in range(blurring_frame_indexes.shape[0]):
+            for kernel_index in range(blurring_frame_lengths[blurring_index]):
+                vector_index = blurring_frame_indexes[blurring_index, kernel_index]
+                gather_indexes[vector_index, gather_lengths[vector_index]] = pixels + blurring_index
+                gather_psfs[vector_index, gather_lengths[vector_index]] = \
+                    blurring_frame_psfs[blurring_index, kernel_index]
+                gather_lengths[vector_index] += 1
+
+        return gather_indexes, gather_psfs, gather_lengths
+
+    @staticmethod
+    @decorator_util.parallel_jit()
+    def convolve_parallel_jit(image_array, blurring_array, gather_indexes, gather_kernels, gather_lengths):
+
+        pixels = image_array.shape[0]
+
+        new_array = np.zeros(image_array.shape, dtype=gather_kernels.dtype)
+
+        for vector_index in numba.prange(pixels):
+
+            value = 0.0
+
+            for kernel_index in range(gather_lengths[vector_index]):
+
+                index = gather_indexes[vector_index, kernel_index]
+
+                if index < pixels:
+                    value += image_array[index] * gather_kernels[vector_index, kernel_index]
+                else:
+                    value += blurring_array[index - pixels] * gather_kernels[vector_index, kernel_index]
+
+            new_array[vector_index] = value
+
+        return new_array
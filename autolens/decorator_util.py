@@ -1,3 +1,5 @@
+import os
+
 import numba
 
 from autofit import conf
@@ -12,15 +14,95 @@ If on laptop:
 If on super computer:
 
 @numba.jit(nopython=True, cache=False, parallel=True)
+
+On a super computer whose shared filesystem does not support numba's cache files next to the source, the cache can \
+instead be kept in a directory set by 'cache_dir' in the [numba] section of the general config (e.g. on node-local \
+or scratch storage), such that cache=True can be used there too. The cache is filled in advance by running \
+'python -m autolens.precompile'.
+
+Numba compiles a jitted function the first time it is called (for the types it is called with), not when it is \
+decorated, thus importing PyAutoLens does not compile any function.
+
+The hot kernels (image and mapping matrix convolution, the mapping and curvature matrices, border relocation and \
+sub-grid setup) also have parallel variants, whose loops over independent pixels use numba.prange. Whether these are \
+used, and how many threads they use, is chosen per process at runtime, for example:
+
+    decorator_util.set_parallel_kernels(use_parallel_kernels=True, threads=8)
+
+to fit one lens on 8 threads, or use_parallel_kernels=False to fit many lenses on one thread each (as the workers \
+of a *batch.BatchRunner* with cores_per_lens=1 do). The default is the 'parallel' setting of the general config.
+
+The threading layer numba uses for the parallel kernels can be set by 'threading_layer' in the [numba] section of \
+the general config. TBB (numba's default choice when it is installed) can hang a process at exit if it forked \
+worker processes (e.g. a *sensitivity_fit.SensitivityMapper* pool) after running a parallel kernel, which the \
+'workqueue' and 'omp' layers do not.
 """
 
 nopython = conf.instance.general.get("numba", "nopython", bool)
 cache = conf.instance.general.get("numba", "cache", bool)
 parallel = conf.instance.general.get("numba", "parallel", bool)
 
+if conf.instance.general.has("numba", "cache_dir"):
+    cache_dir = conf.instance.general.get("numba", "cache_dir", str)
+else:
+    cache_dir = None
+
+if cache_dir is not None:
+    numba.config.CACHE_DIR = os.path.expanduser(cache_dir)
+
+if conf.instance.general.has("numba", "threading_layer"):
+    threading_layer = conf.instance.general.get("numba", "threading_layer", str)
+else:
+    threading_layer = None
+
+if threading_layer is not None:
+    numba.config.THREADING_LAYER = threading_layer
+
 
 def jit(nopython=nopython, cache=cache, parallel=parallel):
     def wrapper(func):
         return numba.jit(func, nopython=nopython, cache=cache, parallel=parallel)
 
     return wrapper
+
+
+def parallel_jit(nopython=nopython, cache=cache):
+    """The numba decorator of the parallel variant of a kernel, which uses numba.prange."""
+    def wrapper(func):
+        return numba.jit(func, nopython=nopython, cache=cache, parallel=True)
+
+    return wrapper
+
+
+_use_parallel_kernels = parallel
+
+
+def set_parallel_kernels(use_parallel_kernels=True, threads=None):
+    """Choose whether the parallel variants of the hot kernels are used in this process, and optionally the number \
+    of threads they use.
+
+    Parameters
+    ----------
+    use_parallel_kernels : bool
+        If True, the parallel (prange) variants of the kernels are used, else the serial kernels.
+    threads : int or None
+        The number of threads the parallel kernels use, which cannot exceed numba's maximum (the NUMBA_NUM_THREADS \
+        environment variable, or the number of cores). If None, the number of threads is unchanged.
+    """
+    global _use_parallel_kernels
+    _use_parallel_kernels = use_parallel_kernels
+
+    if threads is not None:
+        set_threads(threads=threads)
+
+
+def use_parallel_kernels():
+    return _use_parallel_kernels
+
+
+def set_threads(threads):
+    numba.set_num_threads(threads)
+
+
+def threads():
+    return numba.get_num_threads()
@@ -42,4 +42,7 @@ class PlottingException(Exception):
 
 
 class PhaseException(Exception):
-    pass
\ No newline at end of file
+    pass
+
+class BatchException(Exception):
+    pass
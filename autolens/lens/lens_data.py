@@ -1,13 +1,18 @@
+from collections import OrderedDict
+
+from autolens import exc
 from autolens.data.array import grids
 from autolens.data import convolution
 from autolens.data.array import mask as msk
+from autolens.lens.util import lens_fit_util
 from autolens.model.inversion import convolution as inversion_convolution
+from autolens.model.inversion.util import inversion_util
 
 
 class LensData(object):
 
     def __init__(self, ccd_data, mask, sub_grid_size=2, image_psf_shape=None, mapping_matrix_psf_shape=None,
-                 positions=None):
+                 positions=None, precision='float64', gauss_legendre_sub_grid=False):
         """
         The lens data is the collection of data (image, noise-map, PSF), a mask, grid_stack, convolver \
         and other utilities that are used for modeling and fitting an image of a strong lens.
@@ -15,6 +20,21 @@ class LensData(object):
         Whilst the image, noise-map, etc. are loaded in 2D, the lens data creates reduced 1D arrays of each \
         for lensing calculations.
 
+        If the precision is 'float32', the grid-stacks and the PSFs of the convolvers are float32, such that the \
+        traced coordinates, light and mass profile evaluations, image blurring and inversion mapping matrices are all \
+        computed in float32, halving their memory. The image and noise-map remain float64, so that the reductions of \
+        a fit (the residuals, chi-squared, inversion data vector and curvature matrix and the log determinants) are \
+        computed in float64. For sub-gridded profile and inversion fits (with rectangular and adaptive-magnification \
+        pixelizations) of a simulated lens, the float32 likelihood and evidence agree with float64 to a relative \
+        accuracy of ~1e-7 (an absolute difference of ~1e-4), far smaller than the likelihood differences the \
+        non-linear search resolves (see *TestFloat32Precision* in test_lens_fit.py).
+
+        For a Voronoi pixelization, a traced sub-pixel within ~1e-7 arc-seconds of the edge of a Voronoi cell may be \
+        paired to the neighboring cell in float32, which changes the evidence by an amount that depends on the \
+        reconstructed fluxes of the two cells (and may exceed the accuracy above). The image-plane pixelization grid \
+        whose traced coordinates are the Voronoi pixel centres is always setup in float64 (see \
+        *ImagePlanePixelization*), so the number of pixels does not change with the precision.
+
         Parameters
         ----------
         ccd_data: im.CCD
@@ -33,8 +53,19 @@ class LensData(object):
         positions : [[]]
             Lists of image-pixel coordinates (arc-seconds) that mappers close to one another in the source-plane(s), \
             used to speed up the non-linear sampling.
+        precision : str
+            The precision ('float64' or 'float32') of the grid-stacks, profile evaluations, PSF convolution and \
+            mapping matrices.
+        gauss_legendre_sub_grid : bool
+            If True, the sub-grids of the grid-stacks are Gauss-Legendre sub-grids (see *GaussLegendreSubGrid*), \
+            whose sub-pixels are at the nodes of Gauss-Legendre quadrature and are weighted by its weights, as opposed \
+            to uniform sub-grids.
         """
 
+        if precision not in ('float64', 'float32'):
+            raise exc.ImagingException('The precision of lens data must be float64 or float32, not {}'.format(
+                precision))
+
         self.ccd_data = ccd_data
 
         self.image = ccd_data.image
@@ -48,16 +79,24 @@ class LensData(object):
         self.noise_map_1d = mask.map_2d_array_to_masked_1d_array(array_2d=ccd_data.noise_map)
         self.mask_1d = mask.map_2d_array_to_masked_1d_array(array_2d=mask)
 
+        self.noise_normalization = lens_fit_util.noise_normalization_from_noise_map_1d(noise_map_1d=self.noise_map_1d)
+        self.noise_weighted_image_1d = inversion_util.noise_weighted_image_1d_from_image_1d_and_noise_map_1d(
+            image_1d=self.image_1d, noise_map_1d=self.noise_map_1d)
+
         self.sub_grid_size = sub_grid_size
+        self.gauss_legendre_sub_grid = gauss_legendre_sub_grid
 
         if image_psf_shape is None:
             self.image_psf_shape = self.psf.shape
         else:
             self.image_psf_shape = image_psf_shape
 
+        self.precision = precision
+
         self.convolver_image = convolution.ConvolverImage(mask=self.mask,
                                         blurring_mask=mask.blurring_mask_for_psf_shape(psf_shape=self.image_psf_shape),
-                                        psf=self.psf.resized_scaled_array_from_array(new_shape=self.image_psf_shape))
+                                        psf=self.psf.resized_scaled_array_from_array(
+                                            new_shape=self.image_psf_shape).astype(precision))
 
         if mapping_matrix_psf_shape is None:
             self.mapping_matrix_psf_shape = self.psf.shape
@@ -65,13 +104,23 @@ class LensData(object):
             self.mapping_matrix_psf_shape = mapping_matrix_psf_shape
 
         self.convolver_mapping_matrix = inversion_convolution.ConvolverMappingMatrix(self.mask,
-                      self.psf.resized_scaled_array_from_array(new_shape=self.mapping_matrix_psf_shape))
+                      self.psf.resized_scaled_array_from_array(new_shape=self.mapping_matrix_psf_shape).astype(precision))
 
         self.grid_stack = grids.GridStack.grid_stack_from_mask_sub_grid_size_and_psf_shape(mask=mask,
-                                              sub_grid_size=sub_grid_size, psf_shape=self.image_psf_shape)
+                                              sub_grid_size=sub_grid_size, psf_shape=self.image_psf_shape,
+                                              gauss_legendre_sub_grid=gauss_legendre_sub_grid)
 
         self.padded_grid_stack = grids.GridStack.padded_grid_stack_from_mask_sub_grid_size_and_psf_shape(mask=mask,
-                                                            sub_grid_size=sub_grid_size, psf_shape=self.image_psf_shape)
+                                                            sub_grid_size=sub_grid_size, psf_shape=self.image_psf_shape,
+                                                            gauss_legendre_sub_grid=gauss_legendre_sub_grid)
+
+        if precision != 'float64':
+            self.grid_stack = self.grid_stack.grid_stack_with_dtype(dtype=precision)
+            self.padded_grid_stack = self.padded_grid_stack.grid_stack_with_dtype(dtype=precision)
+
+        # The grid-stacks are stored in one buffer each, so that their concatenated grids are not copies.
+        self.grid_stack = self.grid_stack.with_buffer()
+        self.padded_grid_stack = self.padded_grid_stack.with_buffer()
 
         self.border = grids.RegularGridBorder.from_mask(mask=mask)
 
@@ -83,7 +132,8 @@ class LensData(object):
 
         return LensData(ccd_data=ccd_data_with_modified_image, mask=self.mask, sub_grid_size=self.sub_grid_size,
                         image_psf_shape=self.image_psf_shape, mapping_matrix_psf_shape=self.mapping_matrix_psf_shape,
-                        positions=self.positions)
+                        positions=self.positions, precision=self.precision,
+                        gauss_legendre_sub_grid=self.gauss_legendre_sub_grid)
 
     @property
     def map_to_scaled_array(self):
@@ -99,7 +149,11 @@ class LensData(object):
             self.image_1d = obj.image_1d
             self.noise_map_1d = obj.noise_map_1d
             self.mask_1d = obj.mask_1d
+            self.noise_normalization = obj.noise_normalization
+            self.noise_weighted_image_1d = obj.noise_weighted_image_1d
             self.sub_grid_size = obj.sub_grid_size
+            self.gauss_legendre_sub_grid = obj.gauss_legendre_sub_grid
+            self.precision = obj.precision
             self.convolver_image = obj.convolver_image
             self.convolver_mapping_matrix = obj.convolver_mapping_matrix
             self.grid_stack = obj.grid_stack
@@ -111,7 +165,8 @@ class LensData(object):
 class LensDataHyper(LensData):
 
     def __init__(self, ccd_data, mask, hyper_model_image, hyper_galaxy_images, hyper_minimum_values, sub_grid_size=2,
-                 image_psf_shape=None, mapping_matrix_psf_shape=None, positions=None):
+                 image_psf_shape=None, mapping_matrix_psf_shape=None, positions=None, precision='float64',
+                 hyper_cache_size=100, gauss_legendre_sub_grid=False):
         """
         The lens data is the collection of data (image, noise-map, PSF), a mask, grid_stack, convolver \
         and other utilities that are used for modeling and fitting an image of a strong lens.
@@ -140,9 +195,19 @@ class LensDataHyper(LensData):
         positions : [[]]
             Lists of image-pixel coordinates (arc-seconds) that mappers close to one another in the source-plane(s), used \
             to speed up the non-linear sampling.
+        precision : str
+            The precision ('float64' or 'float32') of the grid-stacks, profile evaluations, PSF convolution and \
+            mapping matrices.
+        hyper_cache_size : int
+            The maximum number of contribution maps and hyper noise-maps stored in the caches keyed on the \
+            hyper-galaxy parameters, after which the least recently used entry is discarded.
+        gauss_legendre_sub_grid : bool
+            If True, the sub-grids of the grid-stacks are Gauss-Legendre sub-grids (see *GaussLegendreSubGrid*).
         """
-        super().__init__(ccd_data=ccd_data, mask=mask, sub_grid_size=sub_grid_size, image_psf_shape=image_psf_shape,
-                         mapping_matrix_psf_shape=mapping_matrix_psf_shape, positions=positions)
+        super(LensDataHyper, self).__init__(ccd_data=ccd_data, mask=mask, sub_grid_size=sub_grid_size,
+                                            image_psf_shape=image_psf_shape,
+                                            mapping_matrix_psf_shape=mapping_matrix_psf_shape, positions=positions,
+                                            precision=precision, gauss_legendre_sub_grid=gauss_legendre_sub_grid)
 
         self.hyper_model_image = hyper_model_image
         self.hyper_galaxy_images = hyper_galaxy_images
@@ -153,6 +218,64 @@ class LensDataHyper(LensData):
                                                mask.map_2d_array_to_masked_1d_array(hyper_galaxy_image),
                                                hyper_galaxy_images))
 
+        self.hyper_cache_size = hyper_cache_size
+        self.contribution_maps_1d_cache = OrderedDict()
+        self.hyper_noise_map_1d_cache = OrderedDict()
+
+    def contribution_maps_1d_from_hyper_galaxies(self, hyper_galaxies):
+        """Compute the 1D contribution map of every hyper-galaxy, using the hyper-images of the lens data.
+
+        The contribution maps depend only on each hyper-galaxy's *contribution_factor* and the fixed hyper-images, \
+        thus they are cached on these parameters so that repeated hyper-galaxies do not recompute them.
+
+        Parameters
+        -----------
+        hyper_galaxies : [galaxy.HyperGalaxy]
+            The hyper-galaxies which represent the model components used to scale the noise_map.
+        """
+        key = tuple(hyper_galaxy.contribution_factor for hyper_galaxy in hyper_galaxies)
+
+        return self.value_from_hyper_cache(
+            cache=self.contribution_maps_1d_cache, key=key,
+            value_function=lambda: lens_fit_util.contribution_maps_1d_from_hyper_images_and_galaxies(
+                hyper_model_image_1d=self.hyper_model_image_1d, hyper_galaxy_images_1d=self.hyper_galaxy_images_1d,
+                hyper_galaxies=hyper_galaxies, hyper_minimum_values=self.hyper_minimum_values))
+
+    def hyper_noise_map_1d_from_hyper_galaxies(self, hyper_galaxies):
+        """Compute the 1D hyper noise-map from the hyper-galaxies, using their (cached) contribution maps.
+
+        The hyper noise-map is cached on the *contribution_factor*, *noise_factor* and *noise_power* of every \
+        hyper-galaxy.
+
+        Parameters
+        -----------
+        hyper_galaxies : [galaxy.HyperGalaxy]
+            The hyper-galaxies which represent the model components used to scale the noise_map.
+        """
+        key = tuple((hyper_galaxy.contribution_factor, hyper_galaxy.noise_factor, hyper_galaxy.noise_power)
+                    for hyper_galaxy in hyper_galaxies)
+
+        return self.value_from_hyper_cache(
+            cache=self.hyper_noise_map_1d_cache, key=key,
+            value_function=lambda: lens_fit_util.scaled_noise_map_from_hyper_galaxies_and_contribution_maps(
+                contribution_maps=self.contribution_maps_1d_from_hyper_galaxies(hyper_galaxies=hyper_galaxies),
+                hyper_galaxies=hyper_galaxies, noise_map=self.noise_map_1d))
+
+    def value_from_hyper_cache(self, cache, key, value_function):
+        """Return the value of a key in one of the hyper caches, computing it with *value_function* if it is not \
+        cached. The least recently used entries are removed once the cache holds more than *hyper_cache_size*."""
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+
+        value = value_function()
+        cache[key] = value
+
+        while len(cache) > self.hyper_cache_size:
+            cache.popitem(last=False)
+
+        return value
+
     def __array_finalize__(self, obj):
         super(LensDataHyper, self).__array_finalize__(obj)
         if isinstance(obj, LensDataHyper):
@@ -160,4 +283,7 @@ class LensDataHyper(LensData):
             self.hyper_galaxy_images = obj.hyper_galaxy_images
             self.hyper_minimum_values = obj.hyper_minimum_values
             self.hyper_model_image_1d = obj.hyper_model_image_1d
-            self.hyper_galaxy_images_1d = obj.hyper_galaxy_images_1d
\ No newline at end of file
+            self.hyper_galaxy_images_1d = obj.hyper_galaxy_images_1d
+            self.hyper_cache_size = obj.hyper_cache_size
+            self.contribution_maps_1d_cache = obj.contribution_maps_1d_cache
+            self.hyper_noise_map_1d_cache = obj.hyper_noise_map_1d_cache
\ No newline at end of file
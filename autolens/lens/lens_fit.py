@@ -1,13 +1,16 @@
+import copy
+
 import numpy as np
 
-from autofit.tools import fit
+from autofit.tools import fit, fit_util
 from autolens import exc
+from autolens import timing
 from autolens.model.inversion import inversions
 from autolens.lens.util import lens_fit_util as util
 from autolens.lens import ray_tracing
 
 
-def fit_lens_data_with_tracer(lens_data, tracer, padded_tracer=None):
+def fit_lens_data_with_tracer(lens_data, tracer, padded_tracer=None, inversion_solver=None):
     """Fit lens data with a model tracer, automatically determining the type of fit based on the \
     properties of the galaxies in the tracer.
 
@@ -20,20 +23,22 @@ def fit_lens_data_with_tracer(lens_data, tracer, padded_tracer=None):
     padded_tracer : ray_tracing.Tracer or None
         A tracer with an identical strong lens configuration to the tracer above, but using the lens data's \
         padded grid_stack such that unmasked model-images can be computed.
+    inversion_solver : inversions.ConjugateGradientSolver or None
+        If supplied, inversions are solved iteratively with this solver (see *inversions.Inversion*).
     """
 
     if tracer.has_light_profile and not tracer.has_pixelization:
         return LensProfileFit(lens_data=lens_data, tracer=tracer, padded_tracer=padded_tracer)
     elif not tracer.has_light_profile and tracer.has_pixelization:
-        return LensInversionFit(lens_data=lens_data, tracer=tracer)
+        return LensInversionFit(lens_data=lens_data, tracer=tracer, inversion_solver=inversion_solver)
     elif tracer.has_light_profile and tracer.has_pixelization:
         return LensProfileInversionFit(lens_data=lens_data, tracer=tracer,
-                                           padded_tracer=padded_tracer)
+                                           padded_tracer=padded_tracer, inversion_solver=inversion_solver)
     else:
         raise exc.FittingException('The fit routine did not call a Fit class - check the '
                                    'properties of the tracer')
 
-def hyper_fit_lens_data_with_tracer(lens_data_hyper, tracer, padded_tracer=None):
+def hyper_fit_lens_data_with_tracer(lens_data_hyper, tracer, padded_tracer=None, inversion_solver=None):
     """Fit lens data with a model tracer, automatically determining the type of fit based on the \
     properties of the galaxies in the tracer.
 
@@ -46,17 +51,20 @@ def hyper_fit_lens_data_with_tracer(lens_data_hyper, tracer, padded_tracer=None)
     padded_tracer : ray_tracing.Tracer or None
         A tracer with an identical strong lens configuration to the tracer above, but using the lens data's \
         padded grid_stack such that unmasked model-images can be computed.
+    inversion_solver : inversions.ConjugateGradientSolver or None
+        If supplied, inversions are solved iteratively with this solver (see *inversions.Inversion*).
     """
 
     if tracer.has_light_profile and not tracer.has_pixelization:
         return LensProfileHyperFit(lens_data_hyper=lens_data_hyper, tracer=tracer, padded_tracer=padded_tracer)
 
     elif not tracer.has_light_profile and tracer.has_pixelization:
-        return LensInversionHyperFit(lens_data_hyper=lens_data_hyper, tracer=tracer)
+        return LensInversionHyperFit(lens_data_hyper=lens_data_hyper, tracer=tracer,
+                                     inversion_solver=inversion_solver)
 
     elif tracer.has_light_profile and tracer.has_pixelization:
         return LensProfileInversionHyperFit(lens_data_hyper=lens_data_hyper, tracer=tracer,
-                                            padded_tracer=padded_tracer)
+                                            padded_tracer=padded_tracer, inversion_solver=inversion_solver)
     else:
         raise exc.FittingException('The hyper fit routine did not call a Fit class - check the '
                                    'properties of the tracer')
@@ -82,6 +90,17 @@ class AbstractLensFit(object):
         self.psf = psf
         self.map_to_scaled_array = map_to_scaled_array
 
+    @property
+    def padded_planes(self):
+        """The planes of the padded tracer, which the unmasked model images are computed from."""
+        return self.padded_tracer.planes
+
+    @property
+    def tracer_with_linear_intensities(self):
+        """The tracer, with the intensities of any linear light profiles solved for by the fit (see \
+        *AbstractLensProfileFit*), from which the images of its planes and galaxies (e.g. for plotting) are computed."""
+        return self.tracer
+
     @property
     def total_inversions(self):
         return len(self.tracer.mappers_of_planes)
@@ -93,7 +112,7 @@ class AbstractLensFit(object):
         elif self.padded_tracer is not None:
             return util.unmasked_blurred_image_from_padded_grid_stack_psf_and_unmasked_image(
                 padded_grid_stack=self.padded_tracer.image_plane.grid_stack, psf=self.psf,
-                unmasked_image_1d=self.padded_tracer.image_plane_image_1d)
+                unmasked_image_1d=sum([plane.image_plane_image_1d for plane in self.padded_planes]))
 
     @property
     def unmasked_model_image_of_planes(self):
@@ -101,7 +120,7 @@ class AbstractLensFit(object):
             return None
         elif self.padded_tracer is not None:
             return util.unmasked_blurred_image_of_planes_from_padded_grid_stack_and_psf(
-                planes=self.padded_tracer.planes, padded_grid_stack=self.padded_tracer.image_plane.grid_stack,
+                planes=self.padded_planes, padded_grid_stack=self.padded_tracer.image_plane.grid_stack,
                 psf=self.psf)
 
     @property
@@ -110,16 +129,22 @@ class AbstractLensFit(object):
             return None
         elif self.padded_tracer is not None:
             return util.unmasked_blurred_image_of_planes_and_galaxies_from_padded_grid_stack_and_psf(
-                planes=self.padded_tracer.planes, padded_grid_stack=self.padded_tracer.image_plane.grid_stack,
+                planes=self.padded_planes, padded_grid_stack=self.padded_tracer.image_plane.grid_stack,
                 psf=self.psf)
 
 
 class AbstractLensProfileFit(AbstractLensFit):
 
-    def __init__(self, lens_data, tracer, padded_tracer):
+    def __init__(self, lens_data, noise_map_1d, tracer, padded_tracer):
         """ An abstract lens profile fitter, which generates the image-plane image of all galaxies (with light \
         profiles) in the tracer and blurs it with the lens data's PSF.
 
+        If the tracer's galaxies have linear light profiles (see *light_profiles.LinearLightProfile*), their \
+        intensities are solved for via a non-negative least-squares fit of their blurred images (for an intensity of \
+        1.0) to the image, after subtracting the blurred image of all other light profiles. The solved intensities \
+        are stored as the fit's *linear_intensities* (the light profiles themselves are not changed), and the model \
+        image is the blurred image of the other light profiles plus the blurred linear images scaled by them.
+
         If a padded tracer is supplied, the blurred profile image's can be generated over the entire image and thus \
         without the mask.
 
@@ -127,6 +152,9 @@ class AbstractLensProfileFit(AbstractLensFit):
         -----------
         lens_data : lens_data.LensData
             The lens-image that is fitted.
+        noise_map_1d : ndarray
+            The 1D noise_map map that is fitted, which is an input variable so a hyper-noise_map map can be used (see \
+            *AbstractHyperFitter*).
         tracer : ray_tracing.AbstractTracerNonStack
             The tracer, which describes the ray-tracing and strong lens configuration.
         padded_tracer : ray_tracing.Tracer or None
@@ -138,14 +166,65 @@ class AbstractLensProfileFit(AbstractLensFit):
 
         self.convolver_image = lens_data.convolver_image
 
-        blurred_profile_image_1d = util.blurred_image_1d_from_1d_unblurred_and_blurring_images(
-            unblurred_image_1d=tracer.image_plane_image_1d, blurring_image_1d=tracer.image_plane_blurring_image_1d,
-            convolver=self.convolver_image)
+        linear_light_profiles = util.linear_light_profiles_of_planes(planes=tracer.planes)
+
+        if not linear_light_profiles:
+
+            self.linear_intensities = None
+
+            self.blurred_profile_image_1d = util.blurred_image_1d_from_1d_unblurred_and_blurring_images(
+                unblurred_image_1d=tracer.image_plane_image_1d,
+                blurring_image_1d=tracer.image_plane_blurring_image_1d, convolver=self.convolver_image)
+
+        else:
 
-        self.blurred_profile_image = self.map_to_scaled_array(array_1d=blurred_profile_image_1d)
+            blurred_non_linear_image_1d_of_planes = \
+                util.blurred_image_1d_of_non_linear_light_profiles_of_planes_from_planes_and_convolver(
+                    planes=tracer.planes, convolver=self.convolver_image)
+
+            blurred_linear_images_1d = util.blurred_images_1d_of_linear_light_profiles_from_planes_and_convolver(
+                planes=tracer.planes, convolver=self.convolver_image)
+
+            self.linear_intensities = \
+                util.linear_light_profile_intensities_from_image_1d_noise_map_1d_and_blurred_images(
+                    image_1d=lens_data.image_1d - sum(blurred_non_linear_image_1d_of_planes),
+                    noise_map_1d=noise_map_1d, blurred_images_1d=blurred_linear_images_1d)
+
+            self.blurred_profile_image_1d_of_planes = blurred_non_linear_image_1d_of_planes
+
+            for plane_index, intensity, blurred_image_1d in zip(
+                    util.plane_indexes_of_linear_light_profiles(planes=tracer.planes), self.linear_intensities,
+                    blurred_linear_images_1d):
+                self.blurred_profile_image_1d_of_planes[plane_index] = \
+                    self.blurred_profile_image_1d_of_planes[plane_index] + intensity * blurred_image_1d
+
+            self.blurred_profile_image_1d = sum(self.blurred_profile_image_1d_of_planes)
+
+    @property
+    def blurred_profile_image(self):
+        return self.map_to_scaled_array(array_1d=self.blurred_profile_image_1d)
+
+    @property
+    def padded_planes(self):
+        if self.padded_tracer is None or self.linear_intensities is None:
+            return super(AbstractLensProfileFit, self).padded_planes
+        return util.planes_with_linear_light_profile_intensities(planes=self.padded_tracer.planes,
+                                                                 linear_intensities=self.linear_intensities)
+
+    @property
+    def tracer_with_linear_intensities(self):
+        if self.linear_intensities is None:
+            return super(AbstractLensProfileFit, self).tracer_with_linear_intensities
+        tracer = copy.copy(self.tracer)
+        tracer.planes = util.planes_with_linear_light_profile_intensities(planes=self.tracer.planes,
+                                                                          linear_intensities=self.linear_intensities)
+        return tracer
 
     @property
     def model_image_of_planes(self):
+        if self.linear_intensities is not None:
+            return [self.map_to_scaled_array(array_1d=blurred_image_1d) if np.count_nonzero(blurred_image_1d) > 0
+                    else None for blurred_image_1d in self.blurred_profile_image_1d_of_planes]
         return util.blurred_image_of_planes_from_1d_images_and_convolver(total_planes=self.tracer.total_planes,
                 image_plane_image_1d_of_planes=self.tracer.image_plane_image_1d_of_planes,
                 image_plane_blurring_image_1d_of_planes=self.tracer.image_plane_blurring_image_1d_of_planes,
@@ -154,7 +233,7 @@ class AbstractLensProfileFit(AbstractLensFit):
 
 class AbstractLensInversionFit(AbstractLensFit):
 
-    def __init__(self, lens_data, noise_map_1d, tracer):
+    def __init__(self, lens_data, noise_map_1d, tracer, inversion_solver=None, noise_weighted_image_1d=None):
         """ An abstract lens inversion fitter, which fits the lens data an inversion using the mapper(s) and \
         regularization(s) in the galaxies of the tracer.
 
@@ -169,13 +248,19 @@ class AbstractLensInversionFit(AbstractLensFit):
             *AbstractHyperFitter*).
         tracer : ray_tracing.Tracer
             The tracer, which describes the ray-tracing and strong lens configuration.
+        inversion_solver : inversions.ConjugateGradientSolver or None
+            If supplied, the inversion is solved iteratively with this solver (see *inversions.Inversion*).
+        noise_weighted_image_1d : ndarray or None
+            The lens data's image divided by the noise-map squared, which is precomputed by the lens data. If \
+            *None* (e.g. for a hyper noise-map), it is computed by the inversion.
         """
         super(AbstractLensInversionFit, self).__init__(tracer=tracer, padded_tracer=None, psf=lens_data.psf,
                                                        map_to_scaled_array=lens_data.map_to_scaled_array)
 
         self.inversion = inversions.inversion_from_image_mapper_and_regularization(
             image_1d=lens_data.image_1d, noise_map_1d=noise_map_1d, convolver=lens_data.convolver_mapping_matrix,
-            mapper=tracer.mappers_of_planes[-1], regularization=tracer.regularizations_of_planes[-1])
+            mapper=tracer.mappers_of_planes[-1], regularization=tracer.regularizations_of_planes[-1],
+            solver=inversion_solver, noise_weighted_image_1d=noise_weighted_image_1d)
 
     @property
     def model_image_of_planes(self):
@@ -184,7 +269,7 @@ class AbstractLensInversionFit(AbstractLensFit):
 
 class AbstractLensProfileInversionFit(AbstractLensFit):
 
-    def __init__(self, lens_data, noise_map_1d, tracer, padded_tracer):
+    def __init__(self, lens_data, noise_map_1d, tracer, padded_tracer, inversion_solver=None):
         """ An abstract lens profile and inversion fitter, which first generates and subtracts the image-plane \
         image of all galaxies (with light profiles) in the tracer, blurs it with the PSF and fits the residual image \
         with an inversion using the mapper(s) and regularization(s) in the galaxy's of the tracer.
@@ -206,27 +291,37 @@ class AbstractLensProfileInversionFit(AbstractLensFit):
         padded_tracer : ray_tracing.AbstractTracerNonStack or None
             A tracer with an identical strong lens configuration to the tracer above, but using the lens data's \
             padded grid_stack such that unmasked model-images can be computed.
+        inversion_solver : inversions.ConjugateGradientSolver or None
+            If supplied, the inversion is solved iteratively with this solver (see *inversions.Inversion*).
         """
         super(AbstractLensProfileInversionFit, self).__init__(tracer=tracer, padded_tracer=padded_tracer,
                                                               psf=lens_data.psf,
                                                               map_to_scaled_array=lens_data.map_to_scaled_array)
 
+        if util.linear_light_profiles_of_planes(planes=tracer.planes):
+            raise exc.FittingException('Linear light profiles cannot be fitted simultaneously with an inversion')
+
         self.psf = lens_data.psf
         self.convolver_image = lens_data.convolver_image
 
-        blurred_profile_image_1d = util.blurred_image_1d_from_1d_unblurred_and_blurring_images(
+        self.blurred_profile_image_1d = util.blurred_image_1d_from_1d_unblurred_and_blurring_images(
             unblurred_image_1d=tracer.image_plane_image_1d, blurring_image_1d=tracer.image_plane_blurring_image_1d,
             convolver=lens_data.convolver_image)
 
-        self.blurred_profile_image = self.map_to_scaled_array(array_1d=blurred_profile_image_1d)
-
-        profile_subtracted_image_1d = lens_data.image_1d - blurred_profile_image_1d
-        self.profile_subtracted_image = lens_data.image - self.blurred_profile_image
+        self.profile_subtracted_image_1d = lens_data.image_1d - self.blurred_profile_image_1d
 
         self.inversion = inversions.inversion_from_image_mapper_and_regularization(
-            image_1d=profile_subtracted_image_1d, noise_map_1d=noise_map_1d,
+            image_1d=self.profile_subtracted_image_1d, noise_map_1d=noise_map_1d,
             convolver=lens_data.convolver_mapping_matrix, mapper=tracer.mappers_of_planes[-1],
-            regularization=tracer.regularizations_of_planes[-1])
+            regularization=tracer.regularizations_of_planes[-1], solver=inversion_solver)
+
+    @property
+    def blurred_profile_image(self):
+        return self.map_to_scaled_array(array_1d=self.blurred_profile_image_1d)
+
+    @property
+    def profile_subtracted_image(self):
+        return self.image - self.blurred_profile_image
 
     @property
     def model_image_of_planes(self):
@@ -235,21 +330,87 @@ class AbstractLensProfileInversionFit(AbstractLensFit):
 
 class LensDataFit(fit.DataFit):
 
-    def __init__(self, image, noise_map, mask, model_image):
+    def __init__(self, image, noise_map, mask, image_1d, noise_map_1d, model_image_1d, map_to_scaled_array,
+                 noise_normalization=None):
         """Class to fit lens data with a model image.
 
+        The chi-squared, noise normalization and likelihood are computed using only the 1D masked image, noise-map \
+        and model image. The 2D model image, residual-map and chi-squared map are only computed (and then stored) \
+        when they are accessed, for example by a plotter.
+
         Parameters
         -----------
         image : ndarray
             The observed image that is fitted.
-        noise_map : ndarray
-            The noise-map of the observed image.
+        noise_map : ndarray or None
+            The noise-map of the observed image. If *None*, it is mapped from the 1D noise-map when accessed.
         mask: msk.Mask
             The mask that is applied to the image.
-        model_data : ndarray
-            The model image the oberved image is fitted with.
+        image_1d : ndarray
+            The 1D masked observed image that is fitted.
+        noise_map_1d : ndarray
+            The 1D masked noise-map of the observed image.
+        model_image_1d : ndarray
+            The 1D masked model image the oberved image is fitted with.
+        map_to_scaled_array : func
+            A function which maps a 1D masked array to its unmasked 2D array.
+        noise_normalization : float or None
+            The noise normalization of the 1D noise-map, which can be precomputed (see *LensData*) as it does not \
+            change between fits. If *None*, it is computed from the 1D noise-map.
         """
-        super(LensDataFit, self).__init__(data=image, noise_map=noise_map, mask=mask, model_data=model_image)
+        self.data = image
+        self.mask = mask
+        self.image_1d = image_1d
+        self.noise_map_1d = noise_map_1d
+        self.model_image_1d = model_image_1d
+        self.map_to_scaled_array = map_to_scaled_array
+
+        self._noise_map = noise_map
+        self._model_data = None
+        self._residual_map = None
+        self._chi_squared_map = None
+
+        with timing.timer('likelihood'):
+
+            self.chi_squared_map_1d = util.chi_squared_map_1d_from_image_1d_noise_map_1d_and_model_image_1d(
+                image_1d=image_1d, noise_map_1d=noise_map_1d, model_image_1d=model_image_1d)
+
+            self.chi_squared = np.sum(self.chi_squared_map_1d)
+            self.reduced_chi_squared = self.chi_squared / image_1d.shape[0]
+
+            if noise_normalization is None:
+                noise_normalization = util.noise_normalization_from_noise_map_1d(noise_map_1d=noise_map_1d)
+
+            self.noise_normalization = noise_normalization
+
+            self.likelihood = fit_util.likelihood_from_chi_squared_and_noise_normalization(
+                chi_squared=self.chi_squared, noise_normalization=self.noise_normalization)
+
+    @property
+    def noise_map(self):
+        if self._noise_map is None:
+            self._noise_map = self.map_to_scaled_array(array_1d=self.noise_map_1d)
+        return self._noise_map
+
+    @property
+    def model_data(self):
+        if self._model_data is None:
+            self._model_data = self.map_to_scaled_array(array_1d=self.model_image_1d)
+        return self._model_data
+
+    @property
+    def residual_map(self):
+        if self._residual_map is None:
+            self._residual_map = fit_util.residual_map_from_data_mask_and_model_data(
+                data=self.data, mask=self.mask, model_data=self.model_data)
+        return self._residual_map
+
+    @property
+    def chi_squared_map(self):
+        if self._chi_squared_map is None:
+            self._chi_squared_map = fit_util.chi_squared_map_from_residual_map_noise_map_and_mask(
+                residual_map=self.residual_map, noise_map=self.noise_map, mask=self.mask)
+        return self._chi_squared_map
 
     @property
     def image(self):
@@ -266,24 +427,35 @@ class LensDataFit(fit.DataFit):
 
 class LensDataInversionFit(LensDataFit):
 
-    def __init__(self, image, noise_map, mask, model_image, inversion):
+    def __init__(self, image, noise_map, mask, image_1d, noise_map_1d, model_image_1d, map_to_scaled_array,
+                 inversion, noise_normalization=None):
         """Class to fit lens data with a inversion model image.
 
         Parameters
         -----------
         image : ndarray
             The observed image that is fitted.
-        noise_map : ndarray
-            The noise-map of the observed image.
+        noise_map : ndarray or None
+            The noise-map of the observed image. If *None*, it is mapped from the 1D noise-map when accessed.
         mask: msk.Mask
             The mask that is applied to the image.
-        model_data : ndarray
-            The model image the oberved image is fitted with.
+        image_1d : ndarray
+            The 1D masked observed image that is fitted.
+        noise_map_1d : ndarray
+            The 1D masked noise-map of the observed image.
+        model_image_1d : ndarray
+            The 1D masked model image the oberved image is fitted with.
+        map_to_scaled_array : func
+            A function which maps a 1D masked array to its unmasked 2D array.
         inversion : inversions.Inversion
             The inversion used to ofit the image.
+        noise_normalization : float or None
+            The noise normalization of the 1D noise-map. If *None*, it is computed from the 1D noise-map.
         """
-        super(LensDataInversionFit, self).__init__(image=image, noise_map=noise_map,
-                                                   mask=mask, model_image=model_image)
+        super(LensDataInversionFit, self).__init__(image=image, noise_map=noise_map, mask=mask, image_1d=image_1d,
+                                                   noise_map_1d=noise_map_1d, model_image_1d=model_image_1d,
+                                                   map_to_scaled_array=map_to_scaled_array,
+                                                   noise_normalization=noise_normalization)
 
         self.likelihood_with_regularization = \
             util.likelihood_with_regularization_from_chi_squared_regularization_term_and_noise_normalization(
@@ -323,16 +495,20 @@ class LensProfileFit(LensDataFit, AbstractLensProfileFit):
             A tracer with an identical strong lens configuration to the tracer above, but using the lens data's \
             padded grid_stack such that unmasked model-images can be computed.
         """
-        AbstractLensProfileFit.__init__(self=self, lens_data=lens_data, tracer=tracer,
-                                        padded_tracer=padded_tracer)
+        AbstractLensProfileFit.__init__(self=self, lens_data=lens_data, noise_map_1d=lens_data.noise_map_1d,
+                                        tracer=tracer, padded_tracer=padded_tracer)
 
         super(LensProfileFit, self).__init__(image=lens_data.image, noise_map=lens_data.noise_map,
-                                             mask=lens_data.mask, model_image=self.blurred_profile_image)
+                                             mask=lens_data.mask, image_1d=lens_data.image_1d,
+                                             noise_map_1d=lens_data.noise_map_1d,
+                                             model_image_1d=self.blurred_profile_image_1d,
+                                             map_to_scaled_array=lens_data.map_to_scaled_array,
+                                             noise_normalization=lens_data.noise_normalization)
 
 
 class LensInversionFit(LensDataInversionFit, AbstractLensInversionFit):
 
-    def __init__(self, lens_data, tracer):
+    def __init__(self, lens_data, tracer, inversion_solver=None):
         """ Fit lens data with an inversion, as follows:
 
         1) Extract the mapper(s) and regularization(s) of galaxies in the tracer.
@@ -345,20 +521,27 @@ class LensInversionFit(LensDataInversionFit, AbstractLensInversionFit):
             The lens-image that is fitted.
         tracer : ray_tracing.Tracer
             The tracer, which describes the ray-tracing and strong lens configuration.
+        inversion_solver : inversions.ConjugateGradientSolver or None
+            If supplied, the inversion is solved iteratively with this solver (see *inversions.Inversion*).
         """
 
         AbstractLensInversionFit.__init__(self=self, lens_data=lens_data,
-                                          noise_map_1d=lens_data.noise_map_1d, tracer=tracer)
+                                          noise_map_1d=lens_data.noise_map_1d, tracer=tracer,
+                                          inversion_solver=inversion_solver,
+                                          noise_weighted_image_1d=lens_data.noise_weighted_image_1d)
 
         super(LensInversionFit, self).__init__(image=lens_data.image, noise_map=lens_data.noise_map,
-                                               mask=lens_data.mask,
-                                               model_image=self.inversion.reconstructed_data,
-                                               inversion=self.inversion)
+                                               mask=lens_data.mask, image_1d=lens_data.image_1d,
+                                               noise_map_1d=lens_data.noise_map_1d,
+                                               model_image_1d=self.inversion.reconstructed_data_vector,
+                                               map_to_scaled_array=lens_data.map_to_scaled_array,
+                                               inversion=self.inversion,
+                                               noise_normalization=lens_data.noise_normalization)
 
 
 class LensProfileInversionFit(LensDataInversionFit, AbstractLensProfileInversionFit):
 
-    def __init__(self, lens_data, tracer, padded_tracer=None):
+    def __init__(self, lens_data, tracer, padded_tracer=None, inversion_solver=None):
         """ Fit lens data with galaxy light-profiles and an inversion, as follows:
 
         1) Generates the image-plane image of all galaxies with light profiles in the tracer.
@@ -384,17 +567,23 @@ class LensProfileInversionFit(LensDataInversionFit, AbstractLensProfileInversion
         padded_tracer : ray_tracing.Tracer or None
             A tracer with an identical strong lens configuration to the tracer above, but using the lens data's \
             padded grid_stack such that unmasked model-images can be computed.
+        inversion_solver : inversions.ConjugateGradientSolver or None
+            If supplied, the inversion is solved iteratively with this solver (see *inversions.Inversion*).
         """
 
         AbstractLensProfileInversionFit.__init__(self=self, lens_data=lens_data,
                                                  noise_map_1d=lens_data.noise_map_1d, tracer=tracer,
-                                                 padded_tracer=padded_tracer)
+                                                 padded_tracer=padded_tracer, inversion_solver=inversion_solver)
 
-        model_image = self.blurred_profile_image + self.inversion.reconstructed_data
+        model_image_1d = self.blurred_profile_image_1d + self.inversion.reconstructed_data_vector
 
         super(LensProfileInversionFit, self).__init__(image=lens_data.image, noise_map=lens_data.noise_map,
-                                                      mask=lens_data.mask, model_image=model_image,
-                                                      inversion=self.inversion)
+                                                      mask=lens_data.mask, image_1d=lens_data.image_1d,
+                                                      noise_map_1d=lens_data.noise_map_1d,
+                                                      model_image_1d=model_image_1d,
+                                                      map_to_scaled_array=lens_data.map_to_scaled_array,
+                                                      inversion=self.inversion,
+                                                      noise_normalization=lens_data.noise_normalization)
 
 
 class AbstractLensHyperFit(object):
@@ -428,22 +617,22 @@ class AbstractLensHyperFit(object):
 
         self.is_hyper_fit = True
 
-        contribution_maps_1d = \
-            util.contribution_maps_1d_from_hyper_images_and_galaxies(
-                hyper_model_image_1d=lens_data_hyper.hyper_model_image_1d,
-                hyper_galaxy_images_1d=lens_data_hyper.hyper_galaxy_images_1d,
-                hyper_galaxies=hyper_galaxies, hyper_minimum_values=lens_data_hyper.hyper_minimum_values)
+        self.contribution_maps_1d = lens_data_hyper.contribution_maps_1d_from_hyper_galaxies(
+            hyper_galaxies=hyper_galaxies)
+
+        self.hyper_noise_map_1d = lens_data_hyper.hyper_noise_map_1d_from_hyper_galaxies(
+            hyper_galaxies=hyper_galaxies)
 
-        self.contribution_maps = list(map(lambda contribution_map_1d :
-                                          lens_data_hyper.map_to_scaled_array(array_1d=contribution_map_1d),
-                                          contribution_maps_1d))
+        self.map_to_scaled_array = lens_data_hyper.map_to_scaled_array
 
-        self.hyper_noise_map_1d =\
-            util.scaled_noise_map_from_hyper_galaxies_and_contribution_maps(
-                contribution_maps=contribution_maps_1d, hyper_galaxies=hyper_galaxies,
-                noise_map=lens_data_hyper.noise_map_1d)
+    @property
+    def contribution_maps(self):
+        return list(map(lambda contribution_map_1d: self.map_to_scaled_array(array_1d=contribution_map_1d),
+                        self.contribution_maps_1d))
 
-        self.hyper_noise_map = lens_data_hyper.map_to_scaled_array(array_1d=self.hyper_noise_map_1d)
+    @property
+    def hyper_noise_map(self):
+        return self.noise_map
 
 
 class LensProfileHyperFit(LensDataFit, AbstractLensProfileFit, AbstractLensHyperFit):
@@ -473,16 +662,19 @@ class LensProfileHyperFit(LensDataFit, AbstractLensProfileFit, AbstractLensHyper
         AbstractLensHyperFit.__init__(self=self, lens_data_hyper=lens_data_hyper,
                                       hyper_galaxies=tracer.hyper_galaxies)
 
-        AbstractLensProfileFit.__init__(self=self, lens_data=lens_data_hyper, tracer=tracer,
-                                        padded_tracer=padded_tracer)
+        AbstractLensProfileFit.__init__(self=self, lens_data=lens_data_hyper, noise_map_1d=self.hyper_noise_map_1d,
+                                        tracer=tracer, padded_tracer=padded_tracer)
 
-        super(LensProfileHyperFit, self).__init__(image=lens_data_hyper.image, noise_map=self.hyper_noise_map,
-                                                  mask=lens_data_hyper.mask, model_image=self.blurred_profile_image)
+        super(LensProfileHyperFit, self).__init__(image=lens_data_hyper.image, noise_map=None,
+                                                  mask=lens_data_hyper.mask, image_1d=lens_data_hyper.image_1d,
+                                                  noise_map_1d=self.hyper_noise_map_1d,
+                                                  model_image_1d=self.blurred_profile_image_1d,
+                                                  map_to_scaled_array=lens_data_hyper.map_to_scaled_array)
 
 
 class LensInversionHyperFit(LensDataInversionFit, AbstractLensInversionFit, AbstractLensHyperFit):
 
-    def __init__(self, lens_data_hyper, tracer):
+    def __init__(self, lens_data_hyper, tracer, inversion_solver=None):
         """ Fit a lens hyper-image with an inversion, as follows:
 
         1) Use the hyper-image and tracer's hyper-galaxies to generate a hyper noise-map.
@@ -497,23 +689,28 @@ class LensInversionHyperFit(LensDataInversionFit, AbstractLensInversionFit, Abst
             The lens hyper image that is fitted, which includes the hyper-image used for scaling the noise-map.
         tracer : ray_tracing.Tracer
             The tracer, which describes the ray-tracing of the strong lens configuration.
+        inversion_solver : inversions.ConjugateGradientSolver or None
+            If supplied, the inversion is solved iteratively with this solver (see *inversions.Inversion*).
         """
 
         AbstractLensHyperFit.__init__(self=self, lens_data_hyper=lens_data_hyper,
                                       hyper_galaxies=tracer.hyper_galaxies)
 
         AbstractLensInversionFit.__init__(self=self, lens_data=lens_data_hyper,
-                                          noise_map_1d=self.hyper_noise_map_1d, tracer=tracer)
-
-        super(LensInversionHyperFit, self).__init__(image=lens_data_hyper.image,
-                                                    noise_map=self.hyper_noise_map, mask=lens_data_hyper.mask,
-                                                    model_image=self.inversion.reconstructed_data,
+                                          noise_map_1d=self.hyper_noise_map_1d, tracer=tracer,
+                                          inversion_solver=inversion_solver)
+
+        super(LensInversionHyperFit, self).__init__(image=lens_data_hyper.image, noise_map=None,
+                                                    mask=lens_data_hyper.mask, image_1d=lens_data_hyper.image_1d,
+                                                    noise_map_1d=self.hyper_noise_map_1d,
+                                                    model_image_1d=self.inversion.reconstructed_data_vector,
+                                                    map_to_scaled_array=lens_data_hyper.map_to_scaled_array,
                                                     inversion=self.inversion)
 
 
 class LensProfileInversionHyperFit(LensDataInversionFit, AbstractLensProfileInversionFit, AbstractLensHyperFit):
 
-    def __init__(self, lens_data_hyper, tracer, padded_tracer=None):
+    def __init__(self, lens_data_hyper, tracer, padded_tracer=None, inversion_solver=None):
         """Fit a lens hyper-image with galaxy light-profiles and an inversion, as follows:
 
         1) Use the hyper-image and tracer's hyper-galaxies to generate a hyper noise-map.
@@ -541,6 +738,8 @@ class LensProfileInversionHyperFit(LensDataInversionFit, AbstractLensProfileInve
         padded_tracer : ray_tracing.AbstractTracerNonStack or None
             A tracer with an identical strong lens configuration to the tracer above, but using the lens data's \
             padded grid_stacks such that unmasked model-image can be computed.
+        inversion_solver : inversions.ConjugateGradientSolver or None
+            If supplied, the inversion is solved iteratively with this solver (see *inversions.Inversion*).
         """
 
         AbstractLensHyperFit.__init__(self=self, lens_data_hyper=lens_data_hyper,
@@ -548,13 +747,16 @@ class LensProfileInversionHyperFit(LensDataInversionFit, AbstractLensProfileInve
 
         AbstractLensProfileInversionFit.__init__(self=self, lens_data=lens_data_hyper,
                                                  noise_map_1d=self.hyper_noise_map_1d, tracer=tracer,
-                                                 padded_tracer=padded_tracer)
+                                                 padded_tracer=padded_tracer, inversion_solver=inversion_solver)
 
-        model_image = self.blurred_profile_image + self.inversion.reconstructed_data
+        model_image_1d = self.blurred_profile_image_1d + self.inversion.reconstructed_data_vector
 
-        super(LensProfileInversionHyperFit, self).__init__(image=lens_data_hyper.image,
-                                                           noise_map=self.hyper_noise_map,
-                                                           mask=lens_data_hyper.mask, model_image=model_image,
+        super(LensProfileInversionHyperFit, self).__init__(image=lens_data_hyper.image, noise_map=None,
+                                                           mask=lens_data_hyper.mask,
+                                                           image_1d=lens_data_hyper.image_1d,
+                                                           noise_map_1d=self.hyper_noise_map_1d,
+                                                           model_image_1d=model_image_1d,
+                                                           map_to_scaled_array=lens_data_hyper.map_to_scaled_array,
                                                            inversion=self.inversion)
 
 
@@ -1,3 +1,4 @@
+from collections import OrderedDict
 from functools import wraps
 
 import numpy as np
@@ -5,9 +6,12 @@ from astropy import constants
 from astropy import cosmology as cosmo
 
 from autolens import exc
+from autolens import timing
 from autolens.data.array import scaled_array
 from autolens.data.array import grids
+from autolens.model.galaxy import galaxy as g
 from autolens.model.galaxy.util import galaxy_util
+from autolens.model.profiles import geometry_profiles
 from autolens.lens.util import lens_util
 
 def check_plane_for_redshift(func):
@@ -43,6 +47,301 @@ def check_plane_for_redshift(func):
     return wrapper
 
 
+def mass_profile_cache_key(mass_profile):
+    """Compute a hashable key describing a mass profile's type and parameters, such that two mass profiles with the \
+    same key give identical deflection angles.
+
+    If the mass profile has a parameter which cannot be hashed (e.g. a dictionary), it is not cacheable and *None* is \
+    returned.
+
+    Parameters
+    ----------
+    mass_profile : mp.MassProfile
+        The mass profile the key is computed for.
+    """
+
+    def hashable(value):
+        if isinstance(value, (list, tuple, np.ndarray)):
+            return tuple(map(hashable, value))
+        return value
+
+    key = (mass_profile.__class__,) + tuple(sorted((name, hashable(value))
+                                                  for name, value in mass_profile.__dict__.items()))
+
+    try:
+        hash(key)
+    except TypeError:
+        return None
+
+    return key
+
+
+def galaxy_cache_key(galaxy):
+    """Compute a hashable key describing a galaxy's redshift and the type and parameters of its light profiles, mass \
+    profiles, pixelization, regularization and hyper-galaxy, such that two galaxies with the same key give \
+    identical fits.
+
+    If any of these has a parameter which cannot be hashed (e.g. a dictionary), the galaxy is not cacheable and \
+    *None* is returned.
+
+    Parameters
+    ----------
+    galaxy : g.Galaxy
+        The galaxy the key is computed for.
+    """
+
+    def hashable(value):
+        if value is None or isinstance(value, (bool, int, float, str, np.number)):
+            return value
+        if isinstance(value, (list, tuple, np.ndarray)):
+            return tuple(map(hashable, value))
+        key = mass_profile_cache_key(mass_profile=value)
+        if key is None:
+            raise TypeError('{} is not cacheable'.format(value.__class__.__name__))
+        return key
+
+    try:
+        key = tuple(sorted((name, hashable(value)) for name, value in galaxy.__dict__.items()))
+        hash(key)
+    except TypeError:
+        return None
+
+    return key
+
+
+class DeflectionCache(object):
+
+    def __init__(self, max_size=32):
+        """A cache of the deflection angles of mass profiles on grids, which is shared by the planes of every tracer \
+        created in a phase's analysis.
+
+        Entries are keyed on the mass profile's parameters (see *mass_profile_cache_key*) and the identity of the grid \
+        they were computed on. Thus, if a non-linear search does not change a lens galaxy's mass model between samples \
+        (e.g. a phase where only the source galaxy is varied, or a hyper phase), its deflection angles on the lens \
+        data's grid-stack (which are computed on its concatenated grid, see *GridStack.concatenated_grid*) are \
+        computed once and reused by every subsequent tracer. This includes the tracers of an adaptive pixelization, \
+        whose grid-stack with a new pix-grid evaluates the deflections on the concatenated grid of the lens data's \
+        grid-stack and on the pix-grid separately (see *GridStack.grid_stack_with_pix_grid_added*).
+
+        The deflection-stack of a plane's galaxies and the grid-stack traced with it are also cached, keyed on the \
+        parameters of all of the galaxies' mass profiles and the identity of the grid-stack, so that a plane whose mass \
+        profiles are all unchanged skips summing its deflection angles and tracing its grid-stack to the next plane \
+        entirely (see *deflection_stack_of_galaxies_from_grid_stack*).
+
+        A reference to every grid and grid-stack is kept in the cache, so their ids cannot be reused by a different \
+        grid whilst their deflections are stored. The least recently used entries are removed once there are more \
+        than max_size.
+
+        Parameters
+        ----------
+        max_size : int
+            The maximum number of (mass profile, grid) deflection arrays, and separately the maximum number of \
+            (galaxies, grid-stack) deflection-stacks, stored in the cache.
+        """
+        self.max_size = max_size
+        self.deflections = OrderedDict()
+        self.deflection_stacks = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def deflections_of_mass_profile_from_grid(self, mass_profile, grid):
+        """Compute the deflection angles of a mass profile on a grid, retrieving them from the cache if they have \
+        been computed before for a mass profile with identical parameters on the same grid.
+
+        Parameters
+        ----------
+        mass_profile : mp.MassProfile
+            The mass profile whose deflection angles are computed.
+        grid : ndarray
+            The (y, x) coordinates in the original reference frame of the grid.
+        """
+        mass_profile_key = mass_profile_cache_key(mass_profile=mass_profile)
+        key = (mass_profile_key, id(grid))
+
+        if mass_profile_key is not None and key in self.deflections and self.deflections[key][0] is grid:
+            self.deflections.move_to_end(key)
+            self.hits += 1
+            return self.deflections[key][1]
+
+        self.misses += 1
+
+        deflections = g.deflections_of_mass_profile_from_grid(mass_profile=mass_profile, grid=grid)
+
+        if mass_profile_key is None:
+            return deflections
+
+        self.deflections[key] = (grid, deflections)
+
+        while len(self.deflections) > self.max_size:
+            self.deflections.popitem(last=False)
+
+        return deflections
+
+    def deflections_of_galaxies_from_grid(self, galaxies, grid):
+        """Compute the summed deflection angles of the mass profiles of a list of galaxies on a grid, using the \
+        cache for every mass profile.
+
+        Parameters
+        ----------
+        galaxies : [Galaxy]
+            The galaxies whose mass profiles deflection angles are computed.
+        grid : ndarray
+            The (y, x) coordinates in the original reference frame of the grid.
+        """
+        deflections = np.zeros((grid.shape[0], 2))
+
+        with geometry_profiles.shared_transforms():
+            for galaxy in galaxies:
+                for mass_profile in galaxy.mass_profiles:
+                    deflections += self.deflections_of_mass_profile_from_grid(mass_profile=mass_profile, grid=grid)
+
+        return deflections
+
+    @staticmethod
+    def deflection_stack_key_of_galaxies_and_grid_stack(galaxies, grid_stack):
+        """The key of the deflection-stack of the galaxies' mass profiles on a grid-stack, which is *None* if any of \
+        the mass profiles is not cacheable (see *mass_profile_cache_key*)."""
+        mass_profile_keys = tuple(mass_profile_cache_key(mass_profile=mass_profile) for galaxy in galaxies
+                                  for mass_profile in galaxy.mass_profiles)
+
+        if None in mass_profile_keys:
+            return None
+
+        return mass_profile_keys, id(grid_stack)
+
+    def cached_deflection_stack_entry_of_galaxies_and_grid_stack(self, galaxies, grid_stack):
+        """Look up the cache entry (a list of the grid-stack, its deflection-stack and its traced grid-stack, which \
+        is *None* until it is first traced) of the galaxies' mass profiles on a grid-stack, returning *None* if it \
+        is not cached. This neither counts as a hit or miss, nor changes the order in which entries are removed.
+
+        Parameters
+        ----------
+        galaxies : [Galaxy]
+            The galaxies whose mass profiles deflection angles were computed.
+        grid_stack : grids.GridStack
+            The grid-stack the deflection angles were computed on.
+        """
+        key = self.deflection_stack_key_of_galaxies_and_grid_stack(galaxies=galaxies, grid_stack=grid_stack)
+
+        if key is not None and key in self.deflection_stacks and self.deflection_stacks[key][0] is grid_stack:
+            return self.deflection_stacks[key]
+
+        return None
+
+    def deflection_stack_entry_of_galaxies_from_grid_stack(self, galaxies, grid_stack):
+        """Retrieve the cache entry (see *cached_deflection_stack_entry_of_galaxies_and_grid_stack*) of the \
+        galaxies' mass profiles on a grid-stack, computing the deflection-stack if it is not cached.
+
+        A hit counts as a hit of every mass profile of the galaxies, as none of their deflection angles are \
+        recomputed. If a mass profile is not cacheable, the entry is computed but not stored.
+
+        Parameters
+        ----------
+        galaxies : [Galaxy]
+            The galaxies whose mass profiles deflection angles are computed.
+        grid_stack : grids.GridStack
+            The grid-stack the deflection angles are computed on.
+        """
+        entry = self.cached_deflection_stack_entry_of_galaxies_and_grid_stack(galaxies=galaxies, grid_stack=grid_stack)
+
+        if entry is not None:
+            self.deflection_stacks.move_to_end(
+                self.deflection_stack_key_of_galaxies_and_grid_stack(galaxies=galaxies, grid_stack=grid_stack))
+            self.hits += sum(len(galaxy.mass_profiles) for galaxy in galaxies)
+            return entry
+
+        def calculate_deflections(grid):
+            return self.deflections_of_galaxies_from_grid(galaxies=galaxies, grid=grid)
+
+        entry = [grid_stack, grid_stack.apply_function_to_concatenated_grid(calculate_deflections), None]
+
+        key = self.deflection_stack_key_of_galaxies_and_grid_stack(galaxies=galaxies, grid_stack=grid_stack)
+
+        if key is None:
+            return entry
+
+        self.deflection_stacks[key] = entry
+
+        while len(self.deflection_stacks) > self.max_size:
+            self.deflection_stacks.popitem(last=False)
+
+        return entry
+
+    def deflection_stack_of_galaxies_from_grid_stack(self, galaxies, grid_stack):
+        """Compute the deflection-stack of the summed deflection angles of the mass profiles of a list of galaxies on \
+        a grid-stack, retrieving it from the cache if it has been computed before for mass profiles with identical \
+        parameters on the same grid-stack.
+
+        For a grid-stack set up by adding a pix-grid to a base grid-stack (e.g. for an adaptive pixelization, which \
+        sets up a new grid-stack for every tracer), the deflection-stack of the base grid-stack is cached and only the \
+        pix-grid's deflection angles are computed.
+
+        Parameters
+        ----------
+        galaxies : [Galaxy]
+            The galaxies whose mass profiles deflection angles are computed.
+        grid_stack : grids.GridStack
+            The grid-stack the deflection angles are computed on.
+        """
+        if grid_stack.base_grid_stack is not None:
+
+            base_deflection_stack = self.deflection_stack_of_galaxies_from_grid_stack(
+                galaxies=galaxies, grid_stack=grid_stack.base_grid_stack)
+
+            deflection_stack = grids.GridStack(regular=base_deflection_stack.regular, sub=base_deflection_stack.sub,
+                                               blurring=base_deflection_stack.blurring,
+                                               pix=self.deflections_of_galaxies_from_grid(galaxies=galaxies,
+                                                                                          grid=grid_stack.pix))
+            deflection_stack._base_grid_stack = base_deflection_stack
+
+            return deflection_stack
+
+        return self.deflection_stack_entry_of_galaxies_from_grid_stack(galaxies=galaxies, grid_stack=grid_stack)[1]
+
+    def traced_grid_stack_of_galaxies_from_grid_stack(self, galaxies, grid_stack, deflection_stack):
+        """Trace a grid-stack to the next plane using the deflection-stack of a list of galaxies (see \
+        *deflection_stack_of_galaxies_from_grid_stack*), retrieving the traced grid-stack from the cache if the \
+        grid-stack has been traced before using mass profiles with identical parameters.
+
+        For a grid-stack set up by adding a pix-grid to a base grid-stack, the traced base grid-stack is cached and \
+        only the pix-grid is traced (provided the deflection-stack was computed from the base grid-stack's \
+        deflection-stack by *deflection_stack_of_galaxies_from_grid_stack*).
+
+        Parameters
+        ----------
+        galaxies : [Galaxy]
+            The galaxies whose mass profiles deflect the grid-stack.
+        grid_stack : grids.GridStack
+            The grid-stack which is traced.
+        deflection_stack : grids.GridStack
+            The deflection-stack of the galaxies on the grid-stack.
+        """
+        if grid_stack.base_grid_stack is not None and deflection_stack.base_grid_stack is not None:
+
+            traced_base_grid_stack = self.traced_grid_stack_of_galaxies_from_grid_stack(
+                galaxies=galaxies, grid_stack=grid_stack.base_grid_stack,
+                deflection_stack=deflection_stack.base_grid_stack)
+
+            return grid_stack.traced_grid_stack_from_traced_base_grid_stack_and_pix_deflections(
+                traced_base_grid_stack=traced_base_grid_stack, pix_deflections=deflection_stack.pix)
+
+        entry = self.cached_deflection_stack_entry_of_galaxies_and_grid_stack(galaxies=galaxies, grid_stack=grid_stack)
+
+        # If the deflection-stack is no longer cached (e.g. it was removed, or is not cacheable), the grid-stack is \
+        # traced with the deflection-stack that was passed, without caching the traced grid-stack.
+        if entry is None or entry[1] is not deflection_stack:
+            return grid_stack.traced_grid_stack_from_deflection_stacks(deflection_stacks=[deflection_stack])
+
+        if entry[2] is None:
+            entry[2] = grid_stack.traced_grid_stack_from_deflection_stacks(deflection_stacks=[deflection_stack])
+
+        return entry[2]
+
+    def clear(self):
+        self.deflections.clear()
+        self.deflection_stacks.clear()
+
+
 class AbstractPlane(object):
 
     def __init__(self, galaxies, cosmology):
@@ -91,7 +390,7 @@ class AbstractPlane(object):
     @property
     @check_plane_for_redshift
     def arcsec_per_kpc_proper(self):
-        return self.cosmology.arcsec_per_kpc_proper(z=self.redshift).value
+        return lens_util.arcsec_per_kpc_proper_for_cosmology(z=self.redshift, cosmology=self.cosmology)
 
     @property
     @check_plane_for_redshift
@@ -101,7 +400,8 @@ class AbstractPlane(object):
     @property
     @check_plane_for_redshift
     def angular_diameter_distance_to_earth(self):
-        return self.cosmology.angular_diameter_distance(self.redshift).to('kpc').value
+        return lens_util.angular_diameter_distance_to_earth_for_cosmology(z=self.redshift,
+                                                                         cosmology=self.cosmology)
 
     @property
     def has_light_profile(self):
@@ -238,7 +538,8 @@ class AbstractPlane(object):
 
 class Plane(AbstractPlane):
 
-    def __init__(self, galaxies, grid_stack, border=None, compute_deflections=True, cosmology=cosmo.Planck15):
+    def __init__(self, galaxies, grid_stack, border=None, compute_deflections=True, fft_pixel_scale=None,
+                 deflection_cache=None, flux_fraction_tolerance=None, cosmology=cosmo.Planck15):
         """A plane which uses one grid-stack of (y,x) grid_stack (e.g. a regular-grid, sub-grid, etc.)
 
         Parameters
@@ -252,6 +553,18 @@ class Plane(AbstractPlane):
             source-plane borders.
         compute_deflections : bool
             If true, the deflection-angles of this plane's coordinates are calculated use its galaxy's mass-profiles.
+        fft_pixel_scale : float or None
+            If not *None*, the deflection-angles are computed by FFT convolution of the galaxies' total surface \
+            density, evaluated on a padded grid of this pixel scale bounding the grid-stack, instead of profile by \
+            profile (see *galaxy_util.deflections_via_fft_of_galaxies_from_grid_stack*).
+        deflection_cache : DeflectionCache or None
+            If not *None*, the deflection-angles of each mass profile are retrieved from (and stored in) this cache, \
+            so that mass profiles whose parameters are unchanged from a previous plane are not recomputed. The \
+            deflection-stack and traced grid-stack of the plane are also cached.
+        flux_fraction_tolerance : float or None
+            If not *None*, the intensities of each light profile are only computed for the coordinates inside its \
+            bounding radius, outside of which it contains less than this fraction of its total flux (see \
+            *galaxy_util.intensities_of_galaxies_from_grid*).
         cosmology : astropy.cosmology
             The cosmology associated with the plane, used to convert arc-second coordinates to physical values.
         """
@@ -260,25 +573,44 @@ class Plane(AbstractPlane):
 
         self.grid_stack = grid_stack
         self.border = border
+        self.flux_fraction_tolerance = flux_fraction_tolerance
+        self._sub_grid_buckets = None
+        self._blurring_grid_buckets = None
+        self.deflection_cache = None
 
-        if compute_deflections:
+        if compute_deflections and fft_pixel_scale is not None:
+
+            self.deflection_stack = galaxy_util.deflections_via_fft_of_galaxies_from_grid_stack(
+                grid_stack=self.grid_stack, galaxies=galaxies, pixel_scale=fft_pixel_scale)
+
+        elif compute_deflections and deflection_cache is not None:
+
+            self.deflection_cache = deflection_cache
+
+            self.deflection_stack = deflection_cache.deflection_stack_of_galaxies_from_grid_stack(
+                galaxies=galaxies, grid_stack=self.grid_stack)
+
+        elif compute_deflections:
 
             def calculate_deflections(grid):
-                return sum(map(lambda galaxy: galaxy.deflections_from_grid(grid), galaxies))
+                with geometry_profiles.shared_transforms():
+                    return sum(map(lambda galaxy: galaxy.deflections_from_grid(grid), galaxies))
 
-            self.deflection_stack = self.grid_stack.apply_function(calculate_deflections)
+            self.deflection_stack = self.grid_stack.apply_function_to_concatenated_grid(calculate_deflections)
 
         else:
             self.deflection_stack = None
         self.cosmology = cosmology
 
     def trace_grid_stack_to_next_plane(self):
-        """Trace this plane's grid_stacks to the next plane, using its deflection angles."""
+        """Trace this plane's grid_stacks to the next plane, using its deflection angles. If the plane's deflection \
+        angles are cached, the traced grid-stack is also cached (see *DeflectionCache*)."""
 
-        def minus(grid, deflections):
-            return grid - deflections
+        if self.deflection_cache is not None:
+            return self.deflection_cache.traced_grid_stack_of_galaxies_from_grid_stack(
+                galaxies=self.galaxies, grid_stack=self.grid_stack, deflection_stack=self.deflection_stack)
 
-        return self.grid_stack.map_function(minus, self.deflection_stack)
+        return self.grid_stack.traced_grid_stack_from_deflection_stacks(deflection_stacks=[self.deflection_stack])
 
     @property
     def primary_grid_stack(self):
@@ -297,7 +629,8 @@ class Plane(AbstractPlane):
             return None
         if len(galaxies_with_pixelization) == 1:
             pixelization = galaxies_with_pixelization[0].pixelization
-            return pixelization.mapper_from_grid_stack_and_border(grid_stack=self.grid_stack, border=self.border)
+            with timing.timer('mapper'):
+                return pixelization.mapper_from_grid_stack_and_border(grid_stack=self.grid_stack, border=self.border)
         elif len(galaxies_with_pixelization) > 1:
             raise exc.PixelizationException('The number of galaxies with pixelizations in one plane is above 1')
 
@@ -325,18 +658,48 @@ class Plane(AbstractPlane):
                 'must be padded grid_stacks')
         return self.grid_stack.regular.map_to_2d_keep_padded(padded_array_1d=self.image_plane_image_1d)
 
+    @property
+    def sub_grid_buckets(self):
+        """The spatial bucketing of the sub-grid, used to cull light profile evaluation if a flux fraction \
+        tolerance is set."""
+        if self._sub_grid_buckets is None:
+            self._sub_grid_buckets = grids.GridBuckets(grid=self.primary_grid_stack.sub)
+        return self._sub_grid_buckets
+
+    @property
+    def blurring_grid_buckets(self):
+        if self._blurring_grid_buckets is None:
+            self._blurring_grid_buckets = grids.GridBuckets(grid=self.primary_grid_stack.blurring)
+        return self._blurring_grid_buckets
+
     @property
     def image_plane_image_1d(self):
-        return galaxy_util.intensities_of_galaxies_from_grid(grid=self.primary_grid_stack.sub, galaxies=self.galaxies)
+        if self.flux_fraction_tolerance is None:
+            return galaxy_util.intensities_of_galaxies_from_grid(grid=self.primary_grid_stack.sub,
+                                                                 galaxies=self.galaxies)
+        return galaxy_util.intensities_of_galaxies_from_grid(grid=self.primary_grid_stack.sub, galaxies=self.galaxies,
+                                                             flux_fraction_tolerance=self.flux_fraction_tolerance,
+                                                             grid_buckets=self.sub_grid_buckets)
 
     @property
     def image_plane_image_1d_of_galaxies(self):
-        return [galaxy_util.intensities_of_galaxies_from_grid(grid=self.grid_stack.sub, galaxies=[galaxy]) 
+        if self.flux_fraction_tolerance is None:
+            return [galaxy_util.intensities_of_galaxies_from_grid(grid=self.grid_stack.sub, galaxies=[galaxy])
+                    for galaxy in self.galaxies]
+        return [galaxy_util.intensities_of_galaxies_from_grid(grid=self.grid_stack.sub, galaxies=[galaxy],
+                                                              flux_fraction_tolerance=self.flux_fraction_tolerance,
+                                                              grid_buckets=self.sub_grid_buckets)
                 for galaxy in self.galaxies]
 
     @property
     def image_plane_blurring_image_1d(self):
-        return galaxy_util.intensities_of_galaxies_from_grid(grid=self.primary_grid_stack.blurring, galaxies=self.galaxies)
+        if self.flux_fraction_tolerance is None:
+            return galaxy_util.intensities_of_galaxies_from_grid(grid=self.primary_grid_stack.blurring,
+                                                                 galaxies=self.galaxies)
+        return galaxy_util.intensities_of_galaxies_from_grid(grid=self.primary_grid_stack.blurring,
+                                                             galaxies=self.galaxies,
+                                                             flux_fraction_tolerance=self.flux_fraction_tolerance,
+                                                             grid_buckets=self.blurring_grid_buckets)
 
     @property
     def plane_image(self):
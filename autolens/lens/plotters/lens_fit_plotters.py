@@ -263,7 +263,7 @@ def plot_fit_subplot_lens_and_source_planes(
     if fit.total_inversions == 0:
 
         plane_plotters.plot_plane_image(
-            plane=fit.tracer.source_plane, positions=None, plot_grid=should_plot_source_grid, as_subplot=True,
+            plane=fit.tracer_with_linear_intensities.source_plane, positions=None, plot_grid=should_plot_source_grid, as_subplot=True,
             units=units, figsize=figsize, aspect=aspect,
             cmap=cmap, norm=norm, norm_min=norm_min, norm_max=norm_max, linthresh=linthresh, linscale=linscale,
             cb_ticksize=cb_ticksize, cb_fraction=cb_fraction, cb_pad=cb_pad,
@@ -526,7 +526,7 @@ def plot_fit_individuals_lens_and_source_planes(
         if fit.total_inversions == 0:
 
            plane_plotters.plot_plane_image(
-               plane=fit.tracer.source_plane, plot_grid=True,
+               plane=fit.tracer_with_linear_intensities.source_plane, plot_grid=True,
                units=units, figsize=(20, 20),
                output_path=output_path, output_filename='fit_source_plane', output_format=output_format)
 
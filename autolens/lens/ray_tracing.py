@@ -219,21 +219,24 @@ class AbstractTracer(object):
         return constants.c.to('kpc / s').value ** 2.0 / (4 * math.pi * constants.G.to('kpc3 / M_sun s2').value)
 
     def arcsec_per_kpc_proper_of_plane(self, i):
-        return self.cosmology.arcsec_per_kpc_proper(z=self.plane_redshifts[i]).value
+        return lens_util.arcsec_per_kpc_proper_for_cosmology(z=self.plane_redshifts[i], cosmology=self.cosmology)
 
     def kpc_per_arcsec_proper_of_plane(self, i):
         return 1.0 / self.arcsec_per_kpc_proper_of_plane(i)
 
     def angular_diameter_distance_of_plane_to_earth(self, i):
-        return self.cosmology.angular_diameter_distance(self.plane_redshifts[i]).to('kpc').value
+        return lens_util.angular_diameter_distance_to_earth_for_cosmology(z=self.plane_redshifts[i],
+                                                                         cosmology=self.cosmology)
 
     def angular_diameter_distance_between_planes(self, i, j):
-        return self.cosmology.angular_diameter_distance_z1z2(self.plane_redshifts[i],
-                                                             self.plane_redshifts[j]).to('kpc').value
+        return lens_util.angular_diameter_distance_between_redshifts_for_cosmology(z1=self.plane_redshifts[i],
+                                                                                  z2=self.plane_redshifts[j],
+                                                                                  cosmology=self.cosmology)
 
     @property
     def angular_diameter_distance_to_source_plane(self):
-        return self.cosmology.angular_diameter_distance(self.plane_redshifts[-1]).to('kpc').value
+        return lens_util.angular_diameter_distance_to_earth_for_cosmology(z=self.plane_redshifts[-1],
+                                                                         cosmology=self.cosmology)
 
     def critical_density_kpc_between_planes(self, i, j):
         return self.constant_kpc * self.angular_diameter_distance_of_plane_to_earth(j) / \
@@ -421,7 +424,8 @@ class Tracer(AbstractTracer):
 
 class TracerImagePlane(Tracer):
 
-    def __init__(self, lens_galaxies, image_plane_grid_stack, border=None, cosmology=cosmo.Planck15):
+    def __init__(self, lens_galaxies, image_plane_grid_stack, border=None, deflection_cache=None,
+                 flux_fraction_tolerance=None, cosmology=cosmo.Planck15):
         """Ray tracer for a lens system with just an image-plane. 
         
         As there is only 1 plane, there are no ray-tracing calculations. This class is therefore only used for fitting \ 
@@ -438,6 +442,11 @@ class TracerImagePlane(Tracer):
         border : masks.RegularGridBorder
             The border of the regular-grid, which is used to relocate demagnified traced pixels to the \
             source-plane borders.
+        deflection_cache : plane.DeflectionCache or None
+            If not *None*, a cache which the deflection-angles of mass profiles are retrieved from and stored in.
+        flux_fraction_tolerance : float or None
+            If not *None*, light profile intensities are only computed inside the radius outside of which each \
+            profile contains less than this fraction of its total flux (see *plane.Plane*).
         cosmology : astropy.cosmology
             The cosmology of the ray-tracing calculation.
         """
@@ -446,14 +455,16 @@ class TracerImagePlane(Tracer):
             raise exc.RayTracingException('No lens galaxies have been input into the Tracer')
 
         image_plane = pl.Plane(galaxies=lens_galaxies, grid_stack=image_plane_grid_stack, border=border,
-                               compute_deflections=True, cosmology=cosmology)
+                               compute_deflections=True, deflection_cache=deflection_cache,
+                               flux_fraction_tolerance=flux_fraction_tolerance, cosmology=cosmology)
 
         super(TracerImagePlane, self).__init__(planes=[image_plane], cosmology=cosmology)
 
 
 class TracerImageSourcePlanes(Tracer):
 
-    def __init__(self, lens_galaxies, source_galaxies, image_plane_grid_stack, border=None, cosmology=cosmo.Planck15):
+    def __init__(self, lens_galaxies, source_galaxies, image_plane_grid_stack, border=None, deflection_cache=None,
+                 flux_fraction_tolerance=None, cosmology=cosmo.Planck15):
         """Ray-tracer for a lens system with two planes, an image-plane and source-plane.
 
         This tracer has only one grid-stack (see grid_stack.GridStack) which is used for ray-tracing.
@@ -469,6 +480,11 @@ class TracerImageSourcePlanes(Tracer):
         border : masks.RegularGridBorder
             The border of the regular-grid, which is used to relocate demagnified traced pixels to the \
             source-plane borders.
+        deflection_cache : plane.DeflectionCache or None
+            If not *None*, a cache which the deflection-angles of mass profiles are retrieved from and stored in.
+        flux_fraction_tolerance : float or None
+            If not *None*, light profile intensities are only computed inside the radius outside of which each \
+            profile contains less than this fraction of its total flux (see *plane.Plane*).
         cosmology : astropy.cosmology.Planck15
             The cosmology of the ray-tracing calculation.
         """
@@ -477,12 +493,14 @@ class TracerImageSourcePlanes(Tracer):
             galaxies=source_galaxies, grid_stack=image_plane_grid_stack)
 
         image_plane = pl.Plane(galaxies=lens_galaxies, grid_stack=image_plane_grid_stack, border=border,
-                               compute_deflections=True, cosmology=cosmology)
+                               compute_deflections=True, deflection_cache=deflection_cache,
+                               flux_fraction_tolerance=flux_fraction_tolerance, cosmology=cosmology)
 
         source_plane_grid_stack = image_plane.trace_grid_stack_to_next_plane()
 
         source_plane = pl.Plane(galaxies=source_galaxies, grid_stack=source_plane_grid_stack, border=border,
-                                compute_deflections=False, cosmology=cosmology)
+                                compute_deflections=False, flux_fraction_tolerance=flux_fraction_tolerance,
+                                cosmology=cosmology)
 
         super(TracerImageSourcePlanes, self).__init__(planes=[image_plane, source_plane], cosmology=cosmology)
 
@@ -501,7 +519,8 @@ class TracerImageSourcePlanes(Tracer):
 
 class TracerMultiPlanes(Tracer):
 
-    def __init__(self, galaxies, image_plane_grid_stack, border=None, cosmology=cosmo.Planck15):
+    def __init__(self, galaxies, image_plane_grid_stack, border=None, deflection_cache=None,
+                 flux_fraction_tolerance=None, cosmology=cosmo.Planck15):
         """Ray-tracer for a lens system with any number of planes.
 
         To perform multi-plane ray-tracing, a cosmology must be supplied so that deflection-angles can be rescaled \
@@ -519,6 +538,12 @@ class TracerMultiPlanes(Tracer):
         border : masks.RegularGridBorder
             The border of the regular-grid, which is used to relocate demagnified traced pixels to the \
             source-plane borders.
+        deflection_cache : plane.DeflectionCache or None
+            If not *None*, a cache which the deflection-angles of mass profiles are retrieved from and stored in. \
+            This is only used for the image-plane, as the traced grid-stacks of subsequent planes change every time.
+        flux_fraction_tolerance : float or None
+            If not *None*, light profile intensities are only computed inside the radius outside of which each \
+            profile contains less than this fraction of its total flux (see *plane.Plane*).
         cosmology : astropy.cosmology
             The cosmology of the ray-tracing calculation.
         """
@@ -532,6 +557,9 @@ class TracerMultiPlanes(Tracer):
         image_plane_grid_stack = pix.setup_image_plane_pixelization_grid_from_galaxies_and_grid_stack(
             galaxies=galaxies, grid_stack=image_plane_grid_stack)
 
+        scaling_factors = lens_util.scaling_factor_matrix_from_redshifts_for_cosmology(
+            plane_redshifts=tuple(plane_redshifts), cosmology=cosmology)
+
         planes = []
 
         for plane_index in range(0, len(plane_redshifts)):
@@ -539,24 +567,21 @@ class TracerMultiPlanes(Tracer):
             compute_deflections = lens_util.compute_deflections_at_next_plane(plane_index=plane_index,
                                                                                      total_planes=len(plane_redshifts))
 
-            new_grid_stack = image_plane_grid_stack
-
             if plane_index > 0:
-                for previous_plane_index in range(plane_index):
 
-                    scaling_factor = lens_util.scaling_factor_between_redshifts_for_cosmology(
-                        z1=plane_redshifts[previous_plane_index], z2=plane_redshifts[plane_index],
-                        z_final=plane_redshifts[-1], cosmology=cosmology)
+                new_grid_stack = lens_util.traced_grid_stack_from_deflection_stacks_and_scaling_factors(
+                    grid_stack=image_plane_grid_stack,
+                    deflection_stacks=[plane.deflection_stack for plane in planes],
+                    scaling_factors=scaling_factors[:plane_index, plane_index])
 
-                    scaled_deflection_stack = lens_util.scaled_deflection_stack_from_plane_and_scaling_factor(
-                        plane=planes[previous_plane_index], scaling_factor=scaling_factor)
+            else:
 
-                    new_grid_stack = \
-                        lens_util.grid_stack_from_deflection_stack(grid_stack=new_grid_stack,
-                                                                          deflection_stack=scaled_deflection_stack)
+                new_grid_stack = image_plane_grid_stack
 
             planes.append(pl.Plane(galaxies=galaxies_in_planes[plane_index], grid_stack=new_grid_stack,
-                                   border=border, compute_deflections=compute_deflections, cosmology=cosmology))
+                                   border=border, compute_deflections=compute_deflections,
+                                   deflection_cache=deflection_cache if plane_index == 0 else None,
+                                   flux_fraction_tolerance=flux_fraction_tolerance, cosmology=cosmology))
 
         super(TracerMultiPlanes, self).__init__(planes=planes, cosmology=cosmology)
 
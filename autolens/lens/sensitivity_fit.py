@@ -1,8 +1,15 @@
+import multiprocessing
+
+import numpy as np
+from astropy import cosmology as cosmo
+
+from autolens import decorator_util
 from autolens import exc
 from autolens.lens import lens_fit
+from autolens.lens import plane as pl
 from autolens.lens import ray_tracing
 
-def fit_lens_data_with_sensitivity_tracers(lens_data, tracer_normal, tracer_sensitive):
+def fit_lens_data_with_sensitivity_tracers(lens_data, tracer_normal, tracer_sensitive, fit_normal=None):
     """Fit lens data with a normal tracer and sensitivity tracer, to determine our sensitivity to a selection of \ 
     galaxy components. This factory automatically determines the type of fit based on the properties of the galaxies \
     in the tracers.
@@ -18,17 +25,20 @@ def fit_lens_data_with_sensitivity_tracers(lens_data, tracer_normal, tracer_sens
         A tracer whose galaxies have the same model components (e.g. light profiles, mass profiles) as the \
         lens data that we are fitting, but also addition components (e.g. mass clumps) which we measure \
         how sensitive we are too.
+    fit_normal : lens_fit.LensProfileFit or lens_fit.LensInversionFit or None
+        A previously computed fit of the lens data with the normal tracer, which is reused instead of being \
+        recomputed.
     """
 
     if (tracer_normal.has_light_profile and tracer_sensitive.has_light_profile) and \
             (not tracer_normal.has_pixelization and not tracer_sensitive.has_pixelization):
         return SensitivityProfileFit(lens_data=lens_data, tracer_normal=tracer_normal,
-                                     tracer_sensitive=tracer_sensitive)
+                                     tracer_sensitive=tracer_sensitive, fit_normal=fit_normal)
 
     elif (not tracer_normal.has_light_profile and not tracer_sensitive.has_light_profile) and \
             (tracer_normal.has_pixelization and tracer_sensitive.has_pixelization):
         return SensitivityInversionFit(lens_data=lens_data, tracer_normal=tracer_normal,
-                                     tracer_sensitive=tracer_sensitive)
+                                     tracer_sensitive=tracer_sensitive, fit_normal=fit_normal)
     else:
 
         raise exc.FittingException('The sensitivity_fit routine did not call a SensitivityFit class - check the '
@@ -45,7 +55,7 @@ class AbstractSensitivityFit(object):
 
 class SensitivityProfileFit(AbstractSensitivityFit):
 
-    def __init__(self, lens_data, tracer_normal, tracer_sensitive):
+    def __init__(self, lens_data, tracer_normal, tracer_sensitive, fit_normal=None):
         """Evaluate the sensitivity of a profile fit to a specific component of a lens model and tracer. This is \
         performed by evaluating the likelihood of a fit to an image using two tracers:
 
@@ -70,9 +80,13 @@ class SensitivityProfileFit(AbstractSensitivityFit):
             A tracer whose galaxies have the same model components (e.g. light profiles, mass profiles) as the \
             lens data that we are fitting, but also addition components (e.g. mass clumps) which we measure \
             how sensitive we are too.
+        fit_normal : lens_fit.LensDataFit or None
+            A previously computed fit of the lens data with the normal tracer, which is reused instead of being \
+            recomputed (e.g. when mapping the sensitivity over a grid of sensitive galaxies).
         """
         AbstractSensitivityFit.__init__(self=self, tracer_normal=tracer_normal, tracer_sensitive=tracer_sensitive)
-        self.fit_normal = lens_fit.LensProfileFit(lens_data=lens_data, tracer=tracer_normal)
+        self.fit_normal = lens_fit.LensProfileFit(lens_data=lens_data, tracer=tracer_normal) if fit_normal is None \
+            else fit_normal
         self.fit_sensitive = lens_fit.LensProfileFit(lens_data=lens_data, tracer=tracer_sensitive)
 
     @property
@@ -82,7 +96,7 @@ class SensitivityProfileFit(AbstractSensitivityFit):
 
 class SensitivityInversionFit(AbstractSensitivityFit):
 
-    def __init__(self, lens_data, tracer_normal, tracer_sensitive):
+    def __init__(self, lens_data, tracer_normal, tracer_sensitive, fit_normal=None):
         """Evaluate the sensitivity of an invesion fit to a specific component of a lens model and tracer. This is \
         performed by evaluating the likelihood of a fit to an image using two tracers:
 
@@ -107,11 +121,131 @@ class SensitivityInversionFit(AbstractSensitivityFit):
             A tracer whose galaxies have the same model components (e.g. light profiles, mass profiles) as the \
             lens data that we are fitting, but also addition components (e.g. mass clumps) which we measure \
             how sensitive we are too.
+        fit_normal : lens_fit.LensDataFit or None
+            A previously computed fit of the lens data with the normal tracer, which is reused instead of being \
+            recomputed (e.g. when mapping the sensitivity over a grid of sensitive galaxies).
         """
         AbstractSensitivityFit.__init__(self=self, tracer_normal=tracer_normal, tracer_sensitive=tracer_sensitive)
-        self.fit_normal = lens_fit.LensInversionFit(lens_data=lens_data, tracer=tracer_normal)
+        self.fit_normal = lens_fit.LensInversionFit(lens_data=lens_data, tracer=tracer_normal) if fit_normal is None \
+            else fit_normal
         self.fit_sensitive = lens_fit.LensInversionFit(lens_data=lens_data, tracer=tracer_sensitive)
 
     @property
     def figure_of_merit(self):
-        return self.fit_sensitive.likelihood - self.fit_normal.likelihood
\ No newline at end of file
+        return self.fit_sensitive.likelihood - self.fit_normal.likelihood
+
+
+class SensitivityMapper(object):
+
+    def __init__(self, lens_data, lens_galaxies, source_galaxies, cosmology=cosmo.Planck15):
+        """Map the sensitivity of a lens data to a grid of sensitive galaxies (e.g. dark matter subhalos of varying \
+        position and mass), reusing the baseline fit for every grid cell.
+
+        The normal tracer and its fit are computed once, and the deflection angles of the lens galaxies' mass \
+        profiles are stored in a deflection cache. The sensitive tracer of every grid cell therefore only computes \
+        the deflection angles of the sensitive galaxies, before the lens data is fitted with it.
+
+        Parameters
+        ----------
+        lens_data: lens_data.LensData
+            A simulated lens data which is used to determine our sensitiivity to specific model components.
+        lens_galaxies : [galaxy.Galaxy]
+            The galaxies in the image-plane of the normal tracer.
+        source_galaxies : [galaxy.Galaxy]
+            The galaxies in the source-plane of the normal (and every sensitive) tracer.
+        cosmology : astropy.cosmology
+            The cosmology of the ray-tracing calculation.
+        """
+        self.lens_data = lens_data
+        self.lens_galaxies = lens_galaxies
+        self.source_galaxies = source_galaxies
+        self.cosmology = cosmology
+
+        self.deflection_cache = pl.DeflectionCache()
+
+        self.tracer_normal = self.tracer_for_lens_galaxies(lens_galaxies=lens_galaxies)
+
+        self.fit_normal = lens_fit.fit_lens_data_with_tracer(lens_data=lens_data, tracer=self.tracer_normal)
+
+    def tracer_for_lens_galaxies(self, lens_galaxies):
+        return ray_tracing.TracerImageSourcePlanes(lens_galaxies=lens_galaxies, source_galaxies=self.source_galaxies,
+                                                   image_plane_grid_stack=self.lens_data.grid_stack,
+                                                   border=self.lens_data.border,
+                                                   deflection_cache=self.deflection_cache, cosmology=self.cosmology)
+
+    def fit_for_sensitive_galaxies(self, sensitive_galaxies):
+        """Fit the lens data with the normal tracer's galaxies plus a list of sensitive galaxies, reusing the \
+        baseline fit and lens galaxy deflection angles.
+
+        Parameters
+        ----------
+        sensitive_galaxies : [galaxy.Galaxy]
+            The galaxies added to the image-plane of the normal tracer, whose sensitivity is measured.
+        """
+        tracer_sensitive = self.tracer_for_lens_galaxies(lens_galaxies=self.lens_galaxies + sensitive_galaxies)
+
+        return fit_lens_data_with_sensitivity_tracers(lens_data=self.lens_data, tracer_normal=self.tracer_normal,
+                                                      tracer_sensitive=tracer_sensitive, fit_normal=self.fit_normal)
+
+    def figure_of_merit_for_sensitive_galaxies(self, sensitive_galaxies):
+        return self.fit_for_sensitive_galaxies(sensitive_galaxies=sensitive_galaxies).figure_of_merit
+
+    def sensitivity_map_from_sensitive_galaxies_grid(self, sensitive_galaxies_grid, output_file=None, processes=1):
+        """Compute the sensitivity (the difference in likelihood of the sensitive and normal fits) of every cell of \
+        a grid of sensitive galaxies.
+
+        If processes is above 1, the grid cells are fitted in parallel by a pool of worker processes, each of which \
+        receives a copy of this mapper (including its baseline fit and deflection cache) once.
+
+        If an output file is supplied, each cell's index and figure of merit are written to it (and flushed) as soon \
+        as they are computed, so a partial map is available on disk whilst a long run is in progress.
+
+        Parameters
+        ----------
+        sensitive_galaxies_grid : [[galaxy.Galaxy]]
+            The list of sensitive galaxies of every grid cell (e.g. a subhalo at every position and mass).
+        output_file : str or None
+            The path of the text file the sensitivity of every grid cell is written to.
+        processes : int
+            The number of worker processes the grid cells are fitted using.
+        """
+        sensitivity_map = np.zeros(len(sensitive_galaxies_grid))
+
+        if processes > 1:
+            pool = multiprocessing.Pool(processes=processes, initializer=_set_sensitivity_mapper, initargs=(self,))
+            figures_of_merit = pool.imap(_figure_of_merit_for_sensitive_galaxies, sensitive_galaxies_grid)
+        else:
+            pool = None
+            figures_of_merit = map(self.figure_of_merit_for_sensitive_galaxies, sensitive_galaxies_grid)
+
+        output = open(output_file, 'w') if output_file is not None else None
+
+        try:
+            for index, figure_of_merit in enumerate(figures_of_merit):
+
+                sensitivity_map[index] = figure_of_merit
+
+                if output is not None:
+                    output.write('{} {}\n'.format(index, figure_of_merit))
+                    output.flush()
+        finally:
+            if output is not None:
+                output.close()
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        return sensitivity_map
+
+
+_sensitivity_mapper = None
+
+
+def _set_sensitivity_mapper(sensitivity_mapper):
+    global _sensitivity_mapper
+    _sensitivity_mapper = sensitivity_mapper
+    decorator_util.set_parallel_kernels(use_parallel_kernels=False)
+
+
+def _figure_of_merit_for_sensitive_galaxies(sensitive_galaxies):
+    return _sensitivity_mapper.figure_of_merit_for_sensitive_galaxies(sensitive_galaxies=sensitive_galaxies)
@@ -0,0 +1,147 @@
+import os
+import pickle
+
+import numpy as np
+
+from autolens import exc
+
+"""
+Share lens data between processes without copying it.
+
+Pickling a *LensData* (e.g. to send it to the worker processes of a pool) copies every array it holds (the image, \
+noise-map, mask, grid-stacks, padded grid-stacks, border and convolver frames), and every worker then holds its own \
+copy. Instead, the lens data can be published once to a directory, where each of its arrays is written to a .npy \
+file:
+
+    shared_lens_data.publish_lens_data(lens_data=lens_data, path='/dev/shm/lens')
+
+after which every worker attaches to it:
+
+    lens_data = shared_lens_data.attach_lens_data(path='/dev/shm/lens')
+
+The attached lens data's arrays are read-only memory-mapped views of the .npy files, of the same classes (e.g. \
+*RegularGrid*, *ScaledSquarePixelArray*) and with the same attributes as the published arrays, such that the workers \
+share one copy of the data through the operating system's page cache. Publishing to a memory-backed filesystem \
+(e.g. /dev/shm on Linux) keeps the arrays in memory.
+
+Only the arrays are memory-mapped - the rest of the lens data (e.g. its attributes that are not arrays) is pickled \
+as normal. Arrays smaller than *minimum_bytes* and arrays of Python objects are also pickled as normal.
+"""
+
+lens_data_filename = 'lens_data.pickle'
+
+minimum_bytes = 1024
+
+
+class SharedArrayPickler(pickle.Pickler):
+
+    def __init__(self, file, path, minimum_bytes=minimum_bytes):
+        """A pickler which writes every array it pickles to a .npy file in a directory, pickling only a reference to \
+        the file (and the array's class and attributes).
+
+        Parameters
+        ----------
+        file : file
+            The file the pickle is written to.
+        path : str
+            The directory the .npy files of the arrays are written to.
+        minimum_bytes : int
+            Arrays smaller than this size (in bytes) are pickled as normal.
+        """
+        super(SharedArrayPickler, self).__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.path = path
+        self.minimum_bytes = minimum_bytes
+        self.filenames = {}
+
+    def persistent_id(self, obj):
+
+        if not isinstance(obj, np.ndarray) or obj.dtype.hasobject or obj.nbytes < self.minimum_bytes:
+            return None
+
+        # Arrays are stored with their file, keeping them alive for the lifetime of the pickler, so that the id of an \
+        # array that has been written cannot be reused by another array.
+        if id(obj) not in self.filenames or self.filenames[id(obj)][0] is not obj:
+            filename = 'array_{}.npy'.format(len(self.filenames))
+            np.save(os.path.join(self.path, filename), np.asarray(obj))
+            self.filenames[id(obj)] = (obj, filename)
+
+        return 'ndarray', self.filenames[id(obj)][1], type(obj), getattr(obj, '__dict__', {})
+
+
+class SharedArrayUnpickler(pickle.Unpickler):
+
+    def __init__(self, file, path, mmap_mode='r'):
+        """An unpickler which loads the arrays pickled by a *SharedArrayPickler* as memory-mapped views of their \
+        .npy files.
+
+        Parameters
+        ----------
+        file : file
+            The file the pickle is read from.
+        path : str
+            The directory the .npy files of the arrays were written to.
+        mmap_mode : str
+            The numpy memory-map mode of the arrays, 'r' for read-only views or 'c' for copy-on-write views (which \
+            can be written to, without the writes being shared with other processes).
+        """
+        super(SharedArrayUnpickler, self).__init__(file)
+        self.path = path
+        self.mmap_mode = mmap_mode
+        self.arrays = {}
+
+    def persistent_load(self, pid):
+
+        _, filename, cls, attributes = pid
+
+        if filename not in self.arrays:
+            self.arrays[filename] = np.load(os.path.join(self.path, filename), mmap_mode=self.mmap_mode)
+
+        array = self.arrays[filename].view(np.ndarray)
+
+        if cls is not np.ndarray:
+            array = array.view(cls)
+            array.__dict__.update(attributes)
+
+        return array
+
+
+def publish_lens_data(lens_data, path, minimum_bytes=minimum_bytes):
+    """Publish lens data to a directory, by writing each of its arrays to a .npy file and the rest of it to a pickle, \
+    such that processes can attach to it (see *attach_lens_data*) without copying its arrays.
+
+    Parameters
+    ----------
+    lens_data : lens_data.LensData
+        The lens data (or hyper lens data) that is published.
+    path : str
+        The directory the lens data is published to, which is created if it does not exist.
+    minimum_bytes : int
+        Arrays smaller than this size (in bytes) are pickled instead of memory-mapped.
+    """
+    if not os.path.exists(path):
+        os.makedirs(path)
+
+    with open(os.path.join(path, lens_data_filename), 'wb') as lens_data_file:
+        SharedArrayPickler(file=lens_data_file, path=path, minimum_bytes=minimum_bytes).dump(lens_data)
+
+    return path
+
+
+def attach_lens_data(path, mmap_mode='r'):
+    """Attach to lens data published to a directory (see *publish_lens_data*), whose arrays are memory-mapped views \
+    of the published .npy files.
+
+    Parameters
+    ----------
+    path : str
+        The directory the lens data was published to.
+    mmap_mode : str
+        The numpy memory-map mode of the arrays, 'r' for read-only views or 'c' for copy-on-write views.
+    """
+    lens_data_path = os.path.join(path, lens_data_filename)
+
+    if not os.path.isfile(lens_data_path):
+        raise exc.ImagingException('No lens data has been published to the directory {}'.format(path))
+
+    with open(lens_data_path, 'rb') as lens_data_file:
+        return SharedArrayUnpickler(file=lens_data_file, path=path, mmap_mode=mmap_mode).load()
@@ -1,4 +1,12 @@
+import copy
+
 import numpy as np
+from scipy import optimize
+
+from autolens import timing
+from autolens.model.galaxy import galaxy as g
+from autolens.model.galaxy.util import galaxy_util
+from autolens.model.profiles import light_profiles as lp
 
 def blurred_image_1d_from_1d_unblurred_and_blurring_images(unblurred_image_1d, blurring_image_1d, convolver):
     """For a 1D masked image and 1D blurring image (the regions outside the mask whose light blurs \
@@ -15,7 +23,190 @@ def blurred_image_1d_from_1d_unblurred_and_blurring_images(unblurred_image_1d, b
     convolver : ccd.convolution.ConvolverImage
         The image-convolver which performs the convolution in 1D.
     """
-    return convolver.convolve_image(image_array=unblurred_image_1d, blurring_array=blurring_image_1d)
+    with timing.timer('image_convolution'):
+        return convolver.convolve_image(image_array=unblurred_image_1d, blurring_array=blurring_image_1d)
+
+def linear_light_profiles_of_planes(planes):
+    """Extract every linear light profile (see *light_profiles.LinearLightProfile*) of the galaxies in a list of \
+    planes, in the order of the planes and their galaxies.
+
+    Parameters
+    ----------
+    planes : [plane.Plane]
+        The planes whose galaxies' linear light profiles are extracted.
+    """
+    return [light_profile for plane in planes for galaxy in plane.galaxies for light_profile in galaxy.light_profiles
+            if isinstance(light_profile, lp.LinearLightProfile)]
+
+def plane_indexes_of_linear_light_profiles(planes):
+    """For every linear light profile of the galaxies in a list of planes (in the order of \
+    *linear_light_profiles_of_planes*), the index of the plane it is in.
+
+    Parameters
+    ----------
+    planes : [plane.Plane]
+        The planes whose galaxies' linear light profiles are indexed.
+    """
+    return [plane_index for plane_index, plane in enumerate(planes) for galaxy in plane.galaxies
+            for light_profile in galaxy.light_profiles if isinstance(light_profile, lp.LinearLightProfile)]
+
+def blurred_image_1d_of_non_linear_light_profiles_of_planes_from_planes_and_convolver(planes, convolver):
+    """For every plane in a list of planes, compute the blurred 1D image of all of its galaxies' light profiles \
+    which are not linear light profiles, such that the linear light profiles (whose images are computed separately \
+    for an intensity of 1.0, see *blurred_images_1d_of_linear_light_profiles_from_planes_and_convolver*) are not \
+    evaluated twice.
+
+    Parameters
+    ----------
+    planes : [plane.Plane]
+        The planes whose galaxies' non-linear light profiles are blurred.
+    convolver : ccd.convolution.ConvolverImage
+        The image-convolver which performs the convolution in 1D.
+    """
+    blurred_image_1d_of_planes = []
+
+    for plane in planes:
+
+        non_linear_galaxies = [g.Galaxy(**{'light_profile_{}'.format(index): light_profile for index, light_profile
+                                           in enumerate(galaxy.light_profiles)
+                                           if not isinstance(light_profile, lp.LinearLightProfile)})
+                               for galaxy in plane.galaxies]
+
+        blurred_image_1d_of_planes.append(blurred_image_1d_from_1d_unblurred_and_blurring_images(
+            unblurred_image_1d=galaxy_util.intensities_of_galaxies_from_grid(
+                grid=plane.grid_stack.sub, galaxies=non_linear_galaxies),
+            blurring_image_1d=galaxy_util.intensities_of_galaxies_from_grid(
+                grid=plane.grid_stack.blurring, galaxies=non_linear_galaxies),
+            convolver=convolver))
+
+    return blurred_image_1d_of_planes
+
+def planes_with_linear_light_profile_intensities(planes, linear_intensities):
+    """Copy a list of planes such that the linear light profiles of their galaxies have the intensities solved for \
+    by a fit (in the order of *linear_light_profiles_of_planes*), e.g. to compute the unmasked images of the \
+    planes and galaxies of a fit. The input planes, galaxies and light profiles are not changed.
+
+    Parameters
+    ----------
+    planes : [plane.Plane]
+        The planes which are copied.
+    linear_intensities : ndarray
+        The intensities of the linear light profiles of the planes.
+    """
+    linear_intensities = iter(linear_intensities)
+
+    planes_with_intensities = []
+
+    for plane in planes:
+
+        galaxies = []
+
+        for galaxy in plane.galaxies:
+
+            galaxy = copy.copy(galaxy)
+
+            for name, light_profile in list(galaxy.__dict__.items()):
+                if isinstance(light_profile, lp.LinearLightProfile):
+                    light_profile = copy.copy(light_profile)
+                    light_profile.intensity = next(linear_intensities)
+                    setattr(galaxy, name, light_profile)
+
+            galaxies.append(galaxy)
+
+        plane = copy.copy(plane)
+        plane.galaxies = galaxies
+        planes_with_intensities.append(plane)
+
+    return planes_with_intensities
+
+def blurred_images_1d_of_linear_light_profiles_from_planes_and_convolver(planes, convolver):
+    """For every linear light profile in a list of planes, compute its blurred 1D image for an intensity of 1.0 \
+    using the grid-stack of its plane. These are the basis images the intensities of the linear light profiles are \
+    solved for with.
+
+    Parameters
+    ----------
+    planes : [plane.Plane]
+        The planes whose galaxies' linear light profiles are blurred.
+    convolver : ccd.convolution.ConvolverImage
+        The image-convolver which performs the convolution in 1D.
+    """
+    blurred_images_1d = []
+
+    for plane in planes:
+        for galaxy in plane.galaxies:
+            for light_profile in galaxy.light_profiles:
+                if isinstance(light_profile, lp.LinearLightProfile):
+
+                    unit_light_profile = copy.copy(light_profile)
+                    unit_light_profile.intensity = 1.0
+                    unit_galaxy = [g.Galaxy(light_profile=unit_light_profile)]
+
+                    blurred_images_1d.append(blurred_image_1d_from_1d_unblurred_and_blurring_images(
+                        unblurred_image_1d=galaxy_util.intensities_of_galaxies_from_grid(
+                            grid=plane.grid_stack.sub, galaxies=unit_galaxy),
+                        blurring_image_1d=galaxy_util.intensities_of_galaxies_from_grid(
+                            grid=plane.grid_stack.blurring, galaxies=unit_galaxy),
+                        convolver=convolver))
+
+    return blurred_images_1d
+
+def linear_light_profile_intensities_from_image_1d_noise_map_1d_and_blurred_images(image_1d, noise_map_1d,
+                                                                                   blurred_images_1d,
+                                                                                   non_negative=True):
+    """Solve for the intensities of a set of linear light profiles which best-fit an image, by computing the \
+    (non-negative) least-squares solution of:
+
+    Image / Noise = sum(Intensity * Blurred_Image / Noise)
+
+    Parameters
+    ----------
+    image_1d : ndarray
+        The 1D masked image that is fitted, which should not include the light of non-linear profiles.
+    noise_map_1d : ndarray
+        The 1D masked noise-map of the image.
+    blurred_images_1d : [ndarray]
+        The 1D blurred image of every linear light profile, computed for an intensity of 1.0.
+    non_negative : bool
+        If *True*, the intensities are constrained to be positive.
+    """
+    design_matrix = np.divide(np.stack(blurred_images_1d, axis=1), noise_map_1d[:, None])
+    weighted_image_1d = np.divide(image_1d, noise_map_1d)
+
+    if non_negative:
+        return optimize.nnls(design_matrix, weighted_image_1d)[0]
+
+    return np.linalg.lstsq(design_matrix, weighted_image_1d, rcond=None)[0]
+
+def chi_squared_map_1d_from_image_1d_noise_map_1d_and_model_image_1d(image_1d, noise_map_1d, model_image_1d):
+    """Compute the 1D masked chi-squared map of a model image's fit to an image, where:
+
+    Chi_Squared = ((Image - Model_Image) / Noise) ** 2.0
+
+    As every entry of the 1D arrays is within the mask, no masking of the arrays is required.
+
+    Parameters
+    ----------
+    image_1d : ndarray
+        The 1D masked image that is fitted.
+    noise_map_1d : ndarray
+        The 1D masked noise-map of the image.
+    model_image_1d : ndarray
+        The 1D masked model image the image is fitted with.
+    """
+    return np.square(np.divide(np.subtract(image_1d, model_image_1d), noise_map_1d))
+
+def noise_normalization_from_noise_map_1d(noise_map_1d):
+    """Compute the noise normalization term of a 1D masked noise-map, where:
+
+    [Noise_Term] = sum(log(2*pi*[Noise]**2.0))
+
+    Parameters
+    ----------
+    noise_map_1d : ndarray
+        The 1D masked noise-map of the image.
+    """
+    return np.sum(np.log(2 * np.pi * noise_map_1d ** 2.0))
 
 def likelihood_with_regularization_from_chi_squared_regularization_term_and_noise_normalization(chi_squared,
                                                                   regularization_term, noise_normalization):
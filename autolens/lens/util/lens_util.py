@@ -1,3 +1,7 @@
+import inspect
+from collections import OrderedDict
+from functools import wraps
+
 from autolens import exc
 from autolens.data.array.util import grid_util, mapping_util
 from autolens.model.galaxy.util import galaxy_util
@@ -88,17 +92,137 @@ def compute_deflections_at_next_plane(plane_index, total_planes):
     else:
         raise exc.RayTracingException('A galaxy was not correctly allocated its previous / next redshifts')
 
+def memoize_for_cosmology(func=None, max_size=1024):
+    """Memoize a function of redshifts and a cosmology, such that the astropy cosmology integrators (and unit \
+    conversions) are only called once for every cosmology and set of redshifts.
+
+    Astropy cosmologies are not hashable, so results are keyed on the cosmology's id and a reference to the \
+    cosmology is stored with every result, ensuring its id cannot be reused by another cosmology. Astropy cosmologies \
+    are immutable, so a cached result can never become stale.
+
+    The least recently used results are removed once there are more than max_size (e.g. for a non-linear search \
+    which varies the redshifts or cosmology), so that the results and the cosmologies they refer to do not grow \
+    without bound. The decorator can be used with or without arguments (e.g. @memoize_for_cosmology(max_size=64)).
+
+    Parameters
+    ----------
+    func : (*redshifts, cosmology) -> float
+        A function of one or more redshifts and a cosmology, which may be called with positional or keyword \
+        arguments (results are keyed on the bound arguments, so both calls share a result).
+    max_size : int
+        The maximum number of results stored.
+    """
+    if func is None:
+        return lambda func: memoize_for_cosmology(func=func, max_size=max_size)
+
+    results = OrderedDict()
+    signature = inspect.signature(func)
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+
+        arguments = signature.bind(*args, **kwargs)
+        arguments.apply_defaults()
+        redshifts = dict(arguments.arguments)
+        cosmology = redshifts.pop('cosmology')
+
+        key = (func.__name__, id(cosmology)) + tuple(sorted(redshifts.items()))
+
+        if key in results and results[key][0] is cosmology:
+            results.move_to_end(key)
+            return results[key][1]
+
+        result = func(*args, **kwargs)
+
+        results[key] = (cosmology, result)
+
+        while len(results) > wrapper.max_size:
+            results.popitem(last=False)
+
+        return result
+
+    wrapper.results = results
+    wrapper.max_size = max_size
+
+    return wrapper
+
+@memoize_for_cosmology
+def arcsec_per_kpc_proper_for_cosmology(z, cosmology):
+    return cosmology.arcsec_per_kpc_proper(z).value
+
+@memoize_for_cosmology
+def angular_diameter_distance_to_earth_for_cosmology(z, cosmology):
+    return cosmology.angular_diameter_distance(z).to('kpc').value
+
+@memoize_for_cosmology
+def angular_diameter_distance_between_redshifts_for_cosmology(z1, z2, cosmology):
+    return cosmology.angular_diameter_distance_z1z2(z1, z2).to('kpc').value
+
+@memoize_for_cosmology
 def scaling_factor_between_redshifts_for_cosmology(z1, z2, z_final, cosmology):
 
-    angular_diameter_distance_between_z1_z2 = cosmology.angular_diameter_distance_z1z2(z1=z1, z2=z2).to('kpc').value
-    angular_diameter_distance_to_z_final = cosmology.angular_diameter_distance(z=z_final).to('kpc').value
-    angular_diameter_distance_of_z2_to_earth = cosmology.angular_diameter_distance(z=z2).to('kpc').value
+    angular_diameter_distance_between_z1_z2 = \
+        angular_diameter_distance_between_redshifts_for_cosmology(z1=z1, z2=z2, cosmology=cosmology)
+    angular_diameter_distance_to_z_final = \
+        angular_diameter_distance_to_earth_for_cosmology(z=z_final, cosmology=cosmology)
+    angular_diameter_distance_of_z2_to_earth = \
+        angular_diameter_distance_to_earth_for_cosmology(z=z2, cosmology=cosmology)
     angular_diameter_distance_between_z2_z_final = \
-        cosmology.angular_diameter_distance_z1z2(z1=z1, z2=z_final).to('kpc').value
+        angular_diameter_distance_between_redshifts_for_cosmology(z1=z1, z2=z_final, cosmology=cosmology)
 
     return (angular_diameter_distance_between_z1_z2 * angular_diameter_distance_to_z_final) / \
            (angular_diameter_distance_of_z2_to_earth * angular_diameter_distance_between_z2_z_final)
 
+@memoize_for_cosmology
+def scaling_factor_matrix_from_redshifts_for_cosmology(plane_redshifts, cosmology):
+    """Compute the (planes x planes) matrix of multi-plane scaling factors, where entry [i, j] (for i < j) is the \
+    factor the deflection angles of plane i are scaled by when tracing to plane j and all other entries are zero.
+
+    The matrix is memoized for every cosmology and (tuple of) plane redshifts, so it is computed once per phase. It \
+    is therefore returned read-only.
+
+    Parameters
+    -----------
+    plane_redshifts : (float,)
+        The redshifts of the planes in ascending order.
+    cosmology : astropy.cosmology
+        The cosmology of the ray-tracing calculation.
+    """
+    total_planes = len(plane_redshifts)
+
+    scaling_factors = np.zeros((total_planes, total_planes))
+
+    for j in range(1, total_planes):
+        for i in range(j):
+            scaling_factors[i, j] = scaling_factor_between_redshifts_for_cosmology(
+                z1=plane_redshifts[i], z2=plane_redshifts[j], z_final=plane_redshifts[-1], cosmology=cosmology)
+
+    scaling_factors.setflags(write=False)
+
+    return scaling_factors
+
+def traced_grid_stack_from_deflection_stacks_and_scaling_factors(grid_stack, deflection_stacks, scaling_factors):
+    """Compute the grid-stack of a plane using the recursive multi-plane lens equation, by subtracting the scaled \
+    deflection-stacks of every previous plane from the image-plane grid-stack.
+
+    The subtraction is performed in-place in one buffer holding every traced grid (see \
+    *GridStack.traced_grid_stack_from_deflection_stacks*), as opposed to creating a new scaled deflection-stack and \
+    grid-stack for every previous plane.
+
+    Parameters
+    -----------
+    grid_stack : grids.GridStack
+        The image-plane grid-stack which is traced.
+    deflection_stacks : [grids.GridStack]
+        The deflection-stacks of every previous plane.
+    scaling_factors : [float]
+        The scaling factor of every previous plane's deflection-stack, e.g. a column of the matrix given by \
+        *scaling_factor_matrix_from_redshifts_for_cosmology*.
+    """
+
+    return grid_stack.traced_grid_stack_from_deflection_stacks(deflection_stacks=deflection_stacks,
+                                                              scaling_factors=scaling_factors)
+
 def scaled_deflection_stack_from_plane_and_scaling_factor(plane, scaling_factor):
     """Given a plane and scaling factor, compute a set of scaled deflections.
 
@@ -123,10 +247,7 @@ def grid_stack_from_deflection_stack(grid_stack, deflection_stack):
     """For a deflection stack, comput a new grid stack but subtracting the deflections"""
 
     if deflection_stack is not None:
-        def minus(grid, deflections):
-            return grid - deflections
-
-        return grid_stack.map_function(minus, deflection_stack)
+        return grid_stack.traced_grid_stack_from_deflection_stacks(deflection_stacks=[deflection_stack])
 
 
 def traced_collection_for_deflections(grid_stack, deflections):
@@ -3,6 +3,9 @@ from itertools import count
 import numpy as np
 
 from autolens import exc
+from autolens import timing
+from autolens.model.galaxy.util import galaxy_util
+from autolens.model.profiles import geometry_profiles
 from autolens.model.profiles import light_profiles as lp, mass_profiles as mp
 
 
@@ -114,7 +117,9 @@ class Galaxy(object):
         
         If the galaxy has no light profiles, a grid of zeros is returned.
         
-        See *profiles.light_profiles* for a description of how light profile intensities are computed.
+        See *profiles.light_profiles* for a description of how light profile intensities are computed. Light \
+        profiles with a common geometry share their transformed grid (see *geometry_profiles.shared_transforms*). \
+        Linear light profiles contribute their unit image (see *light_profiles.LinearLightProfile*).
 
         Parameters
         ----------
@@ -122,7 +127,8 @@ class Galaxy(object):
             The (y, x) coordinates in the original reference frame of the grid.
         """
         if self.has_light_profile:
-            return sum(map(lambda p: p.intensities_from_grid(grid), self.light_profiles))
+            with geometry_profiles.shared_transforms():
+                return sum(map(lambda p: p.intensities_from_grid(grid), self.light_profiles))
         else:
             return np.zeros((grid.shape[0],))
 
@@ -185,7 +191,8 @@ class Galaxy(object):
             The (y, x) coordinates in the original reference frame of the grid.
         """
         if self.has_mass_profile:
-            return sum(map(lambda p: p.surface_density_from_grid(grid), self.mass_profiles))
+            with geometry_profiles.shared_transforms():
+                return sum(map(lambda p: p.surface_density_from_grid(grid), self.mass_profiles))
         else:
             return np.zeros((grid.shape[0],))
 
@@ -203,7 +210,8 @@ class Galaxy(object):
             The (y, x) coordinates in the original reference frame of the grid.
         """
         if self.has_mass_profile:
-            return sum(map(lambda p: p.potential_from_grid(grid), self.mass_profiles))
+            with geometry_profiles.shared_transforms():
+                return sum(map(lambda p: p.potential_from_grid(grid), self.mass_profiles))
         else:
             return np.zeros((grid.shape[0],))
 
@@ -221,10 +229,58 @@ class Galaxy(object):
             The (y, x) coordinates in the original reference frame of the grid.
         """
         if self.has_mass_profile:
-            return sum(map(lambda p: p.deflections_from_grid(grid), self.mass_profiles))
+            with geometry_profiles.shared_transforms():
+                return sum(map(lambda p: deflections_of_mass_profile_from_grid(mass_profile=p, grid=grid),
+                               self.mass_profiles))
         else:
             return np.full((grid.shape[0], 2), 0.0)
 
+    def deflections_via_fft_from_grid(self, grid, pixel_scale, buffer=1.0):
+        """Compute the (y,x) deflection angles of the galaxy's total mass distribution using a grid of Cartesian \
+        (y,x) coordinates, by FFT convolution of its surface density evaluated on a padded uniform grid.
+
+        Unlike *deflections_from_grid*, this only requires each mass profile's surface density and so works for any \
+        (e.g. composite or numerically integrated) mass distribution. See \
+        *galaxy_util.deflections_and_potential_via_fft_of_galaxies_from_grids* for details.
+
+        Parameters
+        ----------
+        grid : ndarray
+            The (y, x) coordinates in the original reference frame of the grid.
+        pixel_scale : float
+            The arc-second to pixel conversion factor of the padded grid the surface density is evaluated on.
+        buffer : float
+            The arc-second padding added around the extent of the grid.
+        """
+        if self.has_mass_profile:
+            deflections_list, _ = galaxy_util.deflections_and_potential_via_fft_of_galaxies_from_grids(
+                grids_list=[grid], galaxies=[self], pixel_scale=pixel_scale, buffer=buffer)
+            return deflections_list[0]
+        else:
+            return np.full((grid.shape[0], 2), 0.0)
+
+    def potential_via_fft_from_grid(self, grid, pixel_scale, buffer=1.0):
+        """Compute the lensing potential of the galaxy's total mass distribution using a grid of Cartesian (y,x) \
+        coordinates, by FFT convolution of its surface density evaluated on a padded uniform grid.
+
+        The potential is defined up to an additive constant, which depends on the extent of the padded grid.
+
+        Parameters
+        ----------
+        grid : ndarray
+            The (y, x) coordinates in the original reference frame of the grid.
+        pixel_scale : float
+            The arc-second to pixel conversion factor of the padded grid the surface density is evaluated on.
+        buffer : float
+            The arc-second padding added around the extent of the grid.
+        """
+        if self.has_mass_profile:
+            _, potential_list = galaxy_util.deflections_and_potential_via_fft_of_galaxies_from_grids(
+                grids_list=[grid], galaxies=[self], pixel_scale=pixel_scale, buffer=buffer)
+            return potential_list[0]
+        else:
+            return np.zeros((grid.shape[0],))
+
     def mass_within_circle(self, radius, conversion_factor=1.0):
         """Compute the total mass of the galaxy's mass profiles within a circle of specified radius.
 
@@ -345,6 +401,11 @@ class HyperGalaxy(object):
         return "\n".join(["{}: {}".format(k, v) for k, v in self.__dict__.items()])
 
 
+def deflections_of_mass_profile_from_grid(mass_profile, grid):
+    with timing.timer('deflections_{}'.format(mass_profile.__class__.__name__)):
+        return mass_profile.deflections_from_grid(grid)
+
+
 class Redshift(object):
     def __init__(self, redshift):
         self.redshift = redshift
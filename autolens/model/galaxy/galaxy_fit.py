@@ -1,8 +1,11 @@
 from autofit.tools import fit
 
+from autolens.model.galaxy.util import galaxy_util
+
+
 class GalaxyFit(fit.DataFit):
 
-    def __init__(self, galaxy_data, model_galaxies):
+    def __init__(self, galaxy_data, model_galaxies, model_data_1d=None):
         """Class which fits a set of galaxy-datas to a model galaxy, using either the galaxy's intensities, \
         surface-density or potential.
 
@@ -12,13 +15,17 @@ class GalaxyFit(fit.DataFit):
             The galaxy-datas object being fitted.
         model_galaxies : galaxy.Galaxy
             The model galaxy used to fit the galaxy-datas.
+        model_data_1d : ndarray or None
+            The 1D model data of the model galaxies, if it has already been computed (e.g. both deflection \
+            components from one evaluation). If None, it is computed from the galaxy-data's sub-grid.
         """
 
         self.galaxy_data = galaxy_data
         self.model_galaxies = model_galaxies
 
-        model_data_1d = galaxy_data.profile_quantity_from_galaxy_and_sub_grid(galaxies=model_galaxies,
-                                                                              sub_grid=galaxy_data.grid_stack.sub)
+        if model_data_1d is None:
+            model_data_1d = galaxy_data.profile_quantity_from_galaxy_and_sub_grid(galaxies=model_galaxies,
+                                                                                  sub_grid=galaxy_data.grid_stack.sub)
 
         super(GalaxyFit, self).__init__(data=galaxy_data.image, noise_map=galaxy_data.noise_map,
                                         mask=galaxy_data.mask,
@@ -26,4 +33,27 @@ class GalaxyFit(fit.DataFit):
 
     @property
     def figure_of_merit(self):
-        return self.likelihood
\ No newline at end of file
+        return self.likelihood
+
+
+def fit_galaxy_data_y_and_x_deflections_with_model_galaxies(galaxy_data_y, galaxy_data_x, model_galaxies):
+    """Fit the y and x deflection angles of galaxy-datas with model galaxies, computing the deflections of the \
+    model galaxies once on the sub-grid and fitting both components from that single evaluation (instead of \
+    computing the deflections twice, once per component).
+
+    The galaxy-datas of both components must share the same mask and sub-grid size, so that they share a sub-grid.
+
+    Parameters
+    ----------
+    galaxy_data_y : GalaxyFitData
+        The galaxy-data of the y deflection angles being fitted.
+    galaxy_data_x : GalaxyFitData
+        The galaxy-data of the x deflection angles being fitted.
+    model_galaxies : [galaxy.Galaxy]
+        The model galaxies used to fit the galaxy-datas.
+    """
+    deflections = galaxy_util.deflections_of_galaxies_from_grid(grid=galaxy_data_y.grid_stack.sub,
+                                                                galaxies=model_galaxies)
+
+    return GalaxyFit(galaxy_data=galaxy_data_y, model_galaxies=model_galaxies, model_data_1d=deflections[:, 0]), \
+           GalaxyFit(galaxy_data=galaxy_data_x, model_galaxies=model_galaxies, model_data_1d=deflections[:, 1])
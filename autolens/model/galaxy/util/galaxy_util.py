@@ -1,27 +1,251 @@
 import numpy as np
+from scipy import interpolate, signal
+
 from autolens.data.array import grids
+from autolens.model.profiles import geometry_profiles
 
 @grids.sub_to_image_grid
-def intensities_of_galaxies_from_grid(grid, galaxies):
-    return sum(map(lambda g: g.intensities_from_grid(grid), galaxies))
+def intensities_of_galaxies_from_grid(grid, galaxies, flux_fraction_tolerance=None, grid_buckets=None):
+    """Compute the summed intensities of galaxies on a grid.
+
+    If a *flux_fraction_tolerance* is supplied, each light profile's intensities are only computed for the \
+    coordinates inside its bounding radius (see *light_profiles.LightProfile.bounding_radius*) and are zero \
+    elsewhere, such that every profile neglects at most this fraction of its total flux.
+
+    Parameters
+    ----------
+    grid : ndarray
+        The (y, x) coordinates of the grid (e.g. a sub-grid traced to the source-plane).
+    galaxies : [Galaxy]
+        The galaxies whose intensities are computed.
+    flux_fraction_tolerance : float or None
+        If not *None*, the fraction of each light profile's total flux neglected outside its bounding radius.
+    grid_buckets : grids.GridBuckets or None
+        A spatial bucketing of the grid, used to find the coordinates inside each bounding radius. If *None*, it \
+        is created from the grid.
+    """
+    if flux_fraction_tolerance is None:
+        with geometry_profiles.shared_transforms():
+            return sum(map(lambda g: g.intensities_from_grid(grid), galaxies))
+
+    intensities = np.zeros((grid.shape[0],), dtype=grid.dtype)
+
+    for light_profile in [light_profile for galaxy in galaxies for light_profile in galaxy.light_profiles]:
+
+        bounding_radius = light_profile.bounding_radius(flux_fraction_tolerance=flux_fraction_tolerance)
+
+        if grid_buckets is None:
+            grid_buckets = grids.GridBuckets(grid=grid)
+
+        if bounding_radius is None or grid_buckets.circle_contains_grid(centre=light_profile.centre,
+                                                                        radius=bounding_radius):
+            intensities += light_profile.intensities_from_grid(grid)
+        else:
+            indexes = grid_buckets.indexes_within_circle(centre=light_profile.centre, radius=bounding_radius)
+            if indexes.shape[0] > 0:
+                intensities[indexes] += light_profile.intensities_from_grid(np.asarray(grid)[indexes])
+
+    return intensities
 
 @grids.sub_to_image_grid
 def surface_density_of_galaxies_from_grid(grid, galaxies):
-    return sum(map(lambda g: g.surface_density_from_grid(grid), galaxies))
+    with geometry_profiles.shared_transforms():
+        return sum(map(lambda g: g.surface_density_from_grid(grid), galaxies))
 
 @grids.sub_to_image_grid
 def potential_of_galaxies_from_grid(grid, galaxies):
-    return sum(map(lambda g: g.potential_from_grid(grid), galaxies))
+    with geometry_profiles.shared_transforms():
+        return sum(map(lambda g: g.potential_from_grid(grid), galaxies))
 
 def deflections_of_galaxies_from_grid(grid, galaxies):
-    deflections = sum(map(lambda galaxy: galaxy.deflections_from_grid(grid), galaxies))
+    with geometry_profiles.shared_transforms():
+        deflections = sum(map(lambda galaxy: galaxy.deflections_from_grid(grid), galaxies))
     if isinstance(grid, grids.SubGrid):
         return np.asarray([grid.sub_data_to_regular_data(deflections[:, 0]),
                            grid.sub_data_to_regular_data(deflections[:, 1])]).T
-    return sum(map(lambda galaxy: galaxy.deflections_from_grid(grid), galaxies))
+    return deflections
 
 def deflections_of_galaxies_from_sub_grid(sub_grid, galaxies):
-    return sum(map(lambda galaxy: galaxy.deflections_from_grid(sub_grid), galaxies))
+    with geometry_profiles.shared_transforms():
+        return sum(map(lambda galaxy: galaxy.deflections_from_grid(sub_grid), galaxies))
 
 def deflections_of_galaxies_from_grid_stack(grid_stack, galaxies):
-    return grid_stack.apply_function(lambda grid: deflections_of_galaxies_from_sub_grid(grid, galaxies))
\ No newline at end of file
+    return grid_stack.apply_function_to_concatenated_grid(
+        lambda grid: deflections_of_galaxies_from_sub_grid(grid, galaxies))
+
+def fft_kernels_from_shape_and_pixel_scale(shape, pixel_scale):
+    """Compute the kernels which, when convolved with a 2D convergence map of the input shape, give the (y,x) \
+    deflection angles and lensing potential of that convergence.
+
+    The kernels are (2*shape - 1) in size, so that a linear convolution of the (zero-padded) convergence map covers \
+    every pair of pixels. The deflection kernels are (y,x) / (pi * r^2) and the potential kernel ln(r) / pi. The \
+    central pixel of the deflection kernels is zero by symmetry and that of the potential kernel is the mean of ln(r) \
+    over a disk of equal area to the pixel.
+
+    Parameters
+    ----------
+    shape : (int, int)
+        The 2D shape of the convergence map the kernels are convolved with.
+    pixel_scale : float
+        The arc-second to pixel conversion factor of the convergence map.
+    """
+    y = pixel_scale * np.arange(-(shape[0] - 1), shape[0])
+    x = pixel_scale * np.arange(-(shape[1] - 1), shape[1])
+    y, x = np.meshgrid(y, x, indexing='ij')
+
+    radii_squared = np.square(y) + np.square(x)
+    radii_squared[shape[0] - 1, shape[1] - 1] = 1.0
+
+    kernel_y = np.divide(y, np.pi * radii_squared)
+    kernel_x = np.divide(x, np.pi * radii_squared)
+    kernel_potential = np.log(radii_squared) / (2.0 * np.pi)
+
+    kernel_y[shape[0] - 1, shape[1] - 1] = 0.0
+    kernel_x[shape[0] - 1, shape[1] - 1] = 0.0
+    kernel_potential[shape[0] - 1, shape[1] - 1] = (np.log(pixel_scale / np.sqrt(np.pi)) - 0.5) / np.pi
+
+    return kernel_y, kernel_x, kernel_potential
+
+
+def deflections_and_potential_via_fft_from_convergence(convergence, pixel_scale):
+    """Compute the 2D (y,x) deflection angle and potential maps of a 2D convergence map, by FFT convolution of the \
+    convergence with the kernels given by *fft_kernels_from_shape_and_pixel_scale*.
+
+    The convolution is linear (not circular), so mass outside the map contributes nothing to the deflections.
+
+    Parameters
+    ----------
+    convergence : ndarray
+        The 2D convergence (surface density) map, which must be on a uniform grid with ascending (y,x) axes.
+    pixel_scale : float
+        The arc-second to pixel conversion factor of the convergence map.
+    """
+    kernel_y, kernel_x, kernel_potential = fft_kernels_from_shape_and_pixel_scale(shape=convergence.shape,
+                                                                                  pixel_scale=pixel_scale)
+
+    pixel_area = pixel_scale ** 2.0
+
+    deflections_y = pixel_area * signal.fftconvolve(convergence, kernel_y, mode='same')
+    deflections_x = pixel_area * signal.fftconvolve(convergence, kernel_x, mode='same')
+    potential = pixel_area * signal.fftconvolve(convergence, kernel_potential, mode='same')
+
+    return deflections_y, deflections_x, potential
+
+
+def uniform_axes_bounding_grids_from_pixel_scale(grids_list, pixel_scale, buffer):
+    """Compute the ascending (y,x) axes of a uniform grid with the input pixel scale, which bounds every coordinate \
+    in a list of grids plus a buffer.
+
+    Parameters
+    ----------
+    grids_list : [ndarray]
+        The list of grids of (y,x) arc-second coordinates the uniform grid must bound.
+    pixel_scale : float
+        The arc-second to pixel conversion factor of the uniform grid.
+    buffer : float
+        The arc-second padding added around the extent of the grids.
+    """
+    coordinates = np.concatenate([np.asarray(grid).reshape(-1, 2) for grid in grids_list])
+
+    y_min, x_min = np.min(coordinates, axis=0) - buffer
+    y_max, x_max = np.max(coordinates, axis=0) + buffer
+
+    y_pixels = int(np.ceil((y_max - y_min) / pixel_scale)) + 1
+    x_pixels = int(np.ceil((x_max - x_min) / pixel_scale)) + 1
+
+    y_centre = (y_max + y_min) / 2.0
+    x_centre = (x_max + x_min) / 2.0
+
+    y_axis = y_centre + pixel_scale * (np.arange(y_pixels) - (y_pixels - 1) / 2.0)
+    x_axis = x_centre + pixel_scale * (np.arange(x_pixels) - (x_pixels - 1) / 2.0)
+
+    return y_axis, x_axis
+
+
+def deflections_and_potential_via_fft_of_galaxies_from_grids(grids_list, galaxies, pixel_scale, buffer=1.0):
+    """Compute the deflection angles and potential of a list of galaxies on a list of grids, via FFT convolution of \
+    their total convergence.
+
+    This is performed as follows:
+
+    1) Setup a uniform grid with the input pixel scale, which bounds every grid plus a buffer (the padded grid).
+    2) Evaluate the total surface density of the galaxies on the padded grid (a single call per mass profile).
+    3) Convolve this convergence map with the deflection and potential kernels using FFTs.
+    4) Interpolate (bi-linearly) the deflection and potential maps onto each grid.
+
+    For composite lenses with many numerically integrated mass profiles, this replaces N_profiles x N_pixels \
+    quadrature calls with one surface density evaluation and an FFT per map. The accuracy depends on the pixel scale \
+    (which must resolve the convergence) and buffer (mass outside the padded grid is omitted). Non-finite values of the \
+    convergence (e.g. at the centre of a singular profile) are set to zero.
+
+    Parameters
+    ----------
+    grids_list : [ndarray]
+        The list of grids of (y,x) arc-second coordinates the deflections and potential are computed on.
+    galaxies : [galaxy.Galaxy]
+        The galaxies whose mass profiles are used to compute the deflections and potential.
+    pixel_scale : float
+        The arc-second to pixel conversion factor of the padded grid the convergence is evaluated on.
+    buffer : float
+        The arc-second padding added around the extent of the grids.
+
+    Returns
+    -------
+    ([ndarray], [ndarray])
+        The (y,x) deflection angles and potential of every grid in the input list.
+    """
+    y_axis, x_axis = uniform_axes_bounding_grids_from_pixel_scale(grids_list=grids_list, pixel_scale=pixel_scale,
+                                                                  buffer=buffer)
+
+    padded_grid = np.stack(np.meshgrid(y_axis, x_axis, indexing='ij'), axis=-1).reshape(-1, 2)
+
+    convergence = sum(map(lambda galaxy: galaxy.surface_density_from_grid(padded_grid), galaxies))
+    convergence = np.reshape(convergence, (y_axis.shape[0], x_axis.shape[0]))
+    convergence[~np.isfinite(convergence)] = 0.0
+
+    deflections_y, deflections_x, potential = \
+        deflections_and_potential_via_fft_from_convergence(convergence=convergence, pixel_scale=pixel_scale)
+
+    interpolators = list(map(lambda map_2d: interpolate.RegularGridInterpolator(points=(y_axis, x_axis),
+                                                                                values=map_2d, bounds_error=False,
+                                                                                fill_value=None),
+                             [deflections_y, deflections_x, potential]))
+
+    deflections_list = []
+    potential_list = []
+
+    for grid in grids_list:
+
+        grid = np.asarray(grid).reshape(-1, 2)
+
+        deflections_list.append(np.stack((interpolators[0](grid), interpolators[1](grid)), axis=-1))
+        potential_list.append(interpolators[2](grid))
+
+    return deflections_list, potential_list
+
+
+def deflections_via_fft_of_galaxies_from_grid_stack(grid_stack, galaxies, pixel_scale, buffer=1.0):
+    """Compute the deflection-stack of a list of galaxies on a grid-stack, via FFT convolution of their total \
+    convergence evaluated on a single padded grid bounding the regular, sub, blurring and pix grids.
+
+    See *deflections_and_potential_via_fft_of_galaxies_from_grids* for a full description.
+
+    Parameters
+    ----------
+    grid_stack : grids.GridStack
+        The grid-stack whose deflections are computed.
+    galaxies : [galaxy.Galaxy]
+        The galaxies whose mass profiles are used to compute the deflections.
+    pixel_scale : float
+        The arc-second to pixel conversion factor of the padded grid the convergence is evaluated on.
+    buffer : float
+        The arc-second padding added around the extent of the grids.
+    """
+    grids_list = list(filter(lambda grid: grid is not None, grid_stack))
+
+    deflections_list, _ = deflections_and_potential_via_fft_of_galaxies_from_grids(
+        grids_list=grids_list, galaxies=galaxies, pixel_scale=pixel_scale, buffer=buffer)
+
+    deflections_iterator = iter(deflections_list)
+
+    return grids.GridStack(*[None if grid is None else next(deflections_iterator) for grid in grid_stack])
@@ -1,5 +1,7 @@
 from autolens import decorator_util
+import numba
 import numpy as np
+from scipy import sparse
 
 from autolens.data import convolution
 
@@ -20,6 +22,39 @@ class ConvolverMappingMatrix(convolution.Convolver):
 
         super(ConvolverMappingMatrix, self).__init__(mask, psf)
 
+        self._convolution_matrix_sparse = None
+
+    @property
+    def convolution_matrix_sparse(self):
+        """The PSF convolution of the unmasked image pixels as a sparse (CSR) matrix of shape (image_pixels, \
+        image_pixels), whose entry [i, j] is the PSF value with which image pixel j is blurred into image pixel i. It \
+        is setup from the PSF frames the first time it is used."""
+        if self._convolution_matrix_sparse is None:
+
+            frame_entries = np.arange(self.psf_max_size)[None, :] < self.image_frame_lengths[:, None]
+
+            rows = self.image_frame_indexes[frame_entries]
+            columns = np.repeat(np.arange(self.pixels_in_mask), self.image_frame_lengths)
+
+            self._convolution_matrix_sparse = sparse.csr_matrix(
+                (self.image_frame_psfs[frame_entries], (rows, columns)),
+                shape=(self.pixels_in_mask, self.pixels_in_mask))
+
+        return self._convolution_matrix_sparse
+
+    def convolve_mapping_matrix_sparse(self, mapping_matrix_sparse):
+        """For a sparse inversion mapping matrix (see *mappers.Mapper.mapping_matrix_sparse*), compute the sparse \
+        blurred mapping matrix as the product of the sparse convolution matrix (see *convolution_matrix_sparse*) and \
+        the mapping matrix, which gives the same blurred mapping matrix as *convolve_mapping_matrix* without forming \
+        either matrix densely.
+
+        Parameters
+        -----------
+        mapping_matrix_sparse : scipy.sparse.csr_matrix
+            The sparse 2D mapping matrix describing how every inversion pixel maps to an image pixel.
+        """
+        return self.convolution_matrix_sparse.dot(mapping_matrix_sparse).tocsr()
+
     def convolve_mapping_matrix(self, mapping_matrix):
         """For a given inversion mapping matrix, convolve every pixel's mapped regular with the PSF kernel.
 
@@ -91,6 +126,10 @@ class ConvolverMappingMatrix(convolution.Convolver):
         mapping_matrix : ndarray
             The 2D mapping matix describing how every inversion pixel maps to an datas_ pixel.
         """
+        if decorator_util.use_parallel_kernels():
+            return self.convolve_matrix_parallel_jit(mapping_matrix, self.image_frame_indexes,
+                                                     self.image_frame_psfs, self.image_frame_lengths)
+
         return self.convolve_matrix_jit(mapping_matrix, self.image_frame_indexes,
                                         self.image_frame_psfs, self.image_frame_lengths)
 
@@ -98,7 +137,7 @@ class ConvolverMappingMatrix(convolution.Convolver):
     @decorator_util.jit()
     def convolve_matrix_jit(mapping_matrix, image_frame_indexes, image_frame_kernels, image_frame_lengths):
 
-        blurred_mapping_matrix = np.zeros(mapping_matrix.shape)
+        blurred_mapping_matrix = np.zeros(mapping_matrix.shape, dtype=image_frame_kernels.dtype)
 
         for pixel_index in range(mapping_matrix.shape[1]):
             for image_index in range(mapping_matrix.shape[0]):
@@ -117,3 +156,25 @@ class ConvolverMappingMatrix(convolution.Convolver):
                         blurred_mapping_matrix[vector_index, pixel_index] += value * kernel
 
         return blurred_mapping_matrix
+
+    @staticmethod
+    @decorator_util.parallel_jit()
+    def convolve_matrix_parallel_jit(mapping_matrix, image_frame_indexes, image_frame_kernels, image_frame_lengths):
+        """The parallel variant of *convolve_matrix_jit*, where every pixelization pixel's column of the mapping \
+        matrix is convolved by one thread."""
+
+        blurred_mapping_matrix = np.zeros(mapping_matrix.shape, dtype=image_frame_kernels.dtype)
+
+        for pixel_index in numba.prange(mapping_matrix.shape[1]):
+            for image_index in range(mapping_matrix.shape[0]):
+
+                value = mapping_matrix[image_index, pixel_index]
+
+                if value > 0:
+
+                    for kernel_index in range(image_frame_lengths[image_index]):
+                        vector_index = image_frame_indexes[image_index, kernel_index]
+                        blurred_mapping_matrix[vector_index, pixel_index] += \
+                            value * image_frame_kernels[image_index, kernel_index]
+
+        return blurred_mapping_matrix
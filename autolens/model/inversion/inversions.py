@@ -1,17 +1,106 @@
 import numpy as np
+from scipy import linalg, optimize, sparse
+from scipy.sparse import linalg as sparse_linalg
 
 from autolens import exc
+from autolens import timing
+from autolens.model.inversion import regularization as reg
 from autolens.model.inversion.util import inversion_util
 
 # TODO : Unit test this properly, using a cleverly made mock hyper-set
 
-def inversion_from_image_mapper_and_regularization(image_1d, noise_map_1d, convolver, mapper, regularization):
+def inversion_from_image_mapper_and_regularization(image_1d, noise_map_1d, convolver, mapper, regularization,
+                                                   solver=None, noise_weighted_image_1d=None,
+                                                   regularization_weights=None):
     return Inversion(image_1d=image_1d, noise_map_1d=noise_map_1d, convolver=convolver, mapper=mapper,
-                     regularization=regularization)
+                     regularization=regularization, solver=solver, noise_weighted_image_1d=noise_weighted_image_1d,
+                     regularization_weights=regularization_weights)
+
+
+def regularization_arguments_from_regularization_mapper_and_weights(regularization, mapper,
+                                                                     regularization_weights=None):
+    """The arguments of a regularization's (dense or sparse) regularization matrix, which are the mapper's pixel \
+    neighbors and, for a weighted regularization, the regularization weights of its pixels."""
+    arguments = {'pixel_neighbors': mapper.geometry.pixel_neighbors,
+                 'pixel_neighbors_size': mapper.geometry.pixel_neighbors_size}
+
+    if isinstance(regularization, reg.Weighted):
+        if regularization_weights is None:
+            raise exc.InversionException('The regularization weights of a Weighted regularization must be supplied '
+                                         'to an inversion')
+        arguments['regularization_weights'] = regularization_weights
+
+    return arguments
+
+
+class ConjugateGradientSolver(object):
+
+    def __init__(self, tolerance=1.0e-8, maximum_iterations=None, total_probes=16, lanczos_steps=32, seed=1):
+        """ An iterative solver for an inversion's linear system, for pixelizations with too many pixels for the \
+        dense curvature_reg_matrix to be formed and solved directly.
+
+        The solution vector is computed via a preconditioned conjugate-gradient method, which uses matrix-free \
+        products with the (sparse) blurred mapping matrix and regularization matrix. Each solve is warm-started from \
+        the solution of the previous solve (e.g. the previous sample of a non-linear search), if it had the same \
+        number of pixels. The log determinant of the curvature_reg_matrix is estimated via stochastic Lanczos \
+        quadrature.
+
+        Parameters
+        -----------
+        tolerance : float
+            The conjugate-gradient iterations stop when the norm of the residual relative to the norm of the data \
+            vector is below this value.
+        maximum_iterations : int or None
+            The maximum number of conjugate-gradient iterations, after which an *InversionException* is raised if the \
+            solve has not converged. If *None*, this is 10 times the number of pixels.
+        total_probes : int
+            The number of probe vectors used to estimate the log determinant.
+        lanczos_steps : int
+            The number of Lanczos iterations performed for every probe vector.
+        seed : int
+            The seed used to generate the probe vectors, which is fixed so that estimates are not noisy between \
+            samples.
+        """
+        self.tolerance = tolerance
+        self.maximum_iterations = maximum_iterations
+        self.total_probes = total_probes
+        self.lanczos_steps = lanczos_steps
+        self.seed = seed
+
+        self.previous_solution_vector = None
+        self.iterations = None
+
+    def solution_vector_from_operator_and_data_vector(self, operator, data_vector, preconditioner_diagonal):
+
+        pixels = data_vector.shape[0]
+
+        if self.previous_solution_vector is not None and self.previous_solution_vector.shape[0] == pixels:
+            initial_solution_vector = self.previous_solution_vector
+        else:
+            initial_solution_vector = np.zeros(pixels)
+
+        maximum_iterations = 10 * pixels if self.maximum_iterations is None else self.maximum_iterations
+
+        solution_vector, self.iterations = \
+            inversion_util.solution_vector_via_preconditioned_conjugate_gradient(
+                operator=operator, data_vector=data_vector, preconditioner_diagonal=preconditioner_diagonal,
+                initial_solution_vector=initial_solution_vector, tolerance=self.tolerance,
+                maximum_iterations=maximum_iterations)
+
+        self.previous_solution_vector = solution_vector
+
+        return solution_vector
+
+    def log_determinant_from_operator(self, operator, dimension):
+        return inversion_util.log_determinant_via_stochastic_lanczos_quadrature(
+            operator=operator, dimension=dimension, total_probes=self.total_probes,
+            lanczos_steps=self.lanczos_steps, seed=self.seed)
+
 
 class Inversion(object):
 
-    def __init__(self, image_1d, noise_map_1d, convolver, mapper, regularization):
+    def __init__(self, image_1d, noise_map_1d, convolver, mapper, regularization, solver=None,
+                 noise_weighted_image_1d=None, regularization_weights=None):
         """ An inversion, which given an input image and noise-map reconstructs the image using a linear inversion, \
         including a convolution that accounts for blurring.
 
@@ -32,14 +121,26 @@ class Inversion(object):
         regularization : inversion.regularization.Regularization
             The regularization scheme applied to smooth the pixelization used to reconstruct the image for the \
             inversion
+        solver : ConjugateGradientSolver or None
+            If supplied, the linear system is solved iteratively (without forming the curvature_reg_matrix) and the \
+            log determinant terms are estimated, as opposed to using a direct solve and Cholesky decomposition.
+        noise_weighted_image_1d : ndarray or None
+            The image divided by the noise-map squared, which can be precomputed (see *LensData*) when the same \
+            image and noise-map are inverted many times. If *None*, it is computed from the image and noise-map.
+        regularization_weights : ndarray or None
+            The regularization weight of every pixelization pixel, which must be supplied for a *Weighted* \
+            regularization (see *regularization.Weighted.regularization_weights_from_pixel_signals*).
 
         Attributes
         -----------
         blurred_mapping_matrix : ndarray
             The matrix representing the blurred mappings between the image's sub-grid of pixels and the pixelization \
-            pixels.
+            pixels. This is *None* if a solver is supplied, in which case only its sparse equivalent \
+            (blurred_mapping_matrix_sparse) is computed.
         regularization_matrix : ndarray
-            The matrix defining how the pixelization's pixels are regularized with one another for smoothing (H).
+            The matrix defining how the pixelization's pixels are regularized with one another for smoothing (H). \
+            This is *None* if a solver is supplied, in which case only its sparse equivalent \
+            (regularization_matrix_sparse) is computed.
         curvature_matrix : ndarray
             The curvature_matrix between each pixelization pixel and all other pixelization pixels (F).
         curvature_reg_matrix : ndarray
@@ -50,19 +151,82 @@ class Inversion(object):
 
         self.mapper = mapper
         self.regularization = regularization
-        self.blurred_mapping_matrix = convolver.convolve_mapping_matrix(mapping_matrix=mapper.mapping_matrix)
+        self.solver = solver
 
-        self.data_vector = inversion_util.data_vector_from_blurred_mapping_matrix_and_data(
-                blurred_mapping_matrix=self.blurred_mapping_matrix, image_1d=image_1d, noise_map_1d=noise_map_1d)
+        if noise_weighted_image_1d is None:
+            noise_weighted_image_1d = inversion_util.noise_weighted_image_1d_from_image_1d_and_noise_map_1d(
+                image_1d=image_1d, noise_map_1d=noise_map_1d)
 
-        self.curvature_matrix = inversion_util.curvature_matrix_from_blurred_mapping_matrix(
-                blurred_mapping_matrix=self.blurred_mapping_matrix, noise_map_1d=noise_map_1d)
+        if solver is None:
+
+            with timing.timer('mapping_matrix'):
+                mapping_matrix = mapper.mapping_matrix
+
+            with timing.timer('mapping_matrix_convolution'):
+                self.blurred_mapping_matrix = convolver.convolve_mapping_matrix(mapping_matrix=mapping_matrix)
+
+            with timing.timer('regularization_matrix'):
+                self.regularization_matrix = regularization.regularization_matrix_from_pixel_neighbors(
+                    **regularization_arguments_from_regularization_mapper_and_weights(
+                        regularization=regularization, mapper=mapper, regularization_weights=regularization_weights))
 
-        self.regularization_matrix = \
-            regularization.regularization_matrix_from_pixel_neighbors(pixel_neighbors=mapper.geometry.pixel_neighbors,
-                                                            pixel_neighbors_size=mapper.geometry.pixel_neighbors_size)
-        self.curvature_reg_matrix = np.add(self.curvature_matrix, self.regularization_matrix)
-        self.solution_vector = np.linalg.solve(self.curvature_reg_matrix, self.data_vector)
+            with timing.timer('curvature_matrix'):
+
+                self.data_vector = inversion_util.data_vector_from_blurred_mapping_matrix_and_noise_weighted_image(
+                    blurred_mapping_matrix=self.blurred_mapping_matrix, noise_weighted_image_1d=noise_weighted_image_1d)
+
+                self.curvature_matrix = inversion_util.curvature_matrix_from_blurred_mapping_matrix(
+                        blurred_mapping_matrix=self.blurred_mapping_matrix, noise_map_1d=noise_map_1d)
+
+                self.curvature_reg_matrix = np.add(self.curvature_matrix, self.regularization_matrix)
+
+            with timing.timer('solve'):
+                self.solution_vector = np.linalg.solve(self.curvature_reg_matrix, self.data_vector)
+
+        else:
+
+            # The mapping, blurred mapping and regularization matrices are only formed as sparse matrices, so that \
+            # their memory and setup scale with their number of non-zero entries as opposed to the number of pixels \
+            # squared.
+
+            self.blurred_mapping_matrix = None
+            self.regularization_matrix = None
+
+            with timing.timer('mapping_matrix'):
+                mapping_matrix_sparse = mapper.mapping_matrix_sparse
+
+            with timing.timer('mapping_matrix_convolution'):
+                self.blurred_mapping_matrix_sparse = convolver.convolve_mapping_matrix_sparse(
+                    mapping_matrix_sparse=mapping_matrix_sparse)
+
+            with timing.timer('regularization_matrix'):
+                self.regularization_matrix_sparse = regularization.regularization_matrix_sparse_from_pixel_neighbors(
+                    **regularization_arguments_from_regularization_mapper_and_weights(
+                        regularization=regularization, mapper=mapper, regularization_weights=regularization_weights))
+
+            self.data_vector = inversion_util.data_vector_from_blurred_mapping_matrix_and_noise_weighted_image(
+                blurred_mapping_matrix=self.blurred_mapping_matrix_sparse,
+                noise_weighted_image_1d=noise_weighted_image_1d)
+
+            self.weighted_mapping_matrix_sparse = \
+                sparse.diags(1.0 / noise_map_1d).dot(self.blurred_mapping_matrix_sparse).tocsr()
+            self.weighted_mapping_matrix_sparse_transpose = self.weighted_mapping_matrix_sparse.T.tocsr()
+
+            preconditioner_diagonal = np.add(
+                np.asarray(self.weighted_mapping_matrix_sparse.multiply(self.weighted_mapping_matrix_sparse).sum(
+                    axis=0)).ravel(), self.regularization_matrix_sparse.diagonal())
+
+            with timing.timer('solve'):
+                self.solution_vector = solver.solution_vector_from_operator_and_data_vector(
+                    operator=self.curvature_reg_operator, data_vector=self.data_vector,
+                    preconditioner_diagonal=preconditioner_diagonal)
+
+    def curvature_reg_operator(self, vector):
+        """ Compute the product (F + H) * vector without forming the curvature_reg_matrix, using the sparse noise \
+        weighted blurred mapping matrix *f / sigma* (where F = (f / sigma)^T (f / sigma)) and regularization matrix.
+        """
+        return self.weighted_mapping_matrix_sparse_transpose.dot(self.weighted_mapping_matrix_sparse.dot(vector)) + \
+               self.regularization_matrix_sparse.dot(vector)
 
     @property
     def reconstructed_data(self):
@@ -70,8 +234,11 @@ class Inversion(object):
 
     @property
     def reconstructed_data_vector(self):
+        if self.solver is None:
+            return inversion_util.reconstructed_data_vector_from_blurred_mapping_matrix_and_solution_vector(
+                self.blurred_mapping_matrix, self.solution_vector)
         return inversion_util.reconstructed_data_vector_from_blurred_mapping_matrix_and_solution_vector(
-            self.blurred_mapping_matrix, self.solution_vector)
+            self.blurred_mapping_matrix_sparse, self.solution_vector)
 
     @property
     def regularization_term(self):
@@ -85,15 +252,24 @@ class Inversion(object):
         The above works include the regularization_matrix coefficient (lambda) in this calculation. In PyAutoLens, \
         this is already in the regularization matrix and thus implicitly included in the matrix multiplication.
         """
-        return np.matmul(self.solution_vector.T, np.matmul(self.regularization_matrix, self.solution_vector))
+        if self.solver is None:
+            return np.dot(self.solution_vector, self.regularization_matrix.dot(self.solution_vector))
+        return np.dot(self.solution_vector, self.regularization_matrix_sparse.dot(self.solution_vector))
 
     @property
     def log_det_curvature_reg_matrix_term(self):
-        return self.log_determinant_of_matrix_cholesky(self.curvature_reg_matrix)
+        with timing.timer('log_determinants'):
+            if self.solver is None:
+                return self.log_determinant_of_matrix_cholesky(self.curvature_reg_matrix)
+            return self.solver.log_determinant_from_operator(operator=self.curvature_reg_operator,
+                                                             dimension=self.data_vector.shape[0])
 
     @property
     def log_det_regularization_matrix_term(self):
-        return self.log_determinant_of_matrix_cholesky(self.regularization_matrix)
+        with timing.timer('log_determinants'):
+            if self.solver is None:
+                return self.log_determinant_of_matrix_cholesky(self.regularization_matrix)
+            return self.log_determinant_of_sparse_matrix_lu(self.regularization_matrix_sparse)
 
     @staticmethod
     def log_determinant_of_matrix_cholesky(matrix):
@@ -115,4 +291,184 @@ class Inversion(object):
         try:
             return 2.0 * np.sum(np.log(np.diag(np.linalg.cholesky(matrix))))
         except np.linalg.LinAlgError:
-            raise exc.InversionException()
\ No newline at end of file
+            raise exc.InversionException()
+
+    @staticmethod
+    def log_determinant_of_sparse_matrix_lu(matrix):
+        """Compute the log determinant of a sparse positive-definite matrix (e.g. the regularization matrix of a \
+        pixelization with many pixels) via its sparse LU decomposition, by summing the log of the absolute value of \
+        each diagonal term of U.
+
+        Parameters
+        -----------
+        matrix : scipy.sparse.spmatrix
+            The sparse positive-definite matrix the log determinant is computed for.
+        """
+        try:
+            return np.sum(np.log(np.abs(sparse_linalg.splu(sparse.csc_matrix(matrix)).U.diagonal())))
+        except RuntimeError:
+            raise exc.InversionException()
+
+def inversion_regularization_spectrum_from_image_mapper_and_regularization(image_1d, noise_map_1d, convolver, mapper,
+                                                                           regularization):
+    return InversionRegularizationSpectrum(image_1d=image_1d, noise_map_1d=noise_map_1d, convolver=convolver,
+                                           mapper=mapper, regularization=regularization)
+
+
+class InversionRegularizationSpectrum(object):
+
+    def __init__(self, image_1d, noise_map_1d, convolver, mapper, regularization):
+        """ An inversion for a fixed mapper whose terms can be evaluated for any constant regularization coefficient \
+        without re-solving the linear system.
+
+        For the *Constant* regularization scheme the regularization matrix is H = lambda^2 * L + eps * I, where L is \
+        the regularization matrix for a unit coefficient and eps the small diagonal term which keeps H positive \
+        definite. Writing A = F + eps * I, the generalized eigendecomposition L v = nu A v (with V^T A V = I) \
+        diagonalizes both matrices, such that:
+
+        F + H = V^-T [I + lambda^2 * diag(nu)] V^-1
+
+        The decomposition costs O(N^3) and is performed once, after which the solution vector is an O(N^2) matrix \
+        multiplication and the evidence (the chi-squared + regularization term and the log determinant terms) is \
+        O(N) for every coefficient.
+
+        Parameters
+        -----------
+        image_1d : ndarray
+            Flattened 1D array of the observed image the inversion is fitting.
+        noise_map_1d : ndarray
+            Flattened 1D array of the noise-map used by the inversion during the fit.
+        convolver : ccd.convolution.Convolver
+            The convolver used to blur the mapping matrix with the PSF.
+        mapper : inversion.mappers.Mapper
+            The mapping between the image-pixels (via its regular / sub-grid) and pixelization pixels.
+        regularization : inversion.regularization.Constant
+            The constant regularization scheme whose coefficient is varied. Its coefficients are not used.
+        """
+
+        if not isinstance(regularization, reg.Constant):
+            raise exc.InversionException('A regularization spectrum can only be computed for the Constant '
+                                         'regularization scheme')
+
+        self.mapper = mapper
+        self.regularization = regularization
+        self.blurred_mapping_matrix = convolver.convolve_mapping_matrix(mapping_matrix=mapper.mapping_matrix)
+
+        self.data_vector = inversion_util.data_vector_from_blurred_mapping_matrix_and_data(
+                blurred_mapping_matrix=self.blurred_mapping_matrix, image_1d=image_1d, noise_map_1d=noise_map_1d)
+
+        self.curvature_matrix = inversion_util.curvature_matrix_from_blurred_mapping_matrix(
+                blurred_mapping_matrix=self.blurred_mapping_matrix, noise_map_1d=noise_map_1d)
+
+        regularization_matrix_zero = \
+            reg.Constant(coefficients=(0.0,)).regularization_matrix_from_pixel_neighbors(
+                pixel_neighbors=mapper.geometry.pixel_neighbors,
+                pixel_neighbors_size=mapper.geometry.pixel_neighbors_size)
+
+        self.unit_regularization_matrix = \
+            reg.Constant(coefficients=(1.0,)).regularization_matrix_from_pixel_neighbors(
+                pixel_neighbors=mapper.geometry.pixel_neighbors,
+                pixel_neighbors_size=mapper.geometry.pixel_neighbors_size) - regularization_matrix_zero
+
+        self.regularization_epsilon = regularization_matrix_zero[0, 0]
+
+        curvature_epsilon_matrix = np.add(self.curvature_matrix, regularization_matrix_zero)
+
+        try:
+            self.eigenvalues, self.eigenvectors = linalg.eigh(self.unit_regularization_matrix,
+                                                              curvature_epsilon_matrix)
+        except (np.linalg.LinAlgError, linalg.LinAlgError):
+            raise exc.InversionException()
+
+        self.eigenvalues = np.clip(self.eigenvalues, 0.0, None)
+
+        self.unit_regularization_eigenvalues = \
+            np.clip(np.linalg.eigvalsh(self.unit_regularization_matrix), 0.0, None)
+
+        self.log_det_curvature_epsilon_matrix = Inversion.log_determinant_of_matrix_cholesky(curvature_epsilon_matrix)
+
+        self.projected_data_vector = np.matmul(self.eigenvectors.T, self.data_vector)
+        self.projected_epsilon_matrix = self.regularization_epsilon * np.matmul(self.eigenvectors.T,
+                                                                                self.eigenvectors)
+
+        self.image_chi_squared = np.sum((image_1d / noise_map_1d) ** 2.0)
+        self.noise_normalization = np.sum(np.log(2 * np.pi * noise_map_1d ** 2.0))
+
+    def projected_solution_vector_from_coefficient(self, coefficient):
+        return self.projected_data_vector / (1.0 + coefficient ** 2.0 * self.eigenvalues)
+
+    def solution_vector_from_coefficient(self, coefficient):
+        return np.matmul(self.eigenvectors, self.projected_solution_vector_from_coefficient(coefficient=coefficient))
+
+    def reconstructed_data_vector_from_coefficient(self, coefficient):
+        return inversion_util.reconstructed_data_vector_from_blurred_mapping_matrix_and_solution_vector(
+            self.blurred_mapping_matrix, self.solution_vector_from_coefficient(coefficient=coefficient))
+
+    def chi_squared_from_coefficient(self, coefficient):
+        projected_solution_vector = self.projected_solution_vector_from_coefficient(coefficient=coefficient)
+        return self.image_chi_squared - 2.0 * np.dot(projected_solution_vector, self.projected_data_vector) + \
+               np.dot(projected_solution_vector, projected_solution_vector) - \
+               np.dot(projected_solution_vector, np.matmul(self.projected_epsilon_matrix, projected_solution_vector))
+
+    def regularization_term_from_coefficient(self, coefficient):
+        """ Compute the regularization term s_T * H * s of the inversion for a given regularization coefficient (see \
+        *Inversion.regularization_term*)."""
+        projected_solution_vector = self.projected_solution_vector_from_coefficient(coefficient=coefficient)
+        return coefficient ** 2.0 * np.sum(self.eigenvalues * projected_solution_vector ** 2.0) + \
+               np.dot(projected_solution_vector, np.matmul(self.projected_epsilon_matrix, projected_solution_vector))
+
+    def log_det_curvature_reg_matrix_term_from_coefficient(self, coefficient):
+        return self.log_det_curvature_epsilon_matrix + np.sum(np.log(1.0 + coefficient ** 2.0 * self.eigenvalues))
+
+    def log_det_regularization_matrix_term_from_coefficient(self, coefficient):
+        return np.sum(np.log(coefficient ** 2.0 * self.unit_regularization_eigenvalues + self.regularization_epsilon))
+
+    def evidence_from_coefficient(self, coefficient):
+        return self.evidences_from_coefficients(coefficients=np.array([coefficient]))[0]
+
+    def evidences_from_coefficients(self, coefficients):
+        """ Compute the Bayesian evidence of the inversion for an array of regularization coefficients, in O(N) \
+        operations per coefficient.
+
+        The chi-squared and regularization terms are not computed separately, because their sum reduces to:
+
+        chi_squared + s_T * H * s = (d / sigma)^2 - sum[w^2 / (1 + lambda^2 * nu)]
+
+        where w = V^T D is the data vector in the eigenbasis.
+
+        Parameters
+        -----------
+        coefficients : ndarray
+            The regularization coefficients the evidence is computed for.
+        """
+        coefficients_squared = np.asarray(coefficients, dtype='float64')[:, None] ** 2.0
+
+        denominators = 1.0 + coefficients_squared * self.eigenvalues
+
+        chi_squared_and_regularization_terms = \
+            self.image_chi_squared - np.sum(self.projected_data_vector ** 2.0 / denominators, axis=1)
+
+        log_det_curvature_reg_matrix_terms = self.log_det_curvature_epsilon_matrix + \
+                                             np.sum(np.log(denominators), axis=1)
+
+        log_det_regularization_matrix_terms = \
+            np.sum(np.log(coefficients_squared * self.unit_regularization_eigenvalues + self.regularization_epsilon),
+                   axis=1)
+
+        return -0.5 * (chi_squared_and_regularization_terms + log_det_curvature_reg_matrix_terms -
+                       log_det_regularization_matrix_terms + self.noise_normalization)
+
+    def coefficient_maximizing_evidence(self, coefficient_limits=(1.0e-4, 1.0e4)):
+        """ Find the regularization coefficient which maximizes the evidence, by a bounded one-dimensional search in \
+        log10(coefficient).
+
+        Parameters
+        -----------
+        coefficient_limits : (float, float)
+            The lower and upper limits of the regularization coefficient searched.
+        """
+        result = optimize.minimize_scalar(
+            lambda log_coefficient: -self.evidence_from_coefficient(coefficient=10.0 ** log_coefficient),
+            bounds=np.log10(coefficient_limits), method='bounded')
+
+        return 10.0 ** result.x
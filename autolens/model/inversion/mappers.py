@@ -1,5 +1,6 @@
 from autolens import decorator_util
 import numpy as np
+from scipy import sparse
 
 from autolens.data.array.util import mapping_util
 from autolens.data.array import scaled_array
@@ -77,11 +78,55 @@ class Mapper(object):
         [0.25, 0.75, 0.0, 0.0] [1 sub-pixel maps to pixel 0, 3 map to pixel 1]
         [ 0.0,  1.0, 0.0, 0.0] [All sub-pixels map to pixel 1]
         [ 0.0,  0.0, 0.5, 0.5] [2 sub-pixels map to pixel 2, 2 map to pixel 3]
+
+        For a sub-grid whose sub-pixels are weighted (e.g. a *GaussLegendreSubGrid*), every sub-pixel adds its \
+        weight to the mapping matrix, as opposed to the sub-grid fraction.
         """
-        return mapper_util.mapping_matrix_from_sub_to_pix(sub_to_pix=self.sub_to_pix, pixels=self.pixels,
-                                                          regular_pixels=self.grid_stack.regular.shape[0],
-                                                          sub_to_regular=self.grid_stack.sub.sub_to_regular,
-                                                          sub_grid_fraction=self.grid_stack.sub.sub_grid_fraction)
+        sub_grid_weights = self.grid_stack.sub.sub_grid_weights
+
+        if sub_grid_weights is not None:
+
+            if decorator_util.use_parallel_kernels():
+                mapping_matrix_from_sub_to_pix_and_sub_grid_weights = \
+                    mapper_util.mapping_matrix_from_sub_to_pix_and_sub_grid_weights_parallel
+            else:
+                mapping_matrix_from_sub_to_pix_and_sub_grid_weights = \
+                    mapper_util.mapping_matrix_from_sub_to_pix_and_sub_grid_weights
+
+            return mapping_matrix_from_sub_to_pix_and_sub_grid_weights(
+                sub_to_pix=self.sub_to_pix, pixels=self.pixels, regular_pixels=self.grid_stack.regular.shape[0],
+                sub_to_regular=self.grid_stack.sub.sub_to_regular, sub_grid_weights=sub_grid_weights,
+                dtype=np.result_type(self.grid_stack.sub.dtype, np.float32).type)
+
+        if decorator_util.use_parallel_kernels():
+            mapping_matrix_from_sub_to_pix = mapper_util.mapping_matrix_from_sub_to_pix_parallel
+        else:
+            mapping_matrix_from_sub_to_pix = mapper_util.mapping_matrix_from_sub_to_pix
+
+        return mapping_matrix_from_sub_to_pix(sub_to_pix=self.sub_to_pix, pixels=self.pixels,
+                                              regular_pixels=self.grid_stack.regular.shape[0],
+                                              sub_to_regular=self.grid_stack.sub.sub_to_regular,
+                                              sub_grid_fraction=self.grid_stack.sub.sub_grid_fraction,
+                                              dtype=np.result_type(self.grid_stack.sub.dtype, np.float32).type)
+
+    @property
+    def mapping_matrix_sparse(self):
+        """The mapping matrix as a sparse (CSR) matrix, which is setup from the sub-grid to pixelization mappings \
+        without forming the dense mapping matrix (see *mapping_matrix*). Every sub-pixel adds its sub-grid fraction \
+        (or weight, for a sub-grid whose sub-pixels are weighted) to the entry of its regular pixel and pixelization \
+        pixel, where the duplicate entries of a regular pixel's sub-pixels are summed."""
+        sub_grid = self.grid_stack.sub
+        sub_to_regular = sub_grid.sub_to_regular
+        dtype = np.result_type(sub_grid.dtype, np.float32)
+
+        if sub_grid.sub_grid_weights is None:
+            values = np.full(sub_to_regular.shape[0], sub_grid.sub_grid_fraction, dtype=dtype)
+        else:
+            values = np.tile(sub_grid.sub_grid_weights.astype(dtype),
+                             sub_to_regular.shape[0] // sub_grid.sub_grid_length)
+
+        return sparse.csr_matrix((values, (sub_to_regular, self.sub_to_pix)),
+                                 shape=(self.grid_stack.regular.shape[0], self.pixels))
 
     @property
     def regular_to_pix(self):
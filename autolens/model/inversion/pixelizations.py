@@ -3,6 +3,7 @@ import scipy.spatial
 import sklearn.cluster
 
 from autolens import exc
+from autolens import timing
 from autolens.data.array import grids, scaled_array
 from autolens.model.inversion import mappers
 from autolens.model.inversion.util import pixelization_util
@@ -62,11 +63,18 @@ class ImagePlanePixelization(object):
 
         See *grid_stacks.SparseToRegularGrid* for details on how this grid is calculated.
 
+        The sparse grid is a property of the mask, and is therefore always computed from a float64 regular-grid. \
+        For a float32 regular-grid (see *lens_data.LensData*), the rounding of its coordinates would otherwise change \
+        which sparse-grid pixels fall within the mask, and thus the number and centres of the pixelization's pixels.
+
         Parameters
         -----------
         regular_grid : grids.RegularGrid
             The grid of (y,x) arc-second coordinates at the centre of every image value (e.g. image-pixels).
         """
+        if regular_grid.dtype != np.float64:
+            regular_grid = regular_grid.unlensed_grid
+
         imagepixel_scale = regular_grid.mask.pixel_scale
         pixel_scales = ((regular_grid.masked_shape_arcsec[0] + imagepixel_scale) / self.shape[0],
                         (regular_grid.masked_shape_arcsec[1] + imagepixel_scale) / self.shape[1])
@@ -155,10 +163,10 @@ class Rectangular(Pixelization):
         buffer : float
             The size the pixelization is buffered relative to the grid.
         """
-        y_min = np.min(grid[:, 0]) - buffer
-        y_max = np.max(grid[:, 0]) + buffer
-        x_min = np.min(grid[:, 1]) - buffer
-        x_max = np.max(grid[:, 1]) + buffer
+        y_min = float(np.min(grid[:, 0])) - buffer
+        y_max = float(np.max(grid[:, 0])) + buffer
+        x_min = float(np.min(grid[:, 1])) - buffer
+        x_max = float(np.max(grid[:, 1])) + buffer
         pixel_scales = (float((y_max - y_min) / self.shape[0]), float((x_max - x_min) / self.shape[1]))
         origin = ((y_max + y_min) / 2.0, (x_max + x_min) / 2.0)
         pixel_neighbors, pixel_neighbors_size = self.neighbors_from_pixelization()
@@ -184,7 +192,8 @@ class Rectangular(Pixelization):
         """
 
         if border is not None:
-            relocated_grid_stack = border.relocated_grid_stack_from_grid_stack(grid_stack)
+            with timing.timer('border_relocation'):
+                relocated_grid_stack = border.relocated_grid_stack_from_grid_stack(grid_stack)
         else:
             relocated_grid_stack = grid_stack
 
@@ -251,10 +260,10 @@ class Voronoi(Pixelization):
             An array of length (voronoi_pixels) which gives the number of neighbors of every pixel in the \
             Voronoi grid.
         """
-        y_min = np.min(grid[:, 0]) - buffer
-        y_max = np.max(grid[:, 0]) + buffer
-        x_min = np.min(grid[:, 1]) - buffer
-        x_max = np.max(grid[:, 1]) + buffer
+        y_min = float(np.min(grid[:, 0])) - buffer
+        y_max = float(np.max(grid[:, 0])) + buffer
+        x_min = float(np.min(grid[:, 1])) - buffer
+        x_max = float(np.max(grid[:, 1])) + buffer
         shape_arc_seconds = (y_max - y_min, x_max - x_min)
         origin = ((y_max + y_min) / 2.0, (x_max + x_min) / 2.0)
         return self.Geometry(shape_arc_seconds=shape_arc_seconds, pixel_centres=pixel_centres, origin=origin,
@@ -325,17 +334,19 @@ class AdaptiveMagnification(Voronoi, ImagePlanePixelization):
         """
 
         if border is not None:
-            relocated_grids = border.relocated_grid_stack_from_grid_stack(grid_stack)
+            with timing.timer('border_relocation'):
+                relocated_grids = border.relocated_grid_stack_from_grid_stack(grid_stack)
         else:
             relocated_grids = grid_stack
 
         pixel_centres = relocated_grids.pix
         pixels = pixel_centres.shape[0]
 
-        voronoi = self.voronoi_from_pixel_centers(pixel_centres)
+        with timing.timer('voronoi'):
+            voronoi = self.voronoi_from_pixel_centers(pixel_centres)
 
-        pixel_neighbors, pixel_neighbors_size = self.neighbors_from_pixelization(pixels=pixels,
-                                                                                 ridge_points=voronoi.ridge_points)
+            pixel_neighbors, pixel_neighbors_size = self.neighbors_from_pixelization(pixels=pixels,
+                                                                                     ridge_points=voronoi.ridge_points)
         geometry = self.geometry_from_grid(grid=relocated_grids.sub, pixel_centres=pixel_centres,
                                            pixel_neighbors=pixel_neighbors,
                                            pixel_neighbors_size=pixel_neighbors_size)
@@ -1,4 +1,5 @@
 import numpy as np
+from scipy import sparse
 
 from autolens.model.inversion.util import regularization_util
 
@@ -126,6 +127,9 @@ class Regularization(object):
     def regularization_matrix_from_pixel_neighbors(self, pixel_neighbors, pixel_neighbors_size):
         raise NotImplementedError("regularization_matrix_from_pixel_neighbors should be overridden")
 
+    def regularization_matrix_sparse_from_pixel_neighbors(self, pixel_neighbors, pixel_neighbors_size):
+        raise NotImplementedError("regularization_matrix_sparse_from_pixel_neighbors should be overridden")
+
 
 class Constant(Regularization):
 
@@ -153,6 +157,14 @@ class Constant(Regularization):
         return regularization_util.constant_regularization_matrix_from_pixel_neighbors(coefficients=self.coefficients,
                pixel_neighbors=pixel_neighbors, pixel_neighbors_size=pixel_neighbors_size)
 
+    def regularization_matrix_sparse_from_pixel_neighbors(self, pixel_neighbors, pixel_neighbors_size):
+        """The regularization matrix as a sparse (CSR) matrix, which is setup from its entries without forming the \
+        dense matrix (see *regularization_matrix_from_pixel_neighbors*)."""
+        rows, columns, values = regularization_util.constant_regularization_matrix_entries_from_pixel_neighbors(
+            coefficients=self.coefficients, pixel_neighbors=pixel_neighbors, pixel_neighbors_size=pixel_neighbors_size)
+        pixels = len(pixel_neighbors)
+        return sparse.csr_matrix((values, (rows, columns)), shape=(pixels, pixels))
+
 
 class Weighted(Regularization):
 
@@ -215,3 +227,13 @@ class Weighted(Regularization):
         return regularization_util.weighted_regularization_matrix_from_pixel_neighbors(
             regularization_weights=regularization_weights, pixel_neighbors=pixel_neighbors,
                                                  pixel_neighbors_size=pixel_neighbors_size)
+
+    def regularization_matrix_sparse_from_pixel_neighbors(self, regularization_weights, pixel_neighbors,
+                                                          pixel_neighbors_size):
+        """The regularization matrix as a sparse (CSR) matrix, which is setup from its entries without forming the \
+        dense matrix (see *regularization_matrix_from_pixel_neighbors*)."""
+        rows, columns, values = regularization_util.weighted_regularization_matrix_entries_from_pixel_neighbors(
+            regularization_weights=regularization_weights, pixel_neighbors=pixel_neighbors,
+            pixel_neighbors_size=pixel_neighbors_size)
+        pixels = len(regularization_weights)
+        return sparse.csr_matrix((values, (rows, columns)), shape=(pixels, pixels))
@@ -1,31 +1,54 @@
 from autolens import decorator_util
+from autolens import exc
+import numba
 import numpy as np
 
-@decorator_util.jit()
 def data_vector_from_blurred_mapping_matrix_and_data(blurred_mapping_matrix, image_1d, noise_map_1d):
     """Compute the hyper vector *D* from a blurred mapping matrix *f* and the 1D image *d* and 1D noise-map *\sigma* \
     (see Warren & Dye 2003).
     
     Parameters
     -----------
-    blurred_mapping_matrix : ndarray
+    blurred_mapping_matrix : ndarray or scipy.sparse.spmatrix
         The matrix representing the blurred mappings between sub-grid pixels and pixelization pixels.
     image_1d : ndarray
         Flattened 1D array of the observed image the inversion is fitting.
     noise_map_1d : ndarray
         Flattened 1D array of the noise-map used by the inversion during the fit.
     """
+    return data_vector_from_blurred_mapping_matrix_and_noise_weighted_image(
+        blurred_mapping_matrix=blurred_mapping_matrix,
+        noise_weighted_image_1d=noise_weighted_image_1d_from_image_1d_and_noise_map_1d(
+            image_1d=image_1d, noise_map_1d=noise_map_1d))
+
+def noise_weighted_image_1d_from_image_1d_and_noise_map_1d(image_1d, noise_map_1d):
+    """Compute the noise-weighted 1D image *d / \sigma^2*, which is the same for every inversion of the same image \
+    and noise-map (and can therefore be computed once, see *LensData*).
 
-    mapping_shape = blurred_mapping_matrix.shape
+    Parameters
+    -----------
+    image_1d : ndarray
+        Flattened 1D array of the observed image the inversion is fitting.
+    noise_map_1d : ndarray
+        Flattened 1D array of the noise-map used by the inversion during the fit.
+    """
+    return np.divide(image_1d, np.square(noise_map_1d))
 
-    data_vector = np.zeros(mapping_shape[1])
+def data_vector_from_blurred_mapping_matrix_and_noise_weighted_image(blurred_mapping_matrix, noise_weighted_image_1d):
+    """Compute the hyper vector *D* from a blurred mapping matrix *f* and the noise-weighted 1D image \
+    *d / \sigma^2*, as the matrix-vector product D = f^T (d / \sigma^2).
 
-    for image_index in range(mapping_shape[0]):
-        for pix_index in range(mapping_shape[1]):
-            data_vector[pix_index] += image_1d[image_index] * \
-                                      blurred_mapping_matrix[image_index, pix_index] / (noise_map_1d[image_index] ** 2.0)
+    For a dense blurred mapping matrix this product is performed by BLAS, and for a sparse matrix by a sparse \
+    matrix-vector product.
 
-    return data_vector
+    Parameters
+    -----------
+    blurred_mapping_matrix : ndarray or scipy.sparse.spmatrix
+        The matrix representing the blurred mappings between sub-grid pixels and pixelization pixels.
+    noise_weighted_image_1d : ndarray
+        Flattened 1D array of the observed image divided by the noise-map squared.
+    """
+    return blurred_mapping_matrix.T.dot(noise_weighted_image_1d)
 
 def curvature_matrix_from_blurred_mapping_matrix(blurred_mapping_matrix, noise_map_1d):
     """Compute the curvature matrix *F* from a blurred mapping matrix *f* and the 1D noise-map *\sigma* \
@@ -38,6 +61,8 @@ def curvature_matrix_from_blurred_mapping_matrix(blurred_mapping_matrix, noise_m
     noise_map_1d : ndarray
         Flattened 1D array of the noise-map used by the inversion during the fit.
     """
+    if decorator_util.use_parallel_kernels():
+        return curvature_matrix_from_blurred_mapping_matrix_parallel_jit(blurred_mapping_matrix, noise_map_1d)
 
     flist = np.zeros(blurred_mapping_matrix.shape[0])
     iflist = np.zeros(blurred_mapping_matrix.shape[0], dtype='int')
@@ -82,19 +107,211 @@ def curvature_matrix_from_blurred_mapping_matrix_jit(blurred_mapping_matrix, noi
 
     return curvature_matrix
 
-@decorator_util.jit()
-def reconstructed_data_vector_from_blurred_mapping_matrix_and_solution_vector(blurred_mapping_matrix, solution_vector):
-    """ Compute the reconstructed hyper vector from the blurrred mapping matrix *f* and solution vector *S*.
+@decorator_util.parallel_jit()
+def curvature_matrix_from_blurred_mapping_matrix_parallel_jit(blurred_mapping_matrix, noise_map_1d):
+    """The parallel variant of *curvature_matrix_from_blurred_mapping_matrix_jit*, where every row of the \
+    curvature matrix is computed by one thread.
+
+    The non-zero entries of the blurred mapping matrix divided by the noise-map are first stored by image pixel (rows) \
+    and by pixelization pixel (columns). Row *pixel_index* of the curvature matrix is then the sum, over every image \
+    pixel in column *pixel_index*, of that pixel's entry multiplied by the entries of its row.
 
     Parameters
     -----------
     blurred_mapping_matrix : ndarray
         The matrix representing the blurred mappings between sub-grid pixels and pixelization pixels.
+    noise_map_1d : ndarray
+        Flattened 1D array of the noise-map used by the inversion during the fit.
+    """
+    image_pixels = blurred_mapping_matrix.shape[0]
+    pixels = blurred_mapping_matrix.shape[1]
 
+    row_lengths = np.zeros(image_pixels, dtype=np.int64)
+
+    for image_index in numba.prange(image_pixels):
+        for pixel_index in range(pixels):
+            if blurred_mapping_matrix[image_index, pixel_index] > 0.0:
+                row_lengths[image_index] += 1
+
+    row_starts = np.zeros(image_pixels + 1, dtype=np.int64)
+    row_starts[1:] = np.cumsum(row_lengths)
+
+    row_indexes = np.zeros(row_starts[image_pixels], dtype=np.int64)
+    row_values = np.zeros(row_starts[image_pixels])
+
+    for image_index in numba.prange(image_pixels):
+        index = row_starts[image_index]
+        for pixel_index in range(pixels):
+            if blurred_mapping_matrix[image_index, pixel_index] > 0.0:
+                row_indexes[index] = pixel_index
+                row_values[index] = blurred_mapping_matrix[image_index, pixel_index] / noise_map_1d[image_index]
+                index += 1
+
+    column_starts = np.zeros(pixels + 1, dtype=np.int64)
+
+    for index in range(row_indexes.shape[0]):
+        column_starts[row_indexes[index] + 1] += 1
+
+    column_starts = np.cumsum(column_starts)
+
+    column_images = np.zeros(row_indexes.shape[0], dtype=np.int64)
+    column_values = np.zeros(row_indexes.shape[0])
+    column_lengths = np.zeros(pixels, dtype=np.int64)
+
+    for image_index in range(image_pixels):
+        for index in range(row_starts[image_index], row_starts[image_index + 1]):
+            pixel_index = row_indexes[index]
+            column_index = column_starts[pixel_index] + column_lengths[pixel_index]
+            column_images[column_index] = image_index
+            column_values[column_index] = row_values[index]
+            column_lengths[pixel_index] += 1
+
+    curvature_matrix = np.zeros((pixels, pixels))
+
+    for pixel_index in numba.prange(pixels):
+        for column_index in range(column_starts[pixel_index], column_starts[pixel_index + 1]):
+            image_index = column_images[column_index]
+            value = column_values[column_index]
+            for index in range(row_starts[image_index], row_starts[image_index + 1]):
+                curvature_matrix[pixel_index, row_indexes[index]] += value * row_values[index]
+
+    return curvature_matrix
+
+def reconstructed_data_vector_from_blurred_mapping_matrix_and_solution_vector(blurred_mapping_matrix, solution_vector):
+    """ Compute the reconstructed hyper vector from the blurrred mapping matrix *f* and solution vector *S*, as the \
+    matrix-vector product f S (performed by BLAS for a dense matrix, or a sparse matrix-vector product for a sparse \
+    matrix).
+
+    Parameters
+    -----------
+    blurred_mapping_matrix : ndarray or scipy.sparse.spmatrix
+        The matrix representing the blurred mappings between sub-grid pixels and pixelization pixels.
+    solution_vector : ndarray
+        The vector containing the reconstructed flux of every pixelization pixel.
+    """
+    return blurred_mapping_matrix.dot(solution_vector)
+
+def solution_vector_via_preconditioned_conjugate_gradient(operator, data_vector, preconditioner_diagonal,
+                                                          initial_solution_vector, tolerance, maximum_iterations):
+    """ Solve the linear system (F + H) S = D for the solution vector *S* using a Jacobi-preconditioned \
+    conjugate-gradient method, where the matrix (F + H) is only accessed via matrix-vector products.
+
+    Returns the solution vector and the number of iterations performed. If the residual has not converged to the \
+    tolerance within the maximum number of iterations an *InversionException* is raised, as the solution vector (and \
+    therefore the likelihood) would otherwise be silently inaccurate.
+
+    Parameters
+    -----------
+    operator : func
+        A function which returns the product of the (symmetric positive-definite) matrix and an input vector.
+    data_vector : ndarray
+        The data vector *D* of the linear system.
+    preconditioner_diagonal : ndarray
+        The diagonal of the matrix, whose inverse is used as the preconditioner.
+    initial_solution_vector : ndarray
+        The solution vector the iterations begin from (e.g. the solution of a previous, similar, linear system).
+    tolerance : float
+        The iterations stop when the norm of the residual relative to the norm of the data vector is below this value.
+    maximum_iterations : int
+        The maximum number of iterations performed.
     """
-    reconstructed_data_vector = np.zeros(blurred_mapping_matrix.shape[0])
-    for i in range(blurred_mapping_matrix.shape[0]):
-        for j in range(solution_vector.shape[0]):
-            reconstructed_data_vector[i] += solution_vector[j] * blurred_mapping_matrix[i, j]
+    solution_vector = np.array(initial_solution_vector, dtype='float64')
+
+    residual = data_vector - operator(solution_vector)
+    data_vector_norm = np.linalg.norm(data_vector)
+
+    if data_vector_norm == 0.0:
+        return np.zeros(data_vector.shape[0]), 0
+
+    preconditioned_residual = residual / preconditioner_diagonal
+    search_direction = preconditioned_residual.copy()
+    residual_dot = np.dot(residual, preconditioned_residual)
+
+    for iteration in range(maximum_iterations):
+
+        if np.linalg.norm(residual) <= tolerance * data_vector_norm:
+            return solution_vector, iteration
+
+        operator_search_direction = operator(search_direction)
+        step = residual_dot / np.dot(search_direction, operator_search_direction)
+
+        solution_vector += step * search_direction
+        residual -= step * operator_search_direction
+
+        preconditioned_residual = residual / preconditioner_diagonal
+        new_residual_dot = np.dot(residual, preconditioned_residual)
+        search_direction = preconditioned_residual + (new_residual_dot / residual_dot) * search_direction
+        residual_dot = new_residual_dot
+
+    if np.linalg.norm(residual) <= tolerance * data_vector_norm:
+        return solution_vector, maximum_iterations
+
+    raise exc.InversionException('The conjugate-gradient solve did not converge to a tolerance of {} within {} '
+                                 'iterations'.format(tolerance, maximum_iterations))
+
+def log_determinant_via_stochastic_lanczos_quadrature(operator, dimension, total_probes, lanczos_steps, seed):
+    """ Estimate the log determinant of a symmetric positive-definite matrix, which is only accessed via \
+    matrix-vector products, using stochastic Lanczos quadrature:
+
+    ln[det(A)] = Tr[ln(A)] ~ (N / N_probes) * sum_probes [ sum_k tau_k^2 ln(theta_k) ]
+
+    where theta_k and tau_k are the eigenvalues and first eigenvector components of the tridiagonal matrix computed \
+    by running Lanczos iterations on A from each (Rademacher) probe vector.
+
+    The probe vectors are generated from a fixed seed, such that the estimates of similar matrices (e.g. for \
+    successive samples of a non-linear search) are correlated and do not introduce noise into the likelihood surface.
+
+    Parameters
+    -----------
+    operator : func
+        A function which returns the product of the matrix and an input vector.
+    dimension : int
+        The dimension N of the matrix.
+    total_probes : int
+        The number of probe vectors used in the estimate.
+    lanczos_steps : int
+        The number of Lanczos iterations performed for each probe vector.
+    seed : int
+        The seed of the random number generator used to generate the probe vectors.
+    """
+    random_state = np.random.RandomState(seed)
+
+    lanczos_steps = min(lanczos_steps, dimension)
+
+    log_determinant = 0.0
+
+    for probe_index in range(total_probes):
+
+        lanczos_vectors = np.zeros((lanczos_steps, dimension))
+        alphas = []
+        betas = []
+
+        lanczos_vector = random_state.choice([-1.0, 1.0], size=dimension) / np.sqrt(dimension)
+        previous_lanczos_vector = np.zeros(dimension)
+        beta = 0.0
+
+        for step in range(lanczos_steps):
+
+            lanczos_vectors[step] = lanczos_vector
+
+            next_vector = operator(lanczos_vector) - beta * previous_lanczos_vector
+            alpha = np.dot(lanczos_vector, next_vector)
+            next_vector -= alpha * lanczos_vector
+            next_vector -= np.matmul(lanczos_vectors[:step + 1].T, np.matmul(lanczos_vectors[:step + 1], next_vector))
+
+            alphas.append(alpha)
+            beta = np.linalg.norm(next_vector)
+
+            if step == lanczos_steps - 1 or beta < 1.0e-10:
+                break
+
+            betas.append(beta)
+            previous_lanczos_vector = lanczos_vector
+            lanczos_vector = next_vector / beta
+
+        tridiagonal_matrix = np.diag(alphas) + np.diag(betas, k=1) + np.diag(betas, k=-1)
+        eigenvalues, eigenvectors = np.linalg.eigh(tridiagonal_matrix)
+
+        log_determinant += np.sum(eigenvectors[0, :] ** 2.0 * np.log(eigenvalues))
 
-    return reconstructed_data_vector
\ No newline at end of file
+    return dimension * log_determinant / total_probes
@@ -1,8 +1,10 @@
+import numba
 import numpy as np
 from autolens import decorator_util
 
 @decorator_util.jit()
-def mapping_matrix_from_sub_to_pix(sub_to_pix, pixels, regular_pixels, sub_to_regular, sub_grid_fraction):
+def mapping_matrix_from_sub_to_pix(sub_to_pix, pixels, regular_pixels, sub_to_regular, sub_grid_fraction,
+                                   dtype=np.float64):
     """Computes the mapping matrix, by iterating over the known mappings between the sub-grid and pixelization.
 
     Parameters
@@ -17,15 +19,88 @@ def mapping_matrix_from_sub_to_pix(sub_to_pix, pixels, regular_pixels, sub_to_re
         The mappings between the observed regular's sub-pixels and observed regular's pixels.
     sub_grid_fraction : float
         The fractional area each sub-pixel takes up in an regular-pixel.
+    dtype : type
+        The dtype of the mapping matrix (e.g. np.float32 for a float32 sub-grid).
     """
 
-    mapping_matrix = np.zeros((regular_pixels, pixels))
+    mapping_matrix = np.zeros((regular_pixels, pixels), dtype=dtype)
 
     for sub_index in range(sub_to_regular.shape[0]):
         mapping_matrix[sub_to_regular[sub_index], sub_to_pix[sub_index]] += sub_grid_fraction
 
     return mapping_matrix
 
+@decorator_util.parallel_jit()
+def mapping_matrix_from_sub_to_pix_parallel(sub_to_pix, pixels, regular_pixels, sub_to_regular, sub_grid_fraction,
+                                            dtype=np.float64):
+    """The parallel variant of *mapping_matrix_from_sub_to_pix*, where the row of every regular pixel is computed \
+    by one thread. This assumes the sub-pixels of every regular pixel are contiguous on the sub-grid and equal in \
+    number, as they are for a *SubGrid*."""
+
+    mapping_matrix = np.zeros((regular_pixels, pixels), dtype=dtype)
+
+    sub_grid_length = sub_to_regular.shape[0] // regular_pixels
+
+    for regular_index in numba.prange(regular_pixels):
+        for sub_index in range(regular_index * sub_grid_length, (regular_index + 1) * sub_grid_length):
+            mapping_matrix[regular_index, sub_to_pix[sub_index]] += sub_grid_fraction
+
+    return mapping_matrix
+
+@decorator_util.jit()
+def mapping_matrix_from_sub_to_pix_and_sub_grid_weights(sub_to_pix, pixels, regular_pixels, sub_to_regular,
+                                                        sub_grid_weights, dtype=np.float64):
+    """Computes the mapping matrix of a sub-grid whose sub-pixels are weighted (e.g. a Gauss-Legendre sub-grid), by \
+    iterating over the known mappings between the sub-grid and pixelization. Every sub-pixel adds its weight (as \
+    opposed to the sub-grid fraction of *mapping_matrix_from_sub_to_pix*) to the mapping matrix.
+
+    This assumes the sub-pixels of every regular pixel are contiguous on the sub-grid and equal in number, as they \
+    are for a *SubGrid*.
+
+    Parameters
+    -----------
+    sub_to_pix : ndarray
+        The mappings between the observed regular's sub-pixels and pixelization's pixels.
+    pixels : int
+        The number of pixels in the pixelization.
+    regular_pixels : int
+        The number of datas pixels in the observed datas and thus on the regular grid.
+    sub_to_regular : ndarray
+        The mappings between the observed regular's sub-pixels and observed regular's pixels.
+    sub_grid_weights : ndarray
+        The weight of every sub-pixel of a regular-pixel, in the order they are indexed on the sub-grid, which sum \
+        to one.
+    dtype : type
+        The dtype of the mapping matrix (e.g. np.float32 for a float32 sub-grid).
+    """
+
+    mapping_matrix = np.zeros((regular_pixels, pixels), dtype=dtype)
+
+    sub_grid_length = sub_grid_weights.shape[0]
+
+    for sub_index in range(sub_to_regular.shape[0]):
+        mapping_matrix[sub_to_regular[sub_index], sub_to_pix[sub_index]] += \
+            sub_grid_weights[sub_index % sub_grid_length]
+
+    return mapping_matrix
+
+@decorator_util.parallel_jit()
+def mapping_matrix_from_sub_to_pix_and_sub_grid_weights_parallel(sub_to_pix, pixels, regular_pixels, sub_to_regular,
+                                                                 sub_grid_weights, dtype=np.float64):
+    """The parallel variant of *mapping_matrix_from_sub_to_pix_and_sub_grid_weights*, where the row of every regular \
+    pixel is computed by one thread."""
+
+    mapping_matrix = np.zeros((regular_pixels, pixels), dtype=dtype)
+
+    sub_grid_length = sub_grid_weights.shape[0]
+
+    for regular_index in numba.prange(regular_pixels):
+        for sub_pixel in range(sub_grid_length):
+            sub_index = regular_index * sub_grid_length + sub_pixel
+            mapping_matrix[regular_index, sub_to_pix[sub_index]] += sub_grid_weights[sub_pixel]
+
+    return mapping_matrix
+
 @decorator_util.jit()
 def voronoi_regular_to_pix_from_grids_and_geometry(regular_grid, regular_to_nearest_pix, pixel_centres,
                                                    pixel_neighbors, pixel_neighbors_size):
@@ -32,6 +32,58 @@ def constant_regularization_matrix_from_pixel_neighbors(coefficients, pixel_neig
 
     return regularization_matrix
 
+@decorator_util.jit()
+def constant_regularization_matrix_entries_from_pixel_neighbors(coefficients, pixel_neighbors, pixel_neighbors_size):
+    """From the pixel-neighbors, compute the (row, column, value) entries of the regularization matrix using the \
+    constant regularization scheme, such that it can be setup as a sparse matrix (whose duplicate entries are summed) \
+    without forming the dense matrix of *constant_regularization_matrix_from_pixel_neighbors*.
+
+    Parameters
+    ----------
+    coefficients : tuple
+        The regularization coefficients which controls the degree of smoothing of the inversion reconstruction.
+    pixel_neighbors : ndarray
+        An array of length (total_pixels) which provides the index of all neighbors of every pixel in \
+        the Voronoi grid (entries of -1 correspond to no neighbor).
+    pixel_neighbors_size : ndarrayy
+        An array of length (total_pixels) which gives the number of neighbors of every pixel in the \
+        Voronoi grid.
+    """
+
+    pixels = len(pixel_neighbors)
+
+    total_entries = pixels + 2 * np.sum(pixel_neighbors_size)
+
+    rows = np.zeros(total_entries, dtype=np.int64)
+    columns = np.zeros(total_entries, dtype=np.int64)
+    values = np.zeros(total_entries)
+
+    regularization_coefficient = coefficients[0] ** 2.0
+
+    entry = 0
+
+    for i in range(pixels):
+
+        rows[entry] = i
+        columns[entry] = i
+        values[entry] = 1e-8
+        entry += 1
+
+        for j in range(pixel_neighbors_size[i]):
+            neighbor_index = pixel_neighbors[i, j]
+
+            rows[entry] = i
+            columns[entry] = i
+            values[entry] = regularization_coefficient
+            entry += 1
+
+            rows[entry] = i
+            columns[entry] = neighbor_index
+            values[entry] = -regularization_coefficient
+            entry += 1
+
+    return rows, columns, values
+
 @decorator_util.jit()
 def weighted_pixel_signals_from_images(pixels, signal_scale, regular_to_pix, galaxy_image):
     """Compute the (scaled) signal in each pixel, where the signal is the sum of its datas_-pixel fluxes. \
@@ -124,4 +176,60 @@ def weighted_regularization_matrix_from_pixel_neighbors(regularization_weights,
             regularization_matrix[i, neighbor_index] -= regularization_weight[neighbor_index]
             regularization_matrix[neighbor_index, i] -= regularization_weight[neighbor_index]
 
-    return regularization_matrix
\ No newline at end of file
+    return regularization_matrix
+
+@decorator_util.jit()
+def weighted_regularization_matrix_entries_from_pixel_neighbors(regularization_weights, pixel_neighbors,
+                                                                pixel_neighbors_size):
+    """From the pixel-neighbors, compute the (row, column, value) entries of the regularization matrix using the \
+    weighted regularization scheme, such that it can be setup as a sparse matrix (whose duplicate entries are summed) \
+    without forming the dense matrix of *weighted_regularization_matrix_from_pixel_neighbors*.
+
+    Parameters
+    ----------
+    regularization_weights : ndarray
+        The regularization_ weight of each pixel, which governs how much smoothing is applied to that individual pixel.
+    pixel_neighbors : ndarray
+        An array of length (total_pixels) which provides the index of all neighbors of every pixel in \
+        the Voronoi grid (entries of -1 correspond to no neighbor).
+    pixel_neighbors_size : ndarrayy
+        An array of length (total_pixels) which gives the number of neighbors of every pixel in the \
+        Voronoi grid.
+    """
+
+    pixels = len(regularization_weights)
+
+    total_entries = 4 * np.sum(pixel_neighbors_size)
+
+    rows = np.zeros(total_entries, dtype=np.int64)
+    columns = np.zeros(total_entries, dtype=np.int64)
+    values = np.zeros(total_entries)
+
+    regularization_weight = regularization_weights ** 2.0
+
+    entry = 0
+
+    for i in range(pixels):
+        for j in range(pixel_neighbors_size[i]):
+            neighbor_index = pixel_neighbors[i, j]
+            weight = regularization_weight[neighbor_index]
+
+            rows[entry] = i
+            columns[entry] = i
+            values[entry] = weight
+
+            rows[entry + 1] = neighbor_index
+            columns[entry + 1] = neighbor_index
+            values[entry + 1] = weight
+
+            rows[entry + 2] = i
+            columns[entry + 2] = neighbor_index
+            values[entry + 2] = -weight
+
+            rows[entry + 3] = neighbor_index
+            columns[entry + 3] = i
+            values[entry + 3] = -weight
+
+            entry += 4
+
+    return rows, columns, values
@@ -1,4 +1,5 @@
 import inspect
+from contextlib import contextmanager
 from functools import wraps
 
 import numpy as np
@@ -36,13 +37,130 @@ def transform_grid(func):
             A value or coordinate in the same coordinate system as those passed in.
         """
         if not isinstance(grid, TransformedGrid):
-            return func(profile, profile.transform_grid_to_reference_frame(grid), *args, **kwargs)
+            transformed_grid = transformed_grid_from_profile_and_grid(profile=profile, grid=grid)
+            return array_with_precision_of_grid(array=func(profile, transformed_grid, *args, **kwargs), grid=grid)
         else:
             return func(profile, grid, *args, **kwargs)
 
     return wrapper
 
 
+class TransformCache(object):
+
+    def __init__(self):
+        """A cache of the grids transformed to the reference frames of profiles, and of the radii computed from \
+        them, so that profiles with a common geometry (e.g. the light and mass profiles of a galaxy whose centres \
+        and orientations are aligned) evaluated on the same grid share one transformed grid and its radii.
+
+        Transformed grids are keyed on the grid and the profile's *transform_key* (its centre and, if it is \
+        elliptical, its rotation angle phi) and radii on the transformed grid and the quantities they depend on \
+        (e.g. the axis-ratio). Every grid a key refers to is held by the cache, so that its id is not reused while \
+        the cache is alive, and every cached array is read-only, so that one profile cannot change the transformed \
+        grid or radii of another.
+
+        The cache is used by profiles only while it is active, see *shared_transforms*.
+        """
+        self.arrays = {}
+
+    def array_from_grid_and_key(self, grid, key, func):
+        """Retrieve the array computed from a grid by *func* for a key, computing and storing it if it is not \
+        cached.
+
+        Parameters
+        ----------
+        grid : ndarray
+            The grid the array is computed from.
+        key : tuple
+            The key of the array (e.g. the profile geometry or axis-ratio it depends on).
+        func : () -> ndarray
+            The function computing the array.
+        """
+        cache_key = (id(grid),) + key
+
+        if cache_key not in self.arrays:
+            array = func()
+            array.flags.writeable = False
+            self.arrays[cache_key] = (grid, array)
+
+        return self.arrays[cache_key][1]
+
+
+_transform_cache = None
+
+
+@contextmanager
+def shared_transforms(transform_cache=None):
+    """Activate a transform cache (see *TransformCache*) for the profile evaluations within a with block, e.g. for \
+    the profiles of a galaxy or plane:
+
+        with geometry_profiles.shared_transforms():
+            intensities = sum(map(lambda p: p.intensities_from_grid(grid), light_profiles))
+
+    If a cache is already active (e.g. a plane's evaluation of its galaxies), it remains active, so that the \
+    transforms are shared across the outermost block.
+
+    Parameters
+    ----------
+    transform_cache : TransformCache or None
+        The cache which is activated. If *None*, a new cache is created unless one is already active.
+    """
+    global _transform_cache
+
+    if transform_cache is None and _transform_cache is not None:
+        yield _transform_cache
+        return
+
+    previous_transform_cache = _transform_cache
+    _transform_cache = transform_cache if transform_cache is not None else TransformCache()
+
+    try:
+        yield _transform_cache
+    finally:
+        _transform_cache = previous_transform_cache
+
+
+def transformed_grid_from_profile_and_grid(profile, grid):
+    """Transform a grid to the reference frame of a profile, retrieving it from the active transform cache (if \
+    there is one) when a profile of the same geometry has already transformed this grid."""
+
+    def transform():
+        return array_with_precision_of_grid(array=profile.transform_grid_to_reference_frame(grid), grid=grid)
+
+    if _transform_cache is None or profile.transform_key is None:
+        return transform()
+
+    return _transform_cache.array_from_grid_and_key(grid=grid, key=('transform',) + profile.transform_key,
+                                                    func=transform)
+
+
+def radii_from_transformed_grid(grid, key, func):
+    """Compute radii (e.g. elliptical radii) from a transformed grid via *func*, retrieving them from the active \
+    transform cache (if there is one) when they have already been computed for the same key."""
+    if _transform_cache is None:
+        return func()
+
+    return _transform_cache.array_from_grid_and_key(grid=grid, key=key, func=func)
+
+
+def array_with_precision_of_grid(array, grid):
+    """Cast an array computed from a float32 grid (e.g. the transformed grid, intensities or deflections of a \
+    profile) to float32, so that profiles evaluated on a float32 grid-stack (see *lens_data.LensData*) are float32 \
+    even where float64 profile parameters (e.g. the centre) are combined with the grid.
+
+    Arrays computed from a grid of any other dtype are returned unchanged.
+
+    Parameters
+    ----------
+    array : ndarray or float
+        The quantity computed from the grid.
+    grid : ndarray
+        The grid the quantity is computed from.
+    """
+    if grid.dtype == np.float32 and isinstance(array, np.ndarray) and array.dtype == np.float64:
+        return array.astype(np.float32)
+    return array
+
+
 class TransformedGrid(np.ndarray):
     pass
 
@@ -59,6 +177,12 @@ class GeometryProfile(object):
         """
         self.centre = centre
 
+    @property
+    def transform_key(self):
+        """The key of the transformed grids of this profile in a *TransformCache*, which is *None* for profiles \
+        whose transform is not cached."""
+        return None
+
     def transform_grid_to_reference_frame(self, grid):
         raise NotImplemented()
 
@@ -82,6 +206,10 @@ class SphericalProfile(GeometryProfile):
         """
         super(SphericalProfile, self).__init__(centre)
 
+    @property
+    def transform_key(self):
+        return 'spherical', tuple(self.centre)
+
     @transform_grid
     def grid_to_radius(self, grid):
         """Convert a grid of (y, x) coordinates to their circular radii.
@@ -93,7 +221,8 @@ class SphericalProfile(GeometryProfile):
         grid : TransformedGrid(ndarray)
             The (y, x) coordinates in the reference frame of the profile.
         """
-        return np.sqrt(np.add(np.square(grid[:, 0]), np.square(grid[:, 1])))
+        return radii_from_transformed_grid(grid=grid, key=('radii',),
+                                           func=lambda: np.sqrt(np.add(np.square(grid[:, 0]), np.square(grid[:, 1]))))
 
     def grid_angle_to_profile(self, grid_thetas):
         """The angle between each (y,x) coordinate on the grid and the profile, in radians.
@@ -165,6 +294,18 @@ class EllipticalProfile(SphericalProfile):
         self.axis_ratio = axis_ratio
         self.phi = phi
 
+    @property
+    def is_spherical(self):
+        """Whether the profile's geometry is spherical (an axis-ratio of 1.0 and no rotation), in which case its grid \
+        is transformed to its reference frame by only a translation to its centre."""
+        return self.axis_ratio == 1.0 and self.phi == 0.0
+
+    @property
+    def transform_key(self):
+        if self.is_spherical:
+            return super(EllipticalProfile, self).transform_key
+        return 'elliptical', tuple(self.centre), self.phi
+
     @property
     def phi_radians(self):
         return np.radians(self.phi)
@@ -221,7 +362,9 @@ class EllipticalProfile(SphericalProfile):
         grid : TransformedGrid(ndarray)
             The (y, x) coordinates in the reference frame of the elliptical profile.
         """
-        return np.sqrt(np.add(np.square(grid[:, 1]), np.square(np.divide(grid[:, 0], self.axis_ratio))))
+        return radii_from_transformed_grid(
+            grid=grid, key=('elliptical_radii', self.axis_ratio),
+            func=lambda: np.sqrt(np.add(np.square(grid[:, 1]), np.square(np.divide(grid[:, 0], self.axis_ratio)))))
 
     @transform_grid
     def grid_to_eccentric_radii(self, grid):
@@ -235,7 +378,9 @@ class EllipticalProfile(SphericalProfile):
         grid : TransformedGrid(ndarray)
             The (y, x) coordinates in the reference frame of the elliptical profile.
         """
-        return np.multiply(np.sqrt(self.axis_ratio), self.grid_to_elliptical_radii(grid)).view(np.ndarray)
+        return radii_from_transformed_grid(
+            grid=grid, key=('eccentric_radii', self.axis_ratio),
+            func=lambda: np.multiply(np.sqrt(self.axis_ratio), self.grid_to_elliptical_radii(grid)).view(np.ndarray))
 
     def transform_grid_to_reference_frame(self, grid):
         """Transform a grid of (y,x) coordinates to the reference frame of the profile, including a translation to \
@@ -246,8 +391,8 @@ class EllipticalProfile(SphericalProfile):
         grid : ndarray
             The (y, x) coordinates in the original reference frame of the grid.
         """
-        if self.__class__.__name__.startswith("Spherical"):
-            return super().transform_grid_to_reference_frame(grid)
+        if self.is_spherical:
+            return super(EllipticalProfile, self).transform_grid_to_reference_frame(grid)
         shifted_coordinates = np.subtract(grid, self.centre)
         radius = np.sqrt(np.sum(shifted_coordinates ** 2.0, 1))
         theta_coordinate_to_profile = np.arctan2(shifted_coordinates[:, 0],
@@ -265,8 +410,8 @@ class EllipticalProfile(SphericalProfile):
         grid : TransformedGrid(ndarray)
             The (y, x) coordinates in the reference frame of the profile.
         """
-        if self.__class__.__name__.startswith("Spherical"):
-            return super().transform_grid_from_reference_frame(grid)
+        if self.is_spherical:
+            return super(EllipticalProfile, self).transform_grid_from_reference_frame(grid)
 
         y = np.add(np.add(np.multiply(grid[:, 1], self.sin_phi), np.multiply(grid[:, 0], self.cos_phi)), self.centre[0])
         x = np.add(np.add(np.multiply(grid[:, 1], self.cos_phi), - np.multiply(grid[:, 0], self.sin_phi)),
@@ -1,5 +1,6 @@
 import numpy as np
 from scipy.integrate import quad
+from scipy.special import gammainccinv
 
 from autolens.model.profiles import geometry_profiles
 
@@ -34,6 +35,35 @@ class LightProfile(object):
         """
         raise NotImplementedError("intensity_from_grid should be overridden")
 
+    # noinspection PyMethodMayBeStatic,PyUnusedLocal
+    def truncation_radius(self, flux_fraction_tolerance):
+        """
+        The radius (in the radial coordinate the profile's intensities are computed from) outside of which the \
+        profile contains less than a fraction *flux_fraction_tolerance* of its total flux, such that its intensities \
+        outside of it can be neglected.
+
+        Profiles whose enclosed flux cannot be computed analytically are not truncated and return *None*.
+
+        Parameters
+        ----------
+        flux_fraction_tolerance : float
+            The fraction of the profile's total flux which may be neglected.
+        """
+        return None
+
+    # noinspection PyMethodMayBeStatic,PyUnusedLocal
+    def bounding_radius(self, flux_fraction_tolerance):
+        """
+        The radius of the circle, centred on the profile, which bounds the profile's truncation radius (see \
+        *truncation_radius*), such that intensities only need to be computed for coordinates inside it.
+
+        Parameters
+        ----------
+        flux_fraction_tolerance : float
+            The fraction of the profile's total flux which may be neglected.
+        """
+        return None
+
     def luminosity_within_circle(self, radius):
         raise NotImplementedError()
 
@@ -42,6 +72,19 @@ class LightProfile(object):
 
 
 # noinspection PyAbstractClass
+class LinearLightProfile(object):
+    """Mixin for a light profile whose intensity is not a parameter of the model, but is instead solved for \
+    linearly when the profile is fitted to an image (see *lens_fit.AbstractLensProfileFit*).
+
+    The model image is linear in the intensity of every light profile, thus the intensities which best-fit the image \
+    can be computed via a (non-negative) least-squares solution, reducing the dimensionality of the non-linear \
+    search. The intensity of a linear light profile is always 1.0, thus its images (and those of the galaxies, planes \
+    and tracers it is in) are unit images, unless they are computed from a fit's *tracer_with_linear_intensities*, \
+    whose linear light profiles have the intensities solved for by the fit.
+    """
+    pass
+
+
 class EllipticalLightProfile(geometry_profiles.EllipticalProfile, LightProfile):
     """Generic class for an elliptical light profiles"""
 
@@ -136,6 +179,27 @@ class EllipticalGaussian(EllipticalLightProfile):
         return np.multiply(np.divide(self.intensity, self.sigma * np.sqrt(2.0 * np.pi)),
                            np.exp(-0.5 * np.square(np.divide(grid_radii, self.sigma))))
 
+    def truncation_radius(self, flux_fraction_tolerance):
+        """The elliptical radius outside of which the Gaussian contains a fraction *flux_fraction_tolerance* of its \
+        total flux, which is sigma * sqrt(-2 ln(flux_fraction_tolerance)).
+
+        Parameters
+        ----------
+        flux_fraction_tolerance : float
+            The fraction of the profile's total flux which may be neglected.
+        """
+        return self.sigma * np.sqrt(-2.0 * np.log(flux_fraction_tolerance))
+
+    def bounding_radius(self, flux_fraction_tolerance):
+        """The elliptical radius is the distance along the major-axis, thus the truncation radius bounds the profile.
+
+        Parameters
+        ----------
+        flux_fraction_tolerance : float
+            The fraction of the profile's total flux which may be neglected.
+        """
+        return self.truncation_radius(flux_fraction_tolerance=flux_fraction_tolerance)
+
     @geometry_profiles.transform_grid
     def intensities_from_grid(self, grid):
         """
@@ -266,6 +330,33 @@ class EllipticalSersic(AbstractEllipticalSersic, EllipticalLightProfile):
             np.multiply(-self.sersic_constant,
                         np.add(np.power(np.divide(grid_radii, self.effective_radius), 1. / self.sersic_index), -1))))
 
+    def truncation_radius(self, flux_fraction_tolerance):
+        """The eccentric radius outside of which the Sersic profile contains a fraction *flux_fraction_tolerance* of \
+        its total flux.
+
+        The flux within an eccentric radius R is the regularized lower incomplete gamma function \
+        P(2n, b (R / R_eff)^(1/n)) of the total flux, thus the truncation radius is \
+        R_eff * (Q^-1(2n, flux_fraction_tolerance) / b)^n, where Q^-1 is the inverse of the upper incomplete gamma \
+        function.
+
+        Parameters
+        ----------
+        flux_fraction_tolerance : float
+            The fraction of the profile's total flux which may be neglected.
+        """
+        return self.effective_radius * np.power(
+            gammainccinv(2.0 * self.sersic_index, flux_fraction_tolerance) / self.sersic_constant, self.sersic_index)
+
+    def bounding_radius(self, flux_fraction_tolerance):
+        """An eccentric radius R extends to R / sqrt(axis_ratio) along the profile's major-axis.
+
+        Parameters
+        ----------
+        flux_fraction_tolerance : float
+            The fraction of the profile's total flux which may be neglected.
+        """
+        return self.truncation_radius(flux_fraction_tolerance=flux_fraction_tolerance) / np.sqrt(self.axis_ratio)
+
     @geometry_profiles.transform_grid
     def intensities_from_grid(self, grid):
         """ Calculate the intensity of the light profile on a grid of Cartesian (y,x) coordinates.
@@ -443,6 +534,13 @@ class EllipticalCoreSersic(EllipticalSersic):
                                                                   (self.effective_radius ** self.alpha)), (
                                                                 1.0 / (self.alpha * self.sersic_index)))))))
 
+    def truncation_radius(self, flux_fraction_tolerance):
+        """The flux enclosed by the cored-Sersic profile has no analytic form, thus it is not truncated."""
+        return None
+
+    def bounding_radius(self, flux_fraction_tolerance):
+        return None
+
 
 class SphericalCoreSersic(EllipticalCoreSersic):
 
@@ -476,3 +574,144 @@ class SphericalCoreSersic(EllipticalCoreSersic):
         self.intensity_break = intensity_break
         self.alpha = alpha
         self.gamma = gamma
+
+
+class EllipticalGaussianLinear(EllipticalGaussian, LinearLightProfile):
+
+    def __init__(self, centre=(0.0, 0.0), axis_ratio=1.0, phi=0.0, sigma=0.01):
+        """ The elliptical Gaussian light profile, whose intensity is solved for linearly.
+
+        Parameters
+        ----------
+        centre : (float, float)
+            The (y,x) arc-second coordinates of the profile centre.
+        axis_ratio : float
+            Ratio of light profiles ellipse's minor and major axes (b/a).
+        phi : float
+            Rotation angle of light profile counter-clockwise from positive x-axis.
+        sigma : float
+            The full-width half-maximum of the Gaussian.
+        """
+        super(EllipticalGaussianLinear, self).__init__(centre, axis_ratio, phi, 1.0, sigma)
+
+
+class SphericalGaussianLinear(SphericalGaussian, LinearLightProfile):
+
+    def __init__(self, centre=(0.0, 0.0), sigma=0.01):
+        """ The spherical Gaussian light profile, whose intensity is solved for linearly.
+
+        Parameters
+        ----------
+        centre : (float, float)
+            The (y,x) arc-second coordinates of the profile centre.
+        sigma : float
+            The full-width half-maximum of the Gaussian.
+        """
+        super(SphericalGaussianLinear, self).__init__(centre, 1.0, sigma)
+
+
+class EllipticalSersicLinear(EllipticalSersic, LinearLightProfile):
+
+    def __init__(self, centre=(0.0, 0.0), axis_ratio=1.0, phi=0.0, effective_radius=0.6, sersic_index=4.0):
+        """ The elliptical Sersic light profile, whose intensity is solved for linearly.
+
+        Parameters
+        ----------
+        centre : (float, float)
+            The (y,x) arc-second coordinates of the profile centre.
+        axis_ratio : float
+            Ratio of light profiles ellipse's minor and major axes (b/a).
+        phi : float
+            Rotation angle of light profile counter-clockwise from positive x-axis.
+        effective_radius : float
+            The circular radius containing half the light of this profile.
+        sersic_index : Int
+            Controls the concentration of the of the profile (lower value -> less concentrated, \
+            higher value -> more concentrated).
+        """
+        super(EllipticalSersicLinear, self).__init__(centre, axis_ratio, phi, 1.0, effective_radius, sersic_index)
+
+
+class SphericalSersicLinear(SphericalSersic, LinearLightProfile):
+
+    def __init__(self, centre=(0.0, 0.0), effective_radius=0.6, sersic_index=4.0):
+        """ The spherical Sersic light profile, whose intensity is solved for linearly.
+
+        Parameters
+        ----------
+        centre : (float, float)
+            The (y,x) arc-second coordinates of the profile centre.
+        effective_radius : float
+            The circular radius containing half the light of this profile.
+        sersic_index : Int
+            Controls the concentration of the of the light profile.
+        """
+        super(SphericalSersicLinear, self).__init__(centre, 1.0, effective_radius, sersic_index)
+
+
+class EllipticalExponentialLinear(EllipticalExponential, LinearLightProfile):
+
+    def __init__(self, centre=(0.0, 0.0), axis_ratio=1.0, phi=0.0, effective_radius=0.6):
+        """ The elliptical exponential profile, whose intensity is solved for linearly.
+
+        Parameters
+        ----------
+        centre : (float, float)
+            The (y,x) arc-second centre of the light profile.
+        axis_ratio : float
+            Ratio of light profiles ellipse's minor and major axes (b/a).
+        phi : float
+            Rotation angle of light profile counter-clockwise from positive x-axis.
+        effective_radius : float
+            The circular radius containing half the light of this profile.
+        """
+        super(EllipticalExponentialLinear, self).__init__(centre, axis_ratio, phi, 1.0, effective_radius)
+
+
+class SphericalExponentialLinear(SphericalExponential, LinearLightProfile):
+
+    def __init__(self, centre=(0.0, 0.0), effective_radius=0.6):
+        """ The spherical exponential profile, whose intensity is solved for linearly.
+
+        Parameters
+        ----------
+        centre : (float, float)
+            The (y,x) arc-second coordinates of the profile centre.
+        effective_radius : float
+            The circular radius containing half the light of this profile.
+        """
+        super(SphericalExponentialLinear, self).__init__(centre, 1.0, effective_radius)
+
+
+class EllipticalDevVaucouleursLinear(EllipticalDevVaucouleurs, LinearLightProfile):
+
+    def __init__(self, centre=(0.0, 0.0), axis_ratio=1.0, phi=0.0, effective_radius=0.6):
+        """ The elliptical Dev Vaucouleurs light profile, whose intensity is solved for linearly.
+
+        Parameters
+        ----------
+        centre : (float, float)
+            The (y,x) arc-second coordinates of the profile centre.
+        axis_ratio : float
+            Ratio of light profiles ellipse's minor and major axes (b/a).
+        phi : float
+            Rotation angle of light profile counter-clockwise from positive x-axis.
+        effective_radius : float
+            The circular radius containing half the light of this profile.
+        """
+        super(EllipticalDevVaucouleursLinear, self).__init__(centre, axis_ratio, phi, 1.0, effective_radius)
+
+
+class SphericalDevVaucouleursLinear(SphericalDevVaucouleurs, LinearLightProfile):
+
+    def __init__(self, centre=(0.0, 0.0), effective_radius=0.6):
+        """ The spherical Dev Vaucouleurs light profile, whose intensity is solved for linearly.
+
+        Parameters
+        ----------
+        centre : (float, float)
+            The (y,x) arc-second coordinates of the profile centre.
+        effective_radius : float
+            The circular radius containing half the light of this profile.
+        """
+        super(SphericalDevVaucouleursLinear, self).__init__(centre, 1.0, effective_radius)
@@ -10,9 +10,56 @@ from scipy.integrate import quad
 from autolens import decorator_util
 from autolens.model.profiles import geometry_profiles
 from autolens.model.profiles import light_profiles
+from autolens.model.profiles import radial_tables
+
+
+class DeferredIntegrand(object):
+
+    def __init__(self, integrand_function):
+        """An integrand of a mass profile (e.g. its *potential_func* or *deflection_func*), whose numba cfunc and \
+        scipy LowLevelCallable are compiled the first time it is used, as opposed to when its class is defined.
+
+        This means that importing PyAutoLens does not compile every integrand, and a process only compiles the \
+        integrands of the mass profiles it uses (a singular isothermal ellipsoid, for example, uses none).
+
+        As a class attribute, an integrand evaluates to its LowLevelCallable (which is passed to *quad*) whether it is \
+        accessed from the class or an instance.
+
+        Parameters
+        ----------
+        integrand_function : func
+            The integrand, whose first argument is the integration variable.
+        """
+        self.integrand_function = integrand_function
+        self._low_level_callable = None
+
+    def __get__(self, instance, owner):
+        return self.low_level_callable
+
+    @property
+    def is_compiled(self):
+        return self._low_level_callable is not None
+
+    @property
+    def low_level_callable(self):
+        if self._low_level_callable is None:
+            self._low_level_callable = low_level_callable_from_integrand(integrand_function=self.integrand_function)
+        return self._low_level_callable
+
+
+deferred_integrands = []
 
 
 def jit_integrand(integrand_function):
+    """Decorate the integrand of a mass profile, deferring its compilation until it is first used (see \
+    *DeferredIntegrand*). Every decorated integrand is listed in *deferred_integrands*, so that they can all be \
+    compiled in advance (see *autolens.precompile*)."""
+    deferred_integrand = DeferredIntegrand(integrand_function=integrand_function)
+    deferred_integrands.append(deferred_integrand)
+    return deferred_integrand
+
+
+def low_level_callable_from_integrand(integrand_function):
     jitted_function = decorator_util.jit(nopython=True, cache=True)(integrand_function)
     no_args = len(inspect.getfullargspec(integrand_function).args)
 
@@ -161,6 +208,58 @@ class EllipticalMassProfile(geometry_profiles.EllipticalProfile, MassProfile):
                / annuli_area
 
 
+# noinspection PyAbstractClass
+class SphericalEnclosedMassProfile(object):
+    """Mixin for a spherical mass profile whose deflection angles, which are radial, can be computed from its \
+    enclosed mass: the deflection angle at radius r is (2 / r) * integral_0^r kappa(r') r' dr'.
+
+    If radial tabulation is on (see *radial_tables*), this radial function is tabulated on log-spaced radii \
+    spanning the grid and interpolated, which replaces the numerical integral per coordinate of the profile's \
+    elliptical deflection angle calculation (which is used otherwise) with a few hundred integrals.
+    """
+
+    @geometry_profiles.transform_grid
+    def deflections_from_grid(self, grid):
+        """
+        Calculate the deflection angles at a given set of gridded coordinates.
+
+        Parameters
+        ----------
+        grid : grids.RegularGrid
+            The grid of (y,x) arc-second coordinates the deflection angles are computed on.
+        """
+        if not radial_tables.tabulate_radial_functions():
+            return super(SphericalEnclosedMassProfile, self).deflections_from_grid(grid)
+
+        deflection_r = radial_tables.radial_function_of_profile_from_radii(
+            profile=self, name='deflections', func=self.deflections_from_radii, radii=self.grid_to_radius(grid))
+
+        return self.grid_radius_to_cartesian(grid, deflection_r)
+
+    def deflections_from_radii(self, radii):
+        """Compute the radial deflection angles at an array of radii, by integrating r' * kappa(r') between \
+        consecutive (sorted) radii and summing the integrals to give the enclosed mass at every radius.
+
+        Parameters
+        ----------
+        radii : ndarray
+            The arc-second radii the deflection angles are computed at.
+        """
+        order = np.argsort(radii)
+        sorted_radii = radii[order]
+        lower_radii = np.concatenate(([0.0], sorted_radii[:-1]))
+
+        enclosed_mass = np.cumsum([quad(lambda radius: radius * self.surface_density_func(radius),
+                                        a=lower_radius, b=upper_radius)[0]
+                                   for lower_radius, upper_radius in zip(lower_radii, sorted_radii)])
+
+        deflections = np.zeros(radii.shape[0])
+        deflections[order] = np.divide(2.0 * enclosed_mass, sorted_radii, out=np.zeros(radii.shape[0]),
+                                       where=sorted_radii > 0.0)
+
+        return deflections
+
+
 class EllipticalCoredPowerLaw(EllipticalMassProfile, MassProfile):
 
     def __init__(self, centre=(0.0, 0.0), axis_ratio=1.0, phi=0.0, einstein_radius=1.0, slope=2.0, core_radius=0.01):
@@ -263,7 +362,6 @@ class EllipticalCoredPowerLaw(EllipticalMassProfile, MassProfile):
     def surface_density_func(self, radius):
         return self.einstein_radius_rescaled * (self.core_radius ** 2 + radius ** 2) ** (-(self.slope - 1) / 2.0)
 
-    @staticmethod
     @jit_integrand
     def potential_func(u, y, x, axis_ratio, slope, core_radius):
         eta = np.sqrt((u * ((x ** 2) + (y ** 2 / (1 - (1 - axis_ratio ** 2) * u)))))
@@ -271,7 +369,6 @@ class EllipticalCoredPowerLaw(EllipticalMassProfile, MassProfile):
                ((core_radius ** 2.0 + eta ** 2.0) ** ((3.0 - slope) / 2.0) -
                 core_radius ** (3 - slope)) / ((1 - (1 - axis_ratio ** 2) * u) ** 0.5)
 
-    @staticmethod
     @jit_integrand
     def deflection_func(u, y, x, npow, axis_ratio, einstein_radius_rescaled, slope, core_radius):
         eta_u = np.sqrt((u * ((x ** 2) + (y ** 2 / (1 - (1 - axis_ratio ** 2) * u)))))
@@ -343,14 +440,12 @@ class EllipticalPowerLaw(EllipticalCoredPowerLaw):
         else:
             return np.inf
 
-    @staticmethod
     @jit_integrand
     def potential_func(u, y, x, axis_ratio, slope, core_radius):
         eta_u = np.sqrt((u * ((x ** 2) + (y ** 2 / (1 - (1 - axis_ratio ** 2) * u)))))
         return (eta_u / u) * ((3.0 - slope) * eta_u) ** -1.0 * eta_u ** (3.0 - slope) / \
                ((1 - (1 - axis_ratio ** 2) * u) ** 0.5)
 
-    @staticmethod
     @jit_integrand
     def deflection_func(u, y, x, npow, axis_ratio, einstein_radius_rescaled, slope, core_radius):
         eta_u = np.sqrt((u * ((x ** 2) + (y ** 2 / (1 - (1 - axis_ratio ** 2) * u)))))
@@ -460,7 +555,11 @@ class EllipticalIsothermal(EllipticalPowerLaw):
             The grid of (y,x) arc-second coordinates the deflection angles are computed on.
         """
 
-        grid[(grid[:, 0] == 0.0) & (grid[:, 1] == 0.0)] = np.array([1.0e-8, 1.0e-8])
+        grid_at_centre = (grid[:, 0] == 0.0) & (grid[:, 1] == 0.0)
+
+        if np.any(grid_at_centre):
+            grid = grid.copy()
+            grid[grid_at_centre] = np.array([1.0e-8, 1.0e-8])
 
         try:
             factor = 2.0 * self.einstein_radius_rescaled * self.axis_ratio / np.sqrt(1 - self.axis_ratio ** 2)
@@ -590,6 +689,14 @@ class AbstractEllipticalGeneralizedNFW(EllipticalMassProfile, MassProfile):
 
 class EllipticalGeneralizedNFW(AbstractEllipticalGeneralizedNFW):
 
+    @jit_integrand
+    def tabulated_deflection_integrand(x, kappa_radius, scale_radius, inner_slope):
+        return (x + kappa_radius / scale_radius) ** (inner_slope - 3) * ((1 - np.sqrt(1 - x ** 2)) / x)
+
+    @jit_integrand
+    def tabulated_surface_density_integrand(x, kappa_radius, scale_radius, inner_slope):
+        return (3 - inner_slope) * (x + kappa_radius / scale_radius) ** (inner_slope - 4) * (1 - np.sqrt(1 - x * x))
+
     @geometry_profiles.transform_grid
     def potential_from_grid(self, grid, tabulate_bins=1000):
         """
@@ -603,10 +710,6 @@ class EllipticalGeneralizedNFW(AbstractEllipticalGeneralizedNFW):
             The number of bins to tabulate the inner integral of this profile.
         """
 
-        @jit_integrand
-        def deflection_integrand(x, kappa_radius, scale_radius, inner_slope):
-            return (x + kappa_radius / scale_radius) ** (inner_slope - 3) * ((1 - np.sqrt(1 - x ** 2)) / x)
-
         eta_min, eta_max, minimum_log_eta, maximum_log_eta, bin_size = self.tabulate_integral(grid, tabulate_bins)
 
         potential_grid = np.zeros(grid.shape[0])
@@ -617,7 +720,8 @@ class EllipticalGeneralizedNFW(AbstractEllipticalGeneralizedNFW):
             eta = 10. ** (minimum_log_eta + (i - 1) * bin_size)
 
             integral = \
-                quad(deflection_integrand, a=0.0, b=1.0, args=(eta, self.scale_radius, self.inner_slope),
+                quad(self.tabulated_deflection_integrand, a=0.0, b=1.0,
+                     args=(eta, self.scale_radius, self.inner_slope),
                      epsrel=EllipticalGeneralizedNFW.epsrel)[0]
 
             deflection_integral[i] = ((eta / self.scale_radius) ** (2 - self.inner_slope)) * (
@@ -648,10 +752,6 @@ class EllipticalGeneralizedNFW(AbstractEllipticalGeneralizedNFW):
             The number of bins to tabulate the inner integral of this profile.
         """
 
-        @jit_integrand
-        def surface_density_integrand(x, kappa_radius, scale_radius, inner_slope):
-            return (3 - inner_slope) * (x + kappa_radius / scale_radius) ** (inner_slope - 4) * (1 - np.sqrt(1 - x * x))
-
         def calculate_deflection_component(npow, index):
 
             deflection_grid = np.zeros(grid.shape[0])
@@ -677,8 +777,8 @@ class EllipticalGeneralizedNFW(AbstractEllipticalGeneralizedNFW):
         for i in range(tabulate_bins):
             eta = 10. ** (minimum_log_eta + (i - 1) * bin_size)
 
-            integral = quad(surface_density_integrand, a=0.0, b=1.0, args=(eta, self.scale_radius,
-                                                                           self.inner_slope),
+            integral = quad(self.tabulated_surface_density_integrand, a=0.0, b=1.0,
+                            args=(eta, self.scale_radius, self.inner_slope),
                             epsrel=EllipticalGeneralizedNFW.epsrel)[0]
 
             surface_density_integral[i] = ((eta / self.scale_radius) ** (1 - self.inner_slope)) * \
@@ -761,14 +861,28 @@ class SphericalGeneralizedNFW(EllipticalGeneralizedNFW):
             The grid of (y,x) arc-second coordinates the deflection angles are computed on.
         """
 
-        eta = np.multiply(1. / self.scale_radius, self.grid_to_radius(grid))
+        deflection_grid = radial_tables.radial_function_of_profile_from_radii(
+            profile=self, name='deflections', func=self.deflections_from_radii, radii=self.grid_to_radius(grid))
 
-        deflection_grid = np.zeros(grid.shape[0])
+        return self.grid_radius_to_cartesian(grid, deflection_grid)
 
-        for i in range(grid.shape[0]):
+    def deflections_from_radii(self, radii):
+        """Compute the radial deflection angles at an array of radii, via a numerical integral at every radius (or \
+        at every radius of its radial table, if radial tabulation is on).
+
+        Parameters
+        ----------
+        radii : ndarray
+            The arc-second radii the deflection angles are computed at.
+        """
+        eta = np.multiply(1. / self.scale_radius, radii)
+
+        deflection_grid = np.zeros(radii.shape[0])
+
+        for i in range(radii.shape[0]):
             deflection_grid[i] = np.multiply(4. * self.kappa_s * self.scale_radius, self.deflection_func_sph(eta[i]))
 
-        return self.grid_radius_to_cartesian(grid, deflection_grid)
+        return deflection_grid
 
     @staticmethod
     def deflection_integrand(y, eta, inner_slope):
@@ -865,7 +979,6 @@ class EllipticalNFW(AbstractEllipticalGeneralizedNFW):
         radius = (1.0 / self.scale_radius) * radius
         return 2.0 * self.kappa_s * (1 - self.coord_func(radius)) / (radius ** 2 - 1)
 
-    @staticmethod
     @jit_integrand
     def potential_func(u, y, x, axis_ratio, kappa_s, scale_radius):
 
@@ -882,7 +995,6 @@ class EllipticalNFW(AbstractEllipticalGeneralizedNFW):
                 (np.log(eta_u / 2.0) + eta_u_2) / eta_u) / (
                        (1 - (1 - axis_ratio ** 2) * u) ** 0.5)
 
-    @staticmethod
     @jit_integrand
     def deflection_func(u, y, x, npow, axis_ratio, kappa_s, scale_radius):
 
@@ -1014,7 +1126,6 @@ class AbstractEllipticalSersic(light_profiles.AbstractEllipticalSersic, Elliptic
 
 
 class EllipticalSersic(AbstractEllipticalSersic):
-    @staticmethod
     @jit_integrand
     def deflection_func(u, y, x, npow, axis_ratio, intensity, sersic_index, effective_radius, mass_to_light_ratio,
                         sersic_constant):
@@ -1057,7 +1168,7 @@ class EllipticalSersic(AbstractEllipticalSersic):
         return self.rotate_grid_from_profile(np.multiply(1.0, np.vstack((deflection_y, deflection_x)).T))
 
 
-class SphericalSersic(EllipticalSersic):
+class SphericalSersic(SphericalEnclosedMassProfile, EllipticalSersic):
 
     def __init__(self, centre=(0.0, 0.0), intensity=0.1, effective_radius=0.6, sersic_index=4.0,
                  mass_to_light_ratio=1.0):
@@ -1110,7 +1221,7 @@ class EllipticalExponential(EllipticalSersic):
                                                     mass_to_light_ratio)
 
 
-class SphericalExponential(EllipticalExponential):
+class SphericalExponential(SphericalEnclosedMassProfile, EllipticalExponential):
 
     def __init__(self, centre=(0.0, 0.0), intensity=0.1, effective_radius=0.6, mass_to_light_ratio=1.0):
         """
@@ -1158,7 +1269,7 @@ class EllipticalDevVaucouleurs(EllipticalSersic):
                                                        mass_to_light_ratio)
 
 
-class SphericalDevVaucouleurs(EllipticalDevVaucouleurs):
+class SphericalDevVaucouleurs(SphericalEnclosedMassProfile, EllipticalDevVaucouleurs):
 
     def __init__(self, centre=(0.0, 0.0), intensity=0.1, effective_radius=0.6, mass_to_light_ratio=1.0):
         """
@@ -1261,7 +1372,6 @@ class EllipticalSersicRadialGradient(AbstractEllipticalSersic):
                   radius) /
                  self.effective_radius) ** -self.mass_to_light_gradient) * self.intensity_at_radius(radius))
 
-    @staticmethod
     @jit_integrand
     def deflection_func(u, y, x, npow, axis_ratio, intensity, sersic_index, effective_radius, mass_to_light_ratio,
                         mass_to_light_gradient, sersic_constant):
@@ -1273,7 +1383,7 @@ class EllipticalSersicRadialGradient(AbstractEllipticalSersic):
                        (1 - (1 - axis_ratio ** 2) * u) ** (npow + 0.5))
 
 
-class SphericalSersicRadialGradient(EllipticalSersicRadialGradient):
+class SphericalSersicRadialGradient(SphericalEnclosedMassProfile, EllipticalSersicRadialGradient):
 
     def __init__(self, centre=(0.0, 0.0), intensity=0.1, effective_radius=0.6, sersic_index=4.0,
                  mass_to_light_ratio=1.0, mass_to_light_gradient=0.0):
@@ -0,0 +1,271 @@
+from collections import OrderedDict
+
+import numpy as np
+from scipy.interpolate import CubicSpline
+
+from autofit import conf
+
+"""
+Tabulate the radial functions of spherical profiles.
+
+The deflection angles of a spherical mass profile and the intensities of a spherical light profile depend only on \
+the radius of each coordinate, yet some profiles compute them coordinate by coordinate (e.g. the spherical \
+generalized NFW profile evaluates a numerical integral for every sub-pixel). If radial tabulation is on, the radial \
+function is instead evaluated on a table of log-spaced radii spanning the grid's radii, and interpolated (by a cubic \
+spline in log radius) at every coordinate.
+
+The table's accuracy is checked by evaluating the function at the midpoint of every bin of the table, and the number \
+of bins is doubled until the interpolation error at the midpoints is below the tolerance (relative to the maximum of \
+the function on the table). If the tolerance cannot be met within the maximum number of bins, the function is \
+evaluated at every coordinate instead.
+
+Tables are cached per profile parameters (excluding the centre, which the radii are relative to), so that every \
+evaluation of a profile with the same parameters (e.g. on the sub-grid and blurring-grid, or in the next fit of a \
+phase whose non-linear search only varies other profiles) reuses its table. Radial tabulation is turned on for a \
+process with, for example:
+
+    radial_tables.set_radial_tabulation(tabulate=True, bins=200, tolerance=1.0e-5)
+
+or by 'tabulate_radial_functions' in the [profiles] section of the general config.
+"""
+
+if conf.instance.general.has("profiles", "tabulate_radial_functions"):
+    tabulate = conf.instance.general.get("profiles", "tabulate_radial_functions", bool)
+else:
+    tabulate = False
+
+bins = 200
+maximum_bins = 3200
+tolerance = 1.0e-5
+
+_tabulate = tabulate
+_bins = bins
+_tolerance = tolerance
+
+
+def set_radial_tabulation(tabulate=True, bins=None, tolerance=None):
+    """Choose whether spherical profiles tabulate their radial functions in this process, and optionally the \
+    initial number of bins and the tolerance of the tables.
+
+    Parameters
+    ----------
+    tabulate : bool
+        If True, the radial functions of spherical profiles are tabulated and interpolated.
+    bins : int or None
+        The initial number of log-spaced bins of a table, which is doubled until the tolerance is met. If None, it \
+        is unchanged.
+    tolerance : float or None
+        The maximum interpolation error at the midpoints of the table's bins, relative to the maximum of the \
+        function on the table. If None, it is unchanged.
+    """
+    global _tabulate, _bins, _tolerance
+
+    _tabulate = tabulate
+
+    if bins is not None:
+        _bins = bins
+
+    if tolerance is not None:
+        _tolerance = tolerance
+
+    radial_table_cache.clear()
+
+
+def tabulate_radial_functions():
+    return _tabulate
+
+
+class RadialTable(object):
+
+    def __init__(self, radius_min, radius_max, radii, values, spline):
+        """A table of a radial function on log-spaced radii, interpolated by a cubic spline in log radius.
+
+        Parameters
+        ----------
+        radius_min : float
+            The minimum radius the table spans.
+        radius_max : float
+            The maximum radius the table spans.
+        radii : ndarray
+            The radii of the table.
+        values : ndarray
+            The radial function at every radius of the table.
+        spline : scipy.interpolate.CubicSpline or None
+            The spline interpolating the values in log radius, which is *None* if the table did not meet its \
+            tolerance.
+        """
+        self.radius_min = radius_min
+        self.radius_max = radius_max
+        self.radii = radii
+        self.values = values
+        self.spline = spline
+
+    @classmethod
+    def from_function(cls, func, radius_min, radius_max, bins, tolerance, maximum_bins=maximum_bins):
+        """Tabulate a radial function between two radii, doubling the number of bins from *bins* until the \
+        interpolation error at the midpoints of the bins is below the tolerance.
+
+        Parameters
+        ----------
+        func : (ndarray) -> ndarray
+            The radial function, which is evaluated on an array of radii.
+        radius_min : float
+            The minimum (positive) radius the table spans.
+        radius_max : float
+            The maximum radius the table spans.
+        bins : int
+            The initial number of bins of the table.
+        tolerance : float
+            The maximum interpolation error at the midpoints of the bins, relative to the maximum of the function.
+        maximum_bins : int
+            The maximum number of bins, above which the table is not used (see *values_from_radii*).
+        """
+        log_radii = np.linspace(np.log(radius_min), np.log(radius_max), bins + 1)
+        values = np.asarray(func(np.exp(log_radii)), dtype='float64')
+
+        while True:
+
+            spline = CubicSpline(log_radii, values)
+
+            log_midpoints = 0.5 * (log_radii[1:] + log_radii[:-1])
+            midpoint_values = np.asarray(func(np.exp(log_midpoints)), dtype='float64')
+
+            error = np.max(np.abs(spline(log_midpoints) - midpoint_values))
+            scale = max(np.max(np.abs(values)), np.max(np.abs(midpoint_values)))
+
+            if error <= tolerance * scale:
+                return RadialTable(radius_min=radius_min, radius_max=radius_max, radii=np.exp(log_radii),
+                                   values=values, spline=spline)
+
+            if 2 * bins > maximum_bins:
+                return RadialTable(radius_min=radius_min, radius_max=radius_max, radii=np.exp(log_radii),
+                                   values=values, spline=None)
+
+            bins *= 2
+
+            interleaved_log_radii = np.empty(bins + 1)
+            interleaved_log_radii[0::2] = log_radii
+            interleaved_log_radii[1::2] = log_midpoints
+
+            interleaved_values = np.empty(bins + 1)
+            interleaved_values[0::2] = values
+            interleaved_values[1::2] = midpoint_values
+
+            log_radii, values = interleaved_log_radii, interleaved_values
+
+    @property
+    def bins(self):
+        return self.radii.shape[0] - 1
+
+    def spans_radii(self, radius_min, radius_max):
+        return self.radius_min <= radius_min and radius_max <= self.radius_max
+
+    def values_from_radii(self, radii, func):
+        """Interpolate the radial function at radii spanned by the table, evaluating *func* directly at radii outside \
+        it (e.g. a radius of zero) or at every radius if the table did not meet its tolerance."""
+        if self.spline is None:
+            return func(radii)
+
+        inside = (radii >= self.radius_min) & (radii <= self.radius_max)
+
+        if np.all(inside):
+            return self.spline(np.log(radii))
+
+        values = np.zeros(radii.shape[0])
+        values[inside] = self.spline(np.log(radii[inside]))
+        values[~inside] = func(radii[~inside])
+
+        return values
+
+
+class RadialTableCache(object):
+
+    def __init__(self, max_size=64):
+        """A cache of the radial tables of profiles, keyed on the profile's class and parameters (excluding its \
+        centre) and the name of the tabulated function. The least recently used table is removed when the cache \
+        holds more than *max_size* tables.
+        """
+        self.max_size = max_size
+        self.tables = OrderedDict()
+
+    def table_from_key(self, key):
+        if key in self.tables:
+            self.tables.move_to_end(key)
+            return self.tables[key]
+        return None
+
+    def add_table(self, key, table):
+        self.tables[key] = table
+        self.tables.move_to_end(key)
+        if len(self.tables) > self.max_size:
+            self.tables.popitem(last=False)
+
+    def clear(self):
+        self.tables.clear()
+
+
+radial_table_cache = RadialTableCache()
+
+
+def radial_table_key(profile, name):
+    """The key of a profile's radial table in a *RadialTableCache*, from its class, its parameters (excluding its \
+    centre) and the name of the function."""
+
+    def hashable(value):
+        if isinstance(value, (list, tuple, np.ndarray)):
+            return tuple(map(hashable, value))
+        return value
+
+    parameters = tuple(sorted((attribute, hashable(value)) for attribute, value in profile.__dict__.items()
+                              if attribute != 'centre'))
+    return type(profile), name, parameters
+
+
+def radial_function_of_profile_from_radii(profile, name, func, radii):
+    """Compute a profile's radial function at radii, by interpolating its (cached) radial table if radial \
+    tabulation is on (see *set_radial_tabulation*) and by evaluating the function at every radius otherwise.
+
+    The table spans the positive radii passed to it, and is extended (by retabulating) if later radii fall outside \
+    of it.
+
+    Parameters
+    ----------
+    profile : geometry_profiles.SphericalProfile
+        The profile whose radial function is computed.
+    name : str
+        The name of the radial function (e.g. 'deflections'), to distinguish the tables of a profile.
+    func : (ndarray) -> ndarray
+        The radial function, which is evaluated on an array of radii.
+    radii : ndarray
+        The radii the function is computed at.
+    """
+    radii = np.asarray(radii)
+
+    positive_radii = radii[radii > 0.0]
+
+    if not _tabulate or positive_radii.shape[0] < _bins:
+        return func(radii)
+
+    radius_min = np.min(positive_radii)
+    radius_max = np.max(positive_radii)
+
+    if radius_max <= radius_min:
+        return func(radii)
+
+    key = radial_table_key(profile=profile, name=name)
+
+    table = radial_table_cache.table_from_key(key=key)
+
+    if table is None or not table.spans_radii(radius_min=radius_min, radius_max=radius_max):
+
+        if table is not None:
+            radius_min = min(radius_min, table.radius_min)
+            radius_max = max(radius_max, table.radius_max)
+
+        table = RadialTable.from_function(func=func, radius_min=radius_min, radius_max=radius_max, bins=_bins,
+                                          tolerance=_tolerance)
+
+        radial_table_cache.add_table(key=key, table=table)
+
+    return table.values_from_radii(radii=radii, func=func)
+
@@ -0,0 +1,300 @@
+import json
+import logging
+import multiprocessing
+import os
+import time
+
+from autofit import conf
+from autolens import decorator_util
+from autolens import exc
+from autolens.data import ccd
+
+logger = logging.getLogger(__name__)
+
+thread_environment_variables = ['OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'NUMBA_NUM_THREADS']
+
+
+class BatchLens(object):
+
+    def __init__(self, name, data_path, pixel_scale, image_name='image.fits', psf_name='psf.fits',
+                 noise_map_name='noise_map.fits', positions_name=None):
+        """A lens in a batch of lenses, which points to the directory its ccd data is loaded from.
+
+        Parameters
+        ----------
+        name : str
+            The name of the lens, which is also the name of its output directory.
+        data_path : str
+            The path to the directory containing the lens's .fits files.
+        pixel_scale : float
+            The size of each pixel in arc seconds.
+        image_name : str
+            The file name of the image in the data directory.
+        psf_name : str
+            The file name of the PSF in the data directory.
+        noise_map_name : str
+            The file name of the noise-map in the data directory.
+        positions_name : str or None
+            The file name of the lens's image-plane positions, if it has any.
+        """
+        self.name = name
+        self.data_path = data_path
+        self.pixel_scale = pixel_scale
+        self.image_name = image_name
+        self.psf_name = psf_name
+        self.noise_map_name = noise_map_name
+        self.positions_name = positions_name
+
+    def load_ccd_data(self):
+        return ccd.load_ccd_data_from_fits(image_path=os.path.join(self.data_path, self.image_name),
+                                           psf_path=os.path.join(self.data_path, self.psf_name),
+                                           noise_map_path=os.path.join(self.data_path, self.noise_map_name),
+                                           pixel_scale=self.pixel_scale)
+
+    def load_positions(self):
+        if self.positions_name is None:
+            return None
+        return ccd.load_positions(positions_path=os.path.join(self.data_path, self.positions_name))
+
+
+def lenses_from_directory(data_path, pixel_scale, image_name='image.fits'):
+    """Create a lens for every sub-directory of a directory which contains an image, sorted by name.
+
+    Parameters
+    ----------
+    data_path : str
+        The directory containing one sub-directory of .fits files per lens.
+    pixel_scale : float
+        The size of each pixel in arc seconds, which is the same for every lens.
+    image_name : str
+        The file name of the image which a sub-directory must contain to be a lens.
+    """
+    return [BatchLens(name=name, data_path=os.path.join(data_path, name), pixel_scale=pixel_scale,
+                      image_name=image_name)
+            for name in sorted(os.listdir(data_path))
+            if os.path.isfile(os.path.join(data_path, name, image_name))]
+
+
+def lenses_from_manifest(manifest_path):
+    """Create the lenses listed in a .json manifest, which is a list with an entry per lens of the form \
+    {"name": "slacs1430+4105", "data_path": "slacs/slacs1430+4105", "pixel_scale": 0.03}. Entries may also give \
+    the image_name, psf_name, noise_map_name and positions_name of the lens.
+
+    A relative data_path is relative to the directory of the manifest. If data_path is omitted, the lens's data is \
+    in a directory of its name next to the manifest.
+
+    Parameters
+    ----------
+    manifest_path : str
+        The path to the .json manifest of lenses.
+    """
+    with open(manifest_path, 'r') as manifest_file:
+        entries = json.load(manifest_file)
+
+    manifest_directory = os.path.dirname(os.path.abspath(manifest_path))
+
+    lenses = []
+
+    for entry in entries:
+
+        if 'name' not in entry or 'pixel_scale' not in entry:
+            raise exc.BatchException('Every lens in the manifest {} requires a name and pixel_scale - the entry {} '
+                                     'does not have both'.format(manifest_path, entry))
+
+        entry = dict(entry)
+        entry['data_path'] = os.path.join(manifest_directory, entry.get('data_path', entry['name']))
+        lenses.append(BatchLens(**entry))
+
+    names = [lens.name for lens in lenses]
+
+    if len(set(names)) != len(names):
+        raise exc.BatchException('The lens names in the manifest {} are not unique, thus their output would not be '
+                                 'isolated'.format(manifest_path))
+
+    return lenses
+
+
+class BatchRunner(object):
+
+    def __init__(self, pipeline_maker, output_path, config_path=None, cores=1, cores_per_lens=1, pipeline_path=''):
+        """Fit a sample of lenses with the same pipeline, scheduling every lens in a pool of worker processes.
+
+        Each lens is fitted with its output isolated in the directory output_path/lens_name/. Every completed (or \
+        failed) lens is recorded in the file output_path/batch_progress.json as soon as it finishes, so a batch that \
+        is interrupted and run again only fits the lenses which did not complete.
+
+        The pipeline maker (e.g. the *make_pipeline* function of a workspace pipeline module) must be a module-level \
+        function, so that it can be passed to worker processes. As workers are spawned, a runner script must call \
+        *run* inside an *if __name__ == '__main__':* block.
+
+        Parameters
+        ----------
+        pipeline_maker : func
+            A function which takes a pipeline_path and returns the pipeline each lens is fitted with.
+        output_path : str
+            The directory the output of every lens, the progress file and the summary table are written to.
+        config_path : str or None
+            The config directory used by every lens. If None, the config path of the current config is used.
+        cores : int
+            The total number of cores the batch uses.
+        cores_per_lens : int
+            The number of cores (threads) each lens's fit uses, such that cores / cores_per_lens lenses are fitted \
+            in parallel.
+        pipeline_path : str
+            The path passed to the pipeline maker, which prefixes the phase names of every lens's pipeline.
+        """
+        if cores_per_lens < 1 or cores_per_lens > cores:
+            raise exc.BatchException('The cores_per_lens ({}) must be between 1 and the total number of cores '
+                                     '({})'.format(cores_per_lens, cores))
+
+        self.pipeline_maker = pipeline_maker
+        self.output_path = output_path
+        self.config_path = config_path if config_path is not None else conf.instance.config_path
+        self.cores = cores
+        self.cores_per_lens = cores_per_lens
+        self.pipeline_path = pipeline_path
+
+    @property
+    def processes(self):
+        return self.cores // self.cores_per_lens
+
+    @property
+    def progress_path(self):
+        return os.path.join(self.output_path, 'batch_progress.json')
+
+    @property
+    def summary_path(self):
+        return os.path.join(self.output_path, 'batch_summary.txt')
+
+    def output_path_for_lens(self, lens):
+        return os.path.join(self.output_path, lens.name) + '/'
+
+    def load_progress(self):
+        """Load the most recent record of every lens in the progress file, as a dictionary keyed on lens name."""
+        progress = {}
+
+        if os.path.isfile(self.progress_path):
+            with open(self.progress_path, 'r') as progress_file:
+                for line in progress_file:
+                    if line.strip():
+                        record = json.loads(line)
+                        progress[record['name']] = record
+
+        return progress
+
+    def completed_lens_names(self):
+        return [name for name, record in self.load_progress().items() if record['status'] == 'completed']
+
+    def run_lens(self, lens):
+        """Fit a lens with the pipeline, with the config's output path set to the lens's output directory, and return \
+        a record of its status, runtime and the figure of merit (e.g. the evidence) of its final phase.
+
+        An exception raised by the lens's fit is recorded as a failure, such that it does not stop the batch.
+        """
+        previous_config = conf.instance
+        start = time.time()
+
+        record = {'name': lens.name, 'status': 'completed', 'runtime': None, 'figure_of_merit': None, 'error': None}
+
+        try:
+            conf.instance = conf.Config(config_path=self.config_path, output_path=self.output_path_for_lens(lens))
+            pipeline = self.pipeline_maker(pipeline_path=self.pipeline_path)
+            results = pipeline.run(data=lens.load_ccd_data(), positions=lens.load_positions())
+            if results:
+                record['figure_of_merit'] = float(results[-1].figure_of_merit)
+        except Exception as e:
+            logger.exception('The fit of lens {} failed'.format(lens.name))
+            record['status'] = 'failed'
+            record['error'] = '{}: {}'.format(type(e).__name__, e)
+        finally:
+            conf.instance = previous_config
+
+        record['runtime'] = time.time() - start
+
+        return record
+
+    def run(self, lenses):
+        """Fit every lens which has not already been completed, recording each in the progress file as it finishes, \
+        and write a summary table of every lens's status, runtime and figure of merit.
+
+        Parameters
+        ----------
+        lenses : [BatchLens]
+            The lenses of the batch (e.g. from *lenses_from_directory* or *lenses_from_manifest*).
+        """
+        if not os.path.exists(self.output_path):
+            os.makedirs(self.output_path)
+
+        completed_lens_names = self.completed_lens_names()
+
+        remaining_lenses = [lens for lens in lenses if lens.name not in completed_lens_names]
+
+        logger.info('Batch of {} lenses, {} already completed, fitting {} using {} processes'.format(
+            len(lenses), len(lenses) - len(remaining_lenses), len(remaining_lenses), self.processes))
+
+        if self.processes > 1 and len(remaining_lenses) > 1:
+            pool = self.make_pool()
+            records = pool.imap_unordered(_run_lens, remaining_lenses)
+        else:
+            pool = None
+            records = map(self.run_lens, remaining_lenses)
+
+        try:
+            with open(self.progress_path, 'a') as progress_file:
+                for record in records:
+                    progress_file.write(json.dumps(record) + '\n')
+                    progress_file.flush()
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        progress = self.load_progress()
+        records = [progress[lens.name] for lens in lenses if lens.name in progress]
+
+        with open(self.summary_path, 'w') as summary_file:
+            summary_file.write(summary_table_from_records(records=records))
+
+        return records
+
+    def make_pool(self):
+        """Make the pool of worker processes. Workers are spawned (not forked) with the thread-count environment \
+        variables set to cores_per_lens, so that the threaded libraries of each worker honour them when imported."""
+        environment = {name: os.environ.get(name) for name in thread_environment_variables}
+
+        try:
+            for name in thread_environment_variables:
+                os.environ[name] = str(self.cores_per_lens)
+            return multiprocessing.get_context('spawn').Pool(processes=self.processes, initializer=_set_batch_runner,
+                                                             initargs=(self,))
+        finally:
+            for name, value in environment.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+
+def summary_table_from_records(records):
+    """Create a text table of the name, status, runtime and figure of merit of every lens of a batch."""
+    lines = ['{:<30}{:<12}{:>14}{:>24}'.format('Lens', 'Status', 'Runtime (s)', 'Figure of Merit')]
+
+    for record in records:
+        runtime = '{:.1f}'.format(record['runtime']) if record['runtime'] is not None else '-'
+        figure_of_merit = '{:.4f}'.format(record['figure_of_merit']) if record['figure_of_merit'] is not None else '-'
+        lines.append('{:<30}{:<12}{:>14}{:>24}'.format(record['name'], record['status'], runtime, figure_of_merit))
+
+    return '\n'.join(lines) + '\n'
+
+
+_batch_runner = None
+
+
+def _set_batch_runner(batch_runner):
+    global _batch_runner
+    _batch_runner = batch_runner
+    decorator_util.set_parallel_kernels(use_parallel_kernels=batch_runner.cores_per_lens > 1)
+
+
+def _run_lens(lens):
+    return _batch_runner.run_lens(lens=lens)
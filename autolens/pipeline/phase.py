@@ -10,9 +10,11 @@ from autofit.tools.phase_property import PhasePropertyCollection
 from autofit.optimize import non_linear
 
 from autolens import exc
+from autolens import timing
 from autolens.data.array import mask as msk
 from autolens.data.plotters import ccd_plotters
 from autolens.lens import lens_data as li, lens_fit
+from autolens.lens import plane as pl
 from autolens.lens import ray_tracing
 from autolens.lens import sensitivity_fit
 from autolens.lens.plotters import sensitivity_fit_plotters, ray_tracing_plotters, lens_fit_plotters
@@ -77,6 +79,18 @@ class AbstractPhase(phase.AbstractPhase):
         self.phase_name = phase_name
         self.auto_link_priors = auto_link_priors
 
+    def run_analysis(self, analysis):
+        """Run the non-linear search of the analysis. If timings are enabled (see *timing.enable*), they are reset \
+        before the search and written to the phase's output directory after it."""
+        timing.reset()
+
+        result = super(AbstractPhase, self).run_analysis(analysis)
+
+        if timing.is_enabled():
+            timing.timings().output_to_path(path=analysis.phase_output_path)
+
+        return result
+
     @property
     def constant(self):
         """
@@ -444,7 +458,9 @@ class PhaseImaging(Phase):
 
     def __init__(self, phase_name, optimizer_class=non_linear.MultiNest, sub_grid_size=2, image_psf_shape=None,
                  pixelization_psf_shape=None, use_positions=False, mask_function=None, inner_circular_mask_radii=None,
-                 cosmology=cosmo.Planck15, auto_link_priors=False):
+                 cosmology=cosmo.Planck15, auto_link_priors=False, inversion_solver=None,
+                 background_visualizer=None, precision='float64', flux_fraction_tolerance=None,
+                 gauss_legendre_sub_grid=False):
 
         """
 
@@ -457,6 +473,23 @@ class PhaseImaging(Phase):
             The class of a non_linear optimizer
         sub_grid_size: int
             The side length of the subgrid
+        inversion_solver : inversions.ConjugateGradientSolver or None
+            If supplied, inversions are solved iteratively with this solver, which is warm-started from the \
+            previous sample's solution (see *inversions.Inversion*).
+        background_visualizer : visualizer.BackgroundVisualizer or None
+            If supplied, the visualization performed during the non-linear search is drawn in a background worker \
+            process, which is forked before the search (see *visualizer.BackgroundVisualizer*). Where processes \
+            cannot be forked, visualization is performed in-process.
+        precision : str
+            The precision ('float64' or 'float32') of the lens data's grid-stacks, profile evaluations, PSF \
+            convolution and mapping matrices (see *lens_data.LensData*).
+        flux_fraction_tolerance : float or None
+            If not *None*, the fit's light profile intensities are only computed for the coordinates inside the \
+            radius outside of which each profile contains less than this fraction of its total flux (see \
+            *plane.Plane*).
+        gauss_legendre_sub_grid : bool
+            If True, the lens data's sub-grids are Gauss-Legendre sub-grids, as opposed to uniform sub-grids (see \
+            *grids.GaussLegendreSubGrid*).
         """
 
         super(PhaseImaging, self).__init__(optimizer_class=optimizer_class, cosmology=cosmology,
@@ -467,6 +500,11 @@ class PhaseImaging(Phase):
         self.use_positions = use_positions
         self.mask_function = mask_function
         self.inner_circular_mask_radii = inner_circular_mask_radii
+        self.inversion_solver = inversion_solver
+        self.background_visualizer = background_visualizer
+        self.precision = precision
+        self.flux_fraction_tolerance = flux_fraction_tolerance
+        self.gauss_legendre_sub_grid = gauss_legendre_sub_grid
 
     # noinspection PyMethodMayBeStatic,PyUnusedLocal
     def modify_image(self, image, previous_results):
@@ -487,6 +525,19 @@ class PhaseImaging(Phase):
         """
         return image
 
+    def run_analysis(self, analysis):
+        """Run the non-linear search of the analysis. If the phase has a background visualizer, its worker is \
+        started before the search (as it cannot be safely forked from within it, see \
+        *visualizer.BackgroundVisualizer*) and stopped once the search has finished."""
+        if self.background_visualizer is not None:
+            self.background_visualizer.start(visualize=analysis.visualize_fit)
+
+        try:
+            return super(PhaseImaging, self).run_analysis(analysis)
+        finally:
+            if self.background_visualizer is not None:
+                self.background_visualizer.stop()
+
     def run(self, data, previous_results=None, mask=None, positions=None):
         """
         Run this phase.
@@ -543,7 +594,8 @@ class PhaseImaging(Phase):
                                      'pipeline when you ran it.')
 
         lens_data = li.LensData(ccd_data=data, mask=mask, sub_grid_size=self.sub_grid_size,
-                                image_psf_shape=self.image_psf_shape, positions=positions)
+                                image_psf_shape=self.image_psf_shape, positions=positions, precision=self.precision,
+                                gauss_legendre_sub_grid=self.gauss_legendre_sub_grid)
 
         modified_image = self.modify_image(image=lens_data.image, previous_results=previous_results)
         lens_data = lens_data.new_lens_data_with_modified_image(modified_image=modified_image)
@@ -554,6 +606,9 @@ class PhaseImaging(Phase):
 
         analysis = self.__class__.Analysis(lens_data=lens_data, cosmology=self.cosmology,
                                            phase_name=self.phase_name, previous_results=previous_results)
+        analysis.inversion_solver = self.inversion_solver
+        analysis.flux_fraction_tolerance = self.flux_fraction_tolerance
+        analysis.background_visualizer = self.background_visualizer
         return analysis
 
     def output_phase_info(self):
@@ -584,6 +639,12 @@ class PhaseImaging(Phase):
 
             self.lens_data = lens_data
 
+            self.deflection_cache = pl.DeflectionCache()
+            self.inversion_solver = None
+            self.flux_fraction_tolerance = None
+            self.background_visualizer = None
+            self.has_visualized_data = False
+
             self.should_plot_image_plane_pix = \
                 conf.instance.general.get('output', 'plot_image_plane_adaptive_pixelization_grid', bool)
 
@@ -642,24 +703,46 @@ class PhaseImaging(Phase):
             fit : Fit
                 A fractional value indicating how well this model fit and the model lens_data itself
             """
-            self.check_positions_trace_within_threshold(instance)
-            tracer = self.tracer_for_instance(instance)
-            fit = self.fit_for_tracers(tracer=tracer, padded_tracer=None)
-            return fit.figure_of_merit
+            with timing.timer('fit'):
+
+                self.check_positions_trace_within_threshold(instance)
+
+                with timing.timer('tracer'):
+                    tracer = self.tracer_for_instance(instance)
+
+                fit = self.fit_for_tracers(tracer=tracer, padded_tracer=None)
+
+                return fit.figure_of_merit
 
         def visualize(self, instance, suffix, during_analysis):
+            """Visualize the fit of a model instance. The ccd data does not change during a phase, thus it is only \
+            plotted the first time this is called.
+
+            If the phase has a background visualizer whose worker is running (it is started before the non-linear \
+            search, see *run_analysis*), visualization during the analysis is requested from the worker and this \
+            returns immediately. The final visualization (at the end of the analysis) stops the worker and is \
+            performed in this process."""
 
             self.plot_count += 1
 
-            if self.should_plot_mask:
-                mask = self.lens_data.mask
-            else:
-                mask = None
+            if not self.has_visualized_data:
+                self.visualize_data()
+                self.has_visualized_data = True
+
+            if self.background_visualizer is not None:
+
+                if during_analysis and self.background_visualizer.is_running:
+                    self.background_visualizer.request(instance=instance)
+                    return None
+
+                self.background_visualizer.stop()
+
+            return self.visualize_fit(instance=instance, during_analysis=during_analysis)
 
-            if self.should_plot_positions:
-                positions = self.lens_data.positions
-            else:
-                positions = None
+        def visualize_data(self):
+
+            mask = self.lens_data.mask if self.should_plot_mask else None
+            positions = self.lens_data.positions if self.should_plot_positions else None
 
             if self.plot_data_as_subplot:
 
@@ -679,9 +762,16 @@ class PhaseImaging(Phase):
                 units=self.plot_units,
                 output_path=self.output_image_path, output_format='png')
 
+        def visualize_fit(self, instance, during_analysis=True):
 
-            tracer = self.tracer_for_instance(instance)
-            padded_tracer = self.padded_tracer_for_instance(instance)
+            mask = self.lens_data.mask if self.should_plot_mask else None
+            positions = self.lens_data.positions if self.should_plot_positions else None
+
+            fit = self.fit_for_tracers(tracer=self.tracer_for_instance(instance),
+                                       padded_tracer=self.padded_tracer_for_instance(instance))
+
+            # The tracer is plotted with the intensities of any linear light profiles solved for by the fit.
+            tracer = fit.tracer_with_linear_intensities
 
             if self.plot_ray_tracing_as_subplot:
 
@@ -691,8 +781,6 @@ class PhaseImaging(Phase):
                     units=self.plot_units,
                     output_path=self.output_image_path, output_format='png')
 
-            fit = self.fit_for_tracers(tracer=tracer, padded_tracer=padded_tracer)
-
             if self.plot_lens_fit_as_subplot:
 
                 lens_fit_plotters.plot_fit_subplot(
@@ -800,7 +888,8 @@ class PhaseImaging(Phase):
 
         def fit_for_tracers(self, tracer, padded_tracer):
             return lens_fit.fit_lens_data_with_tracer(lens_data=self.lens_data, tracer=tracer,
-                                                      padded_tracer=padded_tracer)
+                                                      padded_tracer=padded_tracer,
+                                                      inversion_solver=self.inversion_solver)
 
         def check_positions_trace_within_threshold(self, instance):
 
@@ -841,7 +930,9 @@ class LensPlanePhase(PhaseImaging):
 
     def __init__(self, phase_name, lens_galaxies=None, optimizer_class=non_linear.MultiNest, sub_grid_size=2,
                  image_psf_shape=None, mask_function=None, inner_circular_mask_radii=None, cosmology=cosmo.Planck15,
-                 auto_link_priors=False):
+                 auto_link_priors=False, inversion_solver=None, background_visualizer=None,
+                 precision='float64', flux_fraction_tolerance=None,
+                 gauss_legendre_sub_grid=False):
         super(LensPlanePhase, self).__init__(optimizer_class=optimizer_class,
                                              sub_grid_size=sub_grid_size,
                                              image_psf_shape=image_psf_shape,
@@ -849,7 +940,12 @@ class LensPlanePhase(PhaseImaging):
                                              inner_circular_mask_radii=inner_circular_mask_radii,
                                              cosmology=cosmology,
                                              phase_name=phase_name,
-                                             auto_link_priors=auto_link_priors)
+                                             auto_link_priors=auto_link_priors,
+                                             inversion_solver=inversion_solver,
+                                             background_visualizer=background_visualizer,
+                                             precision=precision,
+                                             flux_fraction_tolerance=flux_fraction_tolerance,
+                                             gauss_legendre_sub_grid=gauss_legendre_sub_grid)
         self.lens_galaxies = lens_galaxies
 
     class Analysis(PhaseImaging.Analysis):
@@ -861,6 +957,8 @@ class LensPlanePhase(PhaseImaging):
         def tracer_for_instance(self, instance):
             return ray_tracing.TracerImagePlane(lens_galaxies=instance.lens_galaxies,
                                                 image_plane_grid_stack=self.lens_data.grid_stack,
+                                                deflection_cache=self.deflection_cache,
+                                                flux_fraction_tolerance=self.flux_fraction_tolerance,
                                                 cosmology=self.cosmology)
 
         def padded_tracer_for_instance(self, instance):
@@ -902,7 +1000,10 @@ class LensSourcePlanePhase(PhaseImaging):
 
     def __init__(self, phase_name, lens_galaxies=None, source_galaxies=None, optimizer_class=non_linear.MultiNest,
                  sub_grid_size=2, image_psf_shape=None, use_positions=False, mask_function=None,
-                 inner_circular_mask_radii=None, cosmology=cosmo.Planck15, auto_link_priors=False):
+                 inner_circular_mask_radii=None, cosmology=cosmo.Planck15, auto_link_priors=False,
+                 inversion_solver=None, background_visualizer=None,
+                 precision='float64', flux_fraction_tolerance=None,
+                 gauss_legendre_sub_grid=False):
         """
         A phase with a simple source/lens model
 
@@ -926,7 +1027,12 @@ class LensSourcePlanePhase(PhaseImaging):
                                                    inner_circular_mask_radii=inner_circular_mask_radii,
                                                    cosmology=cosmology,
                                                    phase_name=phase_name,
-                                                   auto_link_priors=auto_link_priors)
+                                                   auto_link_priors=auto_link_priors,
+                                                   inversion_solver=inversion_solver,
+                                                   background_visualizer=background_visualizer,
+                                                   precision=precision,
+                                                   flux_fraction_tolerance=flux_fraction_tolerance,
+                                                   gauss_legendre_sub_grid=gauss_legendre_sub_grid)
         self.lens_galaxies = lens_galaxies or []
         self.source_galaxies = source_galaxies or []
 
@@ -942,7 +1048,10 @@ class LensSourcePlanePhase(PhaseImaging):
             return ray_tracing.TracerImageSourcePlanes(lens_galaxies=instance.lens_galaxies,
                                                        source_galaxies=instance.source_galaxies,
                                                        image_plane_grid_stack=self.lens_data.grid_stack,
-                                                       border=self.lens_data.border, cosmology=self.cosmology)
+                                                       border=self.lens_data.border,
+                                                       deflection_cache=self.deflection_cache,
+                                                       flux_fraction_tolerance=self.flux_fraction_tolerance,
+                                                       cosmology=self.cosmology)
 
         def padded_tracer_for_instance(self, instance):
             return ray_tracing.TracerImageSourcePlanes(lens_galaxies=instance.lens_galaxies,
@@ -988,7 +1097,10 @@ class MultiPlanePhase(PhaseImaging):
 
     def __init__(self, phase_name, galaxies=None, optimizer_class=non_linear.MultiNest,
                  sub_grid_size=2, image_psf_shape=None, use_positions=False, mask_function=None,
-                 inner_circular_mask_radii=None, cosmology=cosmo.Planck15, auto_link_priors=False):
+                 inner_circular_mask_radii=None, cosmology=cosmo.Planck15, auto_link_priors=False,
+                 inversion_solver=None, background_visualizer=None,
+                 precision='float64', flux_fraction_tolerance=None,
+                 gauss_legendre_sub_grid=False):
         """
         A phase with a simple source/lens model
 
@@ -1012,7 +1124,12 @@ class MultiPlanePhase(PhaseImaging):
                                               inner_circular_mask_radii=inner_circular_mask_radii,
                                               cosmology=cosmology,
                                               phase_name=phase_name,
-                                              auto_link_priors=auto_link_priors)
+                                              auto_link_priors=auto_link_priors,
+                                              inversion_solver=inversion_solver,
+                                              background_visualizer=background_visualizer,
+                                              precision=precision,
+                                              flux_fraction_tolerance=flux_fraction_tolerance,
+                                              gauss_legendre_sub_grid=gauss_legendre_sub_grid)
         self.galaxies = galaxies
 
     class Analysis(PhaseImaging.Analysis):
@@ -1025,7 +1142,9 @@ class MultiPlanePhase(PhaseImaging):
         def tracer_for_instance(self, instance):
             return ray_tracing.TracerMultiPlanes(galaxies=instance.galaxies,
                                                  image_plane_grid_stack=self.lens_data.grid_stack,
-                                                 border=self.lens_data.border, cosmology=self.cosmology)
+                                                 border=self.lens_data.border, deflection_cache=self.deflection_cache,
+                                                 flux_fraction_tolerance=self.flux_fraction_tolerance,
+                                                 cosmology=self.cosmology)
 
         def padded_tracer_for_instance(self, instance):
             return ray_tracing.TracerMultiPlanes(galaxies=instance.galaxies,
@@ -1364,10 +1483,8 @@ class GalaxyFitPhase(AbstractPhase):
 
         def fit_for_instance(self, instance):
 
-            fit_y = galaxy_fit.GalaxyFit(galaxy_data=self.galaxy_data_y, model_galaxies=instance.galaxies)
-            fit_x = galaxy_fit.GalaxyFit(galaxy_data=self.galaxy_data_x, model_galaxies=instance.galaxies)
-
-            return fit_y, fit_x
+            return galaxy_fit.fit_galaxy_data_y_and_x_deflections_with_model_galaxies(
+                galaxy_data_y=self.galaxy_data_y, galaxy_data_x=self.galaxy_data_x, model_galaxies=instance.galaxies)
 
     class Result(Phase.Result):
 
@@ -1417,6 +1534,12 @@ class SensitivityPhase(PhaseImaging):
             super(PhaseImaging.Analysis, self).__init__(cosmology=cosmology, phase_name=phase_name,
                                                         previous_results=previous_results)
 
+            self.deflection_cache = pl.DeflectionCache()
+
+            self.normal_key = None
+            self.tracer_normal = None
+            self.fit_normal = None
+
         def fit(self, instance):
             """
             Determine the fit of a lens galaxy and source galaxy to the lens_data in this lens.
@@ -1431,11 +1554,29 @@ class SensitivityPhase(PhaseImaging):
             fit: Fit
                 A fractional value indicating how well this model fit and the model lens_data itself
             """
-            tracer_normal = self.tracer_normal_for_instance(instance)
+            tracer_normal, fit_normal = self.tracer_and_fit_normal_for_instance(instance)
             tracer_sensitive = self.tracer_sensitive_for_instance(instance)
-            fit = self.fit_for_tracers(tracer_normal=tracer_normal, tracer_sensitive=tracer_sensitive)
+            fit = self.fit_for_tracers(tracer_normal=tracer_normal, tracer_sensitive=tracer_sensitive,
+                                       fit_normal=fit_normal)
             return fit.figure_of_merit
 
+        def tracer_and_fit_normal_for_instance(self, instance):
+            """The normal tracer and its fit, which are only recomputed if the lens or source galaxies have changed \
+            since the previous sample (typically only the sensitive galaxies vary in a sensitivity phase), or if any \
+            of these galaxies is not cacheable (see *plane.galaxy_cache_key*)."""
+            lens_keys = tuple(map(pl.galaxy_cache_key, instance.lens_galaxies))
+            source_keys = tuple(map(pl.galaxy_cache_key, instance.source_galaxies))
+
+            normal_key = None if None in lens_keys + source_keys else (lens_keys, source_keys)
+
+            if normal_key is None or normal_key != self.normal_key:
+                self.tracer_normal = self.tracer_normal_for_instance(instance)
+                self.fit_normal = lens_fit.fit_lens_data_with_tracer(lens_data=self.lens_data,
+                                                                     tracer=self.tracer_normal)
+                self.normal_key = normal_key
+
+            return self.tracer_normal, self.fit_normal
+
         def visualize(self, instance, suffix, during_analysis):
 
             self.plot_count += 1
@@ -1467,19 +1608,22 @@ class SensitivityPhase(PhaseImaging):
             return ray_tracing.TracerImageSourcePlanes(lens_galaxies=instance.lens_galaxies,
                                                        source_galaxies=instance.source_galaxies,
                                                        image_plane_grid_stack=self.lens_data.grid_stack,
-                                                       border=self.lens_data.border)
+                                                       border=self.lens_data.border,
+                                                       deflection_cache=self.deflection_cache)
 
         def tracer_sensitive_for_instance(self, instance):
             return ray_tracing.TracerImageSourcePlanes(
                 lens_galaxies=instance.lens_galaxies + instance.sensitive_galaxies,
                 source_galaxies=instance.source_galaxies,
                 image_plane_grid_stack=self.lens_data.grid_stack,
-                border=self.lens_data.border)
+                border=self.lens_data.border,
+                deflection_cache=self.deflection_cache)
 
-        def fit_for_tracers(self, tracer_normal, tracer_sensitive):
+        def fit_for_tracers(self, tracer_normal, tracer_sensitive, fit_normal=None):
             return sensitivity_fit.fit_lens_data_with_sensitivity_tracers(lens_data=self.lens_data,
                                                                           tracer_normal=tracer_normal,
-                                                                          tracer_sensitive=tracer_sensitive)
+                                                                          tracer_sensitive=tracer_sensitive,
+                                                                          fit_normal=fit_normal)
 
         @classmethod
         def log(cls, instance):
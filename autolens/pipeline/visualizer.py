@@ -0,0 +1,134 @@
+import logging
+import multiprocessing
+import queue
+import time
+
+from autolens import exc
+
+logger = logging.getLogger(__name__)
+
+_stop = 'stop'
+
+
+class BackgroundVisualizer(object):
+
+    def __init__(self, time_budget=None):
+        """Perform a phase's visualization during the non-linear search in a background worker process, so that \
+        rendering figures does not hold up the sampler.
+
+        The worker is a forked copy of the process, which is always started with the 'fork' start method (rather \
+        than the platform's default, e.g. 'spawn' on macOS and Windows), as the analysis it visualizes is not sent to \
+        it. Where 'fork' is not available (e.g. on Windows) the worker is not started, and visualization is performed \
+        in-process instead. Forking a process which is running threads (e.g. those of a non-linear search, or of MPI) \
+        is unsafe, as only the forking thread exists in the copy and the locks held by the others are never released. \
+        The worker must therefore be started before the non-linear search begins (which *PhaseImaging.run_analysis* \
+        does), and it is never started from within the search.
+
+        Requests are put on a queue which the worker coalesces, that is when it finishes a visualization it discards \
+        every pending request bar the newest, so only the most recent best-fit is drawn. Once the worker has spent \
+        the time budget of the phase visualizing, further requests are ignored until the phase ends.
+
+        Parameters
+        ----------
+        time_budget : float or None
+            The maximum wall-clock time (seconds) spent on visualization during a phase, or None for no limit.
+        """
+        self.time_budget = time_budget
+        self.queue = None
+        self.process = None
+        self.budget_exhausted = None
+
+    @property
+    def is_running(self):
+        return self.process is not None
+
+    def start(self, visualize):
+        """Start the worker process, which is forked so that it holds a copy of the phase's analysis (and its lens \
+        data) without it being sent over the queue. This must be called before the non-linear search starts (see \
+        above), and the worker visualizes using the analysis as it was when the worker was started. If the 'fork' \
+        start method is not available, no worker is started (see *is_running*).
+
+        Parameters
+        ----------
+        visualize : func
+            The function the worker calls as visualize(instance=instance), for every request it draws.
+        """
+        try:
+            context = multiprocessing.get_context('fork')
+        except ValueError:
+            logger.warning('The fork start method is not available, so visualization is performed in-process')
+            return
+
+        self.queue = context.Queue()
+        self.budget_exhausted = context.Event()
+        self.process = context.Process(target=_visualization_worker,
+                                       args=(visualize, self.queue, self.time_budget, self.budget_exhausted))
+        self.process.daemon = True
+        self.process.start()
+
+    def request(self, instance):
+        """Request the visualization of a model instance by the worker, which must have been started before the \
+        non-linear search. This returns immediately."""
+        if not self.is_running:
+            raise exc.PhaseException('The background visualizer must be started before the non-linear search, as its '
+                                     'worker cannot be safely forked from within it')
+
+        if not self.budget_exhausted.is_set():
+            self.queue.put(instance)
+
+    def stop(self):
+        """Stop the worker once it has drawn the newest pending request, such that the visualizer can be started again \
+        (with a new time budget) for the next phase."""
+        if not self.is_running:
+            return
+
+        self.queue.put(_stop)
+        self.process.join()
+        self.queue.close()
+
+        self.queue = None
+        self.process = None
+        self.budget_exhausted = None
+
+
+def _is_stop(request):
+    return isinstance(request, str) and request == _stop
+
+
+def _visualization_worker(visualize, request_queue, time_budget, budget_exhausted):
+
+    time_visualizing = 0.0
+
+    while True:
+
+        instance = request_queue.get()
+        should_stop = _is_stop(instance)
+
+        while not should_stop:
+            try:
+                newer_instance = request_queue.get_nowait()
+            except queue.Empty:
+                break
+            if _is_stop(newer_instance):
+                should_stop = True
+            else:
+                instance = newer_instance
+
+        if not _is_stop(instance) and not budget_exhausted.is_set():
+
+            start = time.time()
+
+            try:
+                visualize(instance=instance)
+            except Exception:
+                logger.exception('Visualization in the background worker failed')
+
+            time_visualizing += time.time() - start
+
+            if time_budget is not None and time_visualizing >= time_budget:
+                logger.info('Visualization time budget of {} seconds used, no further figures will be drawn during '
+                            'this phase'.format(time_budget))
+                budget_exhausted.set()
+
+        if should_stop:
+            return
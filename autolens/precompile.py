@@ -0,0 +1,126 @@
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from autolens.data import ccd
+from autolens.data.array import grids
+from autolens.data.array import mask as msk
+from autolens.lens import lens_data as ld
+from autolens.lens import lens_fit
+from autolens.lens import ray_tracing
+from autolens.model.galaxy import galaxy as g
+from autolens.model.inversion import pixelizations as pix
+from autolens.model.inversion import regularization as reg
+from autolens.model.profiles import light_profiles as lp
+from autolens.model.profiles import mass_profiles as mp
+
+"""
+Compile PyAutoLens's numba functions in advance of a modeling run, by fitting a small simulated lens.
+
+Numba compiles a function the first time it is called, which costs seconds at the start of every new process (e.g. \
+the workers of a batch run). With numba's cache enabled (see *decorator_util*), running this once fills the on-disk \
+cache, so that later processes load the compiled functions instead:
+
+    python -m autolens.precompile --precision float64 float32
+
+The mass profile integrands compiled as numba cfuncs (see *mass_profiles.DeferredIntegrand*) cannot be cached on \
+disk, but are only compiled when a profile using them is first evaluated.
+"""
+
+
+def compile_integrands():
+    """Compile the integrand of every mass profile, returning the number of integrands."""
+    for integrand in mp.deferred_integrands:
+        integrand.low_level_callable
+    return len(mp.deferred_integrands)
+
+
+def lens_data_for_precompile(sub_grid_size=2, precision='float64'):
+    """Simulate and mask the ccd data of a small lens, which is fitted to compile the numba functions."""
+    psf = ccd.PSF.simulate_as_gaussian(shape=(5, 5), sigma=0.1, pixel_scale=0.1)
+
+    grid_stack = grids.GridStack.from_shape_pixel_scale_and_sub_grid_size(shape=(20, 20), pixel_scale=0.1,
+                                                                          sub_grid_size=1)
+
+    tracer = ray_tracing.TracerImageSourcePlanes(
+        lens_galaxies=[g.Galaxy(mass=mp.EllipticalIsothermal(einstein_radius=0.6, axis_ratio=0.8))],
+        source_galaxies=[g.Galaxy(light=lp.EllipticalSersic(intensity=0.3, effective_radius=0.2))],
+        image_plane_grid_stack=grid_stack)
+
+    image = psf.convolve(array=tracer.image_plane_image) + 0.1 * np.random.RandomState(seed=1).standard_normal((20, 20))
+
+    ccd_data = ccd.CCDData(image=image, pixel_scale=0.1, psf=psf, noise_map=np.full((20, 20), 0.1))
+
+    mask = msk.Mask.circular(shape=(20, 20), pixel_scale=0.1, radius_arcsec=0.8)
+
+    return ld.LensData(ccd_data=ccd_data, mask=mask, sub_grid_size=sub_grid_size, precision=precision)
+
+
+def tracers_for_precompile(lens_data):
+    """The tracers fitted to compile the numba functions, whose source galaxies have a light profile, a rectangular \
+    pixelization and an adaptive pixelization respectively.
+
+    The image-plane pixelization grid of the adaptive pixelization is set up on the lens data's grid-stack (as in a \
+    phase), so that the sparse-grid and adaptive pixelization functions are compiled for a realistic grid of many \
+    pixels.
+    """
+    lens_galaxy = g.Galaxy(light=lp.EllipticalSersic(intensity=0.1), mass=mp.EllipticalIsothermal(einstein_radius=0.6,
+                                                                                                  axis_ratio=0.8))
+
+    source_galaxies = [g.Galaxy(light=lp.EllipticalSersic(intensity=0.3, effective_radius=0.2)),
+                       g.Galaxy(pixelization=pix.Rectangular(shape=(5, 5)), regularization=reg.Constant()),
+                       g.Galaxy(pixelization=pix.AdaptiveMagnification(shape=(5, 5)), regularization=reg.Constant())]
+
+    tracers = []
+
+    for source_galaxy in source_galaxies:
+
+        grid_stack = pix.setup_image_plane_pixelization_grid_from_galaxies_and_grid_stack(
+            galaxies=[source_galaxy], grid_stack=lens_data.grid_stack)
+
+        tracers.append(ray_tracing.TracerImageSourcePlanes(lens_galaxies=[lens_galaxy], source_galaxies=[source_galaxy],
+                                                           image_plane_grid_stack=grid_stack, border=lens_data.border))
+
+    return tracers
+
+
+def precompile(sub_grid_size=2, precisions=('float64',)):
+    """Compile the mass profile integrands and the numba functions used to fit a lens with light profiles and with \
+    rectangular and adaptive inversions, for lens data of every input precision (see *lens_data.LensData*).
+
+    Parameters
+    ----------
+    sub_grid_size : int
+        The sub-grid size of the lens data which is fitted.
+    precisions : (str,)
+        The precisions of the lens data which is fitted, as numba compiles a function separately for float64 and \
+        float32 arrays.
+    """
+    compile_integrands()
+
+    for precision in precisions:
+
+        lens_data = lens_data_for_precompile(sub_grid_size=sub_grid_size, precision=precision)
+
+        for tracer in tracers_for_precompile(lens_data=lens_data):
+            lens_fit.fit_lens_data_with_tracer(lens_data=lens_data, tracer=tracer)
+
+
+def main(args=None):
+
+    parser = argparse.ArgumentParser(description='Compile the numba functions of PyAutoLens in advance.')
+    parser.add_argument('--sub-grid-size', type=int, default=2)
+    parser.add_argument('--precision', nargs='+', default=['float64'], choices=['float64', 'float32'])
+    args = parser.parse_args(args)
+
+    start = time.time()
+    precompile(sub_grid_size=args.sub_grid_size, precisions=args.precision)
+    print('Compiled PyAutoLens in {:.2f} seconds'.format(time.time() - start))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
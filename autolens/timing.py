@@ -0,0 +1,124 @@
+import json
+import os
+import time
+
+"""
+Opt-in instrumentation of the time spent in each stage of a likelihood evaluation (e.g. tracer construction, the \
+deflections of each mass profile type, border relocation, mapper construction, convolution, the inversion's linear \
+algebra and the likelihood itself).
+
+Timings are only recorded once *enable* has been called, after which every phase resets the timings when it begins \
+and writes a timings.json and timings.txt report to its output directory when it ends. Stages are timed using the \
+*timer* context manager, which does nothing when timings are not enabled:
+
+    with timing.timer('border_relocation'):
+        relocated_grid_stack = border.relocated_grid_stack_from_grid_stack(grid_stack)
+
+The time of a stage includes that of any stage timed within it (e.g. 'mapper' includes 'border_relocation').
+"""
+
+
+class Timings(object):
+
+    def __init__(self):
+        """The number of calls and total time (seconds) of every timed stage."""
+        self.counts = {}
+        self.totals = {}
+
+    def add(self, name, seconds):
+        self.counts[name] = self.counts.get(name, 0) + 1
+        self.totals[name] = self.totals.get(name, 0.0) + seconds
+
+    def reset(self):
+        self.counts = {}
+        self.totals = {}
+
+    @property
+    def names(self):
+        """The stage names, sorted by total time (largest first)."""
+        return sorted(self.totals, key=lambda name: self.totals[name], reverse=True)
+
+    @property
+    def dict(self):
+        return {name: {'count': self.counts[name], 'total': self.totals[name],
+                       'mean': self.totals[name] / self.counts[name]} for name in self.names}
+
+    @property
+    def report(self):
+        lines = ['{:<50}{:>12}{:>16}{:>16}'.format('Stage', 'Count', 'Total (s)', 'Mean (ms)')]
+        for name in self.names:
+            lines.append('{:<50}{:>12}{:>16.4f}{:>16.4f}'.format(name, self.counts[name], self.totals[name],
+                                                               1.0e3 * self.totals[name] / self.counts[name]))
+        return '\n'.join(lines) + '\n'
+
+    def output_to_path(self, path):
+        """Write the timings to the files timings.json and timings.txt in a directory."""
+        if not os.path.exists(path):
+            os.makedirs(path)
+
+        with open(os.path.join(path, 'timings.json'), 'w') as timings_file:
+            json.dump(self.dict, timings_file, indent=4)
+
+        with open(os.path.join(path, 'timings.txt'), 'w') as timings_file:
+            timings_file.write(self.report)
+
+
+class Timer(object):
+
+    def __init__(self, timings, name):
+        self.timings = timings
+        self.name = name
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.timings.add(name=self.name, seconds=time.time() - self.start)
+
+
+class NoTimer(object):
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+_timings = None
+_no_timer = NoTimer()
+
+
+def enable():
+    """Enable timings, returning the timings that every subsequently timed stage is added to."""
+    global _timings
+    if _timings is None:
+        _timings = Timings()
+    return _timings
+
+
+def disable():
+    global _timings
+    _timings = None
+
+
+def is_enabled():
+    return _timings is not None
+
+
+def timings():
+    return _timings
+
+
+def reset():
+    if _timings is not None:
+        _timings.reset()
+
+
+def timer(name):
+    """A context manager which adds the time spent within it to the stage *name*, if timings are enabled."""
+    if _timings is None:
+        return _no_timer
+    return Timer(timings=_timings, name=name)
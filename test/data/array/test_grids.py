@@ -6,6 +6,7 @@ from autolens.data.array.util import grid_util
 from autolens.data.array.util import mapping_util, mask_util
 from autolens.data.array import mask as msk
 from autolens.data.array import grids
+from autolens.model.profiles import light_profiles as lp
 
 
 @pytest.fixture(name="mask")
@@ -289,6 +290,111 @@ class TestSubGrid(object):
         assert (sub_grid.sub_to_regular == sub_to_image_util).all()
 
 
+class TestGaussLegendreSubGrid(object):
+
+    def test__from_mask__compare_to_util(self):
+        mask = np.array([[True, True, True],
+                        [True, False, False],
+                        [True, True, False]])
+
+        sub_grid_util = grid_util.gauss_legendre_sub_grid_1d_masked_from_mask_pixel_scales_and_sub_grid_size(
+            mask=mask, pixel_scales=(3.0, 3.0), sub_grid_size=2)
+
+        mask = msk.Mask(mask, pixel_scale=3.0)
+
+        sub_grid = grids.GaussLegendreSubGrid.from_mask_and_sub_grid_size(mask, sub_grid_size=2)
+
+        assert type(sub_grid) == grids.GaussLegendreSubGrid
+        assert sub_grid == pytest.approx(sub_grid_util, 1e-4)
+        assert sub_grid.sub_grid_weights == pytest.approx(np.array([0.25, 0.25, 0.25, 0.25]), 1e-8)
+        assert (sub_grid.sub_to_regular == mapping_util.sub_to_regular_from_mask(mask, sub_grid_size=2)).all()
+
+        assert type(sub_grid.unlensed_grid) == grids.GaussLegendreSubGrid
+        assert sub_grid.unlensed_grid == pytest.approx(sub_grid_util, 1e-4)
+
+    def test__from_shape_and_pixel_scale__unlensed_unmasked_grid(self, mask):
+
+        sub_grid_util = grid_util.gauss_legendre_sub_grid_1d_masked_from_mask_pixel_scales_and_sub_grid_size(
+            mask=np.full((3, 3), False), pixel_scales=(1.0, 1.0), sub_grid_size=3)
+
+        sub_grid = grids.GaussLegendreSubGrid.from_shape_pixel_scale_and_sub_grid_size(shape=(3, 3), pixel_scale=1.0,
+                                                                                      sub_grid_size=3)
+
+        assert sub_grid == pytest.approx(sub_grid_util, 1e-4)
+
+        sub_grid = grids.GaussLegendreSubGrid.from_mask_and_sub_grid_size(mask, sub_grid_size=3)
+
+        assert type(sub_grid.unlensed_unmasked_grid) == grids.GaussLegendreSubGrid
+        assert sub_grid.unlensed_unmasked_grid == pytest.approx(sub_grid_util, 1e-4)
+
+    def test__sub_data_to_regular_data__weighted_by_sub_grid_weights(self, mask):
+
+        sub_grid = grids.GaussLegendreSubGrid.from_mask_and_sub_grid_size(mask, sub_grid_size=3)
+
+        sub_array = np.arange(45.0)
+
+        assert sub_grid.sub_data_to_regular_data(sub_array) == \
+               pytest.approx(np.dot(sub_array.reshape(5, 9), sub_grid.sub_grid_weights), 1e-8)
+        assert sub_grid.sub_data_to_regular_data(np.ones(45)) == pytest.approx(np.ones(5), 1e-8)
+
+    def test__sub_grid_weights_kept_by_views_and_dtype(self, mask):
+
+        sub_grid = grids.GaussLegendreSubGrid.from_mask_and_sub_grid_size(mask, sub_grid_size=2)
+
+        assert (sub_grid[0:8].sub_grid_weights == sub_grid.sub_grid_weights).all()
+        assert (sub_grid.astype('float32').sub_grid_weights == sub_grid.sub_grid_weights).all()
+        assert grids.SubGrid.from_mask_and_sub_grid_size(mask, sub_grid_size=2).sub_grid_weights is None
+
+    def test__grid_stacks__gauss_legendre_sub_grids(self, centre_mask):
+
+        grid_stack = grids.GridStack.grid_stack_from_mask_sub_grid_size_and_psf_shape(
+            centre_mask, 2, (3, 3), gauss_legendre_sub_grid=True)
+
+        assert type(grid_stack.sub) == grids.GaussLegendreSubGrid
+        assert not grid_stack.regular_in_sub
+
+        grid_stack = grids.GridStack.grid_stack_from_mask_sub_grid_size_and_psf_shape(
+            centre_mask, 3, (3, 3), gauss_legendre_sub_grid=True)
+
+        assert grid_stack.regular_in_sub
+
+        padded_grid_stack = grids.GridStack.padded_grid_stack_from_mask_sub_grid_size_and_psf_shape(
+            centre_mask, 2, (3, 3), gauss_legendre_sub_grid=True)
+
+        padded_sub_grid_util = \
+            grid_util.gauss_legendre_sub_grid_1d_masked_from_mask_pixel_scales_and_sub_grid_size(
+                mask=np.full((5, 5), False), pixel_scales=(1.0, 1.0), sub_grid_size=2)
+
+        assert type(padded_grid_stack.sub) == grids.PaddedGaussLegendreSubGrid
+        assert padded_grid_stack.sub.image_shape == (3, 3)
+        assert padded_grid_stack.sub == pytest.approx(padded_sub_grid_util, 1e-4)
+        assert padded_grid_stack.sub.sub_grid_weights == pytest.approx(np.array([0.25, 0.25, 0.25, 0.25]), 1e-8)
+
+    def test__2x2_gauss_legendre_sub_grid__as_accurate_as_4x4_uniform_sub_grid_for_smooth_profile(self):
+
+        mask = msk.Mask.circular(shape=(20, 20), pixel_scale=0.2, radius_arcsec=1.8)
+
+        light_profile = lp.EllipticalGaussian(centre=(0.05, 0.03), axis_ratio=0.8, phi=30.0, intensity=1.0,
+                                              sigma=0.5)
+
+        def regular_intensities_from_sub_grid(sub_grid):
+            return sub_grid.sub_data_to_regular_data(light_profile.intensities_from_grid(grid=sub_grid))
+
+        intensities_true = regular_intensities_from_sub_grid(
+            grids.GaussLegendreSubGrid.from_mask_and_sub_grid_size(mask, sub_grid_size=16))
+
+        intensities_uniform = regular_intensities_from_sub_grid(
+            grids.SubGrid.from_mask_and_sub_grid_size(mask, sub_grid_size=4))
+
+        intensities_gauss_legendre = regular_intensities_from_sub_grid(
+            grids.GaussLegendreSubGrid.from_mask_and_sub_grid_size(mask, sub_grid_size=2))
+
+        error_uniform = np.max(np.abs(intensities_uniform - intensities_true) / intensities_true)
+        error_gauss_legendre = np.max(np.abs(intensities_gauss_legendre - intensities_true) / intensities_true)
+
+        assert error_gauss_legendre < error_uniform
+
+
 class TestPixGrid:
 
     def test_pix_regular_grid__attributes(self):
@@ -1062,6 +1168,135 @@ class TestDataGridStack(object):
         assert (grid_stack.pix == np.array([[5.0, 5.0], [6.0, 7.0]])).all()
         assert (grid_stack.pix.regular_to_nearest_pix == np.array([0, 1])).all()
 
+    def test__with_buffer__new_grid_stack_of_views_of_buffer_retaining_attributes(self, grid_stack):
+
+        sub_grid = grid_stack.sub
+
+        assert grid_stack.buffer is None
+
+        buffered_grid_stack = grid_stack.with_buffer()
+
+        assert grid_stack.sub is sub_grid
+        assert grid_stack.buffer is None
+
+        buffer = buffered_grid_stack.buffer
+
+        assert buffer.shape == (14, 2)
+        assert (buffer[0:4] == sub_grid).all()
+        assert (buffer[13] == grid_stack.regular[0]).all()
+
+        assert np.shares_memory(buffered_grid_stack.sub, buffer)
+        assert not np.shares_memory(sub_grid, buffer)
+        assert isinstance(buffered_grid_stack.sub, grids.SubGrid)
+        assert buffered_grid_stack.sub.sub_grid_size == 2
+        assert (buffered_grid_stack.sub.sub_to_regular == sub_grid.sub_to_regular).all()
+        assert (buffered_grid_stack.sub.mask == sub_grid.mask).all()
+
+        assert buffered_grid_stack.with_buffer() is buffered_grid_stack
+
+    def test__concatenated_grid__same_with_and_without_buffer(self, grid_stack):
+
+        sub_grid = grid_stack.sub
+
+        buffered_grid_stack = grid_stack.with_buffer()
+
+        assert (grid_stack.concatenated_grid == buffered_grid_stack.concatenated_grid).all()
+        assert np.shares_memory(buffered_grid_stack.concatenated_grid, buffered_grid_stack.buffer)
+
+        assert grid_stack.sub is sub_grid
+        assert grid_stack.buffer is None
+
+    def test__regular_in_sub__odd_sub_grid_sizes_only(self, centre_mask):
+
+        for sub_grid_size, regular_in_sub in [(1, True), (2, False), (3, True), (4, False)]:
+
+            grid_stack = grids.GridStack.grid_stack_from_mask_sub_grid_size_and_psf_shape(
+                mask=centre_mask, sub_grid_size=sub_grid_size, psf_shape=(3, 3))
+
+            assert grid_stack.regular_in_sub == regular_in_sub
+            assert grid_stack.concatenated_grid.shape[0] == \
+                   grid_stack.with_buffer().buffer.shape[0] - (1 if regular_in_sub else 0)
+
+    def test__apply_function_to_concatenated_grid__same_as_apply_function(self):
+
+        mask = msk.Mask.circular(shape=(7, 7), pixel_scale=1.0, radius_arcsec=2.0)
+
+        def deflections(grid):
+            return np.stack((np.sin(grid[:, 0] * grid[:, 1]), np.cos(grid[:, 1]) + grid[:, 0]), axis=1)
+
+        for sub_grid_size in [2, 3]:
+
+            grid_stack = grids.GridStack.grid_stack_from_mask_sub_grid_size_and_psf_shape(
+                mask=mask, sub_grid_size=sub_grid_size, psf_shape=(3, 3))
+
+            deflection_stack = grid_stack.apply_function(deflections)
+            concatenated_deflection_stack = grid_stack.apply_function_to_concatenated_grid(deflections)
+
+            assert concatenated_deflection_stack.regular == pytest.approx(deflection_stack.regular, 1e-12)
+            assert concatenated_deflection_stack.sub == pytest.approx(deflection_stack.sub, 1e-12)
+            assert concatenated_deflection_stack.blurring == pytest.approx(deflection_stack.blurring, 1e-12)
+            assert concatenated_deflection_stack.pix == pytest.approx(deflection_stack.pix, 1e-12)
+
+    def test__traced_grid_stack_from_deflection_stacks__same_as_map_function(self, grid_stack):
+
+        deflection_stack_0 = grid_stack.apply_function(lambda grid: 0.5 * np.square(grid))
+        deflection_stack_1 = grid_stack.apply_function(lambda grid: np.cos(grid))
+
+        traced_grid_stack = grid_stack.traced_grid_stack_from_deflection_stacks(
+            deflection_stacks=[deflection_stack_0, deflection_stack_1], scaling_factors=[1.0, 0.3])
+
+        def trace(grid, deflections_0, deflections_1):
+            return grid - deflections_0 - 0.3 * deflections_1
+
+        mapped_grid_stack = grid_stack.map_function(trace, deflection_stack_0, deflection_stack_1)
+
+        assert traced_grid_stack.regular == pytest.approx(mapped_grid_stack.regular, 1e-12)
+        assert traced_grid_stack.sub == pytest.approx(mapped_grid_stack.sub, 1e-12)
+        assert traced_grid_stack.blurring == pytest.approx(mapped_grid_stack.blurring, 1e-12)
+        assert traced_grid_stack.pix == pytest.approx(mapped_grid_stack.pix, 1e-12)
+
+        assert isinstance(traced_grid_stack.sub, grids.SubGrid)
+        assert traced_grid_stack.sub.sub_grid_size == 2
+        assert np.shares_memory(traced_grid_stack.sub, traced_grid_stack.buffer)
+
+        traced_grid_stack = grid_stack.traced_grid_stack_from_deflection_stacks(deflection_stacks=[deflection_stack_0])
+
+        assert traced_grid_stack.sub == pytest.approx(grid_stack.sub - deflection_stack_0.sub, 1e-12)
+
+
+class TestGridBuckets(object):
+
+    def test__indexes_within_circle__same_as_brute_force(self):
+
+        grid = np.random.RandomState(1).uniform(-3.0, 3.0, size=(1000, 2))
+
+        grid_buckets = grids.GridBuckets(grid=grid, points_per_cell=8)
+
+        for centre, radius in [((0.0, 0.0), 1.0), ((2.5, -1.0), 0.7), ((-3.5, 3.5), 1.0), ((1.0, 1.0), 10.0)]:
+
+            distances = np.sqrt(np.sum(np.square(grid - np.asarray(centre)), axis=1))
+
+            assert (grid_buckets.indexes_within_circle(centre=centre, radius=radius) ==
+                    np.where(distances <= radius)[0]).all()
+
+    def test__circle_outside_grid__no_indexes(self):
+
+        grid = np.array([[0.0, 0.0], [1.0, 1.0], [0.5, 0.2]])
+
+        grid_buckets = grids.GridBuckets(grid=grid)
+
+        assert grid_buckets.indexes_within_circle(centre=(5.0, 5.0), radius=1.0).shape == (0,)
+
+    def test__circle_contains_grid(self):
+
+        grid = np.array([[0.0, 0.0], [1.0, 1.0], [0.5, 0.2]])
+
+        grid_buckets = grids.GridBuckets(grid=grid)
+
+        assert grid_buckets.circle_contains_grid(centre=(0.5, 0.5), radius=0.75) == True
+        assert grid_buckets.circle_contains_grid(centre=(0.5, 0.5), radius=0.7) == False
+        assert grid_buckets._sorted_indexes is None
+
 
 class TestImageGridBorder(object):
 
@@ -1287,4 +1522,22 @@ class TestImageGridBorder(object):
             assert relocated_grids.pix[32] == pytest.approx(np.array([0.1, 0.0]), 1e-3)
             assert relocated_grids.pix[33] == pytest.approx(np.array([-0.2, -0.3]), 1e-3)
             assert relocated_grids.pix[34] == pytest.approx(np.array([0.5, 0.4]), 1e-3)
-            assert relocated_grids.pix[35] == pytest.approx(np.array([0.7, -0.1]), 1e-3)
\ No newline at end of file
+            assert relocated_grids.pix[35] == pytest.approx(np.array([0.7, -0.1]), 1e-3)
+
+        def test__parallel_jit__same_as_serial(self):
+
+            mask = msk.Mask.circular(shape=(20, 20), pixel_scale=0.5, radius_arcsec=3.0)
+
+            border = grids.RegularGridBorder.from_mask(mask=mask)
+            sub_grid = grids.SubGrid.from_mask_and_sub_grid_size(mask=mask, sub_grid_size=2)
+            border_grid = grids.RegularGrid.from_mask(mask=mask)[border]
+
+            grid = 2.0 * np.random.RandomState(1).standard_normal((100, 2))
+            grid = np.concatenate((grid, sub_grid))
+
+            relocated_grid = grids.RegularGridBorder.relocated_grid_from_grid_jit(grid=grid.copy(),
+                                                                                  border_grid=border_grid)
+            relocated_grid_parallel = grids.RegularGridBorder.relocated_grid_from_grid_parallel_jit(
+                grid=grid.copy(), border_grid=border_grid)
+
+            assert relocated_grid_parallel == pytest.approx(relocated_grid, 1.0e-10)
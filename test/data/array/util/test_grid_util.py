@@ -360,6 +360,97 @@ class TestSubGridMasked(object):
                                                    [-1., 0.5], [-1., 1.], [-1., 1.5],
                                                    [-1.5, 0.5], [-1.5, 1.], [-1.5, 1.5]]), 1e-4)
 
+    def test__parallel__same_as_serial(self):
+        mask = np.array([[True, False, True, True],
+                         [False, False, False, True],
+                         [True, True, True, True],
+                         [True, False, False, False]])
+
+        sub_grid = grid_util.sub_grid_1d_masked_from_mask_pixel_scales_and_sub_grid_size(
+            mask=mask, pixel_scales=(3.0, 6.0), sub_grid_size=3, origin=(1.0, -2.0))
+
+        sub_grid_parallel = grid_util.sub_grid_1d_masked_from_mask_pixel_scales_and_sub_grid_size_parallel(
+            mask=mask, pixel_scales=(3.0, 6.0), sub_grid_size=3, origin=(1.0, -2.0))
+
+        assert (sub_grid_parallel == sub_grid).all()
+
+
+class TestGaussLegendreSubGridMasked(object):
+
+    def test__offsets_and_weights__2x2_sub_grid(self):
+
+        sub_grid_offsets, sub_grid_weights = \
+            grid_util.gauss_legendre_sub_grid_offsets_and_weights_from_sub_grid_size(sub_grid_size=2)
+
+        assert sub_grid_offsets == pytest.approx(np.array([-0.5 / np.sqrt(3.0), 0.5 / np.sqrt(3.0)]), 1e-8)
+        assert sub_grid_weights == pytest.approx(np.array([0.25, 0.25, 0.25, 0.25]), 1e-8)
+
+    def test__offsets_and_weights__3x3_sub_grid__central_offset_zero_and_weights_sum_to_one(self):
+
+        sub_grid_offsets, sub_grid_weights = \
+            grid_util.gauss_legendre_sub_grid_offsets_and_weights_from_sub_grid_size(sub_grid_size=3)
+
+        assert sub_grid_offsets[1] == pytest.approx(0.0, abs=1e-12)
+        assert sub_grid_weights.shape == (9,)
+        assert np.sum(sub_grid_weights) == pytest.approx(1.0, 1e-12)
+        assert sub_grid_weights[4] == pytest.approx((4.0 / 9.0) ** 2.0, 1e-8)
+
+    def test__3x3_mask_with_one_pixel__2x2_sub_grid(self):
+        mask = np.array([[True, True, True],
+                         [True, False, True],
+                         [True, True, True]])
+
+        sub_grid = grid_util.gauss_legendre_sub_grid_1d_masked_from_mask_pixel_scales_and_sub_grid_size(
+            mask=mask, pixel_scales=(3.0, 6.0), sub_grid_size=2)
+
+        y = 1.5 / np.sqrt(3.0)
+        x = 3.0 / np.sqrt(3.0)
+
+        assert sub_grid == pytest.approx(np.array([[y, -x], [y, x], [-y, -x], [-y, x]]), 1e-8)
+
+    def test__4x3_mask__2x2_sub_grid__pixel_centres_same_as_uniform_sub_grid(self):
+        mask = np.array([[True, True, True],
+                         [True, False, True],
+                         [True, False, False],
+                         [False, True, True]])
+
+        sub_grid = grid_util.gauss_legendre_sub_grid_1d_masked_from_mask_pixel_scales_and_sub_grid_size(
+            mask=mask, pixel_scales=(3.0, 3.0), sub_grid_size=2)
+
+        uniform_sub_grid = grid_util.sub_grid_1d_masked_from_mask_pixel_scales_and_sub_grid_size(
+            mask=mask, pixel_scales=(3.0, 3.0), sub_grid_size=2)
+
+        assert sub_grid.shape == uniform_sub_grid.shape
+        assert sub_grid.reshape(-1, 4, 2).mean(axis=1) == \
+               pytest.approx(uniform_sub_grid.reshape(-1, 4, 2).mean(axis=1), 1e-8)
+
+    def test__3x3_mask_with_one_pixel__3x3_sub_grid__include_nonzero_origin__central_sub_pixel_at_pixel_centre(self):
+        mask = np.array([[True, True, True],
+                         [True, False, True],
+                         [True, True, True]])
+
+        sub_grid = grid_util.gauss_legendre_sub_grid_1d_masked_from_mask_pixel_scales_and_sub_grid_size(
+            mask=mask, pixel_scales=(2.0, 2.0), sub_grid_size=3, origin=(1.0, 1.0))
+
+        assert sub_grid[4] == pytest.approx(np.array([1.0, 1.0]), 1e-8)
+        assert sub_grid[0] == pytest.approx(np.array([1.0 + np.sqrt(0.6), 1.0 - np.sqrt(0.6)]), 1e-8)
+
+    def test__weights_integrate_polynomial_over_pixel_exactly(self):
+        mask = np.array([[True, True, True],
+                         [True, False, True],
+                         [True, True, True]])
+
+        sub_grid = grid_util.gauss_legendre_sub_grid_1d_masked_from_mask_pixel_scales_and_sub_grid_size(
+            mask=mask, pixel_scales=(2.0, 2.0), sub_grid_size=2)
+
+        _, sub_grid_weights = \
+            grid_util.gauss_legendre_sub_grid_offsets_and_weights_from_sub_grid_size(sub_grid_size=2)
+
+        values = sub_grid[:, 0] ** 2.0 * sub_grid[:, 1] ** 2.0 + sub_grid[:, 0] ** 3.0 + 1.0
+
+        # The mean of y^2 x^2 + y^3 + 1 over the pixel spanning -1 < y, x < 1 is 1/9 + 0 + 1.
+        assert np.sum(sub_grid_weights * values) == pytest.approx(1.0 + 1.0 / 9.0, 1e-10)
+
 
 class TestGridConversions(object):
 
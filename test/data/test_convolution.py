@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from autolens.data import convolution
+from autolens.data.array import mask as msk
+
+
+class TestParallelConvolution(object):
+
+    def test__gather_frames__parallel_convolution_same_as_serial(self):
+
+        mask = msk.Mask.circular(shape=(11, 11), pixel_scale=1.0, radius_arcsec=3.5)
+        blurring_mask = mask.blurring_mask_for_psf_shape(psf_shape=(3, 5))
+
+        psf = np.random.RandomState(1).uniform(size=(3, 5))
+
+        convolver = convolution.ConvolverImage(mask=mask, blurring_mask=blurring_mask, psf=psf)
+
+        image_array = np.random.RandomState(2).uniform(size=convolver.pixels_in_mask)
+        blurring_array = np.random.RandomState(3).uniform(size=convolver.pixels_in_blurring_mask)
+
+        blurred_image = convolver.convolve_jit(image_array, convolver.image_frame_indexes,
+                                               convolver.image_frame_psfs, convolver.image_frame_lengths,
+                                               blurring_array, convolver.blurring_frame_indexes,
+                                               convolver.blurring_frame_psfs, convolver.blurring_frame_lengths)
+
+        gather_indexes, gather_psfs, gather_lengths = convolver.gather_frames
+
+        blurred_image_parallel = convolver.convolve_parallel_jit(image_array, blurring_array, gather_indexes,
+                                                                 gather_psfs, gather_lengths)
+
+        assert blurred_image_parallel == pytest.approx(blurred_image, 1.0e-10)
@@ -1,11 +1,15 @@
 import numpy as np
 import pytest
 
+from autolens import exc
 from autolens.data import ccd, convolution
 from autolens.data.array.util import grid_util
+from autolens.data.array import grids
 from autolens.data.array import scaled_array
 from autolens.data.array import mask as msk
 from autolens.lens import lens_data as ld
+from autolens.lens.util import lens_fit_util
+from autolens.model.galaxy import galaxy as g
 from autolens.model.inversion import convolution as inversion_convolution
 
 
@@ -61,6 +65,11 @@ class TestLensData(object):
         assert (lens_data.noise_map_1d == 2.0*np.ones(4)).all()
         assert (lens_data.mask_1d == np.array([False, False, False, False])).all()
 
+    def test_noise_normalization(self, lens_data):
+
+        assert lens_data.noise_normalization == pytest.approx(4.0 * np.log(2 * np.pi * 2.0 ** 2.0), 1e-8)
+        assert (lens_data.noise_weighted_image_1d == 0.25 * np.ones(4)).all()
+
     def test_grids(self, lens_data):
 
         assert (lens_data.grid_stack.regular == np.array([[1.5, -1.5], [1.5, 1.5], [-1.5, -1.5], [-1.5, 1.5]])).all()
@@ -123,6 +132,50 @@ class TestLensData(object):
         assert (lens_data.image == 8.0*np.ones((4,4))).all()
         assert (lens_data.image_1d == 8.0*np.ones(4)).all()
 
+    def test__float32_precision__grids_and_convolvers_are_float32_and_data_is_float64(self, ccd, mask):
+
+        lens_data = ld.LensData(ccd_data=ccd, mask=mask, precision='float32')
+
+        assert lens_data.precision == 'float32'
+        assert lens_data.grid_stack.regular.dtype == np.float32
+        assert lens_data.grid_stack.sub.dtype == np.float32
+        assert lens_data.grid_stack.blurring.dtype == np.float32
+        assert lens_data.padded_grid_stack.sub.dtype == np.float32
+        assert lens_data.convolver_image.image_frame_psfs.dtype == np.float32
+        assert lens_data.convolver_image.blurring_frame_psfs.dtype == np.float32
+        assert lens_data.convolver_mapping_matrix.image_frame_psfs.dtype == np.float32
+        assert lens_data.image_1d.dtype == np.float64
+        assert lens_data.noise_map_1d.dtype == np.float64
+
+        lens_data_float64 = ld.LensData(ccd_data=ccd, mask=mask)
+
+        assert lens_data.grid_stack.sub == pytest.approx(lens_data_float64.grid_stack.sub, 1e-6)
+        assert lens_data.grid_stack.sub.sub_grid_size == lens_data_float64.grid_stack.sub.sub_grid_size
+        assert (lens_data.grid_stack.sub.sub_to_regular == lens_data_float64.grid_stack.sub.sub_to_regular).all()
+
+        lens_data = lens_data.new_lens_data_with_modified_image(modified_image=8.0 * np.ones((4, 4)))
+
+        assert lens_data.precision == 'float32'
+        assert lens_data.grid_stack.sub.dtype == np.float32
+
+    def test__gauss_legendre_sub_grid__grid_stacks_have_gauss_legendre_sub_grids(self, ccd, mask):
+
+        lens_data = ld.LensData(ccd_data=ccd, mask=mask, sub_grid_size=2, gauss_legendre_sub_grid=True)
+
+        assert lens_data.gauss_legendre_sub_grid
+        assert type(lens_data.grid_stack.sub) == grids.GaussLegendreSubGrid
+        assert type(lens_data.padded_grid_stack.sub) == grids.PaddedGaussLegendreSubGrid
+        assert lens_data.grid_stack.sub.sub_grid_weights == pytest.approx(np.full(4, 0.25), 1e-8)
+
+        lens_data = lens_data.new_lens_data_with_modified_image(modified_image=8.0 * np.ones((4, 4)))
+
+        assert type(lens_data.grid_stack.sub) == grids.GaussLegendreSubGrid
+
+    def test__invalid_precision__raises_exception(self, ccd, mask):
+
+        with pytest.raises(exc.ImagingException):
+            ld.LensData(ccd_data=ccd, mask=mask, precision='float16')
+
 @pytest.fixture(name="lens_data_hyper")
 def make_lens_hyper_image(ccd, mask):
 
@@ -160,3 +213,54 @@ class TestLensDataHyper(object):
         assert (lens_data_hyper.hyper_model_image_1d == 10.0*np.ones(4)).all()
         assert (lens_data_hyper.hyper_galaxy_images_1d[0] == 11.0*np.ones(4)).all()
         assert (lens_data_hyper.hyper_galaxy_images_1d[1] == 12.0*np.ones(4)).all()
+
+    def test__hyper_galaxies_cache__same_maps_as_util_and_reused_for_repeated_parameters(self, lens_data_hyper):
+
+        hyper_galaxies = [g.HyperGalaxy(contribution_factor=1.0, noise_factor=2.0, noise_power=1.0),
+                          g.HyperGalaxy(contribution_factor=2.0, noise_factor=1.0, noise_power=2.0)]
+
+        contribution_maps_1d = lens_data_hyper.contribution_maps_1d_from_hyper_galaxies(hyper_galaxies=hyper_galaxies)
+
+        contribution_maps_1d_util = lens_fit_util.contribution_maps_1d_from_hyper_images_and_galaxies(
+            hyper_model_image_1d=lens_data_hyper.hyper_model_image_1d,
+            hyper_galaxy_images_1d=lens_data_hyper.hyper_galaxy_images_1d, hyper_galaxies=hyper_galaxies,
+            hyper_minimum_values=lens_data_hyper.hyper_minimum_values)
+
+        assert (contribution_maps_1d[0] == contribution_maps_1d_util[0]).all()
+        assert (contribution_maps_1d[1] == contribution_maps_1d_util[1]).all()
+
+        hyper_noise_map_1d = lens_data_hyper.hyper_noise_map_1d_from_hyper_galaxies(hyper_galaxies=hyper_galaxies)
+
+        assert (hyper_noise_map_1d == lens_fit_util.scaled_noise_map_from_hyper_galaxies_and_contribution_maps(
+            contribution_maps=contribution_maps_1d_util, hyper_galaxies=hyper_galaxies,
+            noise_map=lens_data_hyper.noise_map_1d)).all()
+
+        hyper_galaxies_new_noise = [g.HyperGalaxy(contribution_factor=1.0, noise_factor=3.0, noise_power=1.0),
+                                    g.HyperGalaxy(contribution_factor=2.0, noise_factor=1.0, noise_power=2.0)]
+
+        assert lens_data_hyper.contribution_maps_1d_from_hyper_galaxies(
+            hyper_galaxies=hyper_galaxies_new_noise) is contribution_maps_1d
+        assert lens_data_hyper.hyper_noise_map_1d_from_hyper_galaxies(
+            hyper_galaxies=hyper_galaxies) is hyper_noise_map_1d
+        assert lens_data_hyper.hyper_noise_map_1d_from_hyper_galaxies(
+            hyper_galaxies=hyper_galaxies_new_noise) is not hyper_noise_map_1d
+
+        assert len(lens_data_hyper.contribution_maps_1d_cache) == 1
+        assert len(lens_data_hyper.hyper_noise_map_1d_cache) == 2
+
+    def test__hyper_cache_size__least_recently_used_entry_discarded(self, ccd, mask):
+
+        lens_data_hyper = ld.LensDataHyper(ccd_data=ccd, mask=mask, hyper_model_image=10.0 * np.ones((4, 4)),
+                                           hyper_galaxy_images=[11.0*np.ones((4,4))], hyper_minimum_values=[0.1],
+                                           hyper_cache_size=2)
+
+        for contribution_factor in [1.0, 2.0, 3.0]:
+            lens_data_hyper.contribution_maps_1d_from_hyper_galaxies(
+                hyper_galaxies=[g.HyperGalaxy(contribution_factor=contribution_factor)])
+
+        assert list(lens_data_hyper.contribution_maps_1d_cache.keys()) == [(2.0,), (3.0,)]
+
+        lens_data_hyper.contribution_maps_1d_from_hyper_galaxies(hyper_galaxies=[g.HyperGalaxy(contribution_factor=2.0)])
+        lens_data_hyper.contribution_maps_1d_from_hyper_galaxies(hyper_galaxies=[g.HyperGalaxy(contribution_factor=4.0)])
+
+        assert list(lens_data_hyper.contribution_maps_1d_cache.keys()) == [(2.0,), (4.0,)]
@@ -4,6 +4,7 @@ import pytest
 from autofit.tools import fit_util
 from autolens.data import ccd
 from autolens.data.array import scaled_array
+from autolens.data.array import grids
 from autolens.data.array import mask as msk
 from autolens.model.galaxy import galaxy as g
 from autolens.lens.util import lens_fit_util as util
@@ -359,7 +360,8 @@ class TestAbstractLensProfileFit:
                                 blurring_image_1d=np.array([1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0]),
                                 has_light_profile=True, has_hyper_galaxy=False, has_pixelization=False)
 
-            fit = lens_fit.AbstractLensProfileFit(lens_data=lens_data_blur, tracer=tracer, padded_tracer=None)
+            fit = lens_fit.AbstractLensProfileFit(lens_data=lens_data_blur, noise_map_1d=lens_data_blur.noise_map_1d,
+                                                  tracer=tracer, padded_tracer=None)
 
             assert (fit.blurred_profile_image == np.array([[0.0, 0.0, 0.0, 0.0],
                                                            [0.0, 9.0, 9.0, 0.0],
@@ -500,6 +502,19 @@ class TestLensProfileFit:
             assert fit.reduced_chi_squared == 25.0 / 2.0
             assert fit.likelihood == -0.5 * (25.0 + 2.0*np.log(2 * np.pi * 1.0))
 
+        def test__1d_chi_squared_map_and_noise_normalization_match_2d_maps(self, lens_data_manual):
+
+            g0 = g.Galaxy(light_profile=lp.EllipticalSersic(intensity=1.0))
+            tracer = ray_tracing.TracerImagePlane(lens_galaxies=[g0],
+                                                  image_plane_grid_stack=lens_data_manual.grid_stack)
+
+            fit = lens_fit.LensProfileFit(lens_data=lens_data_manual, tracer=tracer)
+
+            assert fit.noise_normalization == lens_data_manual.noise_normalization
+            assert lens_data_manual.map_to_scaled_array(array_1d=fit.chi_squared_map_1d) == \
+                   pytest.approx(fit.chi_squared_map, 1e-8)
+            assert fit.chi_squared == pytest.approx(np.sum(fit.chi_squared_map), 1e-8)
+
     class TestCompareToManual:
 
         def test___manual_image_and_psf(self, lens_data_manual):
@@ -576,8 +591,139 @@ class TestLensProfileFit:
             assert (unmasked_blurred_image_of_galaxies[1][0] == fit.unmasked_model_image_of_planes_and_galaxies[1][0]).all()
 
 
+    class TestLinearLightProfiles:
+
+        def test__linear_intensities_solved_for__fit_image_of_non_linear_profiles_perfectly(self, lens_data_manual):
+
+            g0 = g.Galaxy(light_profile_0=lp.EllipticalSersic(axis_ratio=0.8, intensity=2.0, effective_radius=1.0),
+                          light_profile_1=lp.SphericalGaussian(centre=(0.5, 0.5), intensity=3.0, sigma=0.5))
+
+            tracer = ray_tracing.TracerImagePlane(lens_galaxies=[g0], image_plane_grid_stack=lens_data_manual.grid_stack)
+            fit = lens_fit.LensProfileFit(lens_data=lens_data_manual, tracer=tracer)
+
+            lens_data = lens_data_manual.new_lens_data_with_modified_image(modified_image=fit.model_image)
+
+            g_linear = g.Galaxy(light_profile_0=lp.EllipticalSersicLinear(axis_ratio=0.8, effective_radius=1.0),
+                                light_profile_1=lp.SphericalGaussianLinear(centre=(0.5, 0.5), sigma=0.5))
+
+            tracer = ray_tracing.TracerImagePlane(lens_galaxies=[g_linear], image_plane_grid_stack=lens_data.grid_stack)
+            fit = lens_fit.LensProfileFit(lens_data=lens_data, tracer=tracer)
+
+            assert fit.linear_intensities == pytest.approx(np.array([2.0, 3.0]), 1.0e-4)
+            assert g_linear.light_profile_0.intensity == 1.0
+            assert g_linear.light_profile_1.intensity == 1.0
+            assert fit.chi_squared == pytest.approx(0.0, abs=1.0e-8)
+
+        def test__linear_and_non_linear_profiles_in_two_planes__linear_intensity_solved_for(self, lens_data_manual):
+
+            g0 = g.Galaxy(light_profile=lp.EllipticalSersic(intensity=1.0),
+                          mass_profile=mp.SphericalIsothermal(einstein_radius=0.5))
+            g1 = g.Galaxy(light_profile=lp.EllipticalExponential(intensity=5.0, effective_radius=0.5))
+
+            tracer = ray_tracing.TracerImageSourcePlanes(lens_galaxies=[g0], source_galaxies=[g1],
+                                                         image_plane_grid_stack=lens_data_manual.grid_stack)
+            fit = lens_fit.LensProfileFit(lens_data=lens_data_manual, tracer=tracer)
+
+            lens_data = lens_data_manual.new_lens_data_with_modified_image(modified_image=fit.model_image)
+
+            g1_linear = g.Galaxy(light_profile=lp.EllipticalExponentialLinear(effective_radius=0.5))
+
+            tracer = ray_tracing.TracerImageSourcePlanes(lens_galaxies=[g0], source_galaxies=[g1_linear],
+                                                         image_plane_grid_stack=lens_data.grid_stack)
+            fit = lens_fit.LensProfileFit(lens_data=lens_data, tracer=tracer)
+
+            assert fit.linear_intensities == pytest.approx(np.array([5.0]), 1.0e-4)
+            assert fit.chi_squared == pytest.approx(0.0, abs=1.0e-8)
+
+            fit = lens_fit.LensProfileFit(lens_data=lens_data, tracer=tracer)
+
+            assert fit.linear_intensities == pytest.approx(np.array([5.0]), 1.0e-4)
+
+        def test__model_images_of_planes_use_solved_intensities(self, lens_data_manual):
+
+            g0 = g.Galaxy(light_profile=lp.EllipticalSersic(intensity=1.0),
+                          mass_profile=mp.SphericalIsothermal(einstein_radius=0.5))
+            g1 = g.Galaxy(light_profile=lp.EllipticalExponential(intensity=5.0, effective_radius=0.5))
+
+            tracer = ray_tracing.TracerImageSourcePlanes(lens_galaxies=[g0], source_galaxies=[g1],
+                                                         image_plane_grid_stack=lens_data_manual.grid_stack)
+            padded_tracer = ray_tracing.TracerImageSourcePlanes(
+                lens_galaxies=[g0], source_galaxies=[g1], image_plane_grid_stack=lens_data_manual.padded_grid_stack)
+            fit = lens_fit.LensProfileFit(lens_data=lens_data_manual, tracer=tracer, padded_tracer=padded_tracer)
+
+            lens_data = lens_data_manual.new_lens_data_with_modified_image(modified_image=fit.model_image)
+
+            g1_linear = g.Galaxy(light_profile=lp.EllipticalExponentialLinear(effective_radius=0.5))
+
+            tracer = ray_tracing.TracerImageSourcePlanes(lens_galaxies=[g0], source_galaxies=[g1_linear],
+                                                         image_plane_grid_stack=lens_data.grid_stack)
+            padded_tracer = ray_tracing.TracerImageSourcePlanes(
+                lens_galaxies=[g0], source_galaxies=[g1_linear], image_plane_grid_stack=lens_data.padded_grid_stack)
+            fit_linear = lens_fit.LensProfileFit(lens_data=lens_data, tracer=tracer, padded_tracer=padded_tracer)
+
+            assert fit_linear.model_image_of_planes[0] == pytest.approx(fit.model_image_of_planes[0], 1.0e-4)
+            assert fit_linear.model_image_of_planes[1] == pytest.approx(fit.model_image_of_planes[1], 1.0e-4)
+            assert fit_linear.unmasked_model_image == pytest.approx(fit.unmasked_model_image, 1.0e-4)
+            assert fit_linear.unmasked_model_image_of_planes[1] == \
+                   pytest.approx(fit.unmasked_model_image_of_planes[1], 1.0e-4)
+            assert fit_linear.unmasked_model_image_of_planes_and_galaxies[1][0] == \
+                   pytest.approx(fit.unmasked_model_image_of_planes_and_galaxies[1][0], 1.0e-4)
+            assert g1_linear.light_profile.intensity == 1.0
+
+        def test__tracer_with_linear_intensities__images_use_solved_intensities(self, lens_data_manual):
+
+            g0 = g.Galaxy(light_profile=lp.EllipticalSersic(intensity=1.0),
+                          mass_profile=mp.SphericalIsothermal(einstein_radius=0.5))
+            g1 = g.Galaxy(light_profile=lp.EllipticalExponential(intensity=5.0, effective_radius=0.5))
+
+            tracer = ray_tracing.TracerImageSourcePlanes(lens_galaxies=[g0], source_galaxies=[g1],
+                                                         image_plane_grid_stack=lens_data_manual.grid_stack)
+            fit = lens_fit.LensProfileFit(lens_data=lens_data_manual, tracer=tracer)
+
+            assert fit.tracer_with_linear_intensities is tracer
+
+            lens_data = lens_data_manual.new_lens_data_with_modified_image(modified_image=fit.model_image)
+
+            g1_linear = g.Galaxy(light_profile=lp.EllipticalExponentialLinear(effective_radius=0.5))
+
+            tracer_linear = ray_tracing.TracerImageSourcePlanes(lens_galaxies=[g0], source_galaxies=[g1_linear],
+                                                                image_plane_grid_stack=lens_data.grid_stack)
+            fit_linear = lens_fit.LensProfileFit(lens_data=lens_data, tracer=tracer_linear)
+
+            tracer_with_linear_intensities = fit_linear.tracer_with_linear_intensities
+
+            assert tracer_with_linear_intensities.source_plane.galaxies[0].light_profile.intensity == \
+                   pytest.approx(5.0, 1.0e-4)
+            assert tracer_with_linear_intensities.image_plane_image_1d == \
+                   pytest.approx(tracer.image_plane_image_1d, 1.0e-4)
+            assert tracer_linear.source_plane.galaxies[0].light_profile.intensity == 1.0
+
+
 class TestLensInversionFit:
 
+    class TestIterativeInversion:
+
+        def test__inversion_solver_passed_to_inversion__solution_matches_direct_fit(self, lens_data_manual):
+
+            pix = pixelizations.Rectangular(shape=(3, 3))
+            reg = regularization.Constant(coefficients=(1.0,))
+
+            g0 = g.Galaxy(pixelization=pix, regularization=reg)
+
+            tracer = ray_tracing.TracerImageSourcePlanes(lens_galaxies=[g.Galaxy()], source_galaxies=[g0],
+                                                         image_plane_grid_stack=lens_data_manual.grid_stack, border=None)
+
+            fit = lens_fit.fit_lens_data_with_tracer(lens_data=lens_data_manual, tracer=tracer)
+
+            solver = inversions.ConjugateGradientSolver(tolerance=1.0e-12)
+
+            fit_iterative = lens_fit.fit_lens_data_with_tracer(lens_data=lens_data_manual, tracer=tracer,
+                                                               inversion_solver=solver)
+
+            assert fit_iterative.inversion.solver is solver
+            assert fit_iterative.inversion.solution_vector == pytest.approx(fit.inversion.solution_vector, 1e-6)
+            assert fit_iterative.chi_squared == pytest.approx(fit.chi_squared, 1e-6)
+
     class TestCompareToManual:
 
         def test___manual_image_and_psf(self, lens_data_manual):
@@ -750,6 +896,7 @@ class TestLensProfileHyperFit:
                                                                                                  lens_data_hyper_no_blur):
 
             lens_data_hyper_no_blur.image[1:3,1:3] = 2.0
+            lens_data_hyper_no_blur.image_1d = np.array([2.0, 2.0, 2.0, 2.0])
 
             g0 = g.Galaxy(light_profile=MockLightProfile(value=1.0, size=4))
             g1 = g.Galaxy(light_profile=MockLightProfile(value=0.0, size=4))
@@ -1147,3 +1294,71 @@ class TestPositionFit:
 
         assert fit.maximum_separation_within_threshold(threshold=100.0) == True
         assert fit.maximum_separation_within_threshold(threshold=0.1) == False
+
+
+class TestFloat32Precision:
+
+    def test__profile_and_inversion_fits__float32_likelihoods_match_float64(self):
+
+        psf = ccd.PSF.simulate_as_gaussian(shape=(5, 5), sigma=0.1, pixel_scale=0.1)
+
+        lens_galaxy = g.Galaxy(light=lp.EllipticalSersic(centre=(0.01, 0.0), axis_ratio=0.8, phi=40.0, intensity=0.5,
+                                                         effective_radius=0.8, sersic_index=3.0),
+                               mass=mp.EllipticalIsothermal(centre=(0.0, 0.02), axis_ratio=0.7, phi=45.0,
+                                                            einstein_radius=0.8))
+        source_galaxy = g.Galaxy(light=lp.EllipticalSersic(centre=(0.05, 0.1), axis_ratio=0.8, phi=60.0,
+                                                           intensity=0.3, effective_radius=0.3, sersic_index=1.5))
+
+        grid_stack = grids.GridStack.grid_stack_for_simulation(shape=(30, 30), pixel_scale=0.1, psf_shape=(5, 5),
+                                                               sub_grid_size=2)
+        tracer = ray_tracing.TracerImageSourcePlanes(lens_galaxies=[lens_galaxy], source_galaxies=[source_galaxy],
+                                                     image_plane_grid_stack=grid_stack)
+
+        image = psf.convolve(tracer.image_plane_image_for_simulation)[2:-2, 2:-2]
+        image += np.random.RandomState(1).normal(0.0, 0.1, image.shape)
+        ccd_data = ccd.CCDData(image=image, pixel_scale=0.1, psf=psf, noise_map=0.1 * np.ones(image.shape))
+        mask = msk.Mask.circular(shape=image.shape, pixel_scale=0.1, radius_arcsec=1.2)
+
+        fits = {}
+
+        for precision in ['float64', 'float32']:
+
+            lens_data = ld.LensData(ccd_data=ccd_data, mask=mask, sub_grid_size=2, precision=precision)
+
+            tracer = ray_tracing.TracerImageSourcePlanes(lens_galaxies=[lens_galaxy], source_galaxies=[source_galaxy],
+                                                         image_plane_grid_stack=lens_data.grid_stack)
+            profile_fit = lens_fit.fit_lens_data_with_tracer(lens_data=lens_data, tracer=tracer)
+
+            pixelized_galaxy = g.Galaxy(pixelization=pixelizations.Rectangular(shape=(10, 10)),
+                                        regularization=regularization.Constant(coefficients=(1.0,)))
+            tracer = ray_tracing.TracerImageSourcePlanes(lens_galaxies=[g.Galaxy(mass=lens_galaxy.mass)],
+                                                         source_galaxies=[pixelized_galaxy],
+                                                         image_plane_grid_stack=lens_data.grid_stack,
+                                                         border=lens_data.border)
+            inversion_fit = lens_fit.fit_lens_data_with_tracer(lens_data=lens_data, tracer=tracer)
+
+            adaptive_galaxy = g.Galaxy(pixelization=pixelizations.AdaptiveMagnification(shape=(6, 6)),
+                                       regularization=regularization.Constant(coefficients=(1.0,)))
+            image_plane_grid_stack = pixelizations.setup_image_plane_pixelization_grid_from_galaxies_and_grid_stack(
+                galaxies=[adaptive_galaxy], grid_stack=lens_data.grid_stack)
+            tracer = ray_tracing.TracerImageSourcePlanes(lens_galaxies=[g.Galaxy(mass=lens_galaxy.mass)],
+                                                         source_galaxies=[adaptive_galaxy],
+                                                         image_plane_grid_stack=image_plane_grid_stack,
+                                                         border=lens_data.border)
+            adaptive_fit = lens_fit.fit_lens_data_with_tracer(lens_data=lens_data, tracer=tracer)
+
+            fits[precision] = (profile_fit, inversion_fit, adaptive_fit)
+
+        profile_fit, inversion_fit, adaptive_fit = fits['float32']
+
+        assert profile_fit.model_image_1d.dtype == np.float32
+        assert profile_fit.chi_squared_map_1d.dtype == np.float64
+        assert inversion_fit.inversion.blurred_mapping_matrix.dtype == np.float32
+        assert inversion_fit.inversion.curvature_matrix.dtype == np.float64
+
+        assert profile_fit.likelihood == pytest.approx(fits['float64'][0].likelihood, 1.0e-6)
+        assert inversion_fit.evidence == pytest.approx(fits['float64'][1].evidence, 1.0e-6)
+
+        assert adaptive_fit.inversion.mapper.pixels == fits['float64'][2].inversion.mapper.pixels
+        assert (adaptive_fit.inversion.mapper.sub_to_pix == fits['float64'][2].inversion.mapper.sub_to_pix).all()
+        assert adaptive_fit.evidence == pytest.approx(fits['float64'][2].evidence, 1.0e-6)
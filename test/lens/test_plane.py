@@ -488,6 +488,187 @@ class TestPlane(object):
             assert (plane.deflection_stack.sub == 2.0 * sub_galaxy_deflections).all()
             assert (plane.deflection_stack.blurring == 2.0 * blurring_galaxy_deflections).all()
 
+        def test__deflections_via_fft__matches_deflections_from_mass_profiles(self, padded_grid_stack):
+
+            galaxy = g.Galaxy(mass=mp.SphericalSersic(intensity=1.0, effective_radius=0.5, sersic_index=1.0,
+                                                      mass_to_light_ratio=1.0))
+
+            plane = pl.Plane(galaxies=[galaxy], grid_stack=padded_grid_stack, fft_pixel_scale=0.05)
+
+            plane_analytic = pl.Plane(galaxies=[galaxy], grid_stack=padded_grid_stack)
+
+            assert plane.deflection_stack.regular == pytest.approx(plane_analytic.deflection_stack.regular, 2e-2)
+            assert plane.deflection_stack.sub == pytest.approx(plane_analytic.deflection_stack.sub, 2e-2)
+
+        def test__deflection_cache__deflections_identical_and_reused_for_unchanged_mass_profiles(self, grid_stack):
+
+            deflection_cache = pl.DeflectionCache()
+
+            galaxy = g.Galaxy(mass=mp.SphericalIsothermal(einstein_radius=1.0),
+                              shear=mp.ExternalShear(magnitude=0.1, phi=45.0))
+
+            plane = pl.Plane(galaxies=[galaxy], grid_stack=grid_stack, deflection_cache=deflection_cache)
+            plane_no_cache = pl.Plane(galaxies=[galaxy], grid_stack=grid_stack)
+
+            assert plane.deflection_stack.regular == pytest.approx(plane_no_cache.deflection_stack.regular, 1e-8)
+            assert plane.deflection_stack.sub == pytest.approx(plane_no_cache.deflection_stack.sub, 1e-8)
+            assert plane.deflection_stack.blurring == pytest.approx(plane_no_cache.deflection_stack.blurring, 1e-8)
+            assert deflection_cache.misses == 2
+            assert deflection_cache.hits == 0
+
+            galaxy = g.Galaxy(mass=mp.SphericalIsothermal(einstein_radius=1.0),
+                              shear=mp.ExternalShear(magnitude=0.1, phi=45.0))
+
+            plane = pl.Plane(galaxies=[galaxy], grid_stack=grid_stack, deflection_cache=deflection_cache)
+
+            assert plane.deflection_stack.sub == pytest.approx(plane_no_cache.deflection_stack.sub, 1e-8)
+            assert deflection_cache.misses == 2
+            assert deflection_cache.hits == 2
+
+            galaxy = g.Galaxy(mass=mp.SphericalIsothermal(einstein_radius=2.0),
+                              shear=mp.ExternalShear(magnitude=0.1, phi=45.0))
+
+            plane = pl.Plane(galaxies=[galaxy], grid_stack=grid_stack, deflection_cache=deflection_cache)
+            plane_no_cache = pl.Plane(galaxies=[galaxy], grid_stack=grid_stack)
+
+            assert plane.deflection_stack.sub == pytest.approx(plane_no_cache.deflection_stack.sub, 1e-8)
+            assert deflection_cache.misses == 3
+            assert deflection_cache.hits == 3
+
+        def test__deflection_cache__different_grid_with_same_mass_profile_is_not_reused(self, grid_stack,
+                                                                                         padded_grid_stack,
+                                                                                         galaxy_mass):
+
+            deflection_cache = pl.DeflectionCache()
+
+            pl.Plane(galaxies=[galaxy_mass], grid_stack=grid_stack, deflection_cache=deflection_cache)
+            plane = pl.Plane(galaxies=[galaxy_mass], grid_stack=padded_grid_stack, deflection_cache=deflection_cache)
+            plane_no_cache = pl.Plane(galaxies=[galaxy_mass], grid_stack=padded_grid_stack)
+
+            assert plane.deflection_stack.sub == pytest.approx(plane_no_cache.deflection_stack.sub, 1e-8)
+            assert deflection_cache.hits == 0
+
+        def test__deflection_cache__least_recently_used_entries_removed_above_max_size(self, grid_stack):
+
+            deflection_cache = pl.DeflectionCache(max_size=2)
+
+            galaxy = g.Galaxy(mass=mp.SphericalIsothermal(einstein_radius=1.0),
+                              shear=mp.ExternalShear(magnitude=0.1, phi=45.0),
+                              mass_1=mp.SphericalIsothermal(centre=(1.0, 1.0), einstein_radius=0.5))
+
+            pl.Plane(galaxies=[galaxy], grid_stack=grid_stack, deflection_cache=deflection_cache)
+
+            assert len(deflection_cache.deflections) == 2
+
+        def test__deflection_cache__traced_grid_stack_reused_for_unchanged_mass_profiles(self, grid_stack):
+
+            deflection_cache = pl.DeflectionCache()
+
+            galaxy = g.Galaxy(mass=mp.SphericalIsothermal(einstein_radius=1.0))
+
+            plane = pl.Plane(galaxies=[galaxy], grid_stack=grid_stack, deflection_cache=deflection_cache)
+            traced_grid_stack = plane.trace_grid_stack_to_next_plane()
+
+            plane_no_cache = pl.Plane(galaxies=[galaxy], grid_stack=grid_stack)
+            traced_grid_stack_no_cache = plane_no_cache.trace_grid_stack_to_next_plane()
+
+            assert traced_grid_stack.sub == pytest.approx(traced_grid_stack_no_cache.sub, 1e-8)
+            assert traced_grid_stack.blurring == pytest.approx(traced_grid_stack_no_cache.blurring, 1e-8)
+
+            plane = pl.Plane(galaxies=[g.Galaxy(mass=mp.SphericalIsothermal(einstein_radius=1.0))],
+                             grid_stack=grid_stack, deflection_cache=deflection_cache)
+
+            assert plane.trace_grid_stack_to_next_plane() is traced_grid_stack
+            assert deflection_cache.misses == 1
+            assert deflection_cache.hits == 1
+
+            pix_grid_stack = grid_stack.grid_stack_with_pix_grid_added(pix_grid=np.array([[1.0, 1.0], [2.0, 0.5]]),
+                                                                       regular_to_nearest_pix=np.array([0, 1]))
+
+            plane = pl.Plane(galaxies=[galaxy], grid_stack=pix_grid_stack, deflection_cache=deflection_cache)
+            traced_pix_grid_stack = plane.trace_grid_stack_to_next_plane()
+
+            plane_no_cache = pl.Plane(galaxies=[galaxy], grid_stack=pix_grid_stack)
+            traced_pix_grid_stack_no_cache = plane_no_cache.trace_grid_stack_to_next_plane()
+
+            assert traced_pix_grid_stack.sub is traced_grid_stack.sub
+            assert traced_pix_grid_stack.pix == pytest.approx(traced_pix_grid_stack_no_cache.pix, 1e-8)
+            assert (traced_pix_grid_stack.pix.regular_to_nearest_pix == np.array([0, 1])).all()
+
+            plane = pl.Plane(galaxies=[g.Galaxy(mass=mp.SphericalIsothermal(einstein_radius=2.0))],
+                             grid_stack=grid_stack, deflection_cache=deflection_cache)
+
+            assert plane.trace_grid_stack_to_next_plane() is not traced_grid_stack
+
+        def test__deflection_cache__evicted_deflection_stack__grid_stack_traced_with_passed_deflection_stack(
+                self, grid_stack):
+
+            deflection_cache = pl.DeflectionCache(max_size=1)
+
+            galaxy = g.Galaxy(mass=mp.SphericalIsothermal(einstein_radius=1.0))
+
+            deflection_stack = deflection_cache.deflection_stack_of_galaxies_from_grid_stack(galaxies=[galaxy],
+                                                                                             grid_stack=grid_stack)
+
+            deflection_cache.deflection_stack_of_galaxies_from_grid_stack(
+                galaxies=[g.Galaxy(mass=mp.SphericalIsothermal(einstein_radius=2.0))], grid_stack=grid_stack)
+
+            assert deflection_cache.cached_deflection_stack_entry_of_galaxies_and_grid_stack(
+                galaxies=[galaxy], grid_stack=grid_stack) is None
+
+            hits, misses = deflection_cache.hits, deflection_cache.misses
+
+            traced_grid_stack = deflection_cache.traced_grid_stack_of_galaxies_from_grid_stack(
+                galaxies=[galaxy], grid_stack=grid_stack, deflection_stack=deflection_stack)
+
+            assert traced_grid_stack.sub == pytest.approx(grid_stack.sub - deflection_stack.sub, 1e-8)
+            assert (deflection_cache.hits, deflection_cache.misses) == (hits, misses)
+
+        def test__deflection_cache__unhashable_mass_profile_parameter__deflections_computed_but_not_cached(
+                self, grid_stack):
+
+            deflection_cache = pl.DeflectionCache()
+
+            mass_profile = mp.SphericalIsothermal(einstein_radius=1.0)
+            mass_profile.settings = {'option': 1}
+
+            assert pl.mass_profile_cache_key(mass_profile=mass_profile) is None
+
+            plane = pl.Plane(galaxies=[g.Galaxy(mass=mass_profile)], grid_stack=grid_stack,
+                             deflection_cache=deflection_cache)
+            plane_no_cache = pl.Plane(galaxies=[g.Galaxy(mass=mp.SphericalIsothermal(einstein_radius=1.0))],
+                                      grid_stack=grid_stack)
+
+            assert plane.deflection_stack.sub == pytest.approx(plane_no_cache.deflection_stack.sub, 1e-8)
+            assert plane.trace_grid_stack_to_next_plane().sub == \
+                   pytest.approx(plane_no_cache.trace_grid_stack_to_next_plane().sub, 1e-8)
+            assert len(deflection_cache.deflections) == 0
+            assert len(deflection_cache.deflection_stacks) == 0
+
+        def test__galaxy_cache_key__same_for_equal_parameters_and_changes_with_any_parameter(self):
+
+            def galaxy(intensity=1.0, einstein_radius=1.0, coefficients=(1.0,)):
+                return g.Galaxy(redshift=0.5, light=lp.SphericalSersic(intensity=intensity),
+                                mass=mp.SphericalIsothermal(einstein_radius=einstein_radius),
+                                pixelization=pixelizations.Rectangular(shape=(3, 3)),
+                                regularization=regularization.Constant(coefficients=coefficients))
+
+            key = pl.galaxy_cache_key(galaxy=galaxy())
+
+            assert hash(key) == hash(pl.galaxy_cache_key(galaxy=galaxy()))
+            assert key == pl.galaxy_cache_key(galaxy=galaxy())
+            assert key != pl.galaxy_cache_key(galaxy=galaxy(intensity=2.0))
+            assert key != pl.galaxy_cache_key(galaxy=galaxy(einstein_radius=2.0))
+            assert key != pl.galaxy_cache_key(galaxy=galaxy(coefficients=(2.0,)))
+
+        def test__galaxy_cache_key__unhashable_parameter__not_cacheable(self):
+
+            mass_profile = mp.SphericalIsothermal(einstein_radius=1.0)
+            mass_profile.settings = {'option': 1}
+
+            assert pl.galaxy_cache_key(galaxy=g.Galaxy(mass=mass_profile)) is None
+            assert pl.galaxy_cache_key(galaxy=g.Galaxy(mass=mp.SphericalIsothermal(einstein_radius=1.0))) is not None
+
     class TestProperties:
 
         def test__padded_grid_in__tracer_has_padded_grid_property(self, grid_stack, padded_grid_stack, galaxy_light):
@@ -619,6 +800,32 @@ class TestPlane(object):
             assert (plane.image_plane_image_for_simulation[2, 2] == lp_image_pixel_10).all()
             assert (plane.image_plane_image_for_simulation[2, 3] == lp_image_pixel_11).all()
 
+    class TestImageWithFluxFractionTolerance:
+
+        def test__culled_images__same_as_unculled_images_within_tolerance(self):
+
+            grid_stack = grids.GridStack.grid_stack_from_mask_sub_grid_size_and_psf_shape(
+                mask=msk.Mask.circular(shape=(40, 40), pixel_scale=0.1, radius_arcsec=1.8), sub_grid_size=2,
+                psf_shape=(3, 3))
+
+            galaxy_0 = g.Galaxy(light=lp.EllipticalSersic(centre=(0.5, 0.5), axis_ratio=0.7, phi=30.0, intensity=1.0,
+                                                          effective_radius=0.1, sersic_index=1.0))
+            galaxy_1 = g.Galaxy(light_0=lp.SphericalGaussian(centre=(-1.0, -1.0), intensity=1.0, sigma=0.1),
+                                light_1=lp.EllipticalCoreSersic(intensity=0.1))
+
+            plane = pl.Plane(galaxies=[galaxy_0, galaxy_1], grid_stack=grid_stack, compute_deflections=False)
+            culled_plane = pl.Plane(galaxies=[galaxy_0, galaxy_1], grid_stack=grid_stack, compute_deflections=False,
+                                    flux_fraction_tolerance=1.0e-4)
+
+            assert (culled_plane.image_plane_image_1d_of_galaxies[0] == 0.0).any()
+            assert culled_plane.image_plane_image_1d == pytest.approx(plane.image_plane_image_1d, abs=1.0e-3)
+            assert culled_plane.image_plane_blurring_image_1d == \
+                   pytest.approx(plane.image_plane_blurring_image_1d, abs=1.0e-3)
+            assert culled_plane.image_plane_image_1d_of_galaxies[0] == \
+                   pytest.approx(plane.image_plane_image_1d_of_galaxies[0], abs=1.0e-3)
+
+            assert culled_plane.image_plane_image_1d.sum() == pytest.approx(plane.image_plane_image_1d.sum(), 1.0e-4)
+
     class TestBlurringImage:
 
         def test__image_from_plane__same_as_its_light_profile_image(self, grid_stack, galaxy_light):
@@ -1186,6 +1186,46 @@ class TestTracerImageSourcePlanes(object):
                                                            [0.0, -1.0], [0.0, 0.0], [0.0, 1.0],
                                                            [-1.0, -1.0], [-1.0, 1.0]])).all()
 
+        def test__deflection_cache__adaptive_pixelization__base_grid_deflections_reused_by_next_tracer(self):
+
+            mask = msk.Mask(np.array([[True, True, True, True, True],
+                                     [True, False, False, False, True],
+                                     [True, False, False, False, True],
+                                     [True, False, True, False, True],
+                                     [True, True, True, True, True]]), pixel_scale=1.0)
+
+            grid_stack = grids.GridStack.grid_stack_from_mask_sub_grid_size_and_psf_shape(mask=mask, sub_grid_size=2,
+                                                                                               psf_shape=(3, 3))
+
+            deflection_cache = pl.DeflectionCache()
+
+            lens_galaxy = g.Galaxy(mass=mp.SphericalIsothermal(einstein_radius=1.0))
+            source_galaxy = g.Galaxy(pixelization=pixelizations.AdaptiveMagnification(shape=(3, 3)),
+                                     regularization=regularization.Constant())
+
+            ray_tracing.TracerImageSourcePlanes(lens_galaxies=[lens_galaxy], source_galaxies=[source_galaxy],
+                                                image_plane_grid_stack=grid_stack, deflection_cache=deflection_cache)
+
+            assert deflection_cache.hits == 0
+            assert deflection_cache.misses == 2
+
+            lens_galaxy = g.Galaxy(mass=mp.SphericalIsothermal(einstein_radius=1.0))
+
+            tracer = ray_tracing.TracerImageSourcePlanes(lens_galaxies=[lens_galaxy], source_galaxies=[source_galaxy],
+                                                         image_plane_grid_stack=grid_stack,
+                                                         deflection_cache=deflection_cache)
+
+            tracer_no_cache = ray_tracing.TracerImageSourcePlanes(lens_galaxies=[lens_galaxy],
+                                                                  source_galaxies=[source_galaxy],
+                                                                  image_plane_grid_stack=grid_stack)
+
+            assert deflection_cache.hits == 1
+            assert deflection_cache.misses == 3
+
+            for name in ('regular', 'sub', 'blurring', 'pix'):
+                assert getattr(tracer.source_plane.grid_stack, name) == \
+                       pytest.approx(getattr(tracer_no_cache.source_plane.grid_stack, name), 1e-8)
+
     class TestEinsteinMass:
 
         def test__x1_lens_galaxy__is_child_of_power_law__einstein_mass_is_correct(self, grid_stack):
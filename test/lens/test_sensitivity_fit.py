@@ -302,4 +302,62 @@ class TestSensitivityInversionFit:
                                                                                  tracer_normal=tracer_normal,
                                                                                  tracer_sensitive=tracer_sensitive)
 
-        assert fit.figure_of_merit == fit_from_factory.figure_of_merit
\ No newline at end of file
+        assert fit.figure_of_merit == fit_from_factory.figure_of_merit
+
+class TestSensitivityMapper:
+
+    def test__figure_of_merit_matches_sensitivity_fit_with_tracers_built_from_scratch(self, lens_data_blur):
+
+        g0 = g.Galaxy(mass_profile=mp.SphericalIsothermal(einstein_radius=1.0))
+        g1 = g.Galaxy(light_profile=lp.EllipticalSersic(intensity=2.0))
+        g_subhalo = g.Galaxy(mass_profile=mp.SphericalIsothermal(centre=(0.5, 0.5), einstein_radius=0.1))
+
+        sensitivity_mapper = sensitivity_fit.SensitivityMapper(lens_data=lens_data_blur, lens_galaxies=[g0],
+                                                               source_galaxies=[g1])
+
+        tracer_normal = ray_tracing.TracerImageSourcePlanes(lens_galaxies=[g0], source_galaxies=[g1],
+                                                            image_plane_grid_stack=lens_data_blur.grid_stack,
+                                                            border=lens_data_blur.border)
+
+        tracer_sensitive = ray_tracing.TracerImageSourcePlanes(lens_galaxies=[g0, g_subhalo], source_galaxies=[g1],
+                                                               image_plane_grid_stack=lens_data_blur.grid_stack,
+                                                               border=lens_data_blur.border)
+
+        fit = sensitivity_fit.SensitivityProfileFit(lens_data=lens_data_blur, tracer_normal=tracer_normal,
+                                                    tracer_sensitive=tracer_sensitive)
+
+        assert sensitivity_mapper.figure_of_merit_for_sensitive_galaxies(sensitive_galaxies=[g_subhalo]) == \
+               pytest.approx(fit.figure_of_merit, 1e-8)
+
+        misses = sensitivity_mapper.deflection_cache.misses
+
+        sensitivity_mapper.figure_of_merit_for_sensitive_galaxies(sensitive_galaxies=[g_subhalo])
+
+        assert sensitivity_mapper.deflection_cache.misses == misses
+
+    def test__sensitivity_map__serial_and_parallel_agree_and_are_written_to_output_file(self, lens_data_blur,
+                                                                                        tmpdir):
+
+        g0 = g.Galaxy(mass_profile=mp.SphericalIsothermal(einstein_radius=1.0))
+        g1 = g.Galaxy(light_profile=lp.EllipticalSersic(intensity=2.0))
+
+        sensitive_galaxies_grid = [[g.Galaxy(mass_profile=mp.SphericalIsothermal(centre=(y, x),
+                                                                                 einstein_radius=0.1))]
+                                   for y, x in [(0.5, 0.5), (-0.5, 0.5), (0.5, -0.5)]]
+
+        sensitivity_mapper = sensitivity_fit.SensitivityMapper(lens_data=lens_data_blur, lens_galaxies=[g0],
+                                                               source_galaxies=[g1])
+
+        output_file = str(tmpdir.join('sensitivity_map.txt'))
+
+        sensitivity_map = sensitivity_mapper.sensitivity_map_from_sensitive_galaxies_grid(
+            sensitive_galaxies_grid=sensitive_galaxies_grid, output_file=output_file)
+
+        assert sensitivity_map[0] == \
+               sensitivity_mapper.figure_of_merit_for_sensitive_galaxies(sensitive_galaxies_grid[0])
+        assert np.loadtxt(output_file)[:, 1] == pytest.approx(sensitivity_map, 1e-8)
+
+        sensitivity_map_parallel = sensitivity_mapper.sensitivity_map_from_sensitive_galaxies_grid(
+            sensitive_galaxies_grid=sensitive_galaxies_grid, processes=2)
+
+        assert sensitivity_map_parallel == pytest.approx(sensitivity_map, 1e-8)
@@ -0,0 +1,102 @@
+import io
+
+import numpy as np
+import pytest
+
+from autolens import exc
+from autolens.data import ccd
+from autolens.data.array import grids
+from autolens.data.array import mask as msk
+from autolens.data.array import scaled_array
+from autolens.lens import lens_data as ld
+from autolens.lens import lens_fit
+from autolens.lens import ray_tracing
+from autolens.lens import shared_lens_data
+from autolens.model.galaxy import galaxy as g
+from autolens.model.profiles import light_profiles as lp
+
+
+@pytest.fixture(name='lens_data')
+def make_lens_data():
+
+    image = scaled_array.ScaledSquarePixelArray(array=np.arange(36.0).reshape((6, 6)), pixel_scale=1.0)
+    psf = ccd.PSF(array=np.ones((3, 3)), pixel_scale=1.0, renormalize=True)
+    noise_map = ccd.NoiseMap(array=2.0 * np.ones((6, 6)), pixel_scale=1.0)
+
+    ccd_data = ccd.CCDData(image=image, pixel_scale=1.0, psf=psf, noise_map=noise_map)
+
+    mask = msk.Mask.circular(shape=(6, 6), pixel_scale=1.0, radius_arcsec=2.0)
+
+    return ld.LensData(ccd_data=ccd_data, mask=mask, sub_grid_size=2)
+
+
+class TestSharedLensData(object):
+
+    def test__publish_and_attach__arrays_memory_mapped_with_same_classes_and_attributes(self, lens_data, tmpdir):
+
+        shared_lens_data.publish_lens_data(lens_data=lens_data, path=str(tmpdir), minimum_bytes=0)
+
+        attached_lens_data = shared_lens_data.attach_lens_data(path=str(tmpdir))
+
+        assert (attached_lens_data.image_1d == lens_data.image_1d).all()
+        assert (attached_lens_data.noise_map_1d == lens_data.noise_map_1d).all()
+        assert (attached_lens_data.convolver_image.image_frame_psfs ==
+                lens_data.convolver_image.image_frame_psfs).all()
+
+        sub_grid = attached_lens_data.grid_stack.sub
+
+        assert type(sub_grid) == grids.SubGrid
+        assert (sub_grid == lens_data.grid_stack.sub).all()
+        assert (sub_grid.sub_to_regular == lens_data.grid_stack.sub.sub_to_regular).all()
+        assert sub_grid.sub_grid_size == 2
+        assert type(sub_grid.mask) == msk.Mask
+        assert sub_grid.mask.pixel_scale == 1.0
+
+        assert type(attached_lens_data.border) == grids.RegularGridBorder
+        assert (attached_lens_data.border == lens_data.border).all()
+
+        assert isinstance(sub_grid.base.base, np.memmap)
+        assert not sub_grid.flags.writeable
+
+    def test__attached_lens_data__same_fit_as_published_lens_data(self, lens_data, tmpdir):
+
+        shared_lens_data.publish_lens_data(lens_data=lens_data, path=str(tmpdir), minimum_bytes=0)
+
+        attached_lens_data = shared_lens_data.attach_lens_data(path=str(tmpdir))
+
+        galaxy = g.Galaxy(light=lp.EllipticalSersic(intensity=10.0))
+
+        fit = lens_fit.fit_lens_data_with_tracer(
+            lens_data=lens_data, tracer=ray_tracing.TracerImagePlane(lens_galaxies=[galaxy],
+                                                                     image_plane_grid_stack=lens_data.grid_stack))
+
+        attached_fit = lens_fit.fit_lens_data_with_tracer(
+            lens_data=attached_lens_data,
+            tracer=ray_tracing.TracerImagePlane(lens_galaxies=[galaxy],
+                                                image_plane_grid_stack=attached_lens_data.grid_stack))
+
+        assert attached_fit.likelihood == fit.likelihood
+
+    def test__copy_on_write__arrays_writeable(self, lens_data, tmpdir):
+
+        shared_lens_data.publish_lens_data(lens_data=lens_data, path=str(tmpdir), minimum_bytes=0)
+
+        attached_lens_data = shared_lens_data.attach_lens_data(path=str(tmpdir), mmap_mode='c')
+
+        assert attached_lens_data.grid_stack.sub.flags.writeable
+
+    def test__nothing_published__raises_exception(self, tmpdir):
+
+        with pytest.raises(exc.ImagingException):
+            shared_lens_data.attach_lens_data(path=str(tmpdir))
+
+    def test__temporary_arrays__each_written_to_its_own_file(self, tmpdir):
+
+        pickler = shared_lens_data.SharedArrayPickler(file=io.BytesIO(), path=str(tmpdir), minimum_bytes=0)
+
+        # Each array is freed once its persistent id is computed, thus its id can be reused by the next array.
+        filenames = [pickler.persistent_id(np.full(100, float(value)))[1] for value in range(10)]
+
+        assert len(set(filenames)) == 10
+        assert [np.load(str(tmpdir.join(filename)))[0] for filename in filenames] == [float(value)
+                                                                                        for value in range(10)]
@@ -1,6 +1,7 @@
 import numpy as np
 import pytest
 from astropy import cosmology as cosmo
+from autofit.tools import fit_util
 
 from autolens.data.array import scaled_array
 from autolens.data.array import mask as msk
@@ -122,6 +123,58 @@ class TestBlurImages:
         assert blurred_image_manual_3 == pytest.approx(blurred_image[3], 1e-6)
 
 
+class TestFit1D:
+
+    def test__chi_squared_map_1d__simple_values(self):
+
+        chi_squared_map_1d = util.chi_squared_map_1d_from_image_1d_noise_map_1d_and_model_image_1d(
+            image_1d=np.array([1.0, 2.0, 3.0]), noise_map_1d=np.array([1.0, 2.0, 0.5]),
+            model_image_1d=np.array([1.0, 1.0, 2.0]))
+
+        assert chi_squared_map_1d == pytest.approx(np.array([0.0, 0.25, 4.0]), 1e-8)
+
+    def test__noise_normalization_1d__same_as_2d_masked_calculation(self):
+
+        noise_map = np.array([[1.0, 2.0],
+                              [3.0, 4.0]])
+        mask = np.array([[False, True],
+                         [False, False]])
+
+        noise_normalization_1d = util.noise_normalization_from_noise_map_1d(noise_map_1d=np.array([1.0, 3.0, 4.0]))
+
+        noise_normalization = fit_util.noise_normalization_from_noise_map_and_mask(noise_map=noise_map, mask=mask)
+
+        assert noise_normalization_1d == pytest.approx(noise_normalization, 1e-8)
+
+
+class TestLinearLightProfileIntensities:
+
+    def test__least_squares_solution_of_basis_images(self):
+
+        blurred_images_1d = [np.array([1.0, 0.0, 1.0, 0.0]), np.array([0.0, 1.0, 1.0, 1.0])]
+        image_1d = 2.0 * blurred_images_1d[0] + 3.0 * blurred_images_1d[1]
+
+        intensities = util.linear_light_profile_intensities_from_image_1d_noise_map_1d_and_blurred_images(
+            image_1d=image_1d, noise_map_1d=np.array([1.0, 2.0, 1.0, 2.0]), blurred_images_1d=blurred_images_1d)
+
+        assert intensities == pytest.approx(np.array([2.0, 3.0]), 1.0e-8)
+
+    def test__non_negative__negative_intensity_fixed_to_zero(self):
+
+        blurred_images_1d = [np.array([1.0, 0.0, 0.0]), np.array([0.0, 1.0, 1.0])]
+        image_1d = -2.0 * blurred_images_1d[0] + 3.0 * blurred_images_1d[1]
+
+        intensities = util.linear_light_profile_intensities_from_image_1d_noise_map_1d_and_blurred_images(
+            image_1d=image_1d, noise_map_1d=np.ones(3), blurred_images_1d=blurred_images_1d)
+
+        assert intensities == pytest.approx(np.array([0.0, 3.0]), 1.0e-8)
+
+        intensities = util.linear_light_profile_intensities_from_image_1d_noise_map_1d_and_blurred_images(
+            image_1d=image_1d, noise_map_1d=np.ones(3), blurred_images_1d=blurred_images_1d, non_negative=False)
+
+        assert intensities == pytest.approx(np.array([-2.0, 3.0]), 1.0e-8)
+
+
 class TestInversionEvidence:
 
     def test__simple_values(self):
@@ -1,5 +1,6 @@
 import numpy as np
 import pytest
+from astropy import cosmology as cosmo
 
 from autolens.data.array import grids
 from autolens.data.array import mask
@@ -288,4 +289,97 @@ class TestGridStackDeflections:
 
         assert (traced_grid_stack.regular == grid_stack.regular - deflection_stack.regular).all()
         assert (traced_grid_stack.sub == grid_stack.sub - deflection_stack.sub).all()
-        assert (traced_grid_stack.blurring == grid_stack.blurring - deflection_stack.blurring).all()
\ No newline at end of file
+        assert (traced_grid_stack.blurring == grid_stack.blurring - deflection_stack.blurring).all()
+
+class TestCosmologicalDistances:
+
+    def test__distances_and_scaling_factor_match_astropy(self):
+
+        assert lens_util.arcsec_per_kpc_proper_for_cosmology(z=0.5, cosmology=cosmo.Planck15) == \
+               pytest.approx(cosmo.Planck15.arcsec_per_kpc_proper(0.5).value, 1e-8)
+        assert lens_util.angular_diameter_distance_to_earth_for_cosmology(z=0.5, cosmology=cosmo.Planck15) == \
+               pytest.approx(cosmo.Planck15.angular_diameter_distance(0.5).to('kpc').value, 1e-8)
+        assert lens_util.angular_diameter_distance_between_redshifts_for_cosmology(
+            z1=0.5, z2=1.0, cosmology=cosmo.Planck15) == \
+               pytest.approx(cosmo.Planck15.angular_diameter_distance_z1z2(0.5, 1.0).to('kpc').value, 1e-8)
+
+    def test__results_memoized_per_cosmology_and_redshifts(self):
+
+        results = lens_util.angular_diameter_distance_to_earth_for_cosmology.results
+        results.clear()
+
+        distance = lens_util.angular_diameter_distance_to_earth_for_cosmology(z=0.5, cosmology=cosmo.Planck15)
+        assert len(results) == 1
+
+        assert lens_util.angular_diameter_distance_to_earth_for_cosmology(z=0.5, cosmology=cosmo.Planck15) == distance
+        assert len(results) == 1
+
+        lens_util.angular_diameter_distance_to_earth_for_cosmology(z=1.0, cosmology=cosmo.Planck15)
+        assert len(results) == 2
+
+        distance_wmap = lens_util.angular_diameter_distance_to_earth_for_cosmology(z=0.5, cosmology=cosmo.WMAP7)
+        assert len(results) == 3
+        assert distance_wmap != distance
+
+    def test__positional_and_keyword_calls__same_memoized_result(self):
+
+        results = lens_util.scaling_factor_between_redshifts_for_cosmology.results
+        results.clear()
+
+        scaling_factor = lens_util.scaling_factor_between_redshifts_for_cosmology(0.5, 1.0, 2.0, cosmo.Planck15)
+
+        assert scaling_factor == lens_util.scaling_factor_between_redshifts_for_cosmology(
+            z1=0.5, z2=1.0, z_final=2.0, cosmology=cosmo.Planck15)
+        assert scaling_factor == lens_util.scaling_factor_between_redshifts_for_cosmology(
+            0.5, 1.0, z_final=2.0, cosmology=cosmo.Planck15)
+        assert len(results) == 1
+
+    def test__least_recently_used_results_removed_above_max_size(self):
+
+        @lens_util.memoize_for_cosmology(max_size=2)
+        def redshift_for_cosmology(z, cosmology):
+            return z
+
+        redshift_for_cosmology(z=0.5, cosmology=cosmo.Planck15)
+        redshift_for_cosmology(z=1.0, cosmology=cosmo.Planck15)
+        redshift_for_cosmology(z=0.5, cosmology=cosmo.Planck15)
+        redshift_for_cosmology(z=2.0, cosmology=cosmo.WMAP7)
+
+        assert len(redshift_for_cosmology.results) == 2
+        assert [key[2:] for key in redshift_for_cosmology.results] == [(('z', 0.5),), (('z', 2.0),)]
+        assert redshift_for_cosmology.results[next(reversed(redshift_for_cosmology.results))][0] is cosmo.WMAP7
+
+
+class TestMultiPlaneTracing:
+
+    def test__scaling_factor_matrix__entries_match_scaling_factor_between_redshifts(self):
+
+        scaling_factors = lens_util.scaling_factor_matrix_from_redshifts_for_cosmology(plane_redshifts=(0.5, 1.0, 2.0),
+                                                                                       cosmology=cosmo.Planck15)
+
+        assert scaling_factors.shape == (3, 3)
+        assert scaling_factors[0, 1] == lens_util.scaling_factor_between_redshifts_for_cosmology(
+            z1=0.5, z2=1.0, z_final=2.0, cosmology=cosmo.Planck15)
+        assert scaling_factors[1, 2] == lens_util.scaling_factor_between_redshifts_for_cosmology(
+            z1=1.0, z2=2.0, z_final=2.0, cosmology=cosmo.Planck15)
+        assert (np.tril(scaling_factors) == 0.0).all()
+        assert scaling_factors.flags.writeable == False
+
+    def test__traced_grid_stack__matches_scaling_and_subtracting_each_deflection_stack(self, grid_stack, galaxy_mass):
+
+        plane_0 = pl.Plane(galaxies=[galaxy_mass], grid_stack=grid_stack, compute_deflections=True)
+        plane_1 = pl.Plane(galaxies=[galaxy_mass], grid_stack=grid_stack, compute_deflections=True)
+
+        traced_grid_stack = lens_util.traced_grid_stack_from_deflection_stacks_and_scaling_factors(
+            grid_stack=grid_stack, deflection_stacks=[plane_0.deflection_stack, plane_1.deflection_stack],
+            scaling_factors=[0.5, 2.0])
+
+        assert traced_grid_stack.regular == \
+               pytest.approx(grid_stack.regular - 0.5 * plane_0.deflection_stack.regular -
+                             2.0 * plane_1.deflection_stack.regular, 1e-8)
+        assert traced_grid_stack.sub == \
+               pytest.approx(grid_stack.sub - 2.5 * plane_0.deflection_stack.sub, 1e-8)
+        assert traced_grid_stack.blurring == \
+               pytest.approx(grid_stack.blurring - 2.5 * plane_0.deflection_stack.blurring, 1e-8)
+        assert traced_grid_stack.sub.sub_grid_size == grid_stack.sub.sub_grid_size
+        assert (grid_stack.regular == np.array([[1.0, 1.0], [1.0, 0.0]])).all()
@@ -8,7 +8,7 @@ class MockSubGrid(np.ndarray):
     def __new__(cls, sub_grid, *args, **kwargs):
         return sub_grid.view(cls)
 
-    def __init__(self, sub_grid, sub_to_regular, sub_grid_size):
+    def __init__(self, sub_grid, sub_to_regular, sub_grid_size, sub_grid_weights=None):
         # noinspection PyArgumentList
         super().__init__()
         self.sub_grid_coords = sub_grid
@@ -17,6 +17,7 @@ class MockSubGrid(np.ndarray):
         self.sub_grid_size = sub_grid_size
         self.sub_grid_length = int(sub_grid_size ** 2.0)
         self.sub_grid_fraction = 1.0 / self.sub_grid_length
+        self.sub_grid_weights = sub_grid_weights
 
 
 class MockGridStack(object):
@@ -17,6 +17,10 @@ class MockTracer(object):
     def all_planes(self):
         return []
 
+    @property
+    def planes(self):
+        return []
+
     @property
     def image_plane_image_1d(self):
         return self.unblurred_image_1d
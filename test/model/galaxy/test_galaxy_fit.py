@@ -370,3 +370,39 @@ class TestGalaxyFit:
                                                                                           noise_normalization=noise_normalization)
 
             assert likelihood == pytest.approx(fit.likelihood, 1e-4)
+
+        def test__deflections_y_and_x_in_one_evaluation__same_as_separate_fits(self):
+
+            image = sca.ScaledSquarePixelArray(array=np.array([[0.0, 0.0, 0.0, 0.0, 0.0],
+                                                            [0.0, 1.0, 2.0, 3.0, 0.0],
+                                                            [0.0, 4.0, 5.0, 6.0, 0.0],
+                                                            [0.0, 7.0, 8.0, 9.0, 0.0],
+                                                            [0.0, 0.0, 0.0, 0.0, 0.0]]), pixel_scale=1.0)
+
+            noise_map = 2.0 * np.ones((5, 5))
+
+            galaxy_data = gd.GalaxyData(image=image, noise_map=noise_map, pixel_scale=3.0)
+
+            mask = msk.Mask(array=np.array([[True, True, True, True, True],
+                                            [True, False, False, False, True],
+                                            [True, False, False, False, True],
+                                            [True, False, False, False, True],
+                                            [True, True, True, True, True]]), pixel_scale=1.0)
+
+            galaxy = g.Galaxy(mass=mp.SphericalIsothermal(centre=(1.0, 2.0), einstein_radius=1.0))
+            galaxy_fit_data_y = gd.GalaxyFitData(galaxy_data=galaxy_data, mask=mask, sub_grid_size=2,
+                                                 use_deflections_y=True)
+            galaxy_fit_data_x = gd.GalaxyFitData(galaxy_data=galaxy_data, mask=mask, sub_grid_size=2,
+                                                 use_deflections_x=True)
+
+            fit_y, fit_x = galaxy_fit.fit_galaxy_data_y_and_x_deflections_with_model_galaxies(
+                galaxy_data_y=galaxy_fit_data_y, galaxy_data_x=galaxy_fit_data_x, model_galaxies=[galaxy])
+
+            separate_fit_y = galaxy_fit.GalaxyFit(galaxy_data=galaxy_fit_data_y, model_galaxies=[galaxy])
+            separate_fit_x = galaxy_fit.GalaxyFit(galaxy_data=galaxy_fit_data_x, model_galaxies=[galaxy])
+
+            assert fit_y.model_galaxies == [galaxy]
+            assert (fit_y.model_data == separate_fit_y.model_data).all()
+            assert (fit_x.model_data == separate_fit_x.model_data).all()
+            assert fit_y.likelihood == pytest.approx(separate_fit_y.likelihood, 1e-8)
+            assert fit_x.likelihood == pytest.approx(separate_fit_x.likelihood, 1e-8)
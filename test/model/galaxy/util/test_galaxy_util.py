@@ -238,4 +238,50 @@ class TestDeflectionsFromGrid:
         assert deflections.regular[0] == pytest.approx(np.array([2.0 * 0.707, 2.0 * 0.707]), 1e-3)
         assert deflections.sub[0] == pytest.approx(np.array([2.0 * 0.707, 2.0 * 0.707]), 1e-3)
         assert deflections.sub[1] == pytest.approx(np.array([2.0, 0.0]), 1e-3)
-        assert deflections.blurring[0] == pytest.approx(np.array([2.0, 0.0]), 1e-3)
\ No newline at end of file
+        assert deflections.blurring[0] == pytest.approx(np.array([2.0, 0.0]), 1e-3)
+
+class TestDeflectionsViaFFT:
+
+    def test__kernels__shape_and_symmetry(self):
+
+        kernel_y, kernel_x, kernel_potential = galaxy_util.fft_kernels_from_shape_and_pixel_scale(shape=(3, 4),
+                                                                                                  pixel_scale=0.5)
+
+        assert kernel_y.shape == (5, 7)
+        assert kernel_y[2, 3] == 0.0
+        assert kernel_x[2, 3] == 0.0
+        assert kernel_y[3, 3] == pytest.approx(1.0 / (0.5 * np.pi), 1e-4)
+        assert kernel_x[2, 4] == pytest.approx(1.0 / (0.5 * np.pi), 1e-4)
+        assert kernel_y == pytest.approx(-kernel_y[::-1, :], 1e-4)
+        assert kernel_x == pytest.approx(-kernel_x[:, ::-1], 1e-4)
+        assert kernel_potential[3, 3] == pytest.approx(np.log(0.5) / np.pi, 1e-4)
+
+    def test__compact_sersic_mass__deflections_match_analytic(self):
+
+        sersic = mp.EllipticalSersic(centre=(0.1, 0.0), axis_ratio=0.8, phi=30.0, intensity=1.0,
+                                     effective_radius=0.5, sersic_index=2.0, mass_to_light_ratio=1.0)
+        galaxy = g.Galaxy(mass=sersic)
+
+        grid = np.array([[1.0, 0.5], [0.3, -0.2], [-0.7, 0.9], [2.0, 0.3]])
+
+        deflections, _ = galaxy_util.deflections_and_potential_via_fft_of_galaxies_from_grids(
+            grids_list=[grid], galaxies=[galaxy], pixel_scale=0.02, buffer=3.0)
+
+        assert deflections[0] == pytest.approx(sersic.deflections_from_grid(grid), 1e-2)
+
+        deflections_via_galaxy = galaxy.deflections_via_fft_from_grid(grid=grid, pixel_scale=0.02, buffer=3.0)
+
+        assert (deflections_via_galaxy == deflections[0]).all()
+
+    def test__padded_grid_stack__each_grid_interpolated(self, padded_grid_stack):
+
+        galaxy = g.Galaxy(mass=mp.SphericalSersic(intensity=1.0, effective_radius=0.5, sersic_index=1.0,
+                                                  mass_to_light_ratio=1.0))
+
+        deflections = galaxy_util.deflections_via_fft_of_galaxies_from_grid_stack(grid_stack=padded_grid_stack,
+                                                                                  galaxies=[galaxy], pixel_scale=0.05,
+                                                                                  buffer=2.0)
+
+        assert deflections.blurring.shape == (1, 2)
+        assert deflections.regular == pytest.approx(galaxy.deflections_from_grid(padded_grid_stack.regular), 2e-2)
+        assert deflections.sub == pytest.approx(galaxy.deflections_from_grid(padded_grid_stack.sub), 2e-2)
@@ -1,5 +1,6 @@
 import numpy as np
 import pytest
+from scipy import sparse
 
 from autolens.model.inversion import convolution
 
@@ -96,4 +97,42 @@ class TestConvolveMappingMatrix(object):
                                                           [0.1, 0, 0],
                                                           [0.1, 0, 0],
                                                           [0, 0, 0.1],
-                                                          [0, 0, 0]]), 1e-4)
\ No newline at end of file
+                                                          [0, 0, 0]]), 1e-4)
+
+    def test__parallel_jit__same_as_serial(self):
+
+        mask = np.full((5, 5), False)
+        mask[0, 0] = True
+
+        psf = np.random.RandomState(1).uniform(size=(3, 3))
+
+        convolver = convolution.ConvolverMappingMatrix(mask=mask, psf=psf)
+
+        mapping = np.random.RandomState(2).uniform(size=(24, 4))
+        mapping[mapping < 0.5] = 0.0
+
+        blurred_mapping = convolver.convolve_matrix_jit(mapping, convolver.image_frame_indexes,
+                                                        convolver.image_frame_psfs, convolver.image_frame_lengths)
+
+        blurred_mapping_parallel = convolver.convolve_matrix_parallel_jit(mapping, convolver.image_frame_indexes,
+                                                                          convolver.image_frame_psfs,
+                                                                          convolver.image_frame_lengths)
+
+        assert blurred_mapping_parallel == pytest.approx(blurred_mapping, 1.0e-10)
+
+    def test__convolve_mapping_matrix_sparse__same_as_dense(self):
+
+        mask = np.full((5, 5), False)
+        mask[0, 0] = True
+
+        psf = np.random.RandomState(1).uniform(size=(3, 3))
+
+        convolver = convolution.ConvolverMappingMatrix(mask=mask, psf=psf)
+
+        mapping = np.random.RandomState(2).uniform(size=(24, 4))
+        mapping[mapping < 0.5] = 0.0
+
+        blurred_mapping = convolver.convolve_mapping_matrix(mapping)
+        blurred_mapping_sparse = convolver.convolve_mapping_matrix_sparse(sparse.csr_matrix(mapping))
+
+        assert blurred_mapping_sparse.toarray() == pytest.approx(blurred_mapping, 1.0e-10)
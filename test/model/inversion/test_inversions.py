@@ -2,8 +2,12 @@ import numpy as np
 import pytest
 
 from autolens import exc
+from autolens.data import ccd
 from autolens.data.array import grids, mask
-from autolens.model.inversion import inversions
+from autolens.data.array import mask as msk
+from autolens.lens import lens_data as ld
+from autolens.lens.util import lens_fit_util
+from autolens.model.inversion import inversions, pixelizations, regularization
 from test.mock.mock_inversion import MockConvolver
 
 
@@ -44,7 +48,8 @@ class TestRegularizationTerm:
 
         matrix_shape = (3,3)
 
-        inv = inversions.Inversion(image_1d=np.ones(9), noise_map_1d=np.ones(9), convolver=MockConvolver(matrix_shape),
+        inv = inversions.Inversion(image_1d=np.ones(matrix_shape[0]), noise_map_1d=np.ones(matrix_shape[0]),
+                                   convolver=MockConvolver(matrix_shape),
                                    mapper=MockMapper(matrix_shape), regularization=MockRegularization(matrix_shape))
 
         inv.solution_vector = np.array([1.0, 1.0, 1.0])
@@ -73,7 +78,8 @@ class TestRegularizationTerm:
 
         matrix_shape = (3,3)
 
-        inv = inversions.Inversion(image_1d=np.ones(9), noise_map_1d=np.ones(9), convolver=MockConvolver(matrix_shape),
+        inv = inversions.Inversion(image_1d=np.ones(matrix_shape[0]), noise_map_1d=np.ones(matrix_shape[0]),
+                                   convolver=MockConvolver(matrix_shape),
                                    mapper=MockMapper(matrix_shape), regularization=MockRegularization(matrix_shape))
 
         # G_l term, Warren & Dye 2003 / Nightingale /2015 2018
@@ -105,7 +111,8 @@ class TestLogDetMatrix:
 
         matrix_shape = (3,3)
 
-        inv = inversions.Inversion(image_1d=np.ones(9), noise_map_1d=np.ones(9), convolver=MockConvolver(matrix_shape),
+        inv = inversions.Inversion(image_1d=np.ones(matrix_shape[0]), noise_map_1d=np.ones(matrix_shape[0]),
+                                   convolver=MockConvolver(matrix_shape),
                                    mapper=MockMapper(matrix_shape), regularization=MockRegularization(matrix_shape))
 
         matrix = np.array([[1.0, 0.0, 0.0],
@@ -120,7 +127,8 @@ class TestLogDetMatrix:
 
         matrix_shape = (3,3)
 
-        inv = inversions.Inversion(image_1d=np.ones(9), noise_map_1d=np.ones(9), convolver=MockConvolver(matrix_shape),
+        inv = inversions.Inversion(image_1d=np.ones(matrix_shape[0]), noise_map_1d=np.ones(matrix_shape[0]),
+                                   convolver=MockConvolver(matrix_shape),
                                    mapper=MockMapper(matrix_shape), regularization=MockRegularization(matrix_shape))
 
         matrix = np.array([[2.0, -1.0, 0.0],
@@ -135,7 +143,8 @@ class TestLogDetMatrix:
 
         matrix_shape = (3,3)
 
-        inv = inversions.Inversion(image_1d=np.ones(9), noise_map_1d=np.ones(9), convolver=MockConvolver(matrix_shape),
+        inv = inversions.Inversion(image_1d=np.ones(matrix_shape[0]), noise_map_1d=np.ones(matrix_shape[0]),
+                                   convolver=MockConvolver(matrix_shape),
                                    mapper=MockMapper(matrix_shape), regularization=MockRegularization(matrix_shape))
 
         matrix = np.array([[2.0, 0.0, 0.0],
@@ -159,7 +168,8 @@ class TestReconstructedDataVectorAndImage:
         grid_stack = grids.GridStack.grid_stack_from_mask_sub_grid_size_and_psf_shape(mask=msk, sub_grid_size=1,
                                                                                          psf_shape=(1,1))
 
-        inv = inversions.Inversion(image_1d=np.ones(9), noise_map_1d=np.ones(9), convolver=MockConvolver(matrix_shape),
+        inv = inversions.Inversion(image_1d=np.ones(matrix_shape[0]), noise_map_1d=np.ones(matrix_shape[0]),
+                                   convolver=MockConvolver(matrix_shape),
                                    mapper=MockMapper(matrix_shape, grid_stack),
                                    regularization=MockRegularization(matrix_shape))
 
@@ -188,7 +198,8 @@ class TestReconstructedDataVectorAndImage:
         grid_stack = grids.GridStack.grid_stack_from_mask_sub_grid_size_and_psf_shape(mask=msk, sub_grid_size=1,
                                                                                          psf_shape=(1,1))
 
-        inv = inversions.Inversion(image_1d=np.ones(9), noise_map_1d=np.ones(9), convolver=MockConvolver(matrix_shape),
+        inv = inversions.Inversion(image_1d=np.ones(matrix_shape[0]), noise_map_1d=np.ones(matrix_shape[0]),
+                                   convolver=MockConvolver(matrix_shape),
                                    mapper=MockMapper(matrix_shape, grid_stack), regularization=MockRegularization(matrix_shape))
 
         inv.solution_vector = np.array([1.0, 2.0, 3.0, 4.0])
@@ -204,4 +215,194 @@ class TestReconstructedDataVectorAndImage:
         assert (inv.reconstructed_data_vector == np.array([10.0, 8.0, 1.0])).all()
         assert (inv.reconstructed_data == np.array([[0.0, 0.0, 0.0],
                                                     [10.0, 8.0, 1.0],
-                                                    [0.0, 0.0, 0.0]]))
\ No newline at end of file
+                                                    [0.0, 0.0, 0.0]]))
+
+class TestInversionRegularizationSpectrum:
+
+    @pytest.fixture(name='lens_data')
+    def make_lens_data(self):
+
+        image = np.array([[0.0, 0.0, 0.0, 0.0, 0.0],
+                          [0.0, 1.0, 2.0, 3.0, 0.0],
+                          [0.0, 4.0, 5.0, 6.0, 0.0],
+                          [0.0, 7.0, 8.0, 9.0, 0.0],
+                          [0.0, 0.0, 0.0, 0.0, 0.0]])
+        psf = ccd.PSF(array=np.array([[0.0, 1.0, 0.0],
+                                      [1.0, 2.0, 1.0],
+                                      [0.0, 1.0, 0.0]]), pixel_scale=1.0)
+        ccd_data = ccd.CCDData(image=image, pixel_scale=1.0, psf=psf, noise_map=2.0 * np.ones((5, 5)))
+        mask = msk.Mask.circular(shape=(5, 5), pixel_scale=1.0, radius_arcsec=1.5)
+
+        return ld.LensData(ccd_data=ccd_data, mask=mask, sub_grid_size=2)
+
+    @pytest.fixture(name='mapper')
+    def make_mapper(self, lens_data):
+        return pixelizations.Rectangular(shape=(3, 3)).mapper_from_grid_stack_and_border(
+            grid_stack=lens_data.grid_stack, border=None)
+
+    def test__terms_match_inversion_for_range_of_coefficients(self, lens_data, mapper):
+
+        spectrum = inversions.InversionRegularizationSpectrum(
+            image_1d=lens_data.image_1d, noise_map_1d=lens_data.noise_map_1d,
+            convolver=lens_data.convolver_mapping_matrix, mapper=mapper, regularization=regularization.Constant())
+
+        for coefficient in [0.1, 1.0, 3.0]:
+
+            inversion = inversions.Inversion(image_1d=lens_data.image_1d, noise_map_1d=lens_data.noise_map_1d,
+                                             convolver=lens_data.convolver_mapping_matrix, mapper=mapper,
+                                             regularization=regularization.Constant(coefficients=(coefficient,)))
+
+            assert spectrum.solution_vector_from_coefficient(coefficient=coefficient) == \
+                   pytest.approx(inversion.solution_vector, 1.0e-4)
+            assert spectrum.reconstructed_data_vector_from_coefficient(coefficient=coefficient) == \
+                   pytest.approx(inversion.reconstructed_data_vector, 1.0e-4)
+            assert spectrum.regularization_term_from_coefficient(coefficient=coefficient) == \
+                   pytest.approx(inversion.regularization_term, 1.0e-4)
+            assert spectrum.log_det_curvature_reg_matrix_term_from_coefficient(coefficient=coefficient) == \
+                   pytest.approx(inversion.log_det_curvature_reg_matrix_term, 1.0e-4)
+            assert spectrum.log_det_regularization_matrix_term_from_coefficient(coefficient=coefficient) == \
+                   pytest.approx(inversion.log_det_regularization_matrix_term, 1.0e-4)
+
+            residual_map_1d = lens_data.image_1d - inversion.reconstructed_data_vector
+            chi_squared = np.sum((residual_map_1d / lens_data.noise_map_1d) ** 2.0)
+
+            assert spectrum.chi_squared_from_coefficient(coefficient=coefficient) == pytest.approx(chi_squared, 1.0e-4)
+
+            evidence = lens_fit_util.evidence_from_inversion_terms(
+                chi_squared=chi_squared, regularization_term=inversion.regularization_term,
+                log_curvature_regularization_term=inversion.log_det_curvature_reg_matrix_term,
+                log_regularization_term=inversion.log_det_regularization_matrix_term,
+                noise_normalization=lens_data.noise_normalization)
+
+            assert spectrum.evidence_from_coefficient(coefficient=coefficient) == pytest.approx(evidence, 1.0e-4)
+
+    def test__batch_evidences_and_maximizer(self, lens_data, mapper):
+
+        spectrum = inversions.inversion_regularization_spectrum_from_image_mapper_and_regularization(
+            image_1d=lens_data.image_1d, noise_map_1d=lens_data.noise_map_1d,
+            convolver=lens_data.convolver_mapping_matrix, mapper=mapper, regularization=regularization.Constant())
+
+        coefficients = 10.0 ** np.linspace(-3.0, 3.0, 61)
+
+        evidences = spectrum.evidences_from_coefficients(coefficients=coefficients)
+
+        assert evidences[10] == pytest.approx(spectrum.evidence_from_coefficient(coefficient=coefficients[10]), 1.0e-8)
+
+        coefficient = spectrum.coefficient_maximizing_evidence(coefficient_limits=(1.0e-3, 1.0e3))
+
+        assert spectrum.evidence_from_coefficient(coefficient=coefficient) >= np.max(evidences) - 1.0e-4
+
+    def test__non_constant_regularization__raises_exception(self, lens_data, mapper):
+
+        with pytest.raises(exc.InversionException):
+            inversions.InversionRegularizationSpectrum(
+                image_1d=lens_data.image_1d, noise_map_1d=lens_data.noise_map_1d,
+                convolver=lens_data.convolver_mapping_matrix, mapper=mapper, regularization=regularization.Weighted())
+
+
+class TestConjugateGradientSolver:
+
+    @pytest.fixture(name='lens_data')
+    def make_lens_data(self):
+
+        image = np.arange(1.0, 82.0).reshape(9, 9)
+        psf = ccd.PSF(array=np.array([[0.0, 1.0, 0.0],
+                                      [1.0, 2.0, 1.0],
+                                      [0.0, 1.0, 0.0]]), pixel_scale=1.0)
+        ccd_data = ccd.CCDData(image=image, pixel_scale=1.0, psf=psf, noise_map=2.0 * np.ones((9, 9)))
+        mask = msk.Mask.circular(shape=(9, 9), pixel_scale=1.0, radius_arcsec=3.5)
+
+        return ld.LensData(ccd_data=ccd_data, mask=mask, sub_grid_size=2)
+
+    def test__iterative_inversion_matches_direct_inversion(self, lens_data):
+
+        mapper = pixelizations.Rectangular(shape=(5, 5)).mapper_from_grid_stack_and_border(
+            grid_stack=lens_data.grid_stack, border=None)
+
+        inversion = inversions.inversion_from_image_mapper_and_regularization(
+            image_1d=lens_data.image_1d, noise_map_1d=lens_data.noise_map_1d,
+            convolver=lens_data.convolver_mapping_matrix, mapper=mapper,
+            regularization=regularization.Constant(coefficients=(1.0,)))
+
+        solver = inversions.ConjugateGradientSolver(tolerance=1.0e-10, total_probes=30, lanczos_steps=25)
+
+        inversion_iterative = inversions.inversion_from_image_mapper_and_regularization(
+            image_1d=lens_data.image_1d, noise_map_1d=lens_data.noise_map_1d,
+            convolver=lens_data.convolver_mapping_matrix, mapper=mapper,
+            regularization=regularization.Constant(coefficients=(1.0,)), solver=solver)
+
+        assert inversion_iterative.blurred_mapping_matrix is None
+        assert inversion_iterative.regularization_matrix is None
+        assert inversion_iterative.blurred_mapping_matrix_sparse.toarray() == \
+               pytest.approx(inversion.blurred_mapping_matrix, 1.0e-10)
+        assert inversion_iterative.regularization_matrix_sparse.toarray() == \
+               pytest.approx(inversion.regularization_matrix, 1.0e-10)
+        assert inversion_iterative.solution_vector == pytest.approx(inversion.solution_vector, 1.0e-6)
+        assert inversion_iterative.regularization_term == pytest.approx(inversion.regularization_term, 1.0e-6)
+        assert inversion_iterative.log_det_regularization_matrix_term == \
+               pytest.approx(inversion.log_det_regularization_matrix_term, 1.0e-6)
+        assert inversion_iterative.log_det_curvature_reg_matrix_term == \
+               pytest.approx(inversion.log_det_curvature_reg_matrix_term, 5.0e-2)
+
+    def test__weighted_regularization__iterative_inversion_matches_direct_inversion(self, lens_data):
+
+        mapper = pixelizations.Rectangular(shape=(5, 5)).mapper_from_grid_stack_and_border(
+            grid_stack=lens_data.grid_stack, border=None)
+
+        weighted = regularization.Weighted(coefficients=(1.0, 2.0))
+        regularization_weights = weighted.regularization_weights_from_pixel_signals(
+            pixel_signals=np.linspace(0.1, 1.0, mapper.pixels))
+
+        inversion = inversions.inversion_from_image_mapper_and_regularization(
+            image_1d=lens_data.image_1d, noise_map_1d=lens_data.noise_map_1d,
+            convolver=lens_data.convolver_mapping_matrix, mapper=mapper, regularization=weighted,
+            regularization_weights=regularization_weights)
+
+        inversion_iterative = inversions.inversion_from_image_mapper_and_regularization(
+            image_1d=lens_data.image_1d, noise_map_1d=lens_data.noise_map_1d,
+            convolver=lens_data.convolver_mapping_matrix, mapper=mapper, regularization=weighted,
+            regularization_weights=regularization_weights,
+            solver=inversions.ConjugateGradientSolver(tolerance=1.0e-10))
+
+        assert inversion_iterative.regularization_matrix_sparse.toarray() == \
+               pytest.approx(inversion.regularization_matrix, 1.0e-10)
+        assert inversion_iterative.solution_vector == pytest.approx(inversion.solution_vector, 1.0e-6)
+
+    def test__weighted_regularization_without_weights__raises_exception(self, lens_data):
+
+        mapper = pixelizations.Rectangular(shape=(5, 5)).mapper_from_grid_stack_and_border(
+            grid_stack=lens_data.grid_stack, border=None)
+
+        with pytest.raises(exc.InversionException):
+            inversions.inversion_from_image_mapper_and_regularization(
+                image_1d=lens_data.image_1d, noise_map_1d=lens_data.noise_map_1d,
+                convolver=lens_data.convolver_mapping_matrix, mapper=mapper, regularization=regularization.Weighted(),
+                solver=inversions.ConjugateGradientSolver())
+
+    def test__solver_is_warm_started_from_previous_solution(self, lens_data):
+
+        mapper = pixelizations.Rectangular(shape=(5, 5)).mapper_from_grid_stack_and_border(
+            grid_stack=lens_data.grid_stack, border=None)
+
+        solver = inversions.ConjugateGradientSolver(tolerance=1.0e-10)
+
+        inversions.Inversion(image_1d=lens_data.image_1d, noise_map_1d=lens_data.noise_map_1d,
+                             convolver=lens_data.convolver_mapping_matrix, mapper=mapper,
+                             regularization=regularization.Constant(coefficients=(1.0,)), solver=solver)
+
+        cold_iterations = solver.iterations
+
+        inversions.Inversion(image_1d=lens_data.image_1d, noise_map_1d=lens_data.noise_map_1d,
+                             convolver=lens_data.convolver_mapping_matrix, mapper=mapper,
+                             regularization=regularization.Constant(coefficients=(1.01,)), solver=solver)
+
+        assert solver.iterations < cold_iterations
+
+        mapper = pixelizations.Rectangular(shape=(4, 4)).mapper_from_grid_stack_and_border(
+            grid_stack=lens_data.grid_stack, border=None)
+
+        inversion = inversions.Inversion(image_1d=lens_data.image_1d, noise_map_1d=lens_data.noise_map_1d,
+                                         convolver=lens_data.convolver_mapping_matrix, mapper=mapper,
+                                         regularization=regularization.Constant(coefficients=(1.0,)), solver=solver)
+
+        assert inversion.solution_vector.shape == (16,)
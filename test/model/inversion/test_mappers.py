@@ -1,6 +1,8 @@
 import numpy as np
 import pytest
 
+from autolens.data.array import grids
+from autolens.data.array import mask as msk
 from autolens.data.array.util import mapping_util
 from autolens.model.inversion import mappers
 from autolens.model.inversion import pixelizations
@@ -551,3 +553,46 @@ class TestVoronoiMapper:
 
             assert (mapper.sub_to_pix == sub_to_pix_nearest_neighbour).all()
 
+
+
+class TestMappingMatrix:
+
+    def test__gauss_legendre_sub_grid__mapping_matrix_uses_sub_grid_weights(self):
+
+        mask = msk.Mask(array=np.full((3, 3), False), pixel_scale=1.0)
+
+        grid_stack = grids.GridStack.grid_stack_from_mask_sub_grid_size_and_psf_shape(
+            mask=mask, sub_grid_size=3, psf_shape=(1, 1), gauss_legendre_sub_grid=True)
+
+        pix = pixelizations.Rectangular(shape=(4, 4))
+
+        geometry = pix.geometry_from_grid(grid=grid_stack.sub)
+
+        mapper = mappers.RectangularMapper(pixels=16, shape=(4, 4), grid_stack=grid_stack, border=None,
+                                           geometry=geometry)
+
+        mapping_matrix_util = mapper_util.mapping_matrix_from_sub_to_pix_and_sub_grid_weights(
+            sub_to_pix=mapper.sub_to_pix, pixels=16, regular_pixels=9, sub_to_regular=grid_stack.sub.sub_to_regular,
+            sub_grid_weights=grid_stack.sub.sub_grid_weights)
+
+        assert mapper.mapping_matrix == pytest.approx(mapping_matrix_util, 1e-12)
+        assert np.sum(mapper.mapping_matrix, axis=1) == pytest.approx(np.ones(9), 1e-12)
+        assert not (mapper.mapping_matrix == pytest.approx(mapper_util.mapping_matrix_from_sub_to_pix(
+            sub_to_pix=mapper.sub_to_pix, pixels=16, regular_pixels=9, sub_to_regular=grid_stack.sub.sub_to_regular,
+            sub_grid_fraction=grid_stack.sub.sub_grid_fraction), 1e-12))
+
+    def test__mapping_matrix_sparse__same_as_dense(self):
+
+        mask = msk.Mask(array=np.full((3, 3), False), pixel_scale=1.0)
+
+        for gauss_legendre_sub_grid in (False, True):
+
+            grid_stack = grids.GridStack.grid_stack_from_mask_sub_grid_size_and_psf_shape(
+                mask=mask, sub_grid_size=2, psf_shape=(1, 1), gauss_legendre_sub_grid=gauss_legendre_sub_grid)
+
+            pix = pixelizations.Rectangular(shape=(4, 4))
+
+            mapper = mappers.RectangularMapper(pixels=16, shape=(4, 4), grid_stack=grid_stack, border=None,
+                                               geometry=pix.geometry_from_grid(grid=grid_stack.sub))
+
+            assert mapper.mapping_matrix_sparse.toarray() == pytest.approx(mapper.mapping_matrix, 1e-12)
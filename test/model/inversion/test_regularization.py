@@ -1,4 +1,5 @@
 import numpy as np
+import pytest
 
 from autolens.model.inversion import regularization
 from autolens.model.inversion.util import regularization_util as reg_util
@@ -28,6 +29,27 @@ class TestRegularizationConstant:
 
         assert (regularization_matrix == regularization_matrix_util).all()
 
+    def test__regularization_matrix_sparse__same_as_dense(self):
+
+        pixel_neighbors = np.array([[1, 3, 7, 2],
+                                   [4, 2, 0, -1],
+                                   [1, 5, 3, -1],
+                                   [4, 6, 0, -1],
+                                   [7, 1, 5, 3],
+                                   [4, 2, 8, -1],
+                                   [7, 3, 0, -1],
+                                   [4, 8, 6, -1],
+                                   [7, 5, -1, -1]])
+
+        pixel_neighbors_size = np.array([4, 3, 3, 3, 4, 3, 3, 3, 2])
+
+        reg = regularization.Constant(coefficients=(2.0,))
+        regularization_matrix = reg.regularization_matrix_from_pixel_neighbors(pixel_neighbors, pixel_neighbors_size)
+        regularization_matrix_sparse = reg.regularization_matrix_sparse_from_pixel_neighbors(pixel_neighbors,
+                                                                                             pixel_neighbors_size)
+
+        assert regularization_matrix_sparse.toarray() == pytest.approx(regularization_matrix, 1e-12)
+
 
 class TestRegularizationWeighted:
 
@@ -82,3 +104,24 @@ class TestRegularizationWeighted:
 
 
         assert (regularization_matrix == regularization_matrix_util).all()
+
+    def test__regularization_matrix_sparse__same_as_dense(self):
+
+        reg = regularization.Weighted()
+
+        pixel_neighbors = np.array([[1, 4, -1, -1],
+                                    [2, 4, 0, -1],
+                                    [3, 4, 5, 1],
+                                    [5, 2, -1, -1],
+                                    [5, 0, 1, 2],
+                                    [2, 3, 4, -1]])
+
+        pixel_neighbors_size = np.array([2, 3, 4, 2, 4, 3])
+        regularization_weights = np.array([1.0, 2.0, 3.0, 4.0, 5.0, 6.0])
+
+        regularization_matrix = reg.regularization_matrix_from_pixel_neighbors(regularization_weights,
+                                                                               pixel_neighbors, pixel_neighbors_size)
+        regularization_matrix_sparse = reg.regularization_matrix_sparse_from_pixel_neighbors(
+            regularization_weights, pixel_neighbors, pixel_neighbors_size)
+
+        assert regularization_matrix_sparse.toarray() == pytest.approx(regularization_matrix, 1e-12)
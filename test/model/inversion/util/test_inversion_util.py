@@ -1,5 +1,6 @@
 import numpy as np
 import pytest
+from scipy import sparse
 
 from autolens import exc
 from autolens.data.array import grids, mask
@@ -59,6 +60,46 @@ class TestDataVectorFromData(object):
         assert (data_vector == np.array([2.0, 3.0, 1.0])).all()
         
 
+class TestNoiseWeightedDataVector(object):
+
+    def test__noise_weighted_image_and_dense_and_sparse_matrices__same_data_vector_as_image_and_noise_map(self):
+
+        blurred_mapping_matrix = np.array([[1.0, 1.0, 0.0],
+                                           [1.0, 0.0, 0.0],
+                                           [0.0, 1.0, 0.0],
+                                           [0.0, 1.0, 1.0],
+                                           [0.0, 0.0, 0.0],
+                                           [0.0, 0.0, 0.0]])
+
+        image = np.array([4.0, 1.0, 1.0, 16.0, 1.0, 1.0])
+        noise_map = np.array([2.0, 1.0, 1.0, 4.0, 1.0, 1.0])
+
+        noise_weighted_image = inversion_util.noise_weighted_image_1d_from_image_1d_and_noise_map_1d(
+            image_1d=image, noise_map_1d=noise_map)
+
+        assert (noise_weighted_image == np.array([1.0, 1.0, 1.0, 1.0, 1.0, 1.0])).all()
+
+        data_vector = inversion_util.data_vector_from_blurred_mapping_matrix_and_noise_weighted_image(
+            blurred_mapping_matrix=blurred_mapping_matrix, noise_weighted_image_1d=noise_weighted_image)
+
+        assert (data_vector == inversion_util.data_vector_from_blurred_mapping_matrix_and_data(
+            blurred_mapping_matrix=blurred_mapping_matrix, image_1d=image, noise_map_1d=noise_map)).all()
+        assert (data_vector == np.array([2.0, 3.0, 1.0])).all()
+
+        data_vector = inversion_util.data_vector_from_blurred_mapping_matrix_and_noise_weighted_image(
+            blurred_mapping_matrix=sparse.csr_matrix(blurred_mapping_matrix),
+            noise_weighted_image_1d=noise_weighted_image)
+
+        assert (data_vector == np.array([2.0, 3.0, 1.0])).all()
+
+        reconstructed_data_vector = \
+            inversion_util.reconstructed_data_vector_from_blurred_mapping_matrix_and_solution_vector(
+                blurred_mapping_matrix=sparse.csr_matrix(blurred_mapping_matrix),
+                solution_vector=np.array([1.0, 2.0, 3.0]))
+
+        assert (reconstructed_data_vector == np.array([3.0, 1.0, 2.0, 5.0, 0.0, 0.0])).all()
+
+
 class TestCurvatureMatrixFromBlurred(object):
 
     def test__simple_blurred_mapping_matrix(self):
@@ -95,4 +136,74 @@ class TestCurvatureMatrixFromBlurred(object):
 
         assert (curvature_matrix == np.array([[1.25, 0.25, 0.0],
                                               [0.25, 2.25, 1.0],
-                                              [0.0, 1.0, 1.0]])).all()
\ No newline at end of file
+                                              [0.0, 1.0, 1.0]])).all()
+
+    def test__parallel_jit__same_as_serial(self):
+
+        random_state = np.random.RandomState(1)
+        blurred_mapping_matrix = random_state.uniform(size=(30, 8))
+        blurred_mapping_matrix[blurred_mapping_matrix < 0.6] = 0.0
+        noise_map = random_state.uniform(low=0.5, high=2.0, size=30)
+
+        curvature_matrix = inversion_util.curvature_matrix_from_blurred_mapping_matrix(
+            blurred_mapping_matrix=blurred_mapping_matrix, noise_map_1d=noise_map)
+
+        curvature_matrix_parallel = inversion_util.curvature_matrix_from_blurred_mapping_matrix_parallel_jit(
+            blurred_mapping_matrix, noise_map)
+
+        assert curvature_matrix_parallel == pytest.approx(curvature_matrix, 1.0e-10)
+
+class TestIterativeSolvers(object):
+
+    def test__preconditioned_conjugate_gradient__matches_direct_solve(self):
+
+        random_state = np.random.RandomState(1)
+        matrix = random_state.normal(size=(20, 20))
+        matrix = np.matmul(matrix.T, matrix) + np.eye(20)
+        data_vector = random_state.normal(size=20)
+
+        solution_vector, iterations = inversion_util.solution_vector_via_preconditioned_conjugate_gradient(
+            operator=lambda vector: np.matmul(matrix, vector), data_vector=data_vector,
+            preconditioner_diagonal=np.diag(matrix), initial_solution_vector=np.zeros(20), tolerance=1.0e-12,
+            maximum_iterations=200)
+
+        assert solution_vector == pytest.approx(np.linalg.solve(matrix, data_vector), 1.0e-6)
+        assert iterations > 0
+
+        solution_vector, iterations = inversion_util.solution_vector_via_preconditioned_conjugate_gradient(
+            operator=lambda vector: np.matmul(matrix, vector), data_vector=data_vector,
+            preconditioner_diagonal=np.diag(matrix), initial_solution_vector=solution_vector, tolerance=1.0e-10,
+            maximum_iterations=200)
+
+        assert iterations == 0
+
+    def test__preconditioned_conjugate_gradient__not_converged__raises_inversion_exception(self):
+
+        random_state = np.random.RandomState(1)
+        matrix = random_state.normal(size=(20, 20))
+        matrix = np.matmul(matrix.T, matrix) + np.eye(20)
+        data_vector = random_state.normal(size=20)
+
+        with pytest.raises(exc.InversionException):
+            inversion_util.solution_vector_via_preconditioned_conjugate_gradient(
+                operator=lambda vector: np.matmul(matrix, vector), data_vector=data_vector,
+                preconditioner_diagonal=np.diag(matrix), initial_solution_vector=np.zeros(20), tolerance=1.0e-12,
+                maximum_iterations=2)
+
+    def test__stochastic_lanczos_quadrature__estimates_log_determinant(self):
+
+        random_state = np.random.RandomState(1)
+        matrix = random_state.normal(size=(50, 50))
+        matrix = np.matmul(matrix.T, matrix) / 50.0 + np.eye(50)
+
+        log_determinant = inversion_util.log_determinant_via_stochastic_lanczos_quadrature(
+            operator=lambda vector: np.matmul(matrix, vector), dimension=50, total_probes=50, lanczos_steps=20,
+            seed=1)
+
+        assert log_determinant == pytest.approx(np.linalg.slogdet(matrix)[1], 5.0e-2)
+
+        log_determinant_same_seed = inversion_util.log_determinant_via_stochastic_lanczos_quadrature(
+            operator=lambda vector: np.matmul(matrix, vector), dimension=50, total_probes=50, lanczos_steps=20,
+            seed=1)
+
+        assert log_determinant == log_determinant_same_seed
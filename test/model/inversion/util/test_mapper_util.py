@@ -113,4 +113,71 @@ class TestMappingMatrix:
         assert (mapping_matrix == np.array(
             [[0.75, 0.25, 0, 0, 0, 0],
              [0, 0, 1.0, 0, 0, 0],
-             [0.1875, 0.1875, 0.1875, 0.1875, 0.125, 0.125]])).all()
\ No newline at end of file
+             [0.1875, 0.1875, 0.1875, 0.1875, 0.125, 0.125]])).all()
+
+    def test__parallel__same_as_serial(self):
+
+        random_state = np.random.RandomState(1)
+        sub_to_pix = random_state.randint(0, 5, size=36)
+        sub_to_regular = np.repeat(np.arange(9), 4)
+
+        mapping_matrix = mapper_util.mapping_matrix_from_sub_to_pix(sub_to_pix=sub_to_pix, pixels=5,
+                                                                    regular_pixels=9, sub_to_regular=sub_to_regular,
+                                                                    sub_grid_fraction=0.25)
+
+        mapping_matrix_parallel = mapper_util.mapping_matrix_from_sub_to_pix_parallel(
+            sub_to_pix=sub_to_pix, pixels=5, regular_pixels=9, sub_to_regular=sub_to_regular, sub_grid_fraction=0.25)
+
+        assert (mapping_matrix_parallel == mapping_matrix).all()
+
+
+class TestMappingMatrixWithSubGridWeights:
+
+    def test__equal_sub_grid_weights__same_as_mapping_matrix_with_sub_grid_fraction(self, five_pixels):
+
+        sub_to_pix = np.array([0, 0, 0, 1, 1, 1, 0, 0, 2, 3, 4, 5, 7, 0, 1, 3, 6, 7, 4, 2])
+        sub_to_regular = np.array([0, 0, 0, 0, 1, 1, 1, 1, 2, 2, 2, 2, 3, 3, 3, 3, 4, 4, 4, 4])
+
+        grids = MockGridStack(regular=five_pixels, sub=MockSubGrid(five_pixels, sub_to_regular, sub_grid_size=2))
+
+        mapping_matrix = mapper_util.mapping_matrix_from_sub_to_pix(sub_to_pix=sub_to_pix, pixels=8,
+                                                                    regular_pixels=grids.regular.shape[0],
+                                                                    sub_to_regular=grids.sub.sub_to_regular,
+                                                                    sub_grid_fraction=grids.sub.sub_grid_fraction)
+
+        mapping_matrix_weighted = mapper_util.mapping_matrix_from_sub_to_pix_and_sub_grid_weights(
+            sub_to_pix=sub_to_pix, pixels=8, regular_pixels=grids.regular.shape[0],
+            sub_to_regular=grids.sub.sub_to_regular, sub_grid_weights=np.full(4, 0.25))
+
+        assert (mapping_matrix_weighted == mapping_matrix).all()
+
+    def test__unequal_sub_grid_weights__each_sub_pixel_adds_its_weight(self, three_pixels):
+
+        sub_to_pix = np.array([0, 0, 1, 2, 3, 3, 3, 3, 1, 4, 4, 5])
+        sub_to_regular = np.array([0, 0, 0, 0, 1, 1, 1, 1, 2, 2, 2, 2])
+
+        mapping_matrix = mapper_util.mapping_matrix_from_sub_to_pix_and_sub_grid_weights(
+            sub_to_pix=sub_to_pix, pixels=6, regular_pixels=3, sub_to_regular=sub_to_regular,
+            sub_grid_weights=np.array([0.1, 0.2, 0.3, 0.4]))
+
+        assert mapping_matrix == pytest.approx(np.array(
+            [[0.3, 0.3, 0.4, 0.0, 0.0, 0.0],
+             [0.0, 0.0, 0.0, 1.0, 0.0, 0.0],
+             [0.0, 0.1, 0.0, 0.0, 0.5, 0.4]]), 1e-8)
+
+    def test__parallel__same_as_serial(self):
+
+        random_state = np.random.RandomState(1)
+        sub_to_pix = random_state.randint(0, 5, size=81)
+        sub_to_regular = np.repeat(np.arange(9), 9)
+        sub_grid_weights = random_state.uniform(size=9)
+
+        mapping_matrix = mapper_util.mapping_matrix_from_sub_to_pix_and_sub_grid_weights(
+            sub_to_pix=sub_to_pix, pixels=5, regular_pixels=9, sub_to_regular=sub_to_regular,
+            sub_grid_weights=sub_grid_weights)
+
+        mapping_matrix_parallel = mapper_util.mapping_matrix_from_sub_to_pix_and_sub_grid_weights_parallel(
+            sub_to_pix=sub_to_pix, pixels=5, regular_pixels=9, sub_to_regular=sub_to_regular,
+            sub_grid_weights=sub_grid_weights)
+
+        assert mapping_matrix_parallel == pytest.approx(mapping_matrix, 1e-12)
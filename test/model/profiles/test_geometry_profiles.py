@@ -286,4 +286,67 @@ class TestSphericalProfile(object):
             transformed_grid = spherical_profile.transform_grid_from_reference_frame(grid_spherical)
 
             assert transformed_grid[0, 0] == pytest.approx(grid_original[0, 0], 1e-5)
-            assert transformed_grid[0, 1] == pytest.approx(grid_original[0, 1], 1e-5)
\ No newline at end of file
+            assert transformed_grid[0, 1] == pytest.approx(grid_original[0, 1], 1e-5)
+
+class TestTransformCache(object):
+
+    def test__profiles_with_common_geometry__share_transformed_grid(self):
+
+        grid = np.array([[1.0, 1.0], [2.0, 3.0]])
+
+        profile_0 = gp.EllipticalProfile(centre=(0.1, 0.2), axis_ratio=0.8, phi=45.0)
+        profile_1 = gp.EllipticalProfile(centre=(0.1, 0.2), axis_ratio=0.5, phi=45.0)
+        profile_2 = gp.EllipticalProfile(centre=(0.1, 0.2), axis_ratio=0.8, phi=10.0)
+
+        with gp.shared_transforms() as transform_cache:
+
+            transformed_grid_0 = gp.transformed_grid_from_profile_and_grid(profile=profile_0, grid=grid)
+            transformed_grid_1 = gp.transformed_grid_from_profile_and_grid(profile=profile_1, grid=grid)
+            transformed_grid_2 = gp.transformed_grid_from_profile_and_grid(profile=profile_2, grid=grid)
+
+            assert transformed_grid_1 is transformed_grid_0
+            assert transformed_grid_2 is not transformed_grid_0
+            assert not transformed_grid_0.flags.writeable
+
+            assert (transformed_grid_0 == profile_0.transform_grid_to_reference_frame(grid)).all()
+            assert (transformed_grid_2 == profile_2.transform_grid_to_reference_frame(grid)).all()
+
+            assert profile_0.grid_to_elliptical_radii(grid) is profile_0.grid_to_elliptical_radii(grid)
+            assert profile_1.grid_to_elliptical_radii(grid) is not profile_0.grid_to_elliptical_radii(grid)
+
+            assert len(transform_cache.arrays) == 4
+
+    def test__spherical_geometry__transform_dispatched_on_geometry_not_class_name(self):
+
+        class RoundProfile(gp.EllipticalProfile):
+
+            def __init__(self, centre=(0.0, 0.0)):
+                super(RoundProfile, self).__init__(centre, 1.0, 0.0)
+
+        grid = np.array([[1.0, 1.0], [2.0, 3.0]])
+
+        profile = RoundProfile(centre=(0.1, 0.2))
+
+        assert profile.is_spherical
+        assert profile.transform_key == gp.SphericalProfile(centre=(0.1, 0.2)).transform_key
+        assert (profile.transform_grid_to_reference_frame(grid) == np.subtract(grid, (0.1, 0.2))).all()
+        assert (profile.transform_grid_from_reference_frame(np.subtract(grid, (0.1, 0.2))) == grid).all()
+
+        assert not gp.EllipticalProfile(centre=(0.1, 0.2), axis_ratio=0.8, phi=0.0).is_spherical
+        assert not gp.EllipticalProfile(centre=(0.1, 0.2), axis_ratio=1.0, phi=10.0).is_spherical
+
+    def test__nested_blocks_share_outer_cache__no_cache_outside_block(self):
+
+        grid = np.array([[1.0, 1.0], [2.0, 3.0]])
+
+        profile = gp.SphericalProfile(centre=(0.1, 0.2))
+
+        with gp.shared_transforms() as transform_cache:
+            with gp.shared_transforms() as inner_transform_cache:
+                assert inner_transform_cache is transform_cache
+
+        transformed_grid_0 = gp.transformed_grid_from_profile_and_grid(profile=profile, grid=grid)
+        transformed_grid_1 = gp.transformed_grid_from_profile_and_grid(profile=profile, grid=grid)
+
+        assert transformed_grid_1 is not transformed_grid_0
+        assert transformed_grid_0.flags.writeable
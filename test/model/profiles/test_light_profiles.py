@@ -278,6 +278,61 @@ class TestDevVaucouleurs:
         assert (elliptical.intensities_from_grid(grid) == spherical.intensities_from_grid(grid)).all()
 
 
+class TestLinear(object):
+
+    def test__constructors__intensity_is_1_and_not_an_argument(self):
+
+        sersic = lp.EllipticalSersicLinear(axis_ratio=0.6, phi=10.0, effective_radius=0.9, sersic_index=2.0,
+                                           centre=(0.0, 0.1))
+
+        assert isinstance(sersic, lp.LinearLightProfile)
+        assert sersic.centre == (0.0, 0.1)
+        assert sersic.axis_ratio == 0.6
+        assert sersic.phi == 10.0
+        assert sersic.intensity == 1.0
+        assert sersic.effective_radius == 0.9
+        assert sersic.sersic_index == 2.0
+
+        assert lp.EllipticalExponentialLinear().sersic_index == 1.0
+        assert lp.EllipticalDevVaucouleursLinear().sersic_index == 4.0
+        assert lp.SphericalGaussianLinear(sigma=2.0).intensity == 1.0
+        assert not isinstance(lp.EllipticalSersic(), lp.LinearLightProfile)
+
+    def test__linear_profiles_are_instances_of_their_standard_profiles(self):
+
+        for linear_profile, profile in [(lp.EllipticalGaussianLinear, lp.EllipticalGaussian),
+                                        (lp.SphericalGaussianLinear, lp.SphericalGaussian),
+                                        (lp.EllipticalSersicLinear, lp.EllipticalSersic),
+                                        (lp.SphericalSersicLinear, lp.SphericalSersic),
+                                        (lp.EllipticalExponentialLinear, lp.EllipticalExponential),
+                                        (lp.SphericalExponentialLinear, lp.SphericalExponential),
+                                        (lp.EllipticalDevVaucouleursLinear, lp.EllipticalDevVaucouleurs),
+                                        (lp.SphericalDevVaucouleursLinear, lp.SphericalDevVaucouleurs)]:
+
+            assert isinstance(linear_profile(), profile)
+            assert isinstance(linear_profile(), lp.LinearLightProfile)
+            assert linear_profile().intensity == 1.0
+
+        assert lp.SphericalSersicLinear(effective_radius=2.0).axis_ratio == 1.0
+        assert lp.SphericalExponentialLinear(effective_radius=2.0).effective_radius == 2.0
+        assert lp.SphericalDevVaucouleursLinear().sersic_index == 4.0
+
+    def test__intensities_match_non_linear_profiles_with_intensity_1(self):
+
+        assert (lp.EllipticalSersicLinear(axis_ratio=0.5, phi=20.0, effective_radius=2.0).intensities_from_grid(grid)
+                == lp.EllipticalSersic(axis_ratio=0.5, phi=20.0, intensity=1.0,
+                                       effective_radius=2.0).intensities_from_grid(grid)).all()
+
+        assert (lp.SphericalExponentialLinear(effective_radius=2.0).intensities_from_grid(grid) ==
+                lp.SphericalExponential(intensity=1.0, effective_radius=2.0).intensities_from_grid(grid)).all()
+
+        assert (lp.SphericalDevVaucouleursLinear(effective_radius=2.0).intensities_from_grid(grid) ==
+                lp.SphericalDevVaucouleurs(intensity=1.0, effective_radius=2.0).intensities_from_grid(grid)).all()
+
+        assert (lp.EllipticalGaussianLinear(axis_ratio=0.5, sigma=2.0).intensities_from_grid(grid) ==
+                lp.EllipticalGaussian(axis_ratio=0.5, intensity=1.0, sigma=2.0).intensities_from_grid(grid)).all()
+
+
 class TestCoreSersic(object):
 
     def test__constructor(self):
@@ -477,6 +532,50 @@ class TestLuminosityIntegral(object):
         assert 3.0*luminosity_tot[0] == pytest.approx(intensity_integral, 0.02)
 
 
+class TestTruncationRadius(object):
+
+    def test__sersic__flux_outside_truncation_radius_is_flux_fraction_tolerance(self):
+
+        sersic = lp.SphericalSersic(intensity=3.0, effective_radius=2.0, sersic_index=2.0)
+
+        truncation_radius = sersic.truncation_radius(flux_fraction_tolerance=1.0e-3)
+
+        x = sersic.sersic_constant * (truncation_radius / sersic.effective_radius) ** (1.0 / sersic.sersic_index)
+
+        assert scipy.special.gammaincc(2.0 * sersic.sersic_index, x) == pytest.approx(1.0e-3, 1e-8)
+
+        sersic = lp.EllipticalSersic(axis_ratio=0.5, intensity=3.0, effective_radius=2.0, sersic_index=2.0)
+
+        assert sersic.truncation_radius(flux_fraction_tolerance=1.0e-3) == pytest.approx(truncation_radius, 1e-8)
+        assert sersic.bounding_radius(flux_fraction_tolerance=1.0e-3) == \
+               pytest.approx(truncation_radius / np.sqrt(0.5), 1e-8)
+
+    def test__exponential__luminosity_within_truncation_radius(self):
+
+        exponential = lp.SphericalExponential(intensity=3.0, effective_radius=2.0)
+
+        truncation_radius = exponential.truncation_radius(flux_fraction_tolerance=1.0e-2)
+
+        luminosity_within = exponential.luminosity_within_circle(radius=truncation_radius)
+        luminosity_total = exponential.luminosity_within_circle(radius=200.0)
+
+        assert luminosity_within / luminosity_total == pytest.approx(0.99, 1e-4)
+
+    def test__gaussian__flux_outside_truncation_radius_is_flux_fraction_tolerance(self):
+
+        gaussian = lp.EllipticalGaussian(axis_ratio=0.5, sigma=2.0)
+
+        assert gaussian.truncation_radius(flux_fraction_tolerance=np.exp(-2.0)) == pytest.approx(4.0, 1e-8)
+        assert gaussian.bounding_radius(flux_fraction_tolerance=np.exp(-2.0)) == pytest.approx(4.0, 1e-8)
+
+    def test__core_sersic__not_truncated(self):
+
+        core_sersic = lp.EllipticalCoreSersic()
+
+        assert core_sersic.truncation_radius(flux_fraction_tolerance=1.0e-3) is None
+        assert core_sersic.bounding_radius(flux_fraction_tolerance=1.0e-3) is None
+
+
 class TestGrids(object):
 
     def test__grid_to_eccentric_radius(self, elliptical):
@@ -2,8 +2,10 @@ import math
 
 import numpy as np
 import pytest
+from scipy.integrate import quad
 
 from autolens.model.profiles import light_profiles as lp, mass_profiles as mp
+from autolens.model.profiles import radial_tables
 
 grid = np.array([[1.0, 1.0], [2.0, 2.0], [3.0, 3.0], [2.0, 4.0]])
 
@@ -1146,6 +1148,48 @@ class TestExternalShear(object):
         assert defls[0, 1] == pytest.approx(-0.011895, 1e-3)
 
 
+class TestRadialTabulation(object):
+
+    @pytest.fixture(autouse=True)
+    def tabulate(self):
+        yield
+        radial_tables.set_radial_tabulation(tabulate=False, bins=radial_tables.bins,
+                                            tolerance=radial_tables.tolerance)
+
+    def test__spherical_profiles__tabulated_deflections_same_as_direct_deflections(self):
+
+        grid = np.array([[0.1 * y + 0.02, 0.1 * x + 0.01] for y in range(-10, 10) for x in range(-10, 10)])
+
+        profiles = [mp.SphericalGeneralizedNFW(centre=(0.05, 0.0), kappa_s=0.1, inner_slope=1.5, scale_radius=3.0),
+                    mp.SphericalSersic(centre=(0.05, 0.0), intensity=1.0, effective_radius=0.8, sersic_index=3.0,
+                                       mass_to_light_ratio=2.0),
+                    mp.SphericalExponential(intensity=1.0, effective_radius=0.8),
+                    mp.SphericalSersicRadialGradient(intensity=1.0, effective_radius=0.8, sersic_index=2.0,
+                                                     mass_to_light_gradient=0.5)]
+
+        for profile in profiles:
+
+            radial_tables.set_radial_tabulation(tabulate=False)
+
+            deflections = profile.deflections_from_grid(grid)
+
+            radial_tables.set_radial_tabulation(tabulate=True, bins=50, tolerance=1.0e-7)
+
+            tabulated_deflections = profile.deflections_from_grid(grid)
+
+            assert tabulated_deflections == pytest.approx(deflections, abs=1.0e-5 * np.max(np.abs(deflections)))
+
+    def test__spherical_sersic__enclosed_mass_deflections_same_as_elliptical_deflections(self):
+
+        sersic = mp.SphericalSersic(intensity=1.0, effective_radius=0.8, sersic_index=3.0, mass_to_light_ratio=2.0)
+
+        radii = np.array([0.0, 0.3, 0.1, 2.0])
+
+        deflections = sersic.deflections_from_grid(np.vstack((np.zeros(4), radii)).T)
+
+        assert sersic.deflections_from_radii(radii) == pytest.approx(deflections[:, 1], 1.0e-4)
+
+
 class TestMassIntegral(object):
 
     def test__within_circle__no_conversion_factor__singular_isothermal_sphere__compare_to_analytic(self):
@@ -1313,4 +1357,27 @@ class TestDensityBetweenAnnuli(object):
 
         annuli_area = (np.pi * 2.0 ** 2.0) - (np.pi * 1.0 ** 2.0)
 
-        assert 2.0*(outer_mass - inner_mass) / annuli_area == pytest.approx(density_between_annuli, 1e-4)
\ No newline at end of file
+        assert 2.0*(outer_mass - inner_mass) / annuli_area == pytest.approx(density_between_annuli, 1e-4)
+
+class TestDeferredIntegrand(object):
+
+    def test__compiled_on_first_use__evaluates_to_low_level_callable(self):
+
+        class MockProfile(object):
+
+            @mp.jit_integrand
+            def integrand_func(u, a, b, c):
+                return a * u + b * c
+
+        deferred_integrand = MockProfile.__dict__['integrand_func']
+
+        assert deferred_integrand in mp.deferred_integrands
+        assert deferred_integrand.is_compiled is False
+
+        integrand = MockProfile().integrand_func
+
+        assert deferred_integrand.is_compiled is True
+        assert MockProfile.integrand_func is integrand
+        assert quad(integrand, a=0.0, b=1.0, args=(2.0, 1.0, 3.0))[0] == pytest.approx(4.0, 1e-8)
+
+        mp.deferred_integrands.remove(deferred_integrand)
@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+
+from autolens.model.profiles import mass_profiles as mp
+from autolens.model.profiles import radial_tables
+
+
+@pytest.fixture(name='tabulate')
+def make_tabulate():
+    radial_tables.set_radial_tabulation(tabulate=True, bins=20, tolerance=1.0e-6)
+    yield
+    radial_tables.set_radial_tabulation(tabulate=False, bins=radial_tables.bins, tolerance=radial_tables.tolerance)
+
+
+class TestRadialTable(object):
+
+    def test__smooth_function__interpolated_within_tolerance(self):
+
+        table = radial_tables.RadialTable.from_function(func=lambda radii: np.exp(-radii), radius_min=0.01,
+                                                        radius_max=5.0, bins=20, tolerance=1.0e-6)
+
+        radii = np.linspace(0.01, 5.0, 1000)
+
+        assert table.spline is not None
+        assert table.radii[0] == pytest.approx(0.01, 1.0e-8)
+        assert table.radii[-1] == pytest.approx(5.0, 1.0e-8)
+        assert table.values_from_radii(radii=radii, func=lambda radii: np.exp(-radii)) == \
+               pytest.approx(np.exp(-radii), abs=1.0e-6)
+
+    def test__bins_doubled_until_tolerance_met(self):
+
+        coarse_table = radial_tables.RadialTable.from_function(func=lambda radii: np.exp(-radii), radius_min=0.01,
+                                                               radius_max=5.0, bins=20, tolerance=1.0e-3)
+        fine_table = radial_tables.RadialTable.from_function(func=lambda radii: np.exp(-radii), radius_min=0.01,
+                                                             radius_max=5.0, bins=20, tolerance=1.0e-8)
+
+        assert coarse_table.bins == 20
+        assert fine_table.bins > 20
+        assert fine_table.bins % 20 == 0
+
+    def test__tolerance_not_met_within_maximum_bins__function_evaluated_directly(self):
+
+        def func(radii):
+            return np.sin(1000.0 * radii)
+
+        table = radial_tables.RadialTable.from_function(func=func, radius_min=0.01, radius_max=5.0, bins=20,
+                                                        tolerance=1.0e-8, maximum_bins=40)
+
+        radii = np.array([0.5, 1.0, 2.0])
+
+        assert table.spline is None
+        assert (table.values_from_radii(radii=radii, func=func) == func(radii)).all()
+
+    def test__radii_outside_table__function_evaluated_directly(self):
+
+        table = radial_tables.RadialTable.from_function(func=lambda radii: radii ** 2.0, radius_min=1.0,
+                                                        radius_max=2.0, bins=20, tolerance=1.0e-6)
+
+        values = table.values_from_radii(radii=np.array([0.0, 1.5, 3.0]), func=lambda radii: radii ** 2.0)
+
+        assert values == pytest.approx(np.array([0.0, 2.25, 9.0]), 1.0e-6)
+
+
+class TestRadialTableCache(object):
+
+    def test__table_cached_per_parameters_excluding_centre__extended_to_span_new_radii(self, tabulate):
+
+        nfw_0 = mp.SphericalGeneralizedNFW(centre=(0.0, 0.0), kappa_s=0.1, inner_slope=1.5, scale_radius=3.0)
+        nfw_1 = mp.SphericalGeneralizedNFW(centre=(1.0, 1.0), kappa_s=0.1, inner_slope=1.5, scale_radius=3.0)
+
+        radii = np.linspace(0.1, 1.0, 50)
+
+        radial_tables.radial_function_of_profile_from_radii(profile=nfw_0, name='deflections',
+                                                            func=nfw_0.deflections_from_radii, radii=radii)
+
+        key = radial_tables.radial_table_key(profile=nfw_1, name='deflections')
+
+        assert key == radial_tables.radial_table_key(profile=nfw_0, name='deflections')
+
+        table = radial_tables.radial_table_cache.table_from_key(key=key)
+
+        assert len(radial_tables.radial_table_cache.tables) == 1
+
+        radial_tables.radial_function_of_profile_from_radii(profile=nfw_1, name='deflections',
+                                                            func=nfw_1.deflections_from_radii, radii=radii)
+
+        assert radial_tables.radial_table_cache.table_from_key(key=key) is table
+
+        radial_tables.radial_function_of_profile_from_radii(profile=nfw_1, name='deflections',
+                                                            func=nfw_1.deflections_from_radii, radii=2.0 * radii)
+
+        extended_table = radial_tables.radial_table_cache.table_from_key(key=key)
+
+        assert extended_table is not table
+        assert extended_table.radius_min == pytest.approx(0.1, 1.0e-8)
+        assert extended_table.radius_max == pytest.approx(2.0, 1.0e-8)
+
+    def test__tabulation_off__function_evaluated_directly(self):
+
+        radii = np.linspace(0.1, 1.0, 500)
+
+        values = radial_tables.radial_function_of_profile_from_radii(
+            profile=mp.SphericalNFW(), name='test', func=lambda radii: 2.0 * radii, radii=radii)
+
+        assert (values == 2.0 * radii).all()
+        assert len(radial_tables.radial_table_cache.tables) == 0
@@ -0,0 +1,159 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from autofit import conf
+from autofit.mapper import model_mapper
+from autofit.optimize import non_linear
+from autolens import exc
+from autolens.data.array.util import array_util
+from autolens.pipeline import batch
+from autolens.pipeline import pipeline as pl
+
+
+class DummyPhaseImaging(object):
+
+    def __init__(self, phase_name):
+        self.phase_name = phase_name
+
+    def run(self, data, previous_results, mask=None, positions=None):
+
+        if data.image[0, 0] < 0.0:
+            raise exc.PhaseException('negative image')
+
+        os.makedirs(os.path.join(conf.instance.output_path, self.phase_name))
+
+        return non_linear.Result(model_mapper.ModelInstance(), float(np.sum(data.image)))
+
+
+def make_pipeline(pipeline_path=''):
+    return pl.PipelineImaging('dummy_pipeline', DummyPhaseImaging(phase_name=pipeline_path + 'phase_1'),
+                              DummyPhaseImaging(phase_name=pipeline_path + 'phase_2'))
+
+
+def make_lens_data_directory(path, name, value):
+
+    os.makedirs(os.path.join(path, name))
+
+    for file_name in ['image.fits', 'psf.fits', 'noise_map.fits']:
+        array_util.numpy_array_to_fits(array=value * np.ones((3, 3)), file_path=os.path.join(path, name, file_name))
+
+
+@pytest.fixture(name='data_path')
+def make_data_path(tmpdir):
+
+    data_path = str(tmpdir.mkdir('data'))
+
+    make_lens_data_directory(path=data_path, name='lens_b', value=2.0)
+    make_lens_data_directory(path=data_path, name='lens_a', value=1.0)
+    os.makedirs(os.path.join(data_path, 'not_a_lens'))
+
+    return data_path
+
+
+class TestLenses(object):
+
+    def test__lenses_from_directory__sorted_sub_directories_with_images(self, data_path):
+
+        lenses = batch.lenses_from_directory(data_path=data_path, pixel_scale=0.1)
+
+        assert [lens.name for lens in lenses] == ['lens_a', 'lens_b']
+        assert lenses[0].data_path == os.path.join(data_path, 'lens_a')
+        assert lenses[0].pixel_scale == 0.1
+
+        ccd_data = lenses[1].load_ccd_data()
+
+        assert (ccd_data.image == 2.0 * np.ones((3, 3))).all()
+        assert ccd_data.pixel_scale == 0.1
+        assert lenses[1].load_positions() is None
+
+    def test__lenses_from_manifest__data_paths_relative_to_manifest(self, data_path):
+
+        manifest_path = os.path.join(data_path, 'manifest.json')
+
+        with open(manifest_path, 'w') as manifest_file:
+            json.dump([{'name': 'lens_a', 'pixel_scale': 0.1},
+                       {'name': 'other', 'data_path': 'lens_b', 'pixel_scale': 0.05}], manifest_file)
+
+        lenses = batch.lenses_from_manifest(manifest_path=manifest_path)
+
+        assert [lens.name for lens in lenses] == ['lens_a', 'other']
+        assert lenses[0].data_path == os.path.join(data_path, 'lens_a')
+        assert lenses[1].data_path == os.path.join(data_path, 'lens_b')
+        assert lenses[1].pixel_scale == 0.05
+
+    def test__lenses_from_manifest__missing_pixel_scale_or_repeated_name__raises_exception(self, data_path):
+
+        manifest_path = os.path.join(data_path, 'manifest.json')
+
+        with open(manifest_path, 'w') as manifest_file:
+            json.dump([{'name': 'lens_a'}], manifest_file)
+
+        with pytest.raises(exc.BatchException):
+            batch.lenses_from_manifest(manifest_path=manifest_path)
+
+        with open(manifest_path, 'w') as manifest_file:
+            json.dump([{'name': 'lens_a', 'pixel_scale': 0.1}, {'name': 'lens_a', 'pixel_scale': 0.1}], manifest_file)
+
+        with pytest.raises(exc.BatchException):
+            batch.lenses_from_manifest(manifest_path=manifest_path)
+
+
+class TestBatchRunner(object):
+
+    def test__processes_from_cores_per_lens(self, tmpdir):
+
+        runner = batch.BatchRunner(pipeline_maker=make_pipeline, output_path=str(tmpdir), cores=8, cores_per_lens=3)
+
+        assert runner.processes == 2
+
+        with pytest.raises(exc.BatchException):
+            batch.BatchRunner(pipeline_maker=make_pipeline, output_path=str(tmpdir), cores=2, cores_per_lens=3)
+
+    def test__run__output_isolated_per_lens_and_summary_written(self, data_path, tmpdir):
+
+        output_path = str(tmpdir.mkdir('output'))
+
+        runner = batch.BatchRunner(pipeline_maker=make_pipeline, output_path=output_path)
+
+        records = runner.run(lenses=batch.lenses_from_directory(data_path=data_path, pixel_scale=0.1))
+
+        assert [record['name'] for record in records] == ['lens_a', 'lens_b']
+        assert [record['status'] for record in records] == ['completed', 'completed']
+        assert [record['figure_of_merit'] for record in records] == [9.0, 18.0]
+
+        assert os.path.isdir(os.path.join(output_path, 'lens_a', 'phase_2'))
+        assert os.path.isdir(os.path.join(output_path, 'lens_b', 'phase_2'))
+
+        with open(runner.summary_path, 'r') as summary_file:
+            summary = summary_file.read().split('\n')
+
+        assert 'Figure of Merit' in summary[0]
+        assert summary[1].startswith('lens_a') and '9.0000' in summary[1]
+        assert summary[2].startswith('lens_b') and '18.0000' in summary[2]
+
+    def test__run_again__completed_lenses_skipped_and_failed_lenses_retried(self, data_path, tmpdir):
+
+        make_lens_data_directory(path=data_path, name='lens_c', value=-1.0)
+
+        output_path = str(tmpdir.mkdir('output'))
+
+        runner = batch.BatchRunner(pipeline_maker=make_pipeline, output_path=output_path)
+
+        lenses = batch.lenses_from_directory(data_path=data_path, pixel_scale=0.1)
+
+        records = runner.run(lenses=lenses)
+
+        assert [record['status'] for record in records] == ['completed', 'completed', 'failed']
+        assert 'negative image' in records[2]['error']
+        assert sorted(runner.completed_lens_names()) == ['lens_a', 'lens_b']
+
+        records = runner.run(lenses=lenses)
+
+        with open(runner.progress_path, 'r') as progress_file:
+            progress_names = [json.loads(line)['name'] for line in progress_file]
+
+        assert progress_names == ['lens_a', 'lens_b', 'lens_c', 'lens_c']
+        assert [record['status'] for record in records] == ['completed', 'completed', 'failed']
@@ -387,6 +387,62 @@ class TestPhase(object):
         assert isinstance(result.constant.lens_galaxies[0], g.Galaxy)
         assert isinstance(result.constant.source_galaxies[0], g.Galaxy)
 
+    def test__background_visualizer_is_started_before_search_and_stopped_after(self, ccd_data):
+        clean_images()
+
+        events = []
+
+        class MockBackgroundVisualizer(object):
+
+            def start(self, visualize):
+                events.append('start')
+
+            def stop(self):
+                events.append('stop')
+
+        class RecordingNLO(NLO):
+            def fit(self, analysis):
+                events.append('search')
+                return super(RecordingNLO, self).fit(analysis)
+
+        phase = ph.LensPlanePhase(optimizer_class=RecordingNLO,
+                                  lens_galaxies=[gm.GalaxyModel(light=lp.EllipticalSersic)],
+                                  background_visualizer=MockBackgroundVisualizer(),
+                                  phase_name='test_phase')
+        phase.run(data=ccd_data)
+
+        assert events == ['start', 'search', 'stop']
+
+    def test__sensitivity_analysis__normal_tracer_and_fit_reused_unless_galaxies_change_or_are_not_cacheable(
+            self, lens_data):
+
+        class Instance(object):
+
+            def __init__(self, einstein_radius, sensitive_kappa_s):
+                self.lens_galaxies = [g.Galaxy(mass=mp.SphericalIsothermal(einstein_radius=einstein_radius))]
+                self.source_galaxies = [g.Galaxy(light=lp.EllipticalSersic(intensity=0.1))]
+                self.sensitive_galaxies = [g.Galaxy(mass=mp.SphericalNFW(kappa_s=sensitive_kappa_s))]
+
+        analysis = ph.SensitivityPhase.Analysis(lens_data=lens_data, cosmology=cosmo.Planck15,
+                                                phase_name='test_phase')
+
+        tracer_normal, fit_normal = analysis.tracer_and_fit_normal_for_instance(Instance(1.0, 0.1))
+
+        assert analysis.tracer_and_fit_normal_for_instance(Instance(1.0, 0.2)) == (tracer_normal, fit_normal)
+
+        tracer_normal_new, fit_normal_new = analysis.tracer_and_fit_normal_for_instance(Instance(1.1, 0.2))
+
+        assert tracer_normal_new is not tracer_normal
+        assert fit_normal_new is not fit_normal
+
+        instance = Instance(1.1, 0.2)
+        instance.lens_galaxies[0].mass.settings = {'option': 1}
+
+        tracer_normal, fit_normal = analysis.tracer_and_fit_normal_for_instance(instance)
+
+        assert tracer_normal is not tracer_normal_new
+        assert analysis.tracer_and_fit_normal_for_instance(instance)[0] is not tracer_normal
+
     def test_customize(self, results, ccd_data):
         class MyPlanePhaseAnd(ph.LensSourcePlanePhase):
             def pass_priors(self, previous_results):
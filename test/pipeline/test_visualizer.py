@@ -0,0 +1,109 @@
+import os
+import time
+
+import pytest
+
+from autolens import exc
+from autolens.pipeline import visualizer
+
+
+class MockVisualize(object):
+
+    def __init__(self, output_file, duration):
+        self.output_file = output_file
+        self.duration = duration
+
+    def __call__(self, instance):
+        time.sleep(self.duration)
+        with open(self.output_file, 'a') as output:
+            output.write('{}\n'.format(instance))
+
+
+def visualized_instances(output_file):
+    if not os.path.isfile(output_file):
+        return []
+    with open(output_file, 'r') as output:
+        return [int(line) for line in output]
+
+
+class TestBackgroundVisualizer(object):
+
+    def test__requests_while_drawing__coalesced_to_newest(self, tmpdir):
+
+        output_file = str(tmpdir.join('visualized.txt'))
+
+        background_visualizer = visualizer.BackgroundVisualizer()
+
+        visualize = MockVisualize(output_file=output_file, duration=0.5)
+
+        background_visualizer.start(visualize=visualize)
+
+        assert background_visualizer.is_running
+
+        background_visualizer.request(instance=1)
+
+        time.sleep(0.1)
+
+        for instance in range(2, 6):
+            background_visualizer.request(instance=instance)
+
+        background_visualizer.stop()
+
+        assert not background_visualizer.is_running
+        assert visualized_instances(output_file=output_file) == [1, 5]
+
+    def test__time_budget_used__further_requests_ignored_until_restarted(self, tmpdir):
+
+        output_file = str(tmpdir.join('visualized.txt'))
+
+        background_visualizer = visualizer.BackgroundVisualizer(time_budget=0.1)
+
+        visualize = MockVisualize(output_file=output_file, duration=0.2)
+
+        background_visualizer.start(visualize=visualize)
+        background_visualizer.request(instance=1)
+
+        time.sleep(0.5)
+
+        assert background_visualizer.budget_exhausted.is_set()
+
+        background_visualizer.request(instance=2)
+        background_visualizer.stop()
+
+        assert visualized_instances(output_file=output_file) == [1]
+
+        background_visualizer.start(visualize=visualize)
+        background_visualizer.request(instance=3)
+        background_visualizer.stop()
+
+        assert visualized_instances(output_file=output_file) == [1, 3]
+
+    def test__stop_without_requests__does_nothing(self):
+
+        background_visualizer = visualizer.BackgroundVisualizer()
+        background_visualizer.stop()
+
+        assert not background_visualizer.is_running
+
+    def test__request_before_start__raises_phase_exception(self):
+
+        background_visualizer = visualizer.BackgroundVisualizer()
+
+        with pytest.raises(exc.PhaseException):
+            background_visualizer.request(instance=1)
+
+        assert not background_visualizer.is_running
+
+    def test__fork_not_available__worker_not_started(self, monkeypatch):
+
+        def get_context(method):
+            raise ValueError('cannot find context for {}'.format(method))
+
+        monkeypatch.setattr(visualizer.multiprocessing, 'get_context', get_context)
+
+        background_visualizer = visualizer.BackgroundVisualizer()
+        background_visualizer.start(visualize=None)
+
+        assert not background_visualizer.is_running
+
+        background_visualizer.stop()
@@ -0,0 +1,81 @@
+import argparse
+import os
+import sys
+
+from test.profiling.benchmarks import cases
+from test.profiling.benchmarks import runner
+
+# The PyAutoLens benchmark suite. Run it from the root of the repository with, for example:
+#
+# python -m test.profiling.benchmarks --image-types LSST Euclid --output results.json
+#
+# If a baseline is stored (in test/profiling/benchmarks/baselines), the results are compared to it and the run fails
+# if any case is slower than the baseline by more than the tolerance. Baselines are machine specific, thus one should
+# be saved (with --save-baseline) on the machine that later runs are compared on, and none is committed to the
+# repository. If the baseline was run on a different machine, with different library versions or different benchmark
+# settings, a warning is printed and no comparison is performed.
+#
+# The time to import PyAutoLens in a new process is also measured and reported against an import-time budget, and the
+# run fails if it is over budget.
+
+
+def main(args=None):
+
+    parser = argparse.ArgumentParser(description='Benchmark PyAutoLens and compare to a stored baseline.')
+    parser.add_argument('--image-types', nargs='+', default=cases.image_types, choices=cases.image_types)
+    parser.add_argument('--cases', nargs='+', default=None, choices=[case.__name__ for case in cases.cases])
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--output', default=None, help='The .json file the results are written to.')
+    parser.add_argument('--baseline', default='baseline',
+                        help='The name of the stored baseline (or the path of a .json file) compared to.')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='Store the results as the baseline, instead of comparing to it.')
+    parser.add_argument('--import-budget', type=float, default=runner.import_budget,
+                        help='The time (seconds) importing PyAutoLens in a new process may take.')
+    args = parser.parse_args(args)
+
+    results = runner.results_from_cases(image_types=args.image_types, case_names=args.cases, repeats=args.repeats)
+    results['import_times'] = runner.import_times_from_modules()
+
+    print(runner.results_table_from_results(results=results))
+    print(runner.import_times_table_from_import_times(import_times=results['import_times'], budget=args.import_budget))
+
+    over_import_budget = len(runner.modules_over_import_budget(import_times=results['import_times'],
+                                                               budget=args.import_budget)) > 0
+
+    if args.output is not None:
+        runner.output_results(results=results, file_path=args.output)
+
+    baseline_path = args.baseline if args.baseline.endswith('.json') else \
+        os.path.join(runner.baselines_path, args.baseline + '.json')
+
+    if args.save_baseline:
+        runner.output_results(results=results, file_path=baseline_path)
+        return 1 if over_import_budget else 0
+
+    if not os.path.isfile(baseline_path):
+        print('No baseline at {}, so no comparison is performed.'.format(baseline_path))
+        return 1 if over_import_budget else 0
+
+    baseline = runner.load_results(baseline_path)
+
+    mismatches = runner.metadata_mismatches_between_results_and_baseline(results=results, baseline=baseline)
+
+    if len(mismatches) > 0:
+        print('Warning: the baseline at {} is not comparable to this run, so no comparison is performed:'.format(
+            baseline_path))
+        for name, baseline_value, result_value in mismatches:
+            print('    {}: baseline = {}, this run = {}'.format(name, baseline_value, result_value))
+        return 1 if over_import_budget else 0
+
+    comparisons = runner.comparisons_from_results_and_baseline(results=results, baseline=baseline,
+                                                               tolerance=args.tolerance)
+
+    print(runner.comparison_table_from_comparisons(comparisons=comparisons))
+
+    return 1 if over_import_budget or any(comparison['regression'] for comparison in comparisons) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,151 @@
+import numpy as np
+
+from autolens.data import ccd
+from autolens.data import convolution
+from autolens.data.array import grids
+from autolens.data.array import mask as msk
+from autolens.data.array import scaled_array
+from autolens.lens import lens_data as ld
+from autolens.lens import lens_fit
+from autolens.lens import ray_tracing
+from autolens.lens.util import lens_fit_util
+from autolens.model.galaxy import galaxy as g
+from autolens.model.inversion import inversions
+from autolens.model.inversion import pixelizations as pix
+from autolens.model.inversion import regularization as reg
+from autolens.model.profiles import light_profiles as lp
+from autolens.model.profiles import mass_profiles as mp
+
+from test.profiling import tools
+
+# The benchmark cases. Every case is a function which takes the benchmark's lens data (see *lens_data_for_image_type*)
+# and performs any setup that is not timed, returning a function with no arguments whose run-time is measured.
+
+image_types = ['LSST', 'Euclid', 'HST', 'HST_Up', 'AO']
+image_shapes = {'LSST': (100, 100), 'Euclid': (150, 150), 'HST': (250, 250), 'HST_Up': (320, 320), 'AO': (750, 750)}
+
+sub_grid_size = 2
+radius_arcsec = 3.0
+psf_shape = (21, 21)
+pixelization_shape = (30, 30)
+
+
+def make_lens_galaxy():
+    return g.Galaxy(light=lp.EllipticalSersic(centre=(0.0, 0.0), axis_ratio=0.9, phi=45.0, intensity=0.5,
+                                              effective_radius=0.8, sersic_index=4.0),
+                    mass=mp.EllipticalIsothermal(centre=(0.0, 0.0), einstein_radius=1.6, axis_ratio=0.7, phi=45.0))
+
+
+def make_source_galaxy():
+    return g.Galaxy(light=lp.EllipticalSersic(centre=(0.0, 0.0), axis_ratio=0.8, phi=60.0, intensity=0.4,
+                                              effective_radius=0.5, sersic_index=1.0))
+
+
+def make_source_galaxy_inversion():
+    return g.Galaxy(pixelization=pix.AdaptiveMagnification(shape=pixelization_shape),
+                    regularization=reg.Constant(coefficients=(1.0,)))
+
+
+def lens_data_for_image_type(image_type):
+    """Simulate the ccd data of a lens and source at the resolution of an image type, with noise drawn using a fixed \
+    seed, and mask it to create the lens data every benchmark case is performed on."""
+    pixel_scale = tools.pixel_scale_from_image_type(image_type=image_type)
+    shape = image_shapes[image_type]
+
+    psf = ccd.PSF.simulate_as_gaussian(shape=psf_shape, sigma=pixel_scale, pixel_scale=pixel_scale)
+
+    grid_stack = grids.GridStack.from_shape_pixel_scale_and_sub_grid_size(shape=shape, pixel_scale=pixel_scale,
+                                                                          sub_grid_size=1)
+
+    tracer = ray_tracing.TracerImageSourcePlanes(lens_galaxies=[make_lens_galaxy()],
+                                                 source_galaxies=[make_source_galaxy()],
+                                                 image_plane_grid_stack=grid_stack)
+
+    image = psf.convolve(array=tracer.image_plane_image)
+
+    noise_map = np.full(shape, 0.1)
+    image += noise_map * np.random.RandomState(seed=1).standard_normal(size=shape)
+
+    ccd_data = ccd.CCDData(image=scaled_array.ScaledSquarePixelArray(array=image, pixel_scale=pixel_scale),
+                           pixel_scale=pixel_scale, psf=psf,
+                           noise_map=ccd.NoiseMap(array=noise_map, pixel_scale=pixel_scale))
+
+    mask = msk.Mask.circular(shape=shape, pixel_scale=pixel_scale, radius_arcsec=radius_arcsec)
+
+    return ld.LensData(ccd_data=ccd_data, mask=mask, sub_grid_size=sub_grid_size)
+
+
+def mass_profile_deflections(lens_data):
+    mass_profile = make_lens_galaxy().mass_profiles[0]
+    return lambda: mass_profile.deflections_from_grid(grid=lens_data.grid_stack.sub)
+
+
+def light_profile_intensities(lens_data):
+    light_profile = make_lens_galaxy().light_profiles[0]
+    return lambda: light_profile.intensities_from_grid(grid=lens_data.grid_stack.sub)
+
+
+def convolver_setup(lens_data):
+    blurring_mask = lens_data.mask.blurring_mask_for_psf_shape(psf_shape=lens_data.psf.shape)
+    return lambda: convolution.ConvolverImage(mask=lens_data.mask, blurring_mask=blurring_mask, psf=lens_data.psf)
+
+
+def image_convolution(lens_data):
+    tracer = ray_tracing.TracerImageSourcePlanes(lens_galaxies=[make_lens_galaxy()],
+                                                 source_galaxies=[make_source_galaxy()],
+                                                 image_plane_grid_stack=lens_data.grid_stack)
+    image_1d = tracer.image_plane_image_1d
+    blurring_image_1d = tracer.image_plane_blurring_image_1d
+    return lambda: lens_fit_util.blurred_image_1d_from_1d_unblurred_and_blurring_images(
+        unblurred_image_1d=image_1d, blurring_image_1d=blurring_image_1d, convolver=lens_data.convolver_image)
+
+
+def tracer_for_inversion(lens_data):
+    lens_galaxy = g.Galaxy(mass=make_lens_galaxy().mass_profiles[0])
+    return ray_tracing.TracerImageSourcePlanes(lens_galaxies=[lens_galaxy],
+                                               source_galaxies=[make_source_galaxy_inversion()],
+                                               image_plane_grid_stack=lens_data.grid_stack, border=lens_data.border)
+
+
+def mapper_construction(lens_data):
+    tracer = tracer_for_inversion(lens_data=lens_data)
+    pixelization = tracer.source_plane.galaxies[0].pixelization
+    return lambda: pixelization.mapper_from_grid_stack_and_border(grid_stack=tracer.source_plane.grid_stack,
+                                                                  border=lens_data.border)
+
+
+def inversion(lens_data):
+    tracer = tracer_for_inversion(lens_data=lens_data)
+    mapper = tracer.mappers_of_planes[-1]
+    regularization = tracer.regularizations_of_planes[-1]
+    return lambda: inversions.inversion_from_image_mapper_and_regularization(
+        image_1d=lens_data.image_1d, noise_map_1d=lens_data.noise_map_1d,
+        convolver=lens_data.convolver_mapping_matrix, mapper=mapper, regularization=regularization)
+
+
+def light_profile_fit(lens_data):
+
+    def fit():
+        tracer = ray_tracing.TracerImageSourcePlanes(lens_galaxies=[make_lens_galaxy()],
+                                                     source_galaxies=[make_source_galaxy()],
+                                                     image_plane_grid_stack=lens_data.grid_stack)
+        return lens_fit.fit_lens_data_with_tracer(lens_data=lens_data, tracer=tracer).figure_of_merit
+
+    return fit
+
+
+def inversion_fit(lens_data):
+
+    def fit():
+        tracer = tracer_for_inversion(lens_data=lens_data)
+        return lens_fit.fit_lens_data_with_tracer(lens_data=lens_data, tracer=tracer).figure_of_merit
+
+    return fit
+
+
+# At AO resolution (~280000 image pixels) the dense mapping matrix of an inversion and a second image convolver (on top
+# of the lens data's) do not fit in the memory of a typical machine, so these cases are skipped.
+skipped_cases = {'AO': ['convolver_setup', 'mapper_construction', 'inversion', 'inversion_fit']}
+
+cases = [mass_profile_deflections, light_profile_intensities, convolver_setup, image_convolution,
+         mapper_construction, inversion, light_profile_fit, inversion_fit]
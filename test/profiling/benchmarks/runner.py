@@ -0,0 +1,207 @@
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numba
+import numpy as np
+
+import autolens
+from test.profiling.benchmarks import cases
+
+baselines_path = '{}/baselines/'.format(os.path.dirname(os.path.realpath(__file__)))
+
+# The modules whose import time is measured, and the import-time budget (seconds) they are reported against.
+import_modules = ['autolens.model.profiles.mass_profiles', 'autolens.lens.lens_fit']
+import_budget = 5.0
+
+# The metadata which must be the same for a run and a baseline for their run-times to be comparable.
+comparable_metadata = ['machine', 'processor', 'node', 'python_version', 'numpy_version', 'numba_version', 'settings']
+
+
+def run_times_from_function(function, repeats, minimum_time=0.05):
+    """Return *repeats* measurements of the run-time of a function.
+
+    The function is first called once untimed, which includes any just-in-time compilation. A function which runs in \
+    less than *minimum_time* is called enough times per measurement for the measurement to take this long, and the \
+    mean time per call is used, so that the measurements of fast functions are not dominated by timer noise.
+    """
+    function()
+
+    start = time.perf_counter()
+    function()
+    calls = max(1, int(np.ceil(minimum_time / max(time.perf_counter() - start, 1.0e-9))))
+
+    run_times = []
+
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(calls):
+            function()
+        run_times.append((time.perf_counter() - start) / calls)
+
+    return run_times
+
+
+def results_from_cases(image_types=None, case_names=None, repeats=5):
+    """Run the benchmark cases for every image type, returning a results dictionary of the form \
+    {'metadata': {...}, 'results': {image_type: {case_name: {'min': ..., 'median': ..., 'mean': ...}}}}.
+
+    Parameters
+    ----------
+    image_types : [str] or None
+        The image types (see *cases.image_types*) the cases are benchmarked at. If None, all are used.
+    case_names : [str] or None
+        The names of the cases that are benchmarked. If None, all are used.
+    repeats : int
+        The number of timed calls of every case.
+    """
+    image_types = cases.image_types if image_types is None else image_types
+    benchmark_cases = [case for case in cases.cases if case_names is None or case.__name__ in case_names]
+
+    results = {}
+
+    for image_type in image_types:
+
+        lens_data = cases.lens_data_for_image_type(image_type=image_type)
+
+        results[image_type] = {}
+
+        for case in benchmark_cases:
+
+            if case.__name__ in cases.skipped_cases.get(image_type, []):
+                continue
+
+            run_times = run_times_from_function(function=case(lens_data), repeats=repeats)
+
+            results[image_type][case.__name__] = {'min': float(np.min(run_times)),
+                                                  'median': float(np.median(run_times)),
+                                                  'mean': float(np.mean(run_times)), 'repeats': repeats}
+
+    return {'metadata': metadata(), 'results': results}
+
+
+def metadata():
+    return {'autolens_version': autolens.__version__, 'numpy_version': np.__version__,
+            'numba_version': numba.__version__, 'python_version': platform.python_version(),
+            'machine': platform.machine(),
+            'processor': platform.processor(), 'node': platform.node(),
+            'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'settings': {'sub_grid_size': cases.sub_grid_size, 'radius_arcsec': cases.radius_arcsec,
+                         'psf_shape': list(cases.psf_shape), 'pixelization_shape': list(cases.pixelization_shape)}}
+
+
+def output_results(results, file_path):
+    directory = os.path.dirname(file_path)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory)
+    with open(file_path, 'w') as results_file:
+        json.dump(results, results_file, indent=4, sort_keys=True)
+
+
+def load_results(file_path):
+    with open(file_path, 'r') as results_file:
+        return json.load(results_file)
+
+
+def metadata_mismatches_between_results_and_baseline(results, baseline):
+    """The entries of *comparable_metadata* (e.g. the machine, library versions and benchmark settings) which \
+    differ between a set of results and a baseline. If there are any, the run-times are not like-for-like and should \
+    not be compared.
+
+    Returns a list of the mismatched entries, each a tuple of the entry name and its baseline and result values.
+    """
+    results_metadata = results.get('metadata', {})
+    baseline_metadata = baseline.get('metadata', {})
+
+    return [(name, baseline_metadata.get(name), results_metadata.get(name)) for name in comparable_metadata
+            if baseline_metadata.get(name) != results_metadata.get(name)]
+
+
+def comparisons_from_results_and_baseline(results, baseline, tolerance=0.2):
+    """Compare the minimum run-time of every case in a set of results with a baseline, for every image type and case \
+    in both. The minimum is used as it is the least sensitive to other load on the machine.
+
+    Returns a list of comparisons, each a dictionary of the image type, case name, baseline and result run-times, \
+    their ratio, and whether the case regressed (its ratio is above 1 + tolerance).
+
+    Parameters
+    ----------
+    results : dict
+        The results of a benchmark run (see *results_from_cases*).
+    baseline : dict
+        The stored results the run is compared to.
+    tolerance : float
+        The fractional increase in run-time above which a case is a regression (e.g. 0.2 for 20% slower).
+    """
+    comparisons = []
+
+    for image_type, case_results in results['results'].items():
+        for case_name, result in sorted(case_results.items()):
+
+            if case_name not in baseline['results'].get(image_type, {}):
+                continue
+
+            baseline_time = baseline['results'][image_type][case_name]['min']
+            ratio = result['min'] / baseline_time
+
+            comparisons.append({'image_type': image_type, 'case': case_name, 'baseline': baseline_time,
+                                'result': result['min'], 'ratio': ratio, 'regression': ratio > 1.0 + tolerance})
+
+    return comparisons
+
+
+def comparison_table_from_comparisons(comparisons):
+    lines = ['{:<10}{:<30}{:>16}{:>16}{:>10}'.format('Image', 'Case', 'Baseline (s)', 'Result (s)', 'Ratio')]
+    for comparison in comparisons:
+        lines.append('{:<10}{:<30}{:>16.6f}{:>16.6f}{:>10.2f}{}'.format(
+            comparison['image_type'], comparison['case'], comparison['baseline'], comparison['result'],
+            comparison['ratio'], '  REGRESSION' if comparison['regression'] else ''))
+    return '\n'.join(lines) + '\n'
+
+
+def results_table_from_results(results):
+    lines = ['{:<10}{:<30}{:>16}{:>16}'.format('Image', 'Case', 'Min (s)', 'Median (s)')]
+    for image_type, case_results in results['results'].items():
+        for case_name, result in sorted(case_results.items()):
+            lines.append('{:<10}{:<30}{:>16.6f}{:>16.6f}'.format(image_type, case_name, result['min'],
+                                                                result['median']))
+    return '\n'.join(lines) + '\n'
+
+
+def import_time_from_module(module):
+    """The time (seconds) to import a module in a new Python process, which is what every new worker process of \
+    a batch run pays before it starts."""
+    output = subprocess.check_output([sys.executable, '-c',
+                                      'import time; start = time.perf_counter(); import {}; '
+                                      'print(time.perf_counter() - start)'.format(module)])
+    return float(output.decode().split()[-1])
+
+
+def import_times_from_modules(modules=None, repeats=3):
+    """Measure the import time of every module *repeats* times, returning a dictionary of the form \
+    {module: {'min': ..., 'median': ..., 'mean': ...}}."""
+    modules = import_modules if modules is None else modules
+
+    import_times = {}
+
+    for module in modules:
+        times = [import_time_from_module(module=module) for _ in range(repeats)]
+        import_times[module] = {'min': float(np.min(times)), 'median': float(np.median(times)),
+                                'mean': float(np.mean(times)), 'repeats': repeats}
+
+    return import_times
+
+
+def modules_over_import_budget(import_times, budget=import_budget):
+    return [module for module, import_time in sorted(import_times.items()) if import_time['min'] > budget]
+
+
+def import_times_table_from_import_times(import_times, budget=import_budget):
+    lines = ['{:<50}{:>16}{:>16}'.format('Module', 'Import (s)', 'Budget (s)')]
+    for module, import_time in sorted(import_times.items()):
+        lines.append('{:<50}{:>16.3f}{:>16.3f}{}'.format(module, import_time['min'], budget,
+                                                        '  OVER BUDGET' if import_time['min'] > budget else ''))
+    return '\n'.join(lines) + '\n'
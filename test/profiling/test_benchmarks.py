@@ -0,0 +1,126 @@
+import json
+
+from test.profiling.benchmarks import runner
+
+
+def make_results(times):
+    return {'metadata': {}, 'results': {image_type: {case_name: {'min': time, 'median': time, 'mean': time,
+                                                                  'repeats': 1}
+                                                     for case_name, time in case_times.items()}
+                                        for image_type, case_times in times.items()}}
+
+
+class TestComparisons(object):
+
+    def test__slower_than_tolerance__regression(self):
+
+        baseline = make_results({'LSST': {'inversion': 1.0, 'light_profile_fit': 1.0}})
+        results = make_results({'LSST': {'inversion': 1.1, 'light_profile_fit': 1.5}})
+
+        comparisons = runner.comparisons_from_results_and_baseline(results=results, baseline=baseline, tolerance=0.2)
+
+        assert [comparison['case'] for comparison in comparisons] == ['inversion', 'light_profile_fit']
+        assert comparisons[0]['ratio'] == 1.1
+        assert comparisons[0]['regression'] is False
+        assert comparisons[1]['ratio'] == 1.5
+        assert comparisons[1]['regression'] is True
+
+        table = runner.comparison_table_from_comparisons(comparisons=comparisons)
+
+        assert 'REGRESSION' not in table.split('\n')[1]
+        assert 'REGRESSION' in table.split('\n')[2]
+
+    def test__cases_and_image_types_not_in_baseline__not_compared(self):
+
+        baseline = make_results({'LSST': {'inversion': 1.0}})
+        results = make_results({'LSST': {'inversion': 1.0, 'light_profile_fit': 5.0}, 'AO': {'inversion': 5.0}})
+
+        comparisons = runner.comparisons_from_results_and_baseline(results=results, baseline=baseline)
+
+        assert len(comparisons) == 1
+        assert comparisons[0]['image_type'] == 'LSST'
+
+
+class TestMetadataMismatches(object):
+
+    def test__same_metadata__no_mismatches(self):
+
+        baseline = make_results({'LSST': {'inversion': 1.0}})
+        baseline['metadata'] = runner.metadata()
+        results = make_results({'LSST': {'inversion': 1.0}})
+        results['metadata'] = json.loads(json.dumps(runner.metadata()))
+        results['metadata']['time'] = 'later'
+
+        assert runner.metadata_mismatches_between_results_and_baseline(results=results, baseline=baseline) == []
+
+    def test__different_machine_versions_or_settings__mismatched(self):
+
+        baseline = make_results({'LSST': {'inversion': 1.0}})
+        baseline['metadata'] = runner.metadata()
+        results = make_results({'LSST': {'inversion': 1.0}})
+        results['metadata'] = runner.metadata()
+        results['metadata']['node'] = 'other'
+        results['metadata']['numpy_version'] = '0.0.0'
+        results['metadata']['settings'] = dict(results['metadata']['settings'], sub_grid_size=4)
+
+        mismatches = runner.metadata_mismatches_between_results_and_baseline(results=results, baseline=baseline)
+
+        assert [mismatch[0] for mismatch in mismatches] == ['node', 'numpy_version', 'settings']
+        assert mismatches[0][2] == 'other'
+
+
+class TestRunTimes(object):
+
+    def test__function_called_untimed_and_to_calibrate_then_repeats_timed(self):
+
+        calls = []
+
+        run_times = runner.run_times_from_function(function=lambda: calls.append(1), repeats=3, minimum_time=0.0)
+
+        assert len(calls) == 5
+        assert len(run_times) == 3
+
+    def test__fast_function__called_many_times_per_measurement(self):
+
+        calls = []
+
+        run_times = runner.run_times_from_function(function=lambda: calls.append(1), repeats=2, minimum_time=0.01)
+
+        assert len(calls) > 10
+        assert len(run_times) == 2
+
+    def test__results_from_cases__output_and_load(self, tmpdir):
+
+        results = runner.results_from_cases(image_types=['LSST'], case_names=['mass_profile_deflections'], repeats=1)
+
+        assert list(results['results'].keys()) == ['LSST']
+        assert list(results['results']['LSST'].keys()) == ['mass_profile_deflections']
+        assert results['results']['LSST']['mass_profile_deflections']['min'] > 0.0
+
+        file_path = str(tmpdir.join('results.json'))
+
+        runner.output_results(results=results, file_path=file_path)
+
+        assert runner.load_results(file_path=file_path) == json.loads(json.dumps(results))
+
+
+class TestImportTimes(object):
+
+    def test__import_times_measured_in_new_process(self):
+
+        import_times = runner.import_times_from_modules(modules=['json'], repeats=2)
+
+        assert list(import_times.keys()) == ['json']
+        assert import_times['json']['repeats'] == 2
+        assert 0.0 < import_times['json']['min'] < 5.0
+
+    def test__modules_over_budget__reported(self):
+
+        import_times = {'autolens.lens.lens_fit': {'min': 6.0}, 'autolens.model.profiles.mass_profiles': {'min': 1.0}}
+
+        assert runner.modules_over_import_budget(import_times=import_times, budget=5.0) == ['autolens.lens.lens_fit']
+
+        table = runner.import_times_table_from_import_times(import_times=import_times, budget=5.0)
+
+        assert 'OVER BUDGET' in table.split('\n')[1]
+        assert 'OVER BUDGET' not in table.split('\n')[2]
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from autolens import decorator_util
+from autolens.data.array import grids
+from autolens.data.array import mask as msk
+
+
+@pytest.fixture(name='parallel_kernels')
+def make_parallel_kernels():
+    use_parallel_kernels = decorator_util.use_parallel_kernels()
+    threads = decorator_util.threads()
+    decorator_util.set_parallel_kernels(use_parallel_kernels=True)
+    yield
+    decorator_util.set_parallel_kernels(use_parallel_kernels=use_parallel_kernels, threads=threads)
+
+
+class TestParallelKernels(object):
+
+    def test__set_parallel_kernels__selected_and_threads_set(self, parallel_kernels):
+
+        assert decorator_util.use_parallel_kernels()
+
+        decorator_util.set_parallel_kernels(use_parallel_kernels=False, threads=1)
+
+        assert not decorator_util.use_parallel_kernels()
+        assert decorator_util.threads() == 1
+
+    def test__grid_stack_and_border_relocation__same_with_parallel_kernels(self, parallel_kernels):
+
+        mask = msk.Mask.circular(shape=(10, 10), pixel_scale=0.5, radius_arcsec=2.0)
+
+        grid_stack_parallel = grids.GridStack.grid_stack_from_mask_sub_grid_size_and_psf_shape(
+            mask=mask, sub_grid_size=2, psf_shape=(3, 3))
+        grid_stack_parallel.sub[:] *= 2.0
+
+        decorator_util.set_parallel_kernels(use_parallel_kernels=False)
+
+        grid_stack = grids.GridStack.grid_stack_from_mask_sub_grid_size_and_psf_shape(
+            mask=mask, sub_grid_size=2, psf_shape=(3, 3))
+        grid_stack.sub[:] *= 2.0
+
+        assert (grid_stack_parallel.sub == grid_stack.sub).all()
+
+        border = grids.RegularGridBorder.from_mask(mask=mask)
+
+        relocated_grid_stack = border.relocated_grid_stack_from_grid_stack(grid_stack)
+
+        decorator_util.set_parallel_kernels(use_parallel_kernels=True)
+
+        relocated_grid_stack_parallel = border.relocated_grid_stack_from_grid_stack(grid_stack_parallel)
+
+        assert relocated_grid_stack_parallel.sub == pytest.approx(relocated_grid_stack.sub, 1.0e-10)
@@ -0,0 +1,24 @@
+from autolens import precompile
+from autolens.model.profiles import mass_profiles as mp
+
+
+class TestPrecompile(object):
+
+    def test__compile_integrands__every_integrand_compiled(self):
+
+        assert precompile.compile_integrands() == len(mp.deferred_integrands)
+        assert all(integrand.is_compiled for integrand in mp.deferred_integrands)
+
+    def test__precompile__fits_small_lens_in_both_precisions(self):
+
+        precompile.precompile(sub_grid_size=1, precisions=('float64', 'float32'))
+
+    def test__tracers_for_precompile__adaptive_pixelization_has_image_plane_pix_grid_of_many_pixels(self):
+
+        lens_data = precompile.lens_data_for_precompile(sub_grid_size=1)
+
+        tracers = precompile.tracers_for_precompile(lens_data=lens_data)
+
+        assert tracers[1].image_plane.grid_stack.pix.shape == (1, 2)
+        assert tracers[2].image_plane.grid_stack.pix.shape[0] > 1
+        assert tracers[2].mappers_of_planes[-1].pixels == tracers[2].image_plane.grid_stack.pix.shape[0]
@@ -0,0 +1,126 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from autolens import timing
+from autolens.data.array import grids
+from autolens.data.array import mask as msk
+from autolens.lens import plane as pl
+from autolens.model.galaxy import galaxy as g
+from autolens.model.inversion import pixelizations, regularization
+from autolens.model.profiles import mass_profiles as mp
+
+
+@pytest.fixture(name='timings')
+def make_timings():
+    timings = timing.enable()
+    timings.reset()
+    yield timings
+    timing.disable()
+
+
+class TestTimer(object):
+
+    def test__disabled__nothing_recorded(self):
+
+        timing.disable()
+
+        with timing.timer('stage'):
+            pass
+
+        assert not timing.is_enabled()
+        assert timing.timings() is None
+
+    def test__enabled__counts_and_totals_accumulated(self, timings):
+
+        for _ in range(3):
+            with timing.timer('stage'):
+                pass
+
+        with timing.timer('other_stage'):
+            pass
+
+        assert timings.counts == {'stage': 3, 'other_stage': 1}
+        assert timings.totals['stage'] >= 0.0
+
+        timing.reset()
+
+        assert timings.counts == {}
+
+    def test__exception_in_stage__time_still_recorded(self, timings):
+
+        with pytest.raises(ValueError):
+            with timing.timer('stage'):
+                raise ValueError()
+
+        assert timings.counts == {'stage': 1}
+
+    def test__galaxy_deflections__timed_per_mass_profile_type(self, timings):
+
+        galaxy = g.Galaxy(mass_0=mp.SphericalIsothermal(einstein_radius=1.0),
+                          mass_1=mp.SphericalIsothermal(einstein_radius=2.0),
+                          mass_2=mp.SphericalNFW(kappa_s=0.1))
+
+        galaxy.deflections_from_grid(grid=np.array([[1.0, 1.0]]))
+
+        assert timings.counts == {'deflections_SphericalIsothermal': 2, 'deflections_SphericalNFW': 1}
+
+    def test__deflection_cache__misses_timed_per_mass_profile_type_and_hits_not_timed(self, timings):
+
+        deflection_cache = pl.DeflectionCache()
+
+        galaxy = g.Galaxy(mass_0=mp.SphericalIsothermal(einstein_radius=1.0), mass_1=mp.SphericalNFW(kappa_s=0.1))
+
+        grid = np.array([[1.0, 1.0]])
+
+        deflection_cache.deflections_of_galaxies_from_grid(galaxies=[galaxy], grid=grid)
+        deflection_cache.deflections_of_galaxies_from_grid(galaxies=[galaxy], grid=grid)
+
+        assert deflection_cache.hits == 2
+        assert timings.counts == {'deflections_SphericalIsothermal': 1, 'deflections_SphericalNFW': 1}
+
+    def test__plane_mapper__mapper_stage_includes_border_relocation(self, timings):
+
+        mask = msk.Mask.circular(shape=(7, 7), pixel_scale=1.0, radius_arcsec=2.0)
+
+        grid_stack = grids.GridStack.grid_stack_from_mask_sub_grid_size_and_psf_shape(mask=mask, sub_grid_size=1,
+                                                                                       psf_shape=(1, 1))
+
+        galaxy = g.Galaxy(pixelization=pixelizations.Rectangular(shape=(3, 3)),
+                          regularization=regularization.Constant())
+
+        plane = pl.Plane(galaxies=[galaxy], grid_stack=grid_stack, border=grids.RegularGridBorder.from_mask(mask),
+                         compute_deflections=False)
+
+        plane.mapper
+
+        assert timings.counts == {'mapper': 1, 'border_relocation': 1}
+        assert timings.totals['mapper'] >= timings.totals['border_relocation']
+
+
+class TestOutput(object):
+
+    def test__output_to_path__json_and_text_reports(self, timings, tmpdir):
+
+        timings.add(name='stage', seconds=2.0)
+        timings.add(name='stage', seconds=4.0)
+        timings.add(name='other_stage', seconds=1.0)
+
+        path = str(tmpdir.join('phase'))
+
+        timings.output_to_path(path=path)
+
+        with open(os.path.join(path, 'timings.json'), 'r') as timings_file:
+            timings_dict = json.load(timings_file)
+
+        assert timings_dict['stage'] == {'count': 2, 'total': 6.0, 'mean': 3.0}
+        assert timings_dict['other_stage'] == {'count': 1, 'total': 1.0, 'mean': 1.0}
+
+        with open(os.path.join(path, 'timings.txt'), 'r') as timings_file:
+            lines = timings_file.read().split('\n')
+
+        assert lines[1].startswith('stage')
+        assert '3000.0000' in lines[1]
+        assert lines[2].startswith('other_stage')